@@ -0,0 +1,142 @@
+"""partition chat_messages by month
+
+Revision ID: 5b1e7c2d9f04
+Revises: 2388518a8727
+Create Date: 2025-11-10 09:12:44.201337
+
+Converts an existing chat_messages table into a RANGE (created_at)
+partitioned table with one partition per month, copying existing rows.
+Databases without a chat_messages table are left alone; the model declares
+postgresql_partition_by so the table is created partitioned, and
+chat_partition_service.ensure_partitions() adds the monthly partitions.
+
+NOTE: The copy runs inside the migration transaction. For very large
+tables run it during a maintenance window.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b1e7c2d9f04'
+down_revision: Union[str, Sequence[str], None] = '2388518a8727'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+MONTHS_AHEAD = 2
+
+INDEXES = [
+    "CREATE INDEX ix_chat_messages_session_id ON chat_messages (session_id)",
+    "CREATE INDEX ix_chat_messages_workspace_id ON chat_messages (workspace_id)",
+    "CREATE INDEX ix_chat_messages_role ON chat_messages (role)",
+    "CREATE INDEX ix_chat_messages_created_at ON chat_messages (created_at)",
+    "CREATE INDEX ix_chat_messages_session_created ON chat_messages (session_id, created_at)",
+    "CREATE INDEX ix_chat_messages_workspace_created ON chat_messages (workspace_id, created_at)",
+    "CREATE INDEX ix_chat_messages_role_created ON chat_messages (role, created_at)",
+    "CREATE INDEX ix_chat_messages_feedback ON chat_messages (feedback) WHERE feedback IS NOT NULL",
+]
+
+
+def _table_exists(bind, name: str) -> bool:
+    return bind.execute(
+        sa.text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}
+    ).scalar()
+
+
+def _is_partitioned(bind) -> bool:
+    return bool(bind.execute(sa.text(
+        "SELECT 1 FROM pg_partitioned_table pt "
+        "JOIN pg_class c ON c.oid = pt.partrelid "
+        "WHERE c.relname = 'chat_messages'"
+    )).scalar())
+
+
+def _rename_indexes(bind, table: str, suffix: str) -> None:
+    """Free up index names (they are schema-wide) before recreating them."""
+    names = bind.execute(
+        sa.text("SELECT indexname FROM pg_indexes WHERE tablename = :table"),
+        {"table": table}
+    ).scalars().all()
+
+    for name in names:
+        new_name = f"{name[:63 - len(suffix)]}{suffix}"
+        op.execute(f'ALTER INDEX "{name}" RENAME TO "{new_name}"')
+
+
+def _month_index(value) -> int:
+    return value.year * 12 + value.month - 1
+
+
+def upgrade() -> None:
+    """Convert chat_messages to monthly RANGE partitions on created_at."""
+    bind = op.get_bind()
+
+    if not _table_exists(bind, "chat_messages") or _is_partitioned(bind):
+        return
+
+    # 1. Move the existing table out of the way
+    op.execute("ALTER TABLE chat_messages RENAME TO chat_messages_legacy")
+    _rename_indexes(bind, "chat_messages_legacy", "_legacy")
+
+    # 2. Partitioned parent with the same columns
+    op.execute(
+        "CREATE TABLE chat_messages "
+        "(LIKE chat_messages_legacy INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        "PARTITION BY RANGE (created_at)"
+    )
+    op.execute("ALTER TABLE chat_messages ADD PRIMARY KEY (id, created_at)")
+    op.execute(
+        "ALTER TABLE chat_messages ADD CONSTRAINT chat_messages_session_id_fkey "
+        "FOREIGN KEY (session_id) REFERENCES chat_sessions (id) ON DELETE CASCADE"
+    )
+    for statement in INDEXES:
+        op.execute(statement)
+
+    # 3. Monthly partitions from the oldest message to MONTHS_AHEAD from now
+    oldest, now = bind.execute(sa.text(
+        "SELECT COALESCE(min(created_at), now()), now() FROM chat_messages_legacy"
+    )).one()
+
+    for index in range(_month_index(oldest), _month_index(now) + MONTHS_AHEAD + 1):
+        year, month = divmod(index, 12)
+        next_year, next_month = divmod(index + 1, 12)
+        op.execute(
+            f"CREATE TABLE chat_messages_p{year:04d}{month + 1:02d} "
+            f"PARTITION OF chat_messages "
+            f"FOR VALUES FROM ('{year:04d}-{month + 1:02d}-01') "
+            f"TO ('{next_year:04d}-{next_month + 1:02d}-01')"
+        )
+    op.execute("CREATE TABLE chat_messages_default PARTITION OF chat_messages DEFAULT")
+
+    # 4. Copy rows (LIKE preserves column order) and drop the old table
+    op.execute("INSERT INTO chat_messages SELECT * FROM chat_messages_legacy")
+    op.execute("DROP TABLE chat_messages_legacy")
+
+
+def downgrade() -> None:
+    """Convert chat_messages back to a single unpartitioned table."""
+    bind = op.get_bind()
+
+    if not _table_exists(bind, "chat_messages") or not _is_partitioned(bind):
+        return
+
+    op.execute("ALTER TABLE chat_messages RENAME TO chat_messages_partitioned")
+    _rename_indexes(bind, "chat_messages_partitioned", "_part")
+
+    op.execute(
+        "CREATE TABLE chat_messages "
+        "(LIKE chat_messages_partitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    )
+    op.execute("INSERT INTO chat_messages SELECT * FROM chat_messages_partitioned")
+    op.execute("DROP TABLE chat_messages_partitioned CASCADE")
+
+    op.execute("ALTER TABLE chat_messages ADD PRIMARY KEY (id)")
+    op.execute(
+        "ALTER TABLE chat_messages ADD CONSTRAINT chat_messages_session_id_fkey "
+        "FOREIGN KEY (session_id) REFERENCES chat_sessions (id) ON DELETE CASCADE"
+    )
+    for statement in INDEXES:
+        op.execute(statement)
@@ -0,0 +1,87 @@
+"""add bot_analytics_rollups table
+
+Revision ID: 8d3f6a1b2c47
+Revises: 5b1e7c2d9f04
+Create Date: 2025-11-12 14:03:27.915542
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3f6a1b2c47'
+down_revision: Union[str, Sequence[str], None] = '5b1e7c2d9f04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _counter(name: str, big: bool = False) -> sa.Column:
+    return sa.Column(
+        name,
+        sa.BigInteger() if big else sa.Integer(),
+        nullable=False,
+        server_default='0'
+    )
+
+
+def upgrade() -> None:
+    """Create bot_analytics_rollups table."""
+    op.create_table(
+        'bot_analytics_rollups',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('bot_type', sa.String(length=20), nullable=False),
+        sa.Column('bot_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('workspace_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('granularity', sa.String(length=10), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        _counter('conversations'),
+        _counter('messages'),
+        _counter('user_messages'),
+        _counter('assistant_messages'),
+        _counter('prompt_tokens', big=True),
+        _counter('completion_tokens', big=True),
+        _counter('total_tokens', big=True),
+        _counter('errors'),
+        _counter('feedback_positive'),
+        _counter('feedback_negative'),
+        _counter('response_time_count'),
+        _counter('response_time_sum_ms', big=True),
+        _counter('rt_le_250'),
+        _counter('rt_le_500'),
+        _counter('rt_le_1000'),
+        _counter('rt_le_2000'),
+        _counter('rt_le_5000'),
+        _counter('rt_gt_5000'),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint(
+            'bot_type', 'bot_id', 'granularity', 'bucket_start',
+            name='uq_bot_analytics_rollups_bucket'
+        )
+    )
+    op.create_index(op.f('ix_bot_analytics_rollups_id'), 'bot_analytics_rollups', ['id'], unique=True)
+    op.create_index(
+        op.f('ix_bot_analytics_rollups_workspace_id'),
+        'bot_analytics_rollups',
+        ['workspace_id'],
+        unique=False
+    )
+    op.create_index(
+        'ix_bot_analytics_rollups_workspace_bucket',
+        'bot_analytics_rollups',
+        ['workspace_id', 'granularity', 'bucket_start'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """Drop bot_analytics_rollups table."""
+    op.drop_index('ix_bot_analytics_rollups_workspace_bucket', table_name='bot_analytics_rollups')
+    op.drop_index(op.f('ix_bot_analytics_rollups_workspace_id'), table_name='bot_analytics_rollups')
+    op.drop_index(op.f('ix_bot_analytics_rollups_id'), table_name='bot_analytics_rollups')
+    op.drop_table('bot_analytics_rollups')
@@ -0,0 +1,53 @@
+"""add workspace_usage table
+
+Revision ID: c41e9a7d5f20
+Revises: 8d3f6a1b2c47
+Create Date: 2025-11-13 10:21:44.207316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41e9a7d5f20'
+down_revision: Union[str, Sequence[str], None] = '8d3f6a1b2c47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create workspace_usage table."""
+    op.create_table(
+        'workspace_usage',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('workspace_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('bot_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('period_start', sa.Date(), nullable=False),
+        sa.Column('metric', sa.String(length=50), nullable=False),
+        sa.Column('value', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint(
+            'workspace_id', 'bot_id', 'period_start', 'metric',
+            name='uq_workspace_usage_period_metric'
+        )
+    )
+    op.create_index(op.f('ix_workspace_usage_id'), 'workspace_usage', ['id'], unique=True)
+    op.create_index(
+        'ix_workspace_usage_workspace_period',
+        'workspace_usage',
+        ['workspace_id', 'period_start'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """Drop workspace_usage table."""
+    op.drop_index('ix_workspace_usage_workspace_period', table_name='workspace_usage')
+    op.drop_index(op.f('ix_workspace_usage_id'), table_name='workspace_usage')
+    op.drop_table('workspace_usage')
@@ -0,0 +1,41 @@
+"""add usage_flush_log table
+
+Revision ID: e5a8d2f41b93
+Revises: c41e9a7d5f20
+Create Date: 2025-11-20 09:12:37.518904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a8d2f41b93'
+down_revision: Union[str, Sequence[str], None] = 'c41e9a7d5f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create usage_flush_log table."""
+    op.create_table(
+        'usage_flush_log',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('snapshot_id', sa.String(length=100), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('snapshot_id')
+    )
+    op.create_index(op.f('ix_usage_flush_log_id'), 'usage_flush_log', ['id'], unique=True)
+    op.create_index('ix_usage_flush_log_created_at', 'usage_flush_log', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Drop usage_flush_log table."""
+    op.drop_index('ix_usage_flush_log_created_at', table_name='usage_flush_log')
+    op.drop_index(op.f('ix_usage_flush_log_id'), table_name='usage_flush_log')
+    op.drop_table('usage_flush_log')
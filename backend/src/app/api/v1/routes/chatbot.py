@@ -27,6 +27,7 @@ from app.models.user import User
 from app.models.chatbot import Chatbot
 from app.services.draft_service import draft_service
 from app.services.chatbot_service import chatbot_service
+from app.services.bot_registry import bot_registry
 
 router = APIRouter(prefix="/chatbots", tags=["chatbots"])
 
@@ -369,6 +370,8 @@ async def update_chatbot(
     db.commit()
     db.refresh(chatbot)
 
+    bot_registry.invalidate(chatbot.id)
+
     return chatbot
 
 
@@ -419,6 +422,8 @@ async def delete_chatbot(
     chatbot.is_deleted = True
     db.commit()
 
+    bot_registry.invalidate(chatbot.id)
+
     return {"status": "deleted"}
 
 
@@ -495,7 +500,8 @@ async def get_chatbot_analytics(
     Get chatbot analytics.
 
     WHY: Monitor usage and performance
-    HOW: Aggregate from chat_sessions and chat_messages
+    HOW: Sum daily rollups (bot_analytics_service), maintained on every
+         message write - no scan of chat_sessions/chat_messages
 
     RETURNS:
         {
@@ -503,7 +509,9 @@ async def get_chatbot_analytics(
             "total_messages": 5678,
             "avg_conversation_length": 4.6,
             "avg_response_time_ms": 850,
-            "user_satisfaction": 4.5
+            "p95_response_time_ms": 2000,
+            "user_satisfaction": 0.92,  # Positive share of rated messages
+            "daily": [...]
         }
     """
 
@@ -530,15 +538,15 @@ async def get_chatbot_analytics(
             detail="Access denied"
         )
 
-    # TODO: Implement analytics aggregation
+    # Pre-aggregated daily rollups (at most `days` rows)
+    from app.services.bot_analytics_service import bot_analytics_service
 
-    return {
-        "total_conversations": 0,
-        "total_messages": 0,
-        "avg_conversation_length": 0,
-        "avg_response_time_ms": 0,
-        "user_satisfaction": 0
-    }
+    return bot_analytics_service.get_summary(
+        db=db,
+        bot_type="chatbot",
+        bot_id=chatbot_id,
+        days=days
+    )
 
 
 @router.post("/{chatbot_id}/kb/attach")
@@ -590,6 +598,7 @@ async def attach_knowledge_base(
     if kb_id not in chatbot.knowledge_bases:
         chatbot.knowledge_bases.append(kb_id)
         db.commit()
+        bot_registry.invalidate(chatbot.id)
 
     return {"status": "attached"}
 
@@ -622,5 +631,6 @@ async def detach_knowledge_base(
     if chatbot.knowledge_bases and kb_id in chatbot.knowledge_bases:
         chatbot.knowledge_bases.remove(kb_id)
         db.commit()
+        bot_registry.invalidate(chatbot.id)
 
     return {"status": "detached"}
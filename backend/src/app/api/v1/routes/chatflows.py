@@ -27,6 +27,8 @@ from app.models.user import User
 from app.models.chatflow import Chatflow
 from app.services.draft_service import draft_service
 from app.services.chatflow_service import chatflow_service
+from app.services.bot_registry import bot_registry
+from app.chatflow.utils.execution_plan import execution_plan_cache
 
 router = APIRouter(prefix="/chatflows", tags=["chatflows"])
 
@@ -361,6 +363,9 @@ async def delete_chatflow(
     chatflow.is_deleted = True
     db.commit()
 
+    bot_registry.invalidate(chatflow.id)
+    execution_plan_cache.invalidate(chatflow.id)
+
     return {"status": "deleted"}
 
 
@@ -437,15 +442,18 @@ async def get_chatflow_analytics(
     Get chatflow analytics.
 
     WHY: Monitor usage and performance
-    HOW: Aggregate from chat_sessions and chat_messages
+    HOW: Sum daily rollups (bot_analytics_service), maintained on every
+         message write - no scan of chat_sessions/chat_messages
 
     RETURNS:
         {
             "total_conversations": 1234,
             "total_messages": 5678,
             "avg_conversation_length": 4.6,
-            "top_entry_nodes": [...],
-            "avg_execution_time_ms": 850
+            "avg_execution_time_ms": 850,
+            "p95_response_time_ms": 2000,
+            "user_satisfaction": 0.92,
+            "daily": [...]
         }
     """
 
@@ -472,12 +480,82 @@ async def get_chatflow_analytics(
             detail="Access denied"
         )
 
-    # TODO: Implement analytics aggregation
+    # Pre-aggregated daily rollups (at most `days` rows)
+    from app.services.bot_analytics_service import bot_analytics_service
 
-    return {
-        "total_conversations": 0,
-        "total_messages": 0,
-        "avg_conversation_length": 0,
-        "top_entry_nodes": [],
-        "avg_execution_time_ms": 0
-    }
+    summary = bot_analytics_service.get_summary(
+        db=db,
+        bot_type="chatflow",
+        bot_id=chatflow_id,
+        days=days
+    )
+
+    # Chatflow response time is the graph execution time
+    summary["avg_execution_time_ms"] = summary["avg_response_time_ms"]
+
+    return summary
+
+
+@router.get("/{chatflow_id}/profile")
+async def get_chatflow_profile(
+    chatflow_id: UUID,
+    limit: int = 500,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get per-node latency profile.
+
+    WHY: Find which node makes a chatflow slow
+    HOW: Aggregate the most recent sampled execution traces
+         (chatflow_trace_service, bounded Redis stream)
+
+    RETURNS:
+        {
+            "chatflow_id": "uuid",
+            "traces": 500,
+            "execution": {"p50_ms": 820, "p95_ms": 2100, "error_rate": 0.01},
+            "nodes": [
+                {"node_id": "llm1", "type": "llm", "count": 500,
+                 "p50_ms": 700, "p95_ms": 1900, "max_ms": 3200,
+                 "cache_hit_rate": 0.2, "errors": 3,
+                 "upstream_p50_ms": 650, "avg_output_size": 512}
+            ]
+        }
+    """
+
+    chatflow = db.query(Chatflow).filter(
+        Chatflow.id == chatflow_id
+    ).first()
+
+    if not chatflow:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Chatflow not found"
+        )
+
+    # Verify access
+    from app.models.workspace import Workspace
+    workspace = db.query(Workspace).filter(
+        Workspace.id == chatflow.workspace_id,
+        Workspace.org_id == current_user.org_id
+    ).first()
+
+    if not workspace:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
+
+    from app.services.chatflow_trace_service import TraceStoreUnavailable, chatflow_trace_service
+
+    try:
+        return chatflow_trace_service.get_profile(
+            chatflow_id=chatflow_id,
+            limit=max(1, min(limit, chatflow_trace_service.stream_maxlen))
+        )
+    except TraceStoreUnavailable:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Trace store unavailable, try again shortly"
+        )
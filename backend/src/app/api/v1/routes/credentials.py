@@ -325,6 +325,13 @@ async def update_credential(
     db.commit()
     db.refresh(credential)
 
+    # Drop pooled database connections and cached decrypted data
+    if "data" in updates or "is_active" in updates:
+        from app.services.credential_cache import credential_cache
+        from app.services.database_engine_registry import database_engine_registry
+        database_engine_registry.invalidate(credential.id)
+        credential_cache.invalidate(credential.id)
+
     return {
         "id": str(credential.id),
         "name": credential.name,
@@ -378,6 +385,11 @@ async def delete_credential(
     db.delete(credential)
     db.commit()
 
+    from app.services.credential_cache import credential_cache
+    from app.services.database_engine_registry import database_engine_registry
+    database_engine_registry.invalidate(credential_id)
+    credential_cache.invalidate(credential_id)
+
     return {"status": "deleted"}
 
 
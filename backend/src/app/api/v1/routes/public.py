@@ -98,8 +98,9 @@ async def chat(
     FLOW:
     1. Validate API key
     2. Get bot (chatbot or chatflow)
-    3. Route to appropriate service
-    4. Return response
+    3. Check workspace message quota
+    4. Route to appropriate service
+    5. Return response
 
     ARGS:
         bot_id: UUID of chatbot or chatflow
@@ -124,6 +125,13 @@ async def chat(
         api_key
     )
 
+    # Monthly message quota (cached limits + one Redis read)
+    from app.services.usage_metering_service import usage_metering_service
+
+    quota = usage_metering_service.check_quota(db, workspace_id, "messages")
+    if not quota["allowed"]:
+        raise HTTPException(429, "Monthly message quota exceeded")
+
     # Generate session ID if not provided
     session_id = request.session_id or f"web_{uuid4().hex[:16]}"
 
@@ -186,10 +194,13 @@ async def submit_feedback(
     # Update message
     from app.models.chat_message import ChatMessage
 
-    message = db.query(ChatMessage).get(message_id)
+    # Composite (id, created_at) primary key - look up by id
+    message = db.query(ChatMessage).filter(ChatMessage.id == message_id).first()
     if not message:
         raise HTTPException(404, "Message not found")
 
+    previous_rating = (message.feedback or {}).get("rating")
+
     message.feedback = {
         "rating": request.rating,
         "comment": request.comment,
@@ -197,6 +208,17 @@ async def submit_feedback(
     }
     message.feedback_at = datetime.utcnow()
 
+    # Keep analytics rollups in step (same transaction)
+    from app.services.bot_analytics_service import bot_analytics_service
+
+    bot_analytics_service.record_feedback(
+        db=db,
+        session=message.session,
+        message=message,
+        rating=request.rating,
+        previous_rating=previous_rating
+    )
+
     db.commit()
 
     return {"status": "ok"}
@@ -269,15 +291,14 @@ async def _validate_api_key_and_get_bot(
     Validate API key and return bot.
 
     WHY: Security - ensure valid API key
-    HOW: Check API key matches bot
+    HOW: Check API key matches bot, resolve bot via bot_registry
 
     RETURNS:
         (bot_type, bot, workspace_id)
     """
 
     from app.models.api_key import APIKey
-    from app.models.chatbot import Chatbot
-    from app.models.chatflow import Chatflow
+    from app.services.bot_registry import bot_registry
 
     # Validate API key
     api_key_obj = db.query(APIKey).filter(
@@ -289,15 +310,14 @@ async def _validate_api_key_and_get_bot(
     if not api_key_obj:
         raise HTTPException(401, "Invalid API key")
 
-    # Get bot
-    if api_key_obj.entity_type == "chatbot":
-        bot = db.query(Chatbot).get(bot_id)
-        if not bot:
-            raise HTTPException(404, "Chatbot not found")
-        return "chatbot", bot, bot.workspace_id
+    # Resolve bot type from registry, then load only that model
+    entry = bot_registry.get(db, bot_id)
+    if not entry or entry.bot_type != api_key_obj.entity_type:
+        raise HTTPException(404, f"{api_key_obj.entity_type.capitalize()} not found")
 
-    else:  # chatflow
-        bot = db.query(Chatflow).get(bot_id)
-        if not bot:
-            raise HTTPException(404, "Chatflow not found")
-        return "chatflow", bot, bot.workspace_id
+    try:
+        bot_type, bot = bot_registry.get_model(db, bot_id)
+    except ValueError:
+        raise HTTPException(404, f"{api_key_obj.entity_type.capitalize()} not found")
+
+    return bot_type, bot, UUID(entry.workspace_id)
@@ -11,6 +11,7 @@ HOW:
 - Discord interaction parsing
 - Bot execution delegation
 - Response formatting
+- Deferred interaction response, ordered background processing per channel
 
 PSEUDOCODE follows the existing codebase patterns.
 """
@@ -26,6 +27,9 @@ from app.db.session import get_db
 from app.integrations.discord_integration import discord_integration
 from app.services.chatbot_service import chatbot_service
 from app.services.chatflow_service import chatflow_service
+from app.services.channel_dispatcher import channel_dispatcher
+from app.services.bot_registry import bot_registry
+from app.services.webhook_dedup_service import webhook_dedup_service
 
 router = APIRouter(prefix="/webhooks/discord", tags=["webhooks"])
 
@@ -42,14 +46,15 @@ async def discord_webhook(
     Discord webhook handler.
 
     WHY: Receive and process Discord interactions
-    HOW: Verify signature, parse interaction, execute bot
+    HOW: Verify signature, parse interaction, defer and execute bot later
 
     FLOW:
     1. Verify Discord signature
     2. Parse interaction
     3. Handle interaction type (PING, MESSAGE_CREATE, etc.)
-    4. Execute bot
-    5. Send response to Discord
+    4. Queue job on the (bot, channel) partition, return deferred ack
+    5. Job: execute bot, edit the deferred response with the reply
+       (progressively while streaming when discord.streaming is set)
 
     URL:
         POST /webhooks/discord/{bot_id}
@@ -71,35 +76,21 @@ async def discord_webhook(
 
     RETURNS:
         {
-            "type": 4,  // CHANNEL_MESSAGE_WITH_SOURCE
-            "data": {
-                "content": "Response message"
-            }
+            "type": 5  // DEFERRED_CHANNEL_MESSAGE_WITH_SOURCE
         }
     """
 
-    # Get bot from database
-    from app.models.chatbot import Chatbot
-    from app.models.chatflow import Chatflow
-
-    chatbot = db.query(Chatbot).filter(Chatbot.id == bot_id).first()
-    if chatbot:
-        bot_type = "chatbot"
-        bot = chatbot
-    else:
-        chatflow = db.query(Chatflow).filter(Chatflow.id == bot_id).first()
-        if chatflow:
-            bot_type = "chatflow"
-            bot = chatflow
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Bot not found"
-            )
+    # Resolve bot from registry (no bot queries on the hot path)
+    bot_entry = bot_registry.get(db, bot_id)
+    if not bot_entry:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Bot not found"
+        )
 
     # Check if Discord is enabled
-    deployment_config = bot.deployment_config or {}
-    if "discord" not in deployment_config.get("channels", []):
+    deployment_config = bot_entry.deployment_config
+    if not bot_entry.channel_enabled("discord"):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Discord not enabled for this bot"
@@ -137,58 +128,128 @@ async def discord_webhook(
 
     # Type 2: APPLICATION_COMMAND or Type 3: MESSAGE_COMPONENT
     if interaction_type in [2, 3]:
-        # Extract message
-        data = interaction.get("data", {})
-        message_content = data.get("content") or data.get("custom_id", "")
-
-        # Extract user info
-        member = interaction.get("member", {})
-        user = member.get("user", {}) or interaction.get("user", {})
-        user_id = user.get("id")
-        username = user.get("username")
-        channel_id = interaction.get("channel_id")
-
-        # Generate session ID
-        session_id = f"discord_{channel_id}_{user_id}"
-
-        # Execute bot
-        if bot_type == "chatbot":
+        # Drop redeliveries (checked after signature verification so
+        # forged requests cannot claim real interaction ids)
+        interaction_id = interaction.get("id")
+        if webhook_dedup_service.is_duplicate("discord", bot_id, interaction_id):
+            return {"type": 5}
+
+        try:
+            # Extract message
+            data = interaction.get("data", {})
+            message_content = data.get("content") or data.get("custom_id", "")
+
+            # Extract user info
+            member = interaction.get("member", {})
+            user = member.get("user", {}) or interaction.get("user", {})
+            user_id = user.get("id")
+            username = user.get("username")
+            channel_id = interaction.get("channel_id")
+
+            # Generate session ID
+            session_id = f"discord_{channel_id}_{user_id}"
+
+            channel_context = {
+                "platform": "discord",
+                "channel_id": channel_id,
+                "user_id": user_id,
+                "username": username
+            }
+
+            job = {
+                "bot_id": str(bot_id),
+                "application_id": interaction.get("application_id") or discord_config.get("application_id"),
+                "interaction_token": interaction.get("token"),
+                "text": message_content,
+                "session_id": session_id,
+                "channel_context": channel_context
+            }
+
+            # Acknowledge within Discord's 3 second window, answer later
+            if not channel_dispatcher.submit(bot_id, channel_id, "discord", job):
+                return {
+                    "type": 4,  # CHANNEL_MESSAGE_WITH_SOURCE
+                    "data": {
+                        "content": "I'm still working on earlier messages, please try again shortly."
+                    }
+                }
+
+            return {"type": 5}  # DEFERRED_CHANNEL_MESSAGE_WITH_SOURCE
+        except Exception:
+            # Not acknowledged: let the platform's redelivery through
+            webhook_dedup_service.release("discord", bot_id, interaction_id)
+            raise
+
+    # Unknown interaction type
+    return {"type": 4, "data": {"content": "Unknown interaction type"}}
+
+
+async def reply(db: Session, job: dict):
+    """
+    Execute bot and edit the deferred response (channel_dispatcher job).
+
+    NOTE: The queued job carries the interaction token - it is only valid
+    for the interaction's 15 minute follow-up window anyway
+    """
+
+    bot_id = job["bot_id"]
+    application_id = job["application_id"]
+    interaction_token = job["interaction_token"]
+    text = job["text"]
+    session_id = job["session_id"]
+    channel_context = job["channel_context"]
+
+    bot_entry = bot_registry.get(db, bot_id)
+    streaming = bool(bot_entry and bot_entry.deployment_config.get("discord", {}).get("streaming"))
+
+    bot_type, bot = bot_registry.get_model(db, bot_id)
+
+    # Streamed reply: the deferred response is edited as tokens arrive
+    if streaming and bot_type == "chatbot":
+        stream = discord_integration.open_stream(application_id, interaction_token)
+        try:
             response = await chatbot_service.process_message(
                 db=db,
                 chatbot=bot,
-                user_message=message_content,
+                user_message=text,
                 session_id=session_id,
-                channel_context={
-                    "platform": "discord",
-                    "channel_id": channel_id,
-                    "user_id": user_id,
-                    "username": username
-                }
-            )
-        else:
-            response = await chatflow_service.execute(
-                db=db,
-                chatflow=bot,
-                user_message=message_content,
-                session_id=session_id,
-                channel_context={
-                    "platform": "discord",
-                    "channel_id": channel_id,
-                    "user_id": user_id,
-                    "username": username
-                }
+                channel_context=channel_context,
+                on_partial=stream.update
             )
+        except Exception:
+            await stream.finish("Sorry, something went wrong. Please try again.")
+            raise
+
+        await stream.finish(response["response"])
+        return
+
+    # Execute bot
+    if bot_type == "chatbot":
+        response = await chatbot_service.process_message(
+            db=db,
+            chatbot=bot,
+            user_message=text,
+            session_id=session_id,
+            channel_context=channel_context
+        )
+    else:
+        response = await chatflow_service.execute(
+            db=db,
+            chatflow=bot,
+            user_message=text,
+            session_id=session_id,
+            channel_context=channel_context
+        )
 
-        # Return Discord interaction response
-        return {
-            "type": 4,  # CHANNEL_MESSAGE_WITH_SOURCE
-            "data": {
-                "content": response["response"]
-            }
-        }
+    # Follow up on the deferred interaction
+    await discord_integration._send_message(
+        application_id=application_id,
+        interaction_token=interaction_token,
+        text=response["response"]
+    )
 
-    # Unknown interaction type
-    return {"type": 4, "data": {"content": "Unknown interaction type"}}
+
+channel_dispatcher.register("discord", reply)
 
 
 @router.post("/{bot_id}/register-commands")
@@ -11,6 +11,7 @@ HOW:
 - Telegram update parsing
 - Bot execution delegation
 - Response formatting
+- Fast acknowledgement, ordered background processing per chat
 
 PSEUDOCODE follows the existing codebase patterns.
 """
@@ -24,6 +25,9 @@ from app.db.session import get_db
 from app.integrations.telegram_integration import telegram_integration
 from app.services.chatbot_service import chatbot_service
 from app.services.chatflow_service import chatflow_service
+from app.services.channel_dispatcher import channel_dispatcher
+from app.services.bot_registry import bot_registry
+from app.services.webhook_dedup_service import webhook_dedup_service
 
 router = APIRouter(prefix="/webhooks/telegram", tags=["webhooks"])
 
@@ -38,14 +42,15 @@ async def telegram_webhook(
     Telegram webhook handler.
 
     WHY: Receive and process Telegram messages
-    HOW: Parse update, execute bot, send response
+    HOW: Parse update, queue bot execution, acknowledge immediately
 
     FLOW:
     1. Parse Telegram update
     2. Extract message and user info
-    3. Get bot from database
-    4. Execute bot (chatbot or chatflow)
-    5. Send response to Telegram
+    3. Drop redelivered update_ids, get bot from registry
+    4. Queue job on the (bot, chat) partition and return
+    5. Job: execute bot (chatbot or chatflow), send response to Telegram
+       (streamed into an edited message when telegram.streaming is set)
 
     URL:
         POST /webhooks/telegram/{bot_id}
@@ -91,44 +96,103 @@ async def telegram_webhook(
     chat_id = message.get("chat", {}).get("id")
     user_id = from_user.get("id")
 
-    # Get bot from database (polymorphic)
-    from app.models.chatbot import Chatbot
-    from app.models.chatflow import Chatflow
-    from app.models.api_key import APIKey
-
-    # Try chatbot first
-    chatbot = db.query(Chatbot).filter(
-        Chatbot.id == bot_id
-    ).first()
-
-    if chatbot:
-        bot_type = "chatbot"
-        bot = chatbot
-    else:
-        # Try chatflow
-        chatflow = db.query(Chatflow).filter(
-            Chatflow.id == bot_id
-        ).first()
+    # Drop redeliveries before any DB or LLM work
+    update_id = update.get("update_id")
+    if webhook_dedup_service.is_duplicate("telegram", bot_id, update_id):
+        return {"status": "duplicate"}
 
-        if chatflow:
-            bot_type = "chatflow"
-            bot = chatflow
-        else:
+    try:
+        # Resolve bot from registry (no bot queries on the hot path)
+        bot_entry = bot_registry.get(db, bot_id)
+        if not bot_entry:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Bot not found"
             )
 
-    # Check if Telegram is enabled
-    deployment_config = bot.deployment_config or {}
-    if "telegram" not in deployment_config.get("channels", []):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Telegram not enabled for this bot"
-        )
+        # Check if Telegram is enabled
+        if not bot_entry.channel_enabled("telegram"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Telegram not enabled for this bot"
+            )
+
+        # Generate session ID
+        session_id = f"telegram_{chat_id}"
 
-    # Generate session ID
-    session_id = f"telegram_{chat_id}"
+        channel_context = {
+            "platform": "telegram",
+            "chat_id": chat_id,
+            "user_id": user_id,
+            "username": from_user.get("username"),
+            "first_name": from_user.get("first_name")
+        }
+
+        job = {
+            "bot_id": str(bot_id),
+            "text": text,
+            "session_id": session_id,
+            "channel_context": channel_context
+        }
+
+        # Acknowledge once durably queued, process in order per chat
+        if not channel_dispatcher.submit(bot_id, chat_id, "telegram", job):
+            # Non-2xx makes Telegram redeliver the update later
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Chat queue full or unavailable"
+            )
+    except Exception:
+        # Not acknowledged: let the platform's redelivery through
+        webhook_dedup_service.release("telegram", bot_id, update_id)
+        raise
+
+    return {"status": "ok"}
+
+
+async def reply(db: Session, job: dict):
+    """
+    Execute bot and send the reply (channel_dispatcher job).
+
+    WHY: Runs after the webhook returned - possibly in another process or
+         after a restart, so the bot token is read from the registry here
+         rather than stored in the queued job
+    """
+
+    bot_id = job["bot_id"]
+    chat_id = job["channel_context"]["chat_id"]
+    text = job["text"]
+    session_id = job["session_id"]
+    channel_context = job["channel_context"]
+
+    bot_entry = bot_registry.get(db, bot_id)
+    if not bot_entry:
+        return
+
+    telegram_config = bot_entry.deployment_config.get("telegram", {})
+    telegram_bot_token = telegram_config.get("bot_token")
+    streaming = bool(telegram_config.get("streaming"))
+
+    bot_type, bot = bot_registry.get_model(db, bot_id)
+
+    # Streamed reply: placeholder message edited as tokens arrive
+    if streaming and bot_type == "chatbot" and telegram_bot_token:
+        stream = await telegram_integration.open_stream(chat_id, telegram_bot_token)
+        try:
+            response = await chatbot_service.process_message(
+                db=db,
+                chatbot=bot,
+                user_message=text,
+                session_id=session_id,
+                channel_context=channel_context,
+                on_partial=stream.update
+            )
+        except Exception:
+            await stream.finish("Sorry, something went wrong. Please try again.")
+            raise
+
+        await stream.finish(response["response"])
+        return
 
     # Execute bot
     if bot_type == "chatbot":
@@ -137,13 +201,7 @@ async def telegram_webhook(
             chatbot=bot,
             user_message=text,
             session_id=session_id,
-            channel_context={
-                "platform": "telegram",
-                "chat_id": chat_id,
-                "user_id": user_id,
-                "username": from_user.get("username"),
-                "first_name": from_user.get("first_name")
-            }
+            channel_context=channel_context
         )
     else:
         response = await chatflow_service.execute(
@@ -151,26 +209,19 @@ async def telegram_webhook(
             chatflow=bot,
             user_message=text,
             session_id=session_id,
-            channel_context={
-                "platform": "telegram",
-                "chat_id": chat_id,
-                "user_id": user_id,
-                "username": from_user.get("username"),
-                "first_name": from_user.get("first_name")
-            }
+            channel_context=channel_context
         )
 
     # Send response to Telegram
-    telegram_bot_token = deployment_config.get("telegram", {}).get("bot_token")
-
     if telegram_bot_token:
-        await telegram_integration.send_message(
-            bot_token=telegram_bot_token,
+        await telegram_integration._send_message(
             chat_id=chat_id,
-            message=response["response"]
+            text=response["response"],
+            bot_token=telegram_bot_token
         )
 
-    return {"status": "ok"}
+
+channel_dispatcher.register("telegram", reply)
 
 
 @router.get("/{bot_id}/webhook-info")
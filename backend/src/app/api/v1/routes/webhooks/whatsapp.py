@@ -11,6 +11,7 @@ HOW:
 - WhatsApp webhook verification
 - Message parsing
 - Bot execution delegation
+- Fast acknowledgement, ordered background processing per sender
 
 PSEUDOCODE follows the existing codebase patterns.
 """
@@ -24,6 +25,9 @@ from app.db.session import get_db
 from app.integrations.whatsapp_integration import whatsapp_integration
 from app.services.chatbot_service import chatbot_service
 from app.services.chatflow_service import chatflow_service
+from app.services.channel_dispatcher import channel_dispatcher
+from app.services.bot_registry import bot_registry
+from app.services.webhook_dedup_service import webhook_dedup_service
 
 router = APIRouter(prefix="/webhooks/whatsapp", tags=["webhooks"])
 
@@ -49,26 +53,17 @@ async def whatsapp_webhook_verification(
         hub.challenge (as plain text)
     """
 
-    # Get bot from database
-    from app.models.chatbot import Chatbot
-    from app.models.chatflow import Chatflow
-
-    chatbot = db.query(Chatbot).filter(Chatbot.id == bot_id).first()
-    if chatbot:
-        bot = chatbot
-    else:
-        chatflow = db.query(Chatflow).filter(Chatflow.id == bot_id).first()
-        if chatflow:
-            bot = chatflow
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Bot not found"
-            )
+    # Resolve bot from registry
+    bot_entry = bot_registry.get(db, bot_id)
+    if not bot_entry:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Bot not found"
+        )
 
     # Check if WhatsApp is enabled
-    deployment_config = bot.deployment_config or {}
-    if "whatsapp" not in deployment_config.get("channels", []):
+    deployment_config = bot_entry.deployment_config
+    if not bot_entry.channel_enabled("whatsapp"):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="WhatsApp not enabled for this bot"
@@ -98,14 +93,14 @@ async def whatsapp_webhook(
     WhatsApp webhook handler.
 
     WHY: Receive and process WhatsApp messages
-    HOW: Parse webhook, extract message, execute bot
+    HOW: Parse webhook, extract message, queue bot execution, acknowledge
 
     FLOW:
     1. Parse WhatsApp webhook
     2. Extract message and sender info
-    3. Get bot from database
-    4. Execute bot
-    5. Send response via WhatsApp API
+    3. Drop redelivered message ids, get bot from registry
+    4. Queue job on the (bot, sender) partition and return
+    5. Job: execute bot, send response via WhatsApp API
 
     URL:
         POST /webhooks/whatsapp/{bot_id}
@@ -143,33 +138,6 @@ async def whatsapp_webhook(
     # Parse webhook
     webhook_data = await request.json()
 
-    # Get bot from database
-    from app.models.chatbot import Chatbot
-    from app.models.chatflow import Chatflow
-
-    chatbot = db.query(Chatbot).filter(Chatbot.id == bot_id).first()
-    if chatbot:
-        bot_type = "chatbot"
-        bot = chatbot
-    else:
-        chatflow = db.query(Chatflow).filter(Chatflow.id == bot_id).first()
-        if chatflow:
-            bot_type = "chatflow"
-            bot = chatflow
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Bot not found"
-            )
-
-    # Check if WhatsApp is enabled
-    deployment_config = bot.deployment_config or {}
-    if "whatsapp" not in deployment_config.get("channels", []):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="WhatsApp not enabled for this bot"
-        )
-
     # Extract message from webhook
     entry = webhook_data.get("entry", [])
     if not entry:
@@ -198,50 +166,91 @@ async def whatsapp_webhook(
 
     text = message.get("text", {}).get("body", "")
 
-    # Generate session ID
-    session_id = f"whatsapp_{from_number}"
+    # Drop redeliveries before any DB or LLM work
+    if webhook_dedup_service.is_duplicate("whatsapp", bot_id, message_id):
+        return {"status": "duplicate"}
 
-    # Get WhatsApp config
-    whatsapp_config = deployment_config.get("whatsapp", {})
-    access_token = whatsapp_config.get("access_token")
-    phone_number_id = whatsapp_config.get("phone_number_id")
+    try:
+        # Resolve bot from registry (no bot queries on the hot path)
+        bot_entry = bot_registry.get(db, bot_id)
+        if not bot_entry:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Bot not found"
+            )
+
+        # Check if WhatsApp is enabled
+        if not bot_entry.channel_enabled("whatsapp"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="WhatsApp not enabled for this bot"
+            )
+
+        # Generate session ID
+        session_id = f"whatsapp_{from_number}"
+
+        channel_context = {
+            "platform": "whatsapp",
+            "from_number": from_number,
+            "message_id": message_id
+        }
+
+        job = {
+            "bot_id": str(bot_id),
+            "from_number": from_number,
+            "text": text,
+            "session_id": session_id,
+            "channel_context": channel_context
+        }
+
+        # Acknowledge once durably queued, process in order per sender
+        if not channel_dispatcher.submit(bot_id, from_number, "whatsapp", job):
+            # Non-2xx makes WhatsApp redeliver the webhook later
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Chat queue full or unavailable"
+            )
+    except Exception:
+        # Not acknowledged: let the platform's redelivery through
+        webhook_dedup_service.release("whatsapp", bot_id, message_id)
+        raise
+
+    return {"status": "ok"}
+
+
+async def reply(db: Session, job: dict):
+    """Execute bot and send the reply (channel_dispatcher job)."""
+
+    bot_type, bot = bot_registry.get_model(db, job["bot_id"])
 
     # Execute bot
     if bot_type == "chatbot":
         response = await chatbot_service.process_message(
             db=db,
             chatbot=bot,
-            user_message=text,
-            session_id=session_id,
-            channel_context={
-                "platform": "whatsapp",
-                "from_number": from_number,
-                "message_id": message_id
-            }
+            user_message=job["text"],
+            session_id=job["session_id"],
+            channel_context=job["channel_context"]
         )
     else:
         response = await chatflow_service.execute(
             db=db,
             chatflow=bot,
-            user_message=text,
-            session_id=session_id,
-            channel_context={
-                "platform": "whatsapp",
-                "from_number": from_number,
-                "message_id": message_id
-            }
+            user_message=job["text"],
+            session_id=job["session_id"],
+            channel_context=job["channel_context"]
         )
 
     # Send response to WhatsApp
-    if access_token and phone_number_id:
-        await whatsapp_integration.send_message(
-            access_token=access_token,
-            phone_number_id=phone_number_id,
-            to=from_number,
-            message=response["response"]
-        )
+    await whatsapp_integration._send_message(
+        db=db,
+        bot=bot,
+        to_number=job["from_number"],
+        text=response["response"]
+    )
 
-    return {"status": "ok"}
+
+channel_dispatcher.register("whatsapp", reply)
 
 
 @router.post("/{bot_id}/send-template")
@@ -12,6 +12,7 @@ HOW:
 - Context management
 - Input/output handling
 - Validation framework
+- Opt-in memoization for deterministic node types (run())
 
 PSEUDOCODE follows the existing codebase patterns.
 """
@@ -29,6 +30,9 @@ class BaseNode(ABC):
     HOW: Inherit and implement execute()
     """
 
+    # Templates used when the config omits them (memo keys must see them)
+    memo_defaults: dict = {}
+
     def __init__(self, node_id: str, config: dict):
         """
         Initialize base node.
@@ -71,6 +75,46 @@ class BaseNode(ABC):
         pass
 
 
+    async def run(
+        self,
+        db: Session,
+        context: Dict[str, Any],
+        inputs: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Execute, memoized when the node allows it and the config asks.
+
+        WHY: Skip repeated deterministic work (KB lookups, GETs, ...)
+        HOW: node_memo keyed by (config version, resolved inputs);
+             metadata["cache_hit"] reports hits
+
+        CONFIG:
+            "memoize": true  or  "memoize_ttl": 600
+        """
+        from app.chatflow.utils.node_memo import memo_ttl, node_memo
+
+        if memo_ttl(self.config) is None or not self.is_cacheable():
+            return await self.execute(db, context, inputs)
+
+        return await node_memo.run(
+            node_type=self.node_type,
+            config=self.config,
+            scope=self.build_scope(context, inputs),
+            compute=lambda: self.execute(db, context, inputs),
+            defaults=self.memo_defaults
+        )
+
+
+    def is_cacheable(self) -> bool:
+        """
+        Whether results depend only on config and resolved inputs.
+
+        WHY: Only deterministic nodes may be memoized
+        HOW: Override in subclass (default: not cacheable)
+        """
+        return False
+
+
     def validate_config(self) -> tuple[bool, Optional[str]]:
         """
         Validate node configuration.
@@ -95,6 +139,18 @@ class BaseNode(ABC):
         return inputs.get(key, default)
 
 
+    def build_scope(self, context: dict, inputs: dict, **extra: Any):
+        """
+        Variables visible to this node (extra > inputs > flow variables).
+
+        WHY: Resolve templates without copying every flow variable
+        HOW: Layered copy-on-write scope (writes stay in the top layer)
+        """
+        from app.chatflow.utils.template import layered_scope
+
+        return layered_scope(extra, inputs, context.get("variables", {}))
+
+
     def resolve_variable(self, value: str, context: dict) -> str:
         """
         Resolve variable placeholders in string.
@@ -104,6 +160,8 @@ class BaseNode(ABC):
 
         EXAMPLE:
             "Hello {{user_name}}" -> "Hello John"
+
+        NOTE: Templates are parsed once and cached (see template.py)
         """
         from app.chatflow.utils.variable_resolver import variable_resolver
 
@@ -8,9 +8,10 @@ WHY:
 - Flexible scripting
 
 HOW:
-- Safe code execution
-- Sandboxed environment
-- Limited standard library
+- Runs in the pre-warmed worker pool (separate processes with an empty
+  environment, memory/CPU limits and a hard wall-clock timeout)
+- Compiled bytecode is cached per code hash in the workers
+- Limited builtins and an allow-list of json / re / math / datetime functions
 - Return result
 
 PSEUDOCODE follows the existing codebase patterns.
@@ -20,6 +21,7 @@ from typing import Any, Dict
 from sqlalchemy.orm import Session
 
 from app.chatflow.nodes.base_node import BaseNode
+from app.chatflow.utils.code_sandbox import code_sandbox
 
 
 class CodeNode(BaseNode):
@@ -27,7 +29,7 @@ class CodeNode(BaseNode):
     Python code execution node.
 
     WHY: Custom logic in workflows
-    HOW: Safe execution with restricted globals
+    HOW: Isolated worker process with allow-listed globals
     """
 
     async def execute(
@@ -56,10 +58,10 @@ class CodeNode(BaseNode):
             }
 
         SECURITY:
-            - Sandboxed execution
-            - No file access
-            - No network access
-            - Limited imports
+            - Separate worker process (killed on timeout)
+            - Memory and CPU rlimits
+            - No imports, no dunder access
+            - Inputs/outputs are JSON (non-JSON values become strings)
         """
 
         try:
@@ -69,58 +71,21 @@ class CodeNode(BaseNode):
             if not code:
                 raise ValueError("Code is required")
 
-            # Prepare execution context
-            exec_globals = {
-                # Safe built-ins only
-                "__builtins__": {
-                    "len": len,
-                    "str": str,
-                    "int": int,
-                    "float": float,
-                    "bool": bool,
-                    "list": list,
-                    "dict": dict,
-                    "tuple": tuple,
-                    "set": set,
-                    "range": range,
-                    "enumerate": enumerate,
-                    "zip": zip,
-                    "sum": sum,
-                    "min": min,
-                    "max": max,
-                    "abs": abs,
-                    "round": round,
-                    "sorted": sorted,
-                    "reversed": reversed,
-                    "True": True,
-                    "False": False,
-                    "None": None
-                },
-                # Available modules (safe subset)
-                "json": __import__("json"),
-                "re": __import__("re"),
-                "math": __import__("math"),
-                "datetime": __import__("datetime")
-            }
-
-            exec_locals = {
-                "input_data": inputs.get("input", ""),
-                "variables": context.get("variables", {}),
-                "result": None  # User sets this variable
-            }
-
-            # Execute code (with timeout in production)
-            exec(code, exec_globals, exec_locals)
-
-            # Get result
-            result = exec_locals.get("result")
+            run = await code_sandbox.run(
+                code,
+                input_data=inputs.get("input", ""),
+                variables=context.get("variables", {}),
+                timeout=timeout
+            )
 
             return {
-                "output": result,
+                "output": run["result"],
                 "success": True,
                 "error": None,
                 "metadata": {
-                    "code_length": len(code)
+                    "code_length": len(code),
+                    "compiled": run["compiled"],
+                    "duration_ms": run["duration_ms"]
                 }
             }
 
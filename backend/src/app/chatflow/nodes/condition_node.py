@@ -41,7 +41,7 @@ class ConditionNode(BaseNode):
 
         CONFIG:
             {
-                "condition": "{{input}} contains 'help'",
+                "condition": "{{input}} contains 'help'",  # Used when no operator
                 "operator": "contains",  # contains, equals, gt, lt, regex
                 "value": "help",
                 "variable": "{{input}}"
@@ -63,15 +63,30 @@ class ConditionNode(BaseNode):
         """
 
         try:
+            # Expression mode: "condition" without an operator
+            if self.config.get("condition") and not self.config.get("operator"):
+                from app.chatflow.utils.expression import evaluate
+
+                expression = self.config["condition"]
+                result = evaluate(expression, self.build_scope(context, inputs))
+
+                return {
+                    "output": result,
+                    "success": True,
+                    "error": None,
+                    "condition_result": result,
+                    "metadata": {
+                        "condition_met": result,
+                        "expression": expression[:100]
+                    }
+                }
+
             operator = self.config.get("operator", "equals")
             variable_template = self.config.get("variable", "{{input}}")
             compare_value = self.config.get("value", "")
 
             # Resolve variable
-            variable_value = self.resolve_variable(variable_template, {
-                **context.get("variables", {}),
-                **inputs
-            })
+            variable_value = self.resolve_variable(variable_template, self.build_scope(context, inputs))
 
             # Evaluate condition
             result = self._evaluate(operator, variable_value, compare_value)
@@ -80,6 +95,7 @@ class ConditionNode(BaseNode):
                 "output": result,
                 "success": True,
                 "error": None,
+                "condition_result": result,
                 "metadata": {
                     "condition_met": result,
                     "operator": operator,
@@ -161,6 +177,16 @@ class ConditionNode(BaseNode):
     def validate_config(self) -> tuple[bool, str | None]:
         """Validate condition node configuration."""
 
+        if self.config.get("condition") and not self.config.get("operator"):
+            from app.chatflow.utils.expression import ExpressionError, compile_expression
+
+            try:
+                compile_expression(self.config["condition"])
+            except ExpressionError as e:
+                return False, f"Invalid condition: {e}"
+
+            return True, None
+
         if not self.config.get("operator"):
             return False, "Operator is required"
 
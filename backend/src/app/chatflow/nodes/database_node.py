@@ -8,7 +8,8 @@ WHY:
 - Data-driven workflows
 
 HOW:
-- Use SQLAlchemy
+- Use SQLAlchemy (pooled engines from DatabaseEngineRegistry, one per
+  credential version, instead of an engine per run)
 - Support credentials
 - Parameterized queries
 - Return results
@@ -16,10 +17,11 @@ HOW:
 PSEUDOCODE follows the existing codebase patterns.
 """
 
+import asyncio
 from typing import Any, Dict
-from uuid import UUID
 from sqlalchemy.orm import Session
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
+from sqlalchemy.engine import URL, Engine
 
 from app.chatflow.nodes.base_node import BaseNode
 
@@ -70,56 +72,42 @@ class DatabaseNode(BaseNode):
             if not credential_id:
                 raise ValueError("Credential ID required")
 
-            # Get database credential
-            from app.services.credential_service import credential_service
-            from app.models.credential import Credential
+            # Get database credential (decrypted, cached for a short TTL)
+            from app.services.credential_cache import credential_cache
 
-            credential = db.query(Credential).get(UUID(credential_id))
-            if not credential or credential.credential_type.value != "database":
+            credential = credential_cache.get(db, credential_id)
+            if not credential or credential.credential_type != "database":
                 raise ValueError("Invalid database credential")
 
-            cred_data = credential_service.get_decrypted_data(db, credential)
-
-            # Build connection string
-            conn_str = self._build_connection_string(cred_data)
+            # Build connection URL
+            url = self._build_connection_string(credential.data)
 
             # Get query
             query_template = self.config.get("query", "")
             parameters = self.config.get("parameters", {})
 
             # Resolve parameters
+            scope = self.build_scope(context, inputs)
             resolved_params = {}
             for key, value_template in parameters.items():
                 if isinstance(value_template, str):
-                    resolved_params[key] = self.resolve_variable(value_template, {
-                        **context.get("variables", {}),
-                        **inputs
-                    })
+                    resolved_params[key] = self.resolve_variable(value_template, scope)
                 else:
                     resolved_params[key] = value_template
 
-            # Execute query
-            engine = create_engine(conn_str)
-            with engine.connect() as conn:
-                result = conn.execute(text(query_template), resolved_params)
-
-                # Get operation type
-                operation = self.config.get("operation", "select")
+            # Execute query on a warm pooled connection (off the event loop)
+            from app.services.database_engine_registry import database_engine_registry
 
-                if operation == "select":
-                    # Fetch results
-                    rows = result.fetchall()
-                    columns = result.keys()
+            engine = database_engine_registry.get_engine(
+                credential.id,
+                credential.version,
+                url
+            )
+            operation = self.config.get("operation", "select")
 
-                    # Convert to list of dicts
-                    output = [dict(zip(columns, row)) for row in rows]
-                    row_count = len(output)
-
-                else:
-                    # For insert/update/delete, return affected rows
-                    output = {"affected_rows": result.rowcount}
-                    row_count = result.rowcount
-                    conn.commit()
+            output, row_count = await asyncio.to_thread(
+                self._run_query, engine, query_template, resolved_params, operation
+            )
 
             return {
                 "output": output,
@@ -135,17 +123,43 @@ class DatabaseNode(BaseNode):
             return self.handle_error(e)
 
 
-    def _build_connection_string(self, cred_data: dict) -> str:
-        """Build database connection string from credentials."""
+    def _run_query(self, engine: Engine, query: str, params: dict, operation: str) -> tuple:
+        """
+        Run the query on a pooled connection.
+
+        RETURNS:
+            (output, row_count)
+        """
 
-        db_type = cred_data.get("type", "postgresql")
-        host = cred_data["host"]
-        port = cred_data["port"]
-        database = cred_data["database"]
-        username = cred_data["username"]
-        password = cred_data["password"]
+        with engine.connect() as conn:
+            result = conn.execute(text(query), params)
+
+            if operation == "select":
+                # Convert to list of dicts
+                columns = list(result.keys())
+                output = [dict(zip(columns, row)) for row in result.fetchall()]
+                return output, len(output)
+
+            # For insert/update/delete, return affected rows
+            conn.commit()
+            return {"affected_rows": result.rowcount}, result.rowcount
+
+
+    def _build_connection_string(self, cred_data: dict) -> URL:
+        """
+        Build database connection URL from credentials.
+
+        NOTE: URL.create escapes special characters in passwords
+        """
 
-        return f"{db_type}://{username}:{password}@{host}:{port}/{database}"
+        return URL.create(
+            drivername=cred_data.get("type", "postgresql"),
+            username=cred_data["username"],
+            password=cred_data["password"],
+            host=cred_data["host"],
+            port=int(cred_data["port"]),
+            database=cred_data["database"]
+        )
 
 
     def validate_config(self) -> tuple[bool, str | None]:
@@ -8,7 +8,8 @@ WHY:
 - Support authentication
 
 HOW:
-- Use requests library
+- Shared pooled async client (NodeHTTPClient): keep-alive, per-host limits
+- Opt-in GET response cache ("cache" / "cache_ttl")
 - Support credentials
 - Handle responses
 - Error handling
@@ -17,11 +18,10 @@ PSEUDOCODE follows the existing codebase patterns.
 """
 
 from typing import Any, Dict
-from uuid import UUID
 from sqlalchemy.orm import Session
-import requests
 
 from app.chatflow.nodes.base_node import BaseNode
+from app.services.node_http_client import cache_ttl_from_config, node_http_client
 
 
 class HTTPNode(BaseNode):
@@ -48,7 +48,8 @@ class HTTPNode(BaseNode):
                 "headers": {"Content-Type": "application/json"},
                 "body": {"message": "{{input}}"},
                 "credential_id": "uuid",  # Optional
-                "timeout": 30
+                "timeout": 30,
+                "cache_ttl": 60  # Optional, GET only (or "cache": true)
             }
 
         RETURNS:
@@ -57,7 +58,8 @@ class HTTPNode(BaseNode):
                 "success": True,
                 "metadata": {
                     "status_code": 200,
-                    "response_time_ms": 150
+                    "response_time_ms": 150,
+                    "cache": "hit"  # bypass | miss | hit | revalidated
                 }
             }
         """
@@ -67,19 +69,20 @@ class HTTPNode(BaseNode):
 
             method = self.config.get("method", "GET")
             url = self.config.get("url")
-            headers = self.config.get("headers", {})
+            headers = dict(self.config.get("headers", {}))
             body = self.config.get("body", {})
             timeout = self.config.get("timeout", 30)
 
             # Resolve variables in URL and body
-            url = self.resolve_variable(url, {**context.get("variables", {}), **inputs})
+            scope = self.build_scope(context, inputs)
+            url = self.resolve_variable(url, scope)
 
             # Resolve body variables
             if isinstance(body, dict):
                 resolved_body = {}
                 for key, value in body.items():
                     if isinstance(value, str):
-                        resolved_body[key] = self.resolve_variable(value, {**context.get("variables", {}), **inputs})
+                        resolved_body[key] = self.resolve_variable(value, scope)
                     else:
                         resolved_body[key] = value
                 body = resolved_body
@@ -87,26 +90,25 @@ class HTTPNode(BaseNode):
             # Get credentials if specified
             credential_id = self.config.get("credential_id")
             if credential_id:
-                from app.services.credential_service import credential_service
-                from app.models.credential import Credential
+                from app.services.credential_cache import credential_cache
 
-                credential = db.query(Credential).get(UUID(credential_id))
+                credential = credential_cache.get(db, credential_id)
                 if credential:
-                    cred_data = credential_service.get_decrypted_data(db, credential)
-
                     # Add auth header
-                    if "api_key" in cred_data:
-                        headers["Authorization"] = f"Bearer {cred_data['api_key']}"
+                    if "api_key" in credential.data:
+                        headers["Authorization"] = f"Bearer {credential.data['api_key']}"
 
             # Make request
             start_time = time.time()
 
-            response = requests.request(
-                method=method,
-                url=url,
+            response, cache_status = await node_http_client.request(
+                method,
+                url,
                 headers=headers,
-                json=body if method in ["POST", "PUT", "PATCH"] else None,
-                timeout=timeout
+                json_body=body,
+                timeout=timeout,
+                cache_ttl=cache_ttl_from_config(self.config),
+                credential_id=credential_id
             )
 
             response_time = int((time.time() - start_time) * 1000)
@@ -126,7 +128,8 @@ class HTTPNode(BaseNode):
                 "metadata": {
                     "status_code": response.status_code,
                     "response_time_ms": response_time,
-                    "url": url
+                    "url": url,
+                    "cache": cache_status
                 }
             }
 
@@ -134,6 +137,11 @@ class HTTPNode(BaseNode):
             return self.handle_error(e)
 
 
+    def is_cacheable(self) -> bool:
+        """GETs are idempotent; other methods have side effects."""
+        return self.config.get("method", "GET").upper() == "GET"
+
+
     def validate_config(self) -> tuple[bool, str | None]:
         """Validate HTTP node configuration."""
 
@@ -144,4 +152,8 @@ class HTTPNode(BaseNode):
         if method not in ["GET", "POST", "PUT", "PATCH", "DELETE"]:
             return False, f"Invalid HTTP method: {method}"
 
+        cache_ttl = self.config.get("cache_ttl")
+        if cache_ttl is not None and (not isinstance(cache_ttl, (int, float)) or cache_ttl < 0):
+            return False, "cache_ttl must be a non-negative number"
+
         return True, None
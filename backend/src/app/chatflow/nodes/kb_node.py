@@ -32,6 +32,8 @@ class KBNode(BaseNode):
     HOW: Search vector store with query
     """
 
+    memo_defaults = {"query": "{{input}}"}
+
     async def execute(
         self,
         db: Session,
@@ -74,10 +76,7 @@ class KBNode(BaseNode):
 
             # Get query
             query_template = self.config.get("query", "{{input}}")
-            query = self.resolve_variable(query_template, {
-                **context.get("variables", {}),
-                **inputs
-            })
+            query = self.resolve_variable(query_template, self.build_scope(context, inputs))
 
             # Retrieve from KB
             results = await retrieval_service.search(
@@ -107,6 +106,11 @@ class KBNode(BaseNode):
             return self.handle_error(e)
 
 
+    def is_cacheable(self) -> bool:
+        """Same query against the same KB returns the same chunks."""
+        return True
+
+
     def validate_config(self) -> tuple[bool, str | None]:
         """Validate KB node configuration."""
 
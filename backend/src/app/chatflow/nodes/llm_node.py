@@ -31,6 +31,8 @@ class LLMNode(BaseNode):
     HOW: Call inference service with prompt template
     """
 
+    memo_defaults = {"prompt": "{{input}}"}
+
     async def execute(
         self,
         db: Session,
@@ -69,11 +71,11 @@ class LLMNode(BaseNode):
             prompt_template = self.config.get("prompt", "{{input}}")
 
             # Resolve variables
-            prompt = self.resolve_variable(prompt_template, {
-                **context.get("variables", {}),
-                **inputs,
-                "system_prompt": self.config.get("system_prompt", "")
-            })
+            prompt = self.resolve_variable(prompt_template, self.build_scope(
+                context,
+                inputs,
+                system_prompt=self.config.get("system_prompt", "")
+            ))
 
             # Call LLM
             result = await inference_service.generate(
@@ -98,6 +100,11 @@ class LLMNode(BaseNode):
             return self.handle_error(e)
 
 
+    def is_cacheable(self) -> bool:
+        """Only greedy decoding (temperature 0) is deterministic."""
+        return self.config.get("temperature", 0.7) == 0
+
+
     def validate_config(self) -> tuple[bool, str | None]:
         """Validate LLM node configuration."""
 
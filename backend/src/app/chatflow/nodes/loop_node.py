@@ -9,9 +9,10 @@ WHY:
 
 HOW:
 - Iterate over input array
-- Execute sub-workflow
-- Collect results
-- Return aggregated output
+- Execute the body sub-graph per item in an isolated child scope
+- Map items concurrently (max_concurrency), results kept in item order
+- Stop all iterations on the first failure
+- Return aggregated output with per-iteration timing
 
 PSEUDOCODE follows the existing codebase patterns.
 """
@@ -20,6 +21,7 @@ from typing import Any, Dict
 from sqlalchemy.orm import Session
 
 from app.chatflow.nodes.base_node import BaseNode
+from app.core.config import settings
 
 
 class LoopNode(BaseNode):
@@ -44,7 +46,14 @@ class LoopNode(BaseNode):
                 "array": "{{items}}",  # Variable containing array
                 "max_iterations": 100,
                 "item_variable": "current_item",
-                "index_variable": "index"
+                "index_variable": "index",
+                "max_concurrency": 5,  # Iterations in flight (default 1)
+                "iteration_timeout": 30,  # Seconds per iteration (optional)
+                "body": {  # Sub-graph run once per item
+                    "nodes": [{"id": "fetch", "type": "http_request", "config": {...}}],
+                    "edges": []
+                },
+                "output_node": "fetch"  # Optional, default: response output, else last body node
             }
 
         INPUTS:
@@ -54,28 +63,38 @@ class LoopNode(BaseNode):
 
         RETURNS:
             {
-                "output": [...],  # Collected results
+                "output": [{"index", "item", "result", "duration_ms"}, ...],
                 "success": True,
                 "metadata": {
-                    "iterations": 5
+                    "iterations": 5,
+                    "total_ms": 420.0,
+                    "max_iteration_ms": 150.2
                 }
             }
 
-        NOTE: In full implementation, this would execute
-        a sub-graph for each item. This is simplified.
+        NOTE: Iterations never write to context["variables"]; item and index
+        are bound in each iteration's child scope only.
         """
 
+        import time
+
+        from app.chatflow.utils.subgraph import IterationError, create_node, map_items
+
         try:
             array_template = self.config.get("array", "{{input}}")
             max_iterations = self.config.get("max_iterations", 100)
             item_variable = self.config.get("item_variable", "item")
             index_variable = self.config.get("index_variable", "index")
+            max_concurrency = min(
+                self.config.get("max_concurrency", 1),
+                getattr(settings, "CHATFLOW_LOOP_MAX_CONCURRENCY", 20)
+            )
+
+            scope = self.build_scope(context, inputs)
 
-            # Resolve array
-            array_value = self.resolve_variable(array_template, {
-                **context.get("variables", {}),
-                **inputs
-            })
+            # Resolve array - a lone {{path}} keeps the raw value (list of
+            # dicts/strings); string rendering would flatten it
+            array_value = self._resolve_array(array_template, scope)
 
             # Ensure it's an array
             if isinstance(array_value, str):
@@ -88,30 +107,55 @@ class LoopNode(BaseNode):
                 array_value = [array_value]
 
             # Limit iterations
-            array_value = array_value[:max_iterations]
-
-            # Process each item (simplified - in full version would execute sub-graph)
-            results = []
-            for index, item in enumerate(array_value):
-                # Set loop variables
-                context["variables"][item_variable] = item
-                context["variables"][index_variable] = index
-
-                # In full implementation, would execute sub-workflow here
-                # For now, just collect items
-                results.append({
-                    "index": index,
-                    "item": item,
-                    "result": str(item)  # Placeholder
-                })
+            array_value = list(array_value[:max_iterations])
+
+            body_plan = self._get_body_plan()
+            if body_plan is None:
+                # No body configured - items pass through unchanged
+                return {
+                    "output": [
+                        {"index": index, "item": item, "result": item, "duration_ms": 0.0}
+                        for index, item in enumerate(array_value)
+                    ],
+                    "success": True,
+                    "error": None,
+                    "metadata": {
+                        "iterations": len(array_value),
+                        "max_iterations": max_iterations
+                    }
+                }
+
+            async def run_node(node: dict, node_context: dict, node_inputs: dict) -> dict:
+                return await create_node(node).run(db, node_context, node_inputs)
+
+            start = time.perf_counter()
+            try:
+                results = await map_items(
+                    plan=body_plan,
+                    items=array_value,
+                    run_node=run_node,
+                    scope=scope,
+                    item_variable=item_variable,
+                    index_variable=index_variable,
+                    output_node=self.config.get("output_node"),
+                    max_concurrency=max_concurrency,
+                    iteration_timeout=self.config.get("iteration_timeout")
+                )
+            except IterationError as e:
+                result = self.handle_error(e)
+                result["metadata"]["failed_index"] = e.index
+                return result
 
             return {
                 "output": results,
                 "success": True,
                 "error": None,
                 "metadata": {
-                    "iterations": len(array_value),
-                    "max_iterations": max_iterations
+                    "iterations": len(results),
+                    "max_iterations": max_iterations,
+                    "max_concurrency": max_concurrency,
+                    "total_ms": round((time.perf_counter() - start) * 1000, 2),
+                    "max_iteration_ms": max((r["duration_ms"] for r in results), default=0.0)
                 }
             }
 
@@ -119,6 +163,36 @@ class LoopNode(BaseNode):
             return self.handle_error(e)
 
 
+    def _resolve_array(self, array_template: Any, scope) -> Any:
+        """Raw value for "{{path}}", rendered string for other templates."""
+
+        from app.chatflow.utils.template import VARIABLE_PATTERN, lookup, split_path
+
+        if isinstance(array_template, (list, tuple)):
+            return array_template
+
+        match = VARIABLE_PATTERN.fullmatch(str(array_template).strip())
+        if match:
+            value = lookup(scope, split_path(match.group(1)))
+            return [] if value is None else value
+
+        return self.resolve_variable(array_template, scope)
+
+
+    def _get_body_plan(self):
+        """Compile the body once per node instance (None without a body)."""
+
+        body = self.config.get("body")
+        if not body or not body.get("nodes"):
+            return None
+
+        if getattr(self, "_body_plan", None) is None:
+            from app.chatflow.utils.subgraph import compile_body
+            self._body_plan = compile_body(body)
+
+        return self._body_plan
+
+
     def validate_config(self) -> tuple[bool, str | None]:
         """Validate loop node configuration."""
 
@@ -129,4 +203,8 @@ class LoopNode(BaseNode):
         if max_iter > 1000:
             return False, "Max iterations cannot exceed 1000"
 
+        max_concurrency = self.config.get("max_concurrency", 1)
+        if not isinstance(max_concurrency, int) or max_concurrency < 1:
+            return False, "Max concurrency must be a positive integer"
+
         return True, None
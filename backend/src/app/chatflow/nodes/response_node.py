@@ -62,10 +62,7 @@ class ResponseNode(BaseNode):
             include_sources = self.config.get("include_sources", False)
 
             # Resolve message template
-            message = self.resolve_variable(message_template, {
-                **context.get("variables", {}),
-                **inputs
-            })
+            message = self.resolve_variable(message_template, self.build_scope(context, inputs))
 
             # Format based on type
             if format_type == "json":
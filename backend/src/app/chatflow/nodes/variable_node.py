@@ -67,10 +67,7 @@ class VariableNode(BaseNode):
                 raise ValueError("Variable name is required")
 
             # Resolve value
-            value = self.resolve_variable(value_template, {
-                **context.get("variables", {}),
-                **inputs
-            })
+            value = self.resolve_variable(value_template, self.build_scope(context, inputs))
 
             # Apply transform
             transform = self.config.get("transform")
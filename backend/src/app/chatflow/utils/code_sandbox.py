@@ -0,0 +1,259 @@
+"""
+Code Sandbox - Pre-warmed worker processes for CodeNode.
+
+WHY:
+- CodeNode ran exec() inside the API process: an infinite loop hung the
+  worker, a memory bomb took the whole process down
+- The code was re-parsed on every execution
+- One flow mutating shared modules (json, re, ...) leaked into others
+
+HOW:
+- A pool of long-lived worker processes (code_sandbox_worker.py, run
+  with python -I), started ahead of use
+- Workers start with an empty environment and only expose an
+  allow-list of functions to user code (see code_sandbox_worker)
+- Workers run under rlimits (memory, CPU seconds per job, no core dumps)
+  and compile once per code hash (see code_sandbox_worker)
+- The parent enforces a hard wall-clock timeout: on expiry the worker is
+  killed and replaced, the caller gets an error
+- Requests and replies are compact JSON over a socketpair (never pickle:
+  the reply comes from untrusted code)
+- Workers are recycled after a number of jobs to bound memory creep
+
+PSEUDOCODE follows the existing codebase patterns.
+"""
+
+import asyncio
+import hashlib
+import json
+import queue
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Mapping
+from multiprocessing.connection import Connection
+from typing import Any, Dict, Optional
+
+from app.chatflow.utils import code_sandbox_worker
+
+
+class CodeSandboxError(Exception):
+    """User code failed, timed out or exceeded its limits."""
+    pass
+
+
+class _Worker:
+    """Handle on one worker process."""
+
+    __slots__ = ("process", "conn", "jobs")
+
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.jobs = 0
+
+    def kill(self):
+        try:
+            self.conn.close()
+        except OSError:
+            pass
+        if self.process.poll() is None:
+            self.process.kill()
+        try:
+            self.process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            pass
+
+
+class CodeSandboxPool:
+    """
+    Pool of sandboxed code workers.
+
+    WHY: Isolate user code from the API process, skip re-compilation
+    HOW: Idle workers in a queue; a job checks one out, sends JSON, waits
+         with a wall-clock timeout, returns or replaces the worker
+    """
+
+    def __init__(
+        self,
+        size: Optional[int] = None,
+        memory_mb: Optional[int] = None,
+        max_timeout: Optional[float] = None,
+        max_jobs_per_worker: Optional[int] = None
+    ):
+        from app.core.config import settings
+
+        self.size = size or getattr(settings, "CODE_SANDBOX_POOL_SIZE", 2)
+        self.memory_mb = memory_mb if memory_mb is not None else getattr(settings, "CODE_SANDBOX_MEMORY_MB", 512)
+        self.max_timeout = max_timeout or getattr(settings, "CODE_SANDBOX_MAX_TIMEOUT", 30)
+        self.max_jobs_per_worker = max_jobs_per_worker or getattr(settings, "CODE_SANDBOX_MAX_JOBS_PER_WORKER", 500)
+        self.checkout_timeout = getattr(settings, "CODE_SANDBOX_CHECKOUT_TIMEOUT", 30)
+
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._started = 0
+
+        self._stats = {
+            "executions": 0,
+            "compilations": 0,
+            "errors": 0,
+            "timeouts": 0,
+            "crashes": 0,
+            "restarts": 0
+        }
+
+
+    def start(self):
+        """
+        Pre-warm the pool.
+
+        WHY: Process start-up (~tens of ms) stays off the request path
+        """
+
+        with self._lock:
+            missing = self.size - self._started
+            self._started = self.size
+
+        for _ in range(missing):
+            self._idle.put(self._spawn())
+
+
+    def close(self):
+        """Stop all idle workers."""
+
+        with self._lock:
+            self._started = 0
+
+        while True:
+            try:
+                self._idle.get_nowait().kill()
+            except queue.Empty:
+                break
+
+
+    def _spawn(self) -> _Worker:
+        parent_sock, child_sock = socket.socketpair()
+        child_fd = child_sock.fileno()
+
+        process = subprocess.Popen(
+            [sys.executable, "-I", code_sandbox_worker.__file__, str(child_fd), str(self.memory_mb)],
+            pass_fds=(child_fd,),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            close_fds=True,
+            env={}  # No API secrets (database, Redis, encryption keys) in workers
+        )
+        child_sock.close()
+
+        return _Worker(process, Connection(parent_sock.detach()))
+
+
+    def _replace(self, worker: _Worker):
+        worker.kill()
+        self._stats["restarts"] += 1
+        self._idle.put(self._spawn())
+
+
+    def execute(
+        self,
+        code: str,
+        input_data: Any = None,
+        variables: Optional[Mapping] = None,
+        timeout: float = 5
+    ) -> Dict[str, Any]:
+        """
+        Run code in a worker (blocking).
+
+        ARGS:
+            code: Python source; sets `result`
+            input_data: Available as `input_data`
+            variables: Available as `variables`
+            timeout: Wall-clock and CPU budget in seconds
+
+        RETURNS:
+            {"result": Any, "compiled": bool, "duration_ms": float}
+
+        RAISES:
+            CodeSandboxError: Code error, timeout or limit exceeded
+        """
+
+        if self._started < self.size:
+            self.start()
+
+        timeout = min(float(timeout or 5), self.max_timeout)
+        if isinstance(variables, Mapping) and not isinstance(variables, dict):
+            variables = dict(variables)
+
+        request = code_sandbox_worker.dumps({
+            "hash": hashlib.sha256(code.encode()).hexdigest(),
+            "code": code,
+            "input": input_data,
+            "variables": variables or {},
+            "cpu": timeout
+        })
+
+        try:
+            worker = self._idle.get(timeout=self.checkout_timeout)
+        except queue.Empty:
+            raise CodeSandboxError("No code sandbox worker available")
+
+        self._stats["executions"] += 1
+        start = time.perf_counter()
+
+        try:
+            worker.conn.send_bytes(request)
+            if not worker.conn.poll(timeout):
+                self._stats["timeouts"] += 1
+                self._replace(worker)
+                raise CodeSandboxError(f"Code execution timed out after {timeout:g}s")
+            reply = json.loads(worker.conn.recv_bytes())
+        except (EOFError, OSError):
+            # Worker died: CPU limit (SIGXCPU) or hard crash
+            self._stats["crashes"] += 1
+            self._replace(worker)
+            raise CodeSandboxError("Code execution exceeded its resource limits")
+
+        worker.jobs += 1
+        if worker.jobs >= self.max_jobs_per_worker:
+            self._replace(worker)
+        else:
+            self._idle.put(worker)
+
+        if not reply.get("ok"):
+            self._stats["errors"] += 1
+            raise CodeSandboxError(reply.get("error") or "Code execution failed")
+
+        if reply.get("compiled"):
+            self._stats["compilations"] += 1
+
+        return {
+            "result": reply.get("result"),
+            "compiled": reply.get("compiled", False),
+            "duration_ms": round((time.perf_counter() - start) * 1000, 2)
+        }
+
+
+    async def run(
+        self,
+        code: str,
+        input_data: Any = None,
+        variables: Optional[Mapping] = None,
+        timeout: float = 5
+    ) -> Dict[str, Any]:
+        """
+        Run code without blocking the event loop.
+
+        RETURNS / RAISES: Same as execute()
+        """
+        return await asyncio.to_thread(self.execute, code, input_data, variables, timeout)
+
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool counters."""
+        return {**self._stats, "size": self.size, "idle": self._idle.qsize()}
+
+
+# Global instance
+code_sandbox = CodeSandboxPool()
@@ -0,0 +1,206 @@
+"""
+Code Sandbox Worker - Process that runs CodeNode code.
+
+WHY:
+- User code must not run inside the API process
+- Started as a standalone script (python -I <this file> <fd> <memory_mb>)
+  so it imports nothing from the app and never re-runs the parent's
+  __main__ (as multiprocessing spawn/forkserver would)
+
+HOW:
+- Applies rlimits: address space (memory), no core dumps; CPU seconds
+  are re-armed per job
+- Compiles once per code hash (bounded LRU of code objects); imports,
+  dunder names/attributes, str.format and frame / code introspection
+  attributes are rejected at compile time
+- User code only sees an explicit allow-list of functions (json.loads,
+  re.search, math.sqrt, datetime.timedelta, ...), never module namespaces:
+  modules reference other modules (json.codecs.sys.modules["os"])
+- Each run gets a fresh namespace and fresh copies of the allowed
+  functions, so one flow cannot change what the next one sees
+- The parent starts workers with an empty environment (no secrets)
+- Requests and replies are compact JSON over the inherited socket
+
+NOTE: Standard library only.
+
+PSEUDOCODE follows the existing codebase patterns.
+"""
+
+import ast
+import json
+import math
+import sys
+import types
+from collections import OrderedDict
+from multiprocessing.connection import Connection
+from typing import Any
+
+try:
+    import resource
+except ImportError:  # Non-Unix: the parent's wall-clock timeout still applies
+    resource = None
+
+
+SAFE_BUILTINS = {
+    "len": len,
+    "str": str,
+    "int": int,
+    "float": float,
+    "bool": bool,
+    "list": list,
+    "dict": dict,
+    "tuple": tuple,
+    "set": set,
+    "range": range,
+    "enumerate": enumerate,
+    "zip": zip,
+    "sum": sum,
+    "min": min,
+    "max": max,
+    "abs": abs,
+    "round": round,
+    "sorted": sorted,
+    "reversed": reversed,
+    "True": True,
+    "False": False,
+    "None": None
+}
+
+# Exposed to user code as <module>.<name>; functions and types only
+SAFE_FUNCTIONS = {
+    "json": ("loads", "dumps"),
+    "re": (
+        "search", "match", "fullmatch", "findall", "finditer", "sub", "subn",
+        "split", "compile", "escape", "IGNORECASE", "MULTILINE", "DOTALL"
+    ),
+    "math": (
+        "ceil", "floor", "trunc", "fabs", "sqrt", "exp", "log", "log2", "log10",
+        "pow", "sin", "cos", "tan", "isclose", "isfinite", "isnan", "fsum",
+        "gcd", "prod", "pi", "e", "inf"
+    ),
+    "datetime": ("datetime", "date", "time", "timedelta", "timezone")
+}
+
+# Attribute access that leads to frames, code objects or format-string
+# attribute traversal ("{0.__class__}".format(x))
+BLOCKED_ATTRIBUTES = {"format", "format_map", "mro"}
+BLOCKED_ATTRIBUTE_PREFIXES = ("__", "gi_", "cr_", "ag_", "f_", "tb_", "co_")
+
+CODE_CACHE_SIZE = 256
+
+
+def dumps(payload: Any) -> bytes:
+    """Compact JSON (non-JSON values are stringified)."""
+    return json.dumps(payload, separators=(",", ":"), default=str).encode()
+
+
+def check_code(tree: ast.AST):
+    """Reject imports, dunder names and introspection attributes."""
+
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            raise SyntaxError("Imports are not allowed")
+        if isinstance(node, ast.Attribute) and (
+            node.attr in BLOCKED_ATTRIBUTES or node.attr.startswith(BLOCKED_ATTRIBUTE_PREFIXES)
+        ):
+            raise SyntaxError(f"Access to '{node.attr}' is not allowed")
+        if isinstance(node, ast.Name) and node.id.startswith("__"):
+            raise SyntaxError(f"Access to '{node.id}' is not allowed")
+
+
+def apply_limits(memory_mb: int):
+    """Process-wide limits, set once at start."""
+
+    if resource is None:
+        return
+
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+    if memory_mb > 0:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def arm_cpu_limit(seconds: float):
+    """
+    Allow `seconds` more CPU time.
+
+    WHY: RLIMIT_CPU is cumulative per process and workers are long-lived
+    HOW: Soft limit = CPU used so far + budget; SIGXCPU ends the worker
+    """
+
+    if resource is None:
+        return
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    soft = int(usage.ru_utime + usage.ru_stime + math.ceil(seconds)) + 1
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def serve(conn: Connection, memory_mb: int):
+    """
+    Worker loop: receive job, run, reply.
+
+    REQUEST:  {"hash", "code", "input", "variables", "cpu"}
+    REPLY:    {"ok": true, "result", "compiled"} | {"ok": false, "error"}
+    """
+
+    apply_limits(memory_mb)
+
+    modules = {
+        name: {key: getattr(__import__(name), key) for key in keys}
+        for name, keys in SAFE_FUNCTIONS.items()
+    }
+    compiled_cache = OrderedDict()
+
+    while True:
+        try:
+            request = json.loads(conn.recv_bytes())
+        except (EOFError, OSError):
+            return
+
+        try:
+            code_hash = request["hash"]
+            code_object = compiled_cache.get(code_hash)
+            compiled = code_object is None
+
+            if compiled:
+                tree = ast.parse(request["code"], mode="exec")
+                check_code(tree)
+                code_object = compile(tree, "<code_node>", "exec")
+                compiled_cache[code_hash] = code_object
+                if len(compiled_cache) > CODE_CACHE_SIZE:
+                    compiled_cache.popitem(last=False)
+            else:
+                compiled_cache.move_to_end(code_hash)
+
+            namespace = {
+                "__builtins__": SAFE_BUILTINS,
+                **{name: types.SimpleNamespace(**attributes) for name, attributes in modules.items()},
+                "input_data": request["input"],
+                "variables": request["variables"],
+                "result": None
+            }
+
+            arm_cpu_limit(request["cpu"])
+            exec(code_object, namespace)
+
+            reply = {"ok": True, "result": namespace.get("result"), "compiled": compiled}
+
+        except MemoryError:
+            reply = {"ok": False, "error": "Memory limit exceeded"}
+        except Exception as e:
+            reply = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+        try:
+            payload = dumps(reply)
+        except Exception as e:
+            payload = dumps({"ok": False, "error": f"Result is not serializable: {e}"})
+
+        conn.send_bytes(payload)
+
+
+if __name__ == "__main__":
+    serve(Connection(int(sys.argv[1])), int(sys.argv[2]))
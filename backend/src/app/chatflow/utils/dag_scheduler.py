@@ -0,0 +1,260 @@
+"""
+DAG Scheduler - Run independent chatflow branches concurrently.
+
+WHY:
+- Execution followed a single current_node pointer, so independent
+  HTTP/KB/LLM nodes feeding a later merge ran one after another
+- Fan-out flows took the sum of their branches instead of the slowest one
+
+HOW:
+- Works on a compiled ExecutionPlan (acyclic plans only)
+- In-degree tracking: a node becomes ready once every incoming edge has
+  settled; ready nodes run as asyncio tasks under a parallelism limit
+- Join semantics: a merge node waits for all its predecessors. Edges not
+  taken by a condition settle as inactive; a node whose incoming edges
+  are all inactive is skipped and propagates the skip downstream
+- The flow ends when a response node finishes (remaining tasks are
+  cancelled, as the sequential walk stopped at the response node)
+
+DETERMINISM:
+- Each node sees the flow variables plus the outputs of the upstream
+  nodes on its executed paths, never a concurrently running sibling's
+- A node's scope is handed to its successor without copying when that
+  successor is its only consumer (linear chains stay O(V))
+- A LayeredScope in context["variables"] (loop iterations) is never
+  copied: node scopes layer their outputs on top of it
+- Outputs are written to context["variables"] and nodes_executed in
+  topological order, whatever order the tasks finished in
+
+PSEUDOCODE follows the existing codebase patterns.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Optional
+
+from app.chatflow.utils.execution_plan import ExecutionPlan
+from app.chatflow.utils.template import LayeredScope, layered_scope
+from app.core.config import settings
+
+
+# execute_node(node, node_context) -> node result
+NodeRunner = Callable[[dict, dict], Awaitable[dict]]
+
+
+class DAGScheduler:
+    """
+    Concurrent executor for chatflow plans.
+
+    WHY: Flows finish in the time of their slowest branch
+    HOW: Ready-set scheduling with in-degree counters
+    """
+
+    def __init__(self, max_parallelism: Optional[int] = None):
+        """
+        Initialize scheduler.
+
+        ARGS:
+            max_parallelism: Concurrent nodes per execution
+                (defaults to CHATFLOW_MAX_PARALLELISM)
+        """
+        self.max_parallelism = max_parallelism or getattr(settings, "CHATFLOW_MAX_PARALLELISM", 4)
+
+
+    async def run(
+        self,
+        plan: ExecutionPlan,
+        execute_node: NodeRunner,
+        context: dict,
+        max_parallelism: Optional[int] = None
+    ) -> dict:
+        """
+        Execute a plan from its trigger node.
+
+        ARGS:
+            plan: Compiled, acyclic execution plan
+            execute_node: Runs one node against a node context
+            context: Execution context (variables updated in place)
+            max_parallelism: Per-flow override (config settings.max_parallelism)
+
+        RETURNS:
+            {
+                "output": "Final response text",
+                "nodes_executed": ["trigger", "http1", "kb1", "llm1", "response"],
+                "nodes_cached": ["kb1"]  # results with metadata.cache_hit
+            }
+
+        RAISES:
+            Whatever a node raises (other running nodes are cancelled)
+        """
+
+        if plan.order is None:
+            raise ValueError("DAG scheduling requires an acyclic chatflow")
+
+        semaphore = asyncio.Semaphore(max_parallelism or self.max_parallelism)
+        position = {node_id: index for index, node_id in enumerate(plan.order)}
+        base_variables = context.get("variables", {})
+        if isinstance(base_variables, LayeredScope):
+            # Shared read-only base; scopes own only the top (outputs) layer
+            base_layers = base_variables.layers
+
+            def new_scope(source=None):
+                scope = LayeredScope(*base_layers)
+                if source is not None:
+                    scope.layers[0].update(source.layers[0])
+                return scope
+
+            def merge_scope(target, source):
+                target.layers[0].update(source.layers[0])
+        else:
+            base_variables = dict(base_variables)
+
+            def new_scope(source=None):
+                return dict(base_variables if source is None else source)
+
+            def merge_scope(target, source):
+                target.update(source)
+
+        user_message = context.get("user_message", "")
+
+        pending = {node_id: len(sources) for node_id, sources in plan.predecessors.items()}
+        consumers = {node_id: len(set(targets)) for node_id, targets in plan.successors.items()}
+        activated = set()
+        outputs = {}
+        views = {}   # node_id -> variables the node runs with
+        scopes = {}  # node_id -> variables visible downstream (view + output)
+        executed = []
+        cached = set()
+        running: dict[asyncio.Task, str] = {}
+        output = ""
+
+        def settle(node_id: str, active: set) -> list:
+            """Settle node_id's outgoing edges; return nodes that became ready."""
+
+            ready = []
+            stack = [(node_id, active)]
+
+            while stack:
+                source, active_targets = stack.pop()
+                for target in plan.successors[source]:
+                    if target in active_targets:
+                        activated.add(target)
+
+                    pending[target] -= 1
+                    if pending[target] == 0:
+                        if target in activated:
+                            ready.append(target)
+                        else:
+                            # Every incoming edge was inactive - skip the node
+                            stack.append((target, set()))
+
+            return ready
+
+        def build_view(node_id: str) -> dict:
+            """Merge predecessor scopes; take ownership of the last reference."""
+
+            view = None
+            for source in dict.fromkeys(plan.predecessors[node_id]):
+                if source not in scopes:
+                    continue
+
+                consumers[source] -= 1
+                scope = scopes.pop(source) if consumers[source] == 0 else scopes[source]
+
+                if view is None:
+                    view = scope if consumers[source] == 0 else new_scope(scope)
+                else:
+                    merge_scope(view, scope)
+
+            return view if view is not None else new_scope()
+
+        def launch(node_id: str):
+            variables = views[node_id] = build_view(node_id)
+
+            node_context = {**context, "variables": variables}
+            task = asyncio.create_task(
+                self._run_node(semaphore, execute_node, plan.nodes[node_id], node_context)
+            )
+            running[task] = node_id
+
+        # Other roots are never triggered; settle them so merges do not wait
+        for node_id in plan.order:
+            if node_id != plan.start_node and not plan.predecessors[node_id]:
+                for ready in settle(node_id, set()):
+                    launch(ready)
+
+        launch(plan.start_node)
+
+        try:
+            while running:
+                done, _ = await asyncio.wait(running.keys(), return_when=asyncio.FIRST_COMPLETED)
+                response_done = False
+
+                # Handle simultaneous completions in plan order (deterministic)
+                for task in sorted(done, key=lambda t: position[running[t]]):
+                    node_id = running.pop(task)
+                    result = task.result()
+
+                    executed.append(node_id)
+                    if (result.get("metadata") or {}).get("cache_hit"):
+                        cached.add(node_id)
+                    scope = views.pop(node_id)
+                    if result.get("output"):
+                        outputs[node_id] = result["output"]
+                        scope[node_id] = result["output"]
+                    scopes[node_id] = scope
+
+                    if plan.nodes[node_id]["type"] == "response":
+                        if not response_done:
+                            output = result.get("output", "")
+                            response_done = True
+                        continue
+
+                    if response_done:
+                        continue
+
+                    # Edge predicates see the node's scope plus its output
+                    edge_scope = layered_scope(
+                        {"output": result.get("output"), "input": user_message, "user_message": user_message},
+                        scope
+                    )
+
+                    for ready in settle(node_id, plan.active_targets(node_id, result, edge_scope)):
+                        launch(ready)
+
+                if response_done:
+                    break
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running.keys(), return_exceptions=True)
+
+        # Deterministic writes: topological order
+        executed.sort(key=position.__getitem__)
+        variables = context.setdefault("variables", {})
+        for node_id in executed:
+            if node_id in outputs:
+                variables[node_id] = outputs[node_id]
+
+        return {
+            "output": output,
+            "nodes_executed": executed,
+            "nodes_cached": [node_id for node_id in executed if node_id in cached]
+        }
+
+
+    async def _run_node(
+        self,
+        semaphore: asyncio.Semaphore,
+        execute_node: NodeRunner,
+        node: dict,
+        node_context: dict
+    ) -> dict:
+        """Run one node once a parallelism slot is free."""
+
+        async with semaphore:
+            return await execute_node(node, node_context)
+
+
+# Global instance
+dag_scheduler = DAGScheduler()
@@ -0,0 +1,286 @@
+"""
+Execution Plan - Compiled, cached chatflow graphs.
+
+WHY:
+- Execution found the trigger by scanning config["nodes"] and the next
+  node by scanning the whole edges list at every step (O(V + E) per step)
+- GraphBuilder computed adjacency and ordering but was never used at
+  run time
+- A deployed chatflow version never changes, yet it was re-read from raw
+  config on every message
+
+HOW:
+- compile_plan() turns config into an immutable ExecutionPlan once:
+  node table, successors, conditional branches (edge sourceHandle),
+  predecessors, topological order, validation errors (GraphBuilder)
+- ExecutionPlanCache keeps plans per (chatflow_id, version) in an
+  in-process LRU; invalidated on deploy and delete
+- Per-step lookups become dict accesses (O(1))
+
+BRANCHES:
+- Edges may carry a sourceHandle ("true" / "false" / custom label);
+  "condition" is accepted as an alias (Chatflow model examples)
+- A node result with "branch" selects that handle; a condition result
+  selects "true"/"false"; unlabelled edges are always followed
+- Edges may carry a "predicate" expression (see expression.py), compiled
+  with the plan; the edge is followed only when it evaluates true
+  against the finished node's scope ("output" = the node's output)
+
+PSEUDOCODE follows the existing codebase patterns.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Mapping, Optional
+
+from app.chatflow.utils.expression import ExpressionError, compile_expression
+from app.chatflow.utils.graph_builder import graph_builder
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class ExecutionPlan:
+    """
+    Immutable, precomputed view of one chatflow version.
+
+    NOTE: Shared by concurrent executions - holds no per-run state.
+    """
+
+    chatflow_id: str
+    version: Optional[int]
+    nodes: dict            # node_id -> node (id, type, config)
+    successors: dict       # node_id -> (target_id, ...) in config order
+    outgoing: dict         # node_id -> ((target_id, handle | None, predicate | None), ...)
+    branches: dict         # node_id -> {source_handle: target_id}
+    predecessors: dict     # node_id -> (source_id, ...)
+    start_node: str        # trigger node id
+    order: Optional[tuple]  # topological order, None if the graph has a cycle
+    errors: tuple
+
+    def selected_branch(self, node_id: str, result: dict) -> Optional[str]:
+        """Branch handle chosen by a node result (None = no selection)."""
+
+        if node_id not in self.branches:
+            return None
+
+        handle = result.get("branch")
+        if handle is None and "condition_result" in result:
+            handle = "true" if result["condition_result"] else "false"
+
+        return str(handle) if handle is not None else None
+
+    def active_targets(self, node_id: str, result: dict, scope: Optional[Mapping] = None) -> set:
+        """
+        Successors reached by a finished node.
+
+        HOW: Without a branch selection every outgoing edge is followed
+             (fan-out); with one, the selected handle plus unlabelled edges.
+             Edges with a predicate also need it to hold for scope.
+        """
+
+        handle = self.selected_branch(node_id, result)
+
+        return {
+            target for target, edge_handle, predicate in self.outgoing.get(node_id, ())
+            if (handle is None or edge_handle is None or edge_handle == handle)
+            and (predicate is None or self._holds(predicate, scope))
+        }
+
+    def _holds(self, predicate, scope: Optional[Mapping]) -> bool:
+        return bool(predicate(scope if scope is not None else {}))
+
+    def next_node(self, node_id: str, result: dict, scope: Optional[Mapping] = None) -> Optional[dict]:
+        """
+        Resolve the node to run after node_id.
+
+        WHY: Replaces the per-step scan of the edges list
+        HOW: Branch handle lookup, else first successor whose edge
+             predicate (if any) holds
+
+        ARGS:
+            node_id: Node that just ran
+            result: Its execution result
+            scope: Variables for edge predicates
+
+        RETURNS:
+            Next node, or None at the end of the flow
+        """
+
+        handle = self.selected_branch(node_id, result)
+        if handle is not None:
+            target = self.branches[node_id].get(handle)
+            return self.nodes[target] if target else None
+
+        for target, _, predicate in self.outgoing.get(node_id, ()):
+            if predicate is None or self._holds(predicate, scope):
+                return self.nodes[target]
+
+        return None
+
+
+def _never(scope: Mapping) -> bool:
+    """Predicate for edges whose expression failed to compile."""
+    return False
+
+
+def compile_plan(chatflow_id: Any, version: Optional[int], config: dict) -> ExecutionPlan:
+    """
+    Compile chatflow config into an ExecutionPlan.
+
+    FLOW:
+    1. Validate node definitions and edge endpoints
+    2. Build adjacency and ordering via GraphBuilder
+    3. Index successors, branch handles and predecessors
+
+    RAISES:
+        ValueError: Malformed nodes or no trigger node
+    """
+
+    nodes = config.get("nodes", [])
+    edges = config.get("edges", [])
+
+    fatal_errors, errors = graph_builder.validate_nodes(nodes, edges)
+    if fatal_errors:
+        raise ValueError(f"Invalid chatflow: {'; '.join(fatal_errors)}")
+
+    node_map = {node["id"]: node for node in nodes}
+    valid_edges = [
+        edge for edge in edges
+        if edge.get("source") in node_map and edge.get("target") in node_map
+    ]
+
+    # First trigger in config order (same as the previous scan)
+    start_node = next((node["id"] for node in nodes if node["type"] == "trigger"), None)
+    if start_node is None:
+        raise ValueError("No trigger node found in chatflow")
+
+    graph = graph_builder.build_graph(nodes, valid_edges)
+    errors.extend(graph["errors"])
+
+    outgoing = {node_id: [] for node_id in node_map}
+    branches = {}
+    for edge in valid_edges:
+        handle = edge.get("sourceHandle", edge.get("condition"))
+        handle = str(handle) if handle is not None else None
+
+        predicate = None
+        if edge.get("predicate"):
+            try:
+                predicate = compile_expression(edge["predicate"])
+            except ExpressionError as e:
+                errors.append(f"Edge {edge['source']} -> {edge['target']}: invalid predicate ({e})")
+                predicate = _never
+
+        outgoing[edge["source"]].append((edge["target"], handle, predicate))
+
+        if handle is not None:
+            # First edge wins per handle, like the first-edge rule for successors
+            branches.setdefault(edge["source"], {}).setdefault(handle, edge["target"])
+
+    order = graph_builder.topological_sort(node_map, graph["adjacency"])
+
+    return ExecutionPlan(
+        chatflow_id=str(chatflow_id),
+        version=version,
+        nodes=node_map,
+        successors={node_id: tuple(targets) for node_id, targets in graph["adjacency"].items()},
+        outgoing={node_id: tuple(edges) for node_id, edges in outgoing.items()},
+        branches=branches,
+        predecessors={node_id: tuple(sources) for node_id, sources in graph["reverse_adjacency"].items()},
+        start_node=start_node,
+        order=tuple(order) if order is not None else None,
+        errors=tuple(errors)
+    )
+
+
+class ExecutionPlanCache:
+    """
+    Per-process LRU of compiled plans.
+
+    WHY: Compile each deployed chatflow version once
+    HOW: (chatflow_id, version) -> ExecutionPlan
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        """
+        Initialize plan cache.
+
+        ARGS:
+            max_entries: LRU bound (defaults to CHATFLOW_PLAN_CACHE_SIZE)
+        """
+        self.max_entries = max_entries or getattr(settings, "CHATFLOW_PLAN_CACHE_SIZE", 1000)
+
+        self._plans: OrderedDict[tuple, ExecutionPlan] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "compile_ms": 0.0, "invalidations": 0}
+
+
+    def get_plan(self, chatflow: Any) -> ExecutionPlan:
+        """
+        Plan for a chatflow (compiled on first use).
+
+        NOTE: Objects without a version (draft previews) are compiled
+        every time and never cached - their config is still changing.
+
+        ARGS:
+            chatflow: Chatflow model (id, version, config)
+
+        RAISES:
+            ValueError: Chatflow cannot be compiled
+        """
+
+        version = getattr(chatflow, "version", None)
+        if version is None:
+            return compile_plan(chatflow.id, None, chatflow.config or {})
+
+        key = (str(chatflow.id), version)
+
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is not None:
+                self._plans.move_to_end(key)
+                self._stats["hits"] += 1
+                return plan
+
+        start = time.perf_counter()
+        plan = compile_plan(chatflow.id, version, chatflow.config or {})
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        if plan.errors:
+            print(f"Chatflow {key[0]} v{version} compiled with warnings: {list(plan.errors)}")
+
+        with self._lock:
+            self._stats["misses"] += 1
+            self._stats["compile_ms"] += elapsed_ms
+            self._plans[key] = plan
+            self._plans.move_to_end(key)
+            while len(self._plans) > self.max_entries:
+                self._plans.popitem(last=False)
+
+        return plan
+
+
+    def invalidate(self, chatflow_id: Any):
+        """
+        Drop every cached version of a chatflow.
+
+        WHY: Called on deploy and delete
+        """
+
+        chatflow_id = str(chatflow_id)
+
+        with self._lock:
+            for key in [key for key in self._plans if key[0] == chatflow_id]:
+                del self._plans[key]
+            self._stats["invalidations"] += 1
+
+
+    def get_stats(self) -> dict:
+        """Cache counters for monitoring."""
+        return {**self._stats, "entries": len(self._plans)}
+
+
+# Global instance
+execution_plan_cache = ExecutionPlanCache()
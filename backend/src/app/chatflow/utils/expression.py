@@ -0,0 +1,421 @@
+"""
+Expression - Safe, compiled expressions for conditions and edge predicates.
+
+WHY:
+- Condition evaluation was a placeholder that always returned True
+- Branching logic needs user-authored expressions, and eval() on user
+  input is not an option
+- Conditions run on every message; parsing them each time is waste
+
+HOW:
+- Tokenize + recursive-descent parse into a small AST (tuples)
+- Compile the AST into nested Python closures (no eval, no attribute
+  access, no calls - only the operations below exist)
+- Compiled expressions are cached by expression text
+- Evaluation is a closure call against a scope (dict or LayeredScope)
+
+LANGUAGE:
+- Literals: 'text', "text", 42, 3.5, true, false, null, [1, 'a']
+- Variables: user.name, items.0.id or {{user.name}} (missing -> null,
+  names starting with __ are rejected)
+- Comparison: == != > < >= <=  (numeric when both sides are numbers or
+  numeric strings; ordering on non-numbers is false)
+- Text/collections: contains, not contains, in, not in, starts_with,
+  ends_with (case-insensitive for text), matches (regex search; the
+  pattern must be a literal, the subject is searched up to
+  MAX_MATCH_SUBJECT_LENGTH characters)
+- Emptiness: x is empty, x is not empty
+- Boolean: and / &&, or / ||, not / !, parentheses
+
+EXAMPLES:
+    "{{input}} contains 'help'"
+    "order.total >= 100 and customer.tier in ['gold', 'platinum']"
+    "not (kb1.results is empty)"
+
+PSEUDOCODE follows the existing codebase patterns.
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Callable, Mapping
+
+from app.chatflow.utils.template import lookup, split_path
+from app.core.config import settings
+
+
+MAX_EXPRESSION_LENGTH = 2000
+MAX_NESTING_DEPTH = 32
+MAX_MATCH_SUBJECT_LENGTH = getattr(settings, "CHATFLOW_MATCH_MAX_SUBJECT_LENGTH", 10000)
+
+TOKEN_PATTERN = re.compile(r"""
+    \s*(?:
+        (?P<template>\{\{[^}]+\}\})
+      | (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+      | (?P<number>\d+(?:\.\d+)?)
+      | (?P<op>==|!=|>=|<=|&&|\|\||[><!()\[\],-])
+      | (?P<word>[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z0-9_]+)*)
+    )
+""", re.VERBOSE)
+
+KEYWORDS = {
+    "and", "or", "not", "contains", "in", "matches", "starts_with",
+    "ends_with", "is", "empty", "true", "false", "null", "none"
+}
+
+COMPARISONS = {"==", "!=", ">", "<", ">=", "<=", "contains", "in", "matches", "starts_with", "ends_with"}
+
+# Compiled expression: scope -> value
+Evaluator = Callable[[Mapping], Any]
+
+
+class ExpressionError(ValueError):
+    """Expression could not be parsed."""
+    pass
+
+
+# ----------------------------------------------------------------------
+# Tokenizer / parser
+# ----------------------------------------------------------------------
+
+def _tokenize(text: str) -> list:
+    """Split expression text into (kind, value) tokens."""
+
+    tokens = []
+    position = 0
+    text = text.rstrip()
+
+    while position < len(text):
+        match = TOKEN_PATTERN.match(text, position)
+        if not match or match.end() == position:
+            raise ExpressionError(f"Unexpected character at {position}: {text[position:position + 10]!r}")
+
+        kind = match.lastgroup
+        value = match.group(kind)
+        position = match.end()
+
+        if kind == "word" and value.lower() in KEYWORDS:
+            tokens.append(("kw", value.lower()))
+        else:
+            tokens.append((kind, value))
+
+    return tokens
+
+
+class _Parser:
+    """
+    Recursive-descent parser.
+
+    GRAMMAR:
+        or      := and (("or" | "||") and)*
+        and     := unary (("and" | "&&") unary)*
+        unary   := ("not" | "!") unary | compare
+        compare := operand [["not"] comparison operand | "is" ["not"] "empty"]
+        operand := literal | variable | "-" number | "(" or ")" | "[" list "]"
+    """
+
+    def __init__(self, tokens: list):
+        self.tokens = tokens
+        self.index = 0
+        self.depth = 0
+
+    def nest(self):
+        self.depth += 1
+        if self.depth > MAX_NESTING_DEPTH:
+            raise ExpressionError(f"Expression is nested deeper than {MAX_NESTING_DEPTH} levels")
+
+    def peek(self, offset: int = 0):
+        index = self.index + offset
+        return self.tokens[index] if index < len(self.tokens) else (None, None)
+
+    def take(self):
+        token = self.peek()
+        self.index += 1
+        return token
+
+    def accept(self, *values) -> bool:
+        if self.peek()[1] in values:
+            self.index += 1
+            return True
+        return False
+
+    def expect(self, value: str):
+        if not self.accept(value):
+            raise ExpressionError(f"Expected {value!r}, got {self.peek()[1]!r}")
+
+    def parse(self):
+        node = self.parse_or()
+        if self.peek()[0] is not None:
+            raise ExpressionError(f"Unexpected token {self.peek()[1]!r}")
+        return node
+
+    def parse_or(self):
+        node = self.parse_and()
+        while self.accept("or", "||"):
+            node = ("or", node, self.parse_and())
+        return node
+
+    def parse_and(self):
+        node = self.parse_unary()
+        while self.accept("and", "&&"):
+            node = ("and", node, self.parse_unary())
+        return node
+
+    def parse_unary(self):
+        if self.accept("not", "!"):
+            self.nest()
+            node = ("not", self.parse_unary())
+            self.depth -= 1
+            return node
+        return self.parse_compare()
+
+    def parse_compare(self):
+        left = self.parse_operand()
+        kind, value = self.peek()
+
+        if value == "is":
+            self.take()
+            negate = self.accept("not")
+            self.expect("empty")
+            return ("empty", left, negate)
+
+        negate = False
+        if value == "not" and self.peek(1)[1] in ("contains", "in"):
+            self.take()
+            negate = True
+            kind, value = self.peek()
+
+        if kind in ("op", "kw") and value in COMPARISONS:
+            self.take()
+            node = ("cmp", value, left, self.parse_operand())
+            return ("not", node) if negate else node
+
+        return left
+
+    def parse_operand(self):
+        kind, value = self.take()
+
+        if kind is None:
+            raise ExpressionError("Unexpected end of expression")
+
+        if value == "(":
+            self.nest()
+            node = self.parse_or()
+            self.expect(")")
+            self.depth -= 1
+            return node
+
+        if value == "[":
+            self.nest()
+            items = []
+            if not self.accept("]"):
+                items.append(self.parse_operand())
+                while self.accept(","):
+                    items.append(self.parse_operand())
+                self.expect("]")
+            self.depth -= 1
+            return ("list", items)
+
+        if value == "-" and self.peek()[0] == "number":
+            return ("lit", -_parse_number(self.take()[1]))
+
+        if kind == "number":
+            return ("lit", _parse_number(value))
+
+        if kind == "string":
+            return ("lit", _unescape(value[1:-1]))
+
+        if kind in ("template", "word"):
+            path = split_path(value[2:-2] if kind == "template" else value)
+            if any(part.startswith("__") for part in path):
+                raise ExpressionError(f"Invalid variable name {value!r}")
+            return ("var", path)
+
+        if kind == "kw" and value in ("true", "false"):
+            return ("lit", value == "true")
+
+        if kind == "kw" and value in ("null", "none"):
+            return ("lit", None)
+
+        raise ExpressionError(f"Unexpected token {value!r}")
+
+
+def _parse_number(text: str):
+    return float(text) if "." in text else int(text)
+
+
+def _unescape(text: str) -> str:
+    return re.sub(r"\\(.)", r"\1", text)
+
+
+# ----------------------------------------------------------------------
+# Value semantics
+# ----------------------------------------------------------------------
+
+def _number(value: Any):
+    """Numeric view of a value (None if not numeric)."""
+
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        try:
+            return float(value.strip())
+        except ValueError:
+            return None
+    return None
+
+
+def _text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def _equals(left: Any, right: Any) -> bool:
+    a, b = _number(left), _number(right)
+    if a is not None and b is not None:
+        return a == b
+    if isinstance(left, (list, dict)) or isinstance(right, (list, dict)):
+        return left == right
+    return _text(left) == _text(right)
+
+
+def _contains(container: Any, item: Any) -> bool:
+    if isinstance(container, Mapping):
+        return _text(item) in container
+    if isinstance(container, (list, tuple, set)):
+        return any(_equals(element, item) for element in container)
+    return _text(item).casefold() in _text(container).casefold()
+
+
+def _ordered(compare: Callable[[float, float], bool]):
+    def evaluate(left: Any, right: Any) -> bool:
+        a, b = _number(left), _number(right)
+        return a is not None and b is not None and compare(a, b)
+    return evaluate
+
+
+def _is_empty(value: Any) -> bool:
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return not value.strip()
+    if isinstance(value, (list, tuple, set, dict)):
+        return not value
+    return False
+
+
+OPERATORS = {
+    "==": _equals,
+    "!=": lambda left, right: not _equals(left, right),
+    ">": _ordered(lambda a, b: a > b),
+    "<": _ordered(lambda a, b: a < b),
+    ">=": _ordered(lambda a, b: a >= b),
+    "<=": _ordered(lambda a, b: a <= b),
+    "contains": _contains,
+    "in": lambda left, right: _contains(right, left),
+    "starts_with": lambda left, right: _text(left).casefold().startswith(_text(right).casefold()),
+    "ends_with": lambda left, right: _text(left).casefold().endswith(_text(right).casefold())
+}
+
+
+# ----------------------------------------------------------------------
+# Compiler
+# ----------------------------------------------------------------------
+
+def _compile_node(node: tuple) -> Evaluator:
+    """Turn an AST node into a closure."""
+
+    kind = node[0]
+
+    if kind == "lit":
+        value = node[1]
+        return lambda scope: value
+
+    if kind == "var":
+        root, rest = node[1][0], node[1][1:]
+        if not rest:
+            return lambda scope: scope.get(root)
+
+        def variable(scope):
+            value = scope.get(root)
+            return lookup(value, rest) if value is not None else None
+        return variable
+
+    if kind == "list":
+        items = [_compile_node(item) for item in node[1]]
+        return lambda scope: [item(scope) for item in items]
+
+    if kind == "not":
+        operand = _compile_node(node[1])
+        return lambda scope: not operand(scope)
+
+    if kind == "and":
+        left, right = _compile_node(node[1]), _compile_node(node[2])
+        return lambda scope: bool(left(scope)) and bool(right(scope))
+
+    if kind == "or":
+        left, right = _compile_node(node[1]), _compile_node(node[2])
+        return lambda scope: bool(left(scope)) or bool(right(scope))
+
+    if kind == "empty":
+        operand, negate = _compile_node(node[1]), node[2]
+        return lambda scope: _is_empty(operand(scope)) != negate
+
+    if kind == "cmp":
+        op, left, right = node[1], _compile_node(node[2]), _compile_node(node[3])
+
+        if op == "matches":
+            # Only the flow author picks patterns: a pattern taken from a
+            # variable (user input) could backtrack catastrophically
+            if node[3][0] != "lit":
+                raise ExpressionError("matches requires a literal pattern")
+
+            # Compiled once, with the expression
+            try:
+                pattern = re.compile(_text(node[3][1]))
+            except re.error as e:
+                raise ExpressionError(f"Invalid regex: {e}")
+
+            return lambda scope: bool(pattern.search(_text(left(scope))[:MAX_MATCH_SUBJECT_LENGTH]))
+
+        function = OPERATORS[op]
+        return lambda scope: function(left(scope), right(scope))
+
+    raise ExpressionError(f"Unknown expression node: {kind}")
+
+
+@lru_cache(maxsize=getattr(settings, "CHATFLOW_EXPRESSION_CACHE_SIZE", 4096))
+def compile_expression(text: str) -> Evaluator:
+    """
+    Parse and compile an expression (cached by text).
+
+    RAISES:
+        ExpressionError: Invalid or oversized expression
+    """
+
+    if not isinstance(text, str) or not text.strip():
+        raise ExpressionError("Expression is empty")
+
+    if len(text) > MAX_EXPRESSION_LENGTH:
+        raise ExpressionError(f"Expression exceeds {MAX_EXPRESSION_LENGTH} characters")
+
+    tree = _Parser(_tokenize(text)).parse()
+    return _compile_node(tree)
+
+
+def evaluate(text: str, scope: Mapping) -> bool:
+    """
+    Evaluate an expression to a boolean.
+
+    ARGS:
+        text: Expression source
+        scope: Variables (dict or LayeredScope)
+
+    RAISES:
+        ExpressionError: Invalid expression
+    """
+    return bool(compile_expression(text)(scope))
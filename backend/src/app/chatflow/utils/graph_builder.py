@@ -12,10 +12,13 @@ HOW:
 - Build adjacency list
 - Validate connectivity
 - Sort for execution
+- All traversals are iterative O(V + E) (explicit stacks / deques), so
+  large graphs cannot hit the recursion limit
 
 PSEUDOCODE follows the existing codebase patterns.
 """
 
+from collections import deque
 from typing import List, Dict, Any, Optional, Tuple
 
 
@@ -27,6 +30,60 @@ class GraphBuilder:
     HOW: Graph analysis and validation
     """
 
+    # Config keys a node cannot run without (others have defaults)
+    REQUIRED_NODE_CONFIG = {
+        "http_request": ["url"]
+    }
+
+    def validate_nodes(
+        self,
+        nodes: List[Dict[str, Any]],
+        edges: List[Dict[str, Any]]
+    ) -> Tuple[List[str], List[str]]:
+        """
+        Validate node and edge definitions (before building the graph).
+
+        WHY: Malformed nodes fail at compile time, not mid-execution
+        HOW: Check ids/types, node configs and edge endpoints
+
+        RETURNS:
+            (fatal_errors, errors)
+            fatal_errors: graph cannot be built (missing/duplicate ids)
+            errors: graph builds but parts of it cannot run
+        """
+
+        fatal_errors = []
+        errors = []
+        node_ids = set()
+
+        for index, node in enumerate(nodes):
+            node_id = node.get("id")
+            if not node_id or not node.get("type"):
+                fatal_errors.append(f"Node at position {index} is missing id or type")
+                continue
+
+            if node_id in node_ids:
+                fatal_errors.append(f"Duplicate node id: {node_id}")
+            node_ids.add(node_id)
+
+            config = node.get("config", {})
+            if not isinstance(config, dict):
+                errors.append(f"Node {node_id}: config must be an object")
+                continue
+
+            for key in self.REQUIRED_NODE_CONFIG.get(node["type"], []):
+                if not config.get(key):
+                    errors.append(f"Node {node_id}: '{key}' is required")
+
+        for edge in edges:
+            source = edge.get("source")
+            target = edge.get("target")
+            if source not in node_ids or target not in node_ids:
+                errors.append(f"Edge {source} -> {target} references an unknown node")
+
+        return fatal_errors, errors
+
+
     def build_graph(
         self,
         nodes: List[Dict[str, Any]],
@@ -160,39 +217,42 @@ class GraphBuilder:
         Detect cycles in graph using DFS.
 
         WHY: Cycles cause infinite loops
-        HOW: Depth-first search with visited tracking
+        HOW: Iterative depth-first search (explicit stack of neighbor
+             iterators) with visited / on-path tracking
 
         RETURNS:
             (has_cycle, cycle_nodes)
         """
 
         visited = set()
-        rec_stack = set()
-        cycle_path = []
 
-        def dfs(node: str, path: List[str]) -> bool:
-            visited.add(node)
-            rec_stack.add(node)
-            path.append(node)
+        for root in adjacency.keys():
+            if root in visited:
+                continue
 
-            for neighbor in adjacency.get(node, []):
-                if neighbor not in visited:
-                    if dfs(neighbor, path):
-                        return True
-                elif neighbor in rec_stack:
-                    # Cycle detected
-                    cycle_start = path.index(neighbor)
-                    cycle_path.extend(path[cycle_start:])
-                    return True
+            visited.add(root)
+            path = [root]
+            on_path = {root}
+            stack = [iter(adjacency.get(root, []))]
+
+            while stack:
+                neighbor = next(stack[-1], None)
 
-            rec_stack.remove(node)
-            path.pop()
-            return False
+                if neighbor is None:
+                    # All neighbors explored - leave node
+                    stack.pop()
+                    on_path.discard(path.pop())
+                    continue
 
-        for node in adjacency.keys():
-            if node not in visited:
-                if dfs(node, []):
-                    return True, cycle_path
+                if neighbor in on_path:
+                    # Cycle detected
+                    return True, path[path.index(neighbor):]
+
+                if neighbor not in visited:
+                    visited.add(neighbor)
+                    path.append(neighbor)
+                    on_path.add(neighbor)
+                    stack.append(iter(adjacency.get(neighbor, [])))
 
         return False, None
 
@@ -206,25 +266,19 @@ class GraphBuilder:
         Get all nodes reachable from start node.
 
         WHY: Find disconnected nodes
-        HOW: BFS traversal
+        HOW: BFS traversal (deque, O(V + E))
 
         RETURNS:
             Set of reachable node IDs
         """
 
-        reachable = set()
-        queue = [start_node]
+        reachable = {start_node}
+        queue = deque([start_node])
 
         while queue:
-            node = queue.pop(0)
-
-            if node in reachable:
-                continue
-
-            reachable.add(node)
-
-            for neighbor in adjacency.get(node, []):
+            for neighbor in adjacency.get(queue.popleft(), []):
                 if neighbor not in reachable:
+                    reachable.add(neighbor)
                     queue.append(neighbor)
 
         return reachable
@@ -252,11 +306,11 @@ class GraphBuilder:
                 in_degree[neighbor] += 1
 
         # Queue nodes with no incoming edges
-        queue = [node_id for node_id, degree in in_degree.items() if degree == 0]
+        queue = deque(node_id for node_id, degree in in_degree.items() if degree == 0)
         sorted_nodes = []
 
         while queue:
-            node = queue.pop(0)
+            node = queue.popleft()
             sorted_nodes.append(node)
 
             # Reduce in-degree for neighbors
@@ -282,7 +336,7 @@ class GraphBuilder:
         Find path from start to end node.
 
         WHY: Visualize execution flow
-        HOW: BFS path finding
+        HOW: BFS path finding (parent pointers instead of copied paths)
 
         RETURNS:
             List of node IDs forming path or None if no path
@@ -291,23 +345,25 @@ class GraphBuilder:
         if start_node == end_node:
             return [start_node]
 
-        visited = set()
-        queue = [(start_node, [start_node])]
+        parents = {start_node: None}
+        queue = deque([start_node])
 
         while queue:
-            node, path = queue.pop(0)
+            node = queue.popleft()
 
-            if node in visited:
-                continue
+            for neighbor in adjacency.get(node, []):
+                if neighbor in parents:
+                    continue
 
-            visited.add(node)
+                parents[neighbor] = node
 
-            if node == end_node:
-                return path
+                if neighbor == end_node:
+                    path = [neighbor]
+                    while parents[path[-1]] is not None:
+                        path.append(parents[path[-1]])
+                    return path[::-1]
 
-            for neighbor in adjacency.get(node, []):
-                if neighbor not in visited:
-                    queue.append((neighbor, path + [neighbor]))
+                queue.append(neighbor)
 
         return None
 
@@ -0,0 +1,217 @@
+"""
+Node Memo - Opt-in memoization of deterministic chatflow nodes.
+
+WHY:
+- KB lookups, HTTP GETs and temperature-0 LLM classifications re-ran on
+  every message even when their inputs were identical
+
+HOW:
+- A node type declares whether it can be memoized (deterministic for a
+  given config); the flow author opts in per node:
+      "memoize": true          # default TTL
+      "memoize_ttl": 600       # seconds
+- Key = sha256(node type, config version, resolved inputs)
+  - config version: hash of the node config (any edit = new entries)
+  - resolved inputs: values of every {{variable}} the config (or the
+    node's default templates) references, looked up in the node's scope
+- Only successful, JSON-serializable results are stored; they are
+  stored serialized, so callers can never mutate a cached result
+- Bounded by entry count and total bytes (LRU) plus TTL
+- Hits are marked with metadata["cache_hit"] = True
+
+PSEUDOCODE follows the existing codebase patterns.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Any, Awaitable, Callable, Optional
+
+from app.chatflow.utils.template import compile_template, lookup, split_path
+from app.core.config import settings
+
+
+def memo_ttl(config: dict) -> Optional[float]:
+    """
+    Memoization TTL requested by a node config (None = not requested).
+    """
+
+    if config.get("memoize_ttl") is not None:
+        return float(config["memoize_ttl"])
+    if config.get("memoize"):
+        return float(getattr(settings, "CHATFLOW_NODE_MEMO_TTL_SECONDS", 300))
+    return None
+
+
+def _canonical(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def _template_strings(value: Any):
+    """Every string inside a (nested) config value."""
+
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, Mapping):
+        for item in value.values():
+            yield from _template_strings(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _template_strings(item)
+
+
+def template_inputs(config: dict, scope: Mapping, defaults: Optional[dict] = None) -> dict:
+    """
+    Resolve every variable the node's templates reference.
+
+    ARGS:
+        config: Node config
+        scope: Variables visible to the node
+        defaults: Templates the node uses when config omits them
+                  (e.g. {"query": "{{input}}"})
+
+    RETURNS:
+        {"var.path": value}
+    """
+
+    resolved = {}
+    for text in _template_strings({**(defaults or {}), **config}):
+        if "{{" not in text:
+            continue
+        for name in compile_template(text).variables:
+            if name not in resolved:
+                path = split_path(name)
+                root = scope.get(path[0])
+                resolved[name] = lookup(root, path[1:]) if path[1:] and root is not None else root
+    return resolved
+
+
+class NodeMemo:
+    """
+    TTL + LRU store of node results.
+
+    WHY: Skip deterministic node work for repeated inputs
+    HOW: Serialized results keyed by hash(type, config, inputs)
+    """
+
+    def __init__(self):
+        """Initialize memo store."""
+
+        self.max_entries = getattr(settings, "CHATFLOW_NODE_MEMO_MAX_ENTRIES", 2000)
+        self.max_bytes = getattr(settings, "CHATFLOW_NODE_MEMO_MAX_BYTES", 32 * 1024 * 1024)
+
+        self._entries: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stored": 0, "evicted": 0, "expired": 0}
+
+
+    def key(self, node_type: str, config: dict, inputs: dict) -> str:
+        """Memo key for a node execution."""
+
+        config_version = hashlib.sha256(_canonical(config).encode()).hexdigest()
+        return hashlib.sha256(_canonical([node_type, config_version, inputs]).encode()).hexdigest()
+
+
+    async def run(
+        self,
+        node_type: str,
+        config: dict,
+        scope: Mapping,
+        compute: Callable[[], Awaitable[dict]],
+        defaults: Optional[dict] = None
+    ) -> dict:
+        """
+        Return the memoized result, or compute and store it.
+
+        ARGS:
+            node_type: Node type
+            config: Node config (must request memoization, see memo_ttl)
+            scope: Variables visible to the node
+            compute: Runs the node
+            defaults: Node's default templates (see template_inputs)
+
+        RETURNS:
+            Node result; metadata["cache_hit"] tells whether it was memoized
+        """
+
+        ttl = memo_ttl(config)
+        key = self.key(node_type, config, template_inputs(config, scope, defaults))
+
+        cached = self._get(key)
+        if cached is not None:
+            self._stats["hits"] += 1
+            result = json.loads(cached)
+            result["metadata"] = {**(result.get("metadata") or {}), "cache_hit": True}
+            return result
+
+        self._stats["misses"] += 1
+        result = await compute()
+
+        if ttl and ttl > 0 and result.get("success", True) is not False and not result.get("error"):
+            self._set(key, result, ttl)
+
+        result["metadata"] = {**(result.get("metadata") or {}), "cache_hit": False}
+        return result
+
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, payload = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._bytes -= len(payload)
+                self._stats["expired"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            return payload
+
+
+    def _set(self, key: str, result: dict, ttl: float):
+        try:
+            payload = json.dumps(result)
+        except (TypeError, ValueError):
+            return  # Not serializable - not memoized
+
+        if len(payload) > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous[1])
+
+            self._entries[key] = (time.monotonic() + ttl, payload)
+            self._bytes += len(payload)
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self._stats["evicted"] += 1
+
+        self._stats["stored"] += 1
+
+
+    def clear(self):
+        """Drop every memoized result."""
+
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+    def get_stats(self) -> dict:
+        """Memo counters for monitoring."""
+        return {**self._stats, "entries": len(self._entries), "bytes": self._bytes}
+
+
+# Global instance
+node_memo = NodeMemo()
@@ -0,0 +1,196 @@
+"""
+Subgraph - Run a loop body sub-graph over many items.
+
+WHY:
+- LoopNode echoed each item instead of running a body
+- It wrote item/index into the shared context["variables"] on every
+  iteration, so iterations could never run side by side
+
+HOW:
+- The body ({"nodes", "edges"}) is compiled once into an ExecutionPlan
+  with a synthetic entry node that emits the current item
+- Each iteration runs on the DAGScheduler in its own child scope:
+  item/index layered over the parent variables (no copy), never
+  written back
+- map_items() runs iterations under a concurrency bound, collects results
+  in item order, cancels outstanding iterations on the first failure
+  and times every iteration
+
+PSEUDOCODE follows the existing codebase patterns.
+"""
+
+import asyncio
+import importlib
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from app.chatflow.utils.dag_scheduler import dag_scheduler
+from app.chatflow.utils.execution_plan import ExecutionPlan, compile_plan
+from app.chatflow.utils.template import LayeredScope, layered_scope
+
+
+ENTRY_NODE = "__loop_item__"
+
+# Node type -> class path (imported lazily; node modules pull in services)
+NODE_CLASSES = {
+    "llm": "app.chatflow.nodes.llm_node.LLMNode",
+    "kb": "app.chatflow.nodes.kb_node.KBNode",
+    "condition": "app.chatflow.nodes.condition_node.ConditionNode",
+    "http": "app.chatflow.nodes.http_node.HTTPNode",
+    "http_request": "app.chatflow.nodes.http_node.HTTPNode",
+    "variable": "app.chatflow.nodes.variable_node.VariableNode",
+    "code": "app.chatflow.nodes.code_node.CodeNode",
+    "memory": "app.chatflow.nodes.memory_node.MemoryNode",
+    "database": "app.chatflow.nodes.database_node.DatabaseNode",
+    "loop": "app.chatflow.nodes.loop_node.LoopNode",
+    "response": "app.chatflow.nodes.response_node.ResponseNode"
+}
+
+# run_node(node, node_context, inputs) -> node result
+NodeRunner = Callable[[dict, dict, dict], Awaitable[dict]]
+
+
+class IterationError(Exception):
+    """A loop iteration failed (node error or timeout)."""
+
+    def __init__(self, index: int, error: str):
+        self.index = index
+        self.error = error
+        super().__init__(f"Iteration {index} failed: {error}")
+
+
+def create_node(node: dict):
+    """
+    Instantiate the node class for a node definition.
+
+    RAISES:
+        ValueError: Unknown node type
+    """
+
+    path = NODE_CLASSES.get(node["type"])
+    if path is None:
+        raise ValueError(f"Unknown node type: {node['type']}")
+
+    module_name, class_name = path.rsplit(".", 1)
+    node_class = getattr(importlib.import_module(module_name), class_name)
+
+    return node_class(node_id=node["id"], config=node.get("config", {}))
+
+
+def compile_body(body: dict) -> ExecutionPlan:
+    """
+    Compile a loop body into a plan rooted at the synthetic entry node.
+
+    HOW: Entry node -> every body node without incoming edges
+    """
+
+    nodes = body.get("nodes", [])
+    edges = body.get("edges", [])
+
+    targets = {edge.get("target") for edge in edges}
+    roots = [node["id"] for node in nodes if node.get("id") not in targets]
+
+    return compile_plan(
+        chatflow_id=ENTRY_NODE,
+        version=None,
+        config={
+            "nodes": [{"id": ENTRY_NODE, "type": "trigger", "config": {}}, *nodes],
+            "edges": [{"source": ENTRY_NODE, "target": root} for root in roots] + edges
+        }
+    )
+
+
+async def map_items(
+    plan: ExecutionPlan,
+    items: list,
+    run_node: NodeRunner,
+    scope: dict,
+    item_variable: str = "item",
+    index_variable: str = "index",
+    output_node: Optional[str] = None,
+    max_concurrency: int = 1,
+    iteration_timeout: Optional[float] = None
+) -> list:
+    """
+    Run the body plan once per item.
+
+    ARGS:
+        plan: Compiled body (compile_body)
+        items: Items to map
+        run_node: Executes one body node
+        scope: Parent variables (read-only for iterations)
+        item_variable / index_variable: Names bound in each child scope
+        output_node: Body node whose output is the iteration result
+            (default: response output, else last executed node)
+        max_concurrency: Iterations in flight at once
+        iteration_timeout: Seconds per iteration (None = no limit)
+
+    RETURNS:
+        [{"index", "item", "result", "duration_ms"}, ...] in item order
+
+    RAISES:
+        IterationError: First failing iteration (others are cancelled)
+    """
+
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    if not isinstance(scope, LayeredScope):
+        scope = layered_scope(scope)
+
+    async def iteration(index: int, item: Any) -> dict:
+        async with semaphore:
+            child_context = {
+                "variables": scope.child({item_variable: item, index_variable: index})
+            }
+
+            async def execute_node(node: dict, node_context: dict) -> dict:
+                if node["id"] == ENTRY_NODE:
+                    return {"output": item}
+
+                sources = plan.predecessors[node["id"]]
+                inputs = {"input": node_context["variables"].get(sources[-1]) if sources else item}
+
+                result = await run_node(node, node_context, inputs)
+                if result.get("success") is False:
+                    raise IterationError(index, f"{node['id']}: {result.get('error')}")
+                return result
+
+            start = time.perf_counter()
+            try:
+                run = dag_scheduler.run(plan, execute_node, child_context)
+                if iteration_timeout:
+                    outcome = await asyncio.wait_for(run, timeout=iteration_timeout)
+                else:
+                    outcome = await run
+            except asyncio.TimeoutError:
+                raise IterationError(index, f"timed out after {iteration_timeout}s")
+            except IterationError:
+                raise
+            except Exception as e:
+                raise IterationError(index, str(e))
+
+            variables = child_context["variables"]
+            if output_node:
+                result = variables.get(output_node)
+            elif outcome["output"]:
+                result = outcome["output"]
+            else:
+                executed = [node_id for node_id in outcome["nodes_executed"] if node_id != ENTRY_NODE]
+                result = variables.get(executed[-1]) if executed else item
+
+            return {
+                "index": index,
+                "item": item,
+                "result": result,
+                "duration_ms": round((time.perf_counter() - start) * 1000, 2)
+            }
+
+    tasks = [asyncio.create_task(iteration(index, item)) for index, item in enumerate(items)]
+
+    try:
+        # Raises on the first failure; finally cancels the rest
+        return list(await asyncio.gather(*tasks))
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,199 @@
+"""
+Template - Precompiled {{variable}} templates and layered scopes.
+
+WHY:
+- Executors did one full-string .replace pass per variable
+- VariableResolver re-ran its regex and re-split dotted paths on every
+  call, for templates that never change between messages
+- Nodes built {**context["variables"], **inputs} copies before every
+  resolve, copying every variable to read a few
+
+HOW:
+- compile_template() parses a template once into a segment list:
+  literal strings and pre-split accessor paths ("a.b.0" -> ("a", "b", "0"))
+- Compiled templates are cached by template text (node configs are
+  immutable per chatflow version, so this is a per-config cache)
+- render() does one pass over the segments with dict/list lookups only
+- layered_scope() is a copy-on-write mapping (LayeredScope): inputs and
+  per-node values stack on top of the flow variables without copying;
+  writes land in the top layer only
+
+PSEUDOCODE follows the existing codebase patterns.
+"""
+
+import re
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Any, Iterator
+
+from app.core.config import settings
+
+
+VARIABLE_PATTERN = re.compile(r'\{\{([^}]+)\}\}')
+
+
+class LayeredScope(Mapping):
+    """
+    Copy-on-write stack of variable layers.
+
+    WHY: {**variables, **inputs} copied every variable per resolve
+    HOW: Lookups walk the layers top-down; writes go to the top layer,
+         lower layers (shared flow variables) are never modified
+    """
+
+    __slots__ = ("layers",)
+
+    def __init__(self, *layers: Mapping):
+        self.layers = ({},) + layers
+
+    def get(self, key: str, default: Any = None) -> Any:
+        for layer in self.layers:
+            if key in layer:
+                return layer[key]
+        return default
+
+    def __getitem__(self, key: str) -> Any:
+        for layer in self.layers:
+            if key in layer:
+                return layer[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any):
+        self.layers[0][key] = value
+
+    def __contains__(self, key: object) -> bool:
+        return any(key in layer for layer in self.layers)
+
+    def __iter__(self) -> Iterator[str]:
+        seen = set()
+        for layer in self.layers:
+            for key in layer:
+                if key not in seen:
+                    seen.add(key)
+                    yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def child(self, *layers: Mapping) -> "LayeredScope":
+        """New scope with extra layers on top (this scope stays unchanged)."""
+        return LayeredScope(*layers, *self.layers)
+
+
+def layered_scope(*layers: Mapping) -> LayeredScope:
+    """
+    Layered variable scope (first layer wins, writes go to a new top layer).
+
+    EXAMPLE:
+        layered_scope(inputs, context["variables"])  # no copies
+    """
+    return LayeredScope(*layers)
+
+
+class CompiledTemplate:
+    """
+    Parsed template: literals and accessor paths.
+
+    WHY: Parse once, render many times
+    HOW: Segments are str (literal) or (root, rest_of_path, placeholder)
+    """
+
+    __slots__ = ("segments", "variables", "is_static")
+
+    def __init__(self, segments: tuple):
+        self.segments = segments
+        self.variables = tuple(
+            ".".join((s[0],) + s[1]) for s in segments if not isinstance(s, str)
+        )
+        self.is_static = not self.variables
+
+    def render(self, scope: Mapping) -> str:
+        """
+        Render against a scope.
+
+        NOTE: Missing variables keep their {{placeholder}} text
+        (same as VariableResolver).
+        """
+
+        if self.is_static:
+            return self.segments[0] if self.segments else ""
+
+        get = scope.get
+        parts = []
+        append = parts.append
+
+        for segment in self.segments:
+            if segment.__class__ is str:
+                append(segment)
+                continue
+
+            root, rest, placeholder = segment
+            value = get(root)
+            if rest and value is not None:
+                value = lookup(value, rest)
+
+            if value is None:
+                append(placeholder)
+            elif value.__class__ is str:
+                append(value)
+            else:
+                append(str(value))
+
+        return "".join(parts)
+
+
+def lookup(scope: Any, path: tuple) -> Any:
+    """
+    Follow a pre-split path through mappings and sequences.
+
+    RETURNS:
+        Value, or None if any step is missing
+    """
+
+    current = scope
+    for part in path:
+        if current.__class__ is dict or isinstance(current, Mapping):
+            current = current.get(part)
+        elif isinstance(current, (list, tuple)):
+            try:
+                current = current[int(part)]
+            except (ValueError, IndexError):
+                return None
+        else:
+            return None
+
+        if current is None:
+            return None
+
+    return current
+
+
+def split_path(name: str) -> tuple:
+    """"items.0.name" -> ("items", "0", "name")."""
+    return tuple(name.strip().split("."))
+
+
+@lru_cache(maxsize=getattr(settings, "CHATFLOW_TEMPLATE_CACHE_SIZE", 4096))
+def compile_template(template: str) -> CompiledTemplate:
+    """
+    Compile (or fetch the cached) template.
+
+    ARGS:
+        template: String with {{variable}} placeholders
+    """
+
+    segments = []
+    position = 0
+
+    for match in VARIABLE_PATTERN.finditer(template):
+        if match.start() > position:
+            segments.append(template[position:match.start()])
+        path = split_path(match.group(1))
+        segments.append((path[0], path[1:], match.group(0)))
+        position = match.end()
+
+    if position < len(template):
+        segments.append(template[position:])
+
+    return CompiledTemplate(tuple(segments))
+
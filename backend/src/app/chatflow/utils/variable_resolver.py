@@ -8,7 +8,7 @@ WHY:
 - Expression evaluation
 
 HOW:
-- Parse {{variable}} syntax
+- Parse {{variable}} syntax once per template (app.chatflow.utils.template)
 - Replace with context values
 - Support nested access
 - Handle missing variables
@@ -17,7 +17,9 @@ PSEUDOCODE follows the existing codebase patterns.
 """
 
 import re
-from typing import Any, Dict
+from typing import Any, Dict, Mapping
+
+from app.chatflow.utils.template import compile_template, lookup, split_path
 
 
 class VariableResolver:
@@ -39,7 +41,7 @@ class VariableResolver:
         self.variable_pattern = re.compile(r'\{\{([^}]+)\}\}')
 
 
-    def resolve(self, template: str, context: Dict[str, Any]) -> str:
+    def resolve(self, template: str, context: Mapping[str, Any]) -> str:
         """
         Resolve all variables in template.
 
@@ -64,21 +66,11 @@ class VariableResolver:
         if not isinstance(template, str):
             return str(template)
 
-        def replace_variable(match):
-            variable_name = match.group(1).strip()
-
-            # Get value from context
-            value = self._get_value(variable_name, context)
-
-            return str(value) if value is not None else match.group(0)
-
-        # Replace all variables
-        result = self.variable_pattern.sub(replace_variable, template)
-
-        return result
+        # Parsed once per template text, then cached
+        return compile_template(template).render(context)
 
 
-    def _get_value(self, variable_name: str, context: Dict[str, Any]) -> Any:
+    def _get_value(self, variable_name: str, context: Mapping[str, Any]) -> Any:
         """
         Get variable value from context.
 
@@ -91,26 +83,7 @@ class VariableResolver:
             "items.0.name" -> context["items"][0]["name"]
         """
 
-        # Handle dot notation for nested access
-        parts = variable_name.split(".")
-
-        current = context
-        for part in parts:
-            if isinstance(current, dict):
-                current = current.get(part)
-            elif isinstance(current, (list, tuple)):
-                try:
-                    index = int(part)
-                    current = current[index]
-                except (ValueError, IndexError):
-                    return None
-            else:
-                return None
-
-            if current is None:
-                return None
-
-        return current
+        return lookup(context, split_path(variable_name))
 
 
     def resolve_all(self, data: Any, context: Dict[str, Any]) -> Any:
@@ -72,6 +72,8 @@ from app.db.base_class import Base  # noqa
 # These imports ensure Alembic can detect all tables for migrations
 from app.models.user import User  # noqa
 from app.models.auth_identity import AuthIdentity  # noqa
+from app.models.bot_analytics_rollup import BotAnalyticsRollup  # noqa
+from app.models.workspace_usage import WorkspaceUsage, UsageFlushLog  # noqa
 
 #  TODO: Uncomment these imports as you implement each model
 # from app.models.organization import Organization  # noqa
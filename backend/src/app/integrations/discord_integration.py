@@ -161,6 +161,81 @@ class DiscordIntegration:
         }
 
 
+    async def _send_message(
+        self,
+        application_id: str,
+        interaction_token: str,
+        text: str
+    ):
+        """
+        Edit a deferred interaction response with the bot reply.
+
+        WHY: Webhook answers with type 5 (deferred) within 3 seconds,
+             the reply is delivered once the bot has finished
+        HOW: PATCH the original interaction message with the first chunk,
+             POST the rest of a long reply as follow-ups (token valid 15 min)
+        """
+
+        from app.services.outbound_delivery_service import outbound_delivery_service
+
+        webhook = f"https://discord.com/api/v10/webhooks/{application_id}/{interaction_token}"
+        edited = False
+
+        def build(chunk: str) -> tuple:
+            nonlocal edited
+            if not edited:
+                edited = True
+                return ("PATCH", f"{webhook}/messages/@original", {"content": chunk}, None)
+            # Editing @original again would replace the earlier chunks
+            return ("POST", webhook, {"content": chunk}, None)
+
+        # Per-interaction bucket: each token is its own "chat"
+        await outbound_delivery_service.send_text(
+            platform="discord",
+            bot_key=application_id,
+            chat_key=interaction_token,
+            text=text,
+            build=build
+        )
+
+
+    def open_stream(self, application_id: str, interaction_token: str):
+        """
+        ProgressiveMessage editing the deferred interaction response.
+
+        WHY: Streamed replies; the deferred (type 5) response is already
+             the placeholder ("Bot is thinking...")
+        HOW: PATCH @original for edits, POST follow-ups for overflow
+        """
+
+        from app.services.outbound_delivery_service import outbound_delivery_service
+        from app.services.progressive_message import ProgressiveMessage
+
+        webhook = f"https://discord.com/api/v10/webhooks/{application_id}/{interaction_token}"
+
+        async def edit(text: str, final: bool):
+            await outbound_delivery_service.request(
+                platform="discord",
+                bot_key=application_id,
+                chat_key=interaction_token,
+                request=("PATCH", f"{webhook}/messages/@original", {"content": text}, None)
+            )
+
+        async def overflow(text: str):
+            await outbound_delivery_service.request(
+                platform="discord",
+                bot_key=application_id,
+                chat_key=interaction_token,
+                request=("POST", webhook, {"content": text}, None)
+            )
+
+        return ProgressiveMessage(
+            edit=edit,
+            max_length=outbound_delivery_service.limits["discord"]["max_length"],
+            overflow=overflow
+        )
+
+
     def _get_bot(self, db: Session, entity_id: UUID) -> Tuple[str, Any]:
         """Get bot by ID (chatbot or chatflow)."""
 
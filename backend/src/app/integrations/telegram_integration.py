@@ -172,18 +172,128 @@ class TelegramIntegration:
         text: str,
         bot_token: str
     ):
-        """Send message to Telegram user."""
-
-        requests.post(
-            f"https://api.telegram.org/bot{bot_token}/sendMessage",
-            json={
-                "chat_id": chat_id,
-                "text": text,
-                "parse_mode": "Markdown"  # Support markdown formatting
-            }
+        """
+        Send message to Telegram user.
+
+        HOW: outbound_delivery_service (pooled client, per-bot/per-chat
+             rate limits, Retry-After handling, merges queued replies)
+        """
+
+        from app.services.outbound_delivery_service import outbound_delivery_service
+
+        def build(chunk: str) -> tuple:
+            return (
+                "POST",
+                f"https://api.telegram.org/bot{bot_token}/sendMessage",
+                {
+                    "chat_id": chat_id,
+                    "text": chunk,
+                    "parse_mode": "Markdown"  # Support markdown formatting
+                },
+                None
+            )
+
+        await outbound_delivery_service.send_text(
+            platform="telegram",
+            bot_key=bot_token,
+            chat_key=chat_id,
+            text=text,
+            build=build
+        )
+
+
+    async def open_stream(self, chat_id: int, bot_token: str):
+        """
+        Post a placeholder message and return a ProgressiveMessage for it.
+
+        WHY: Streamed replies (sendMessage once, then editMessageText)
+        HOW: Edits share the chat's rate limit via outbound_delivery_service;
+             in-progress edits are plain text (partial Markdown would be
+             rejected), the final edit uses Markdown with a plain fallback.
+             If the placeholder is refused, nothing is edited and the final
+             reply goes out as ordinary messages.
+        """
+
+        from app.services.outbound_delivery_service import outbound_delivery_service
+        from app.services.progressive_message import ProgressiveMessage
+
+        api = f"https://api.telegram.org/bot{bot_token}"
+
+        async def overflow(text: str):
+            await self._send_message(chat_id=chat_id, text=text, bot_token=bot_token)
+
+        try:
+            placeholder = await outbound_delivery_service.request(
+                platform="telegram",
+                bot_key=bot_token,
+                chat_key=chat_id,
+                request=("POST", f"{api}/sendMessage", {"chat_id": chat_id, "text": "…"}, None)
+            )
+            message_id = self._message_id(placeholder)
+        except Exception as e:
+            print(f"Telegram placeholder failed: {type(e).__name__}: {e}")
+            message_id = None
+
+        if message_id is None:
+            async def send_final(text: str, final: bool):
+                if final:
+                    await overflow(text)
+
+            return ProgressiveMessage(
+                edit=send_final,
+                max_length=outbound_delivery_service.limits["telegram"]["max_length"],
+                overflow=overflow
+            )
+
+        async def edit(text: str, final: bool):
+            body = {"chat_id": chat_id, "message_id": message_id, "text": text}
+            if final:
+                body["parse_mode"] = "Markdown"
+
+            response = await outbound_delivery_service.request(
+                platform="telegram",
+                bot_key=bot_token,
+                chat_key=chat_id,
+                request=("POST", f"{api}/editMessageText", body, None)
+            )
+
+            if final and response.status_code == 400:
+                # Unbalanced Markdown in model output - retry as plain text
+                body.pop("parse_mode")
+                await outbound_delivery_service.request(
+                    platform="telegram",
+                    bot_key=bot_token,
+                    chat_key=chat_id,
+                    request=("POST", f"{api}/editMessageText", body, None)
+                )
+
+        return ProgressiveMessage(
+            edit=edit,
+            max_length=outbound_delivery_service.limits["telegram"]["max_length"],
+            overflow=overflow
         )
 
 
+    @staticmethod
+    def _message_id(response) -> Optional[int]:
+        """message_id of a sendMessage reply (None unless Telegram says ok)."""
+
+        if response.status_code != 200:
+            print(f"Telegram placeholder rejected: HTTP {response.status_code}")
+            return None
+
+        try:
+            data = response.json()
+        except ValueError:
+            return None
+
+        if not data.get("ok"):
+            print(f"Telegram placeholder rejected: {data.get('description')}")
+            return None
+
+        return (data.get("result") or {}).get("message_id")
+
+
     def _get_bot(self, db: Session, entity_id: UUID) -> Tuple[str, Any]:
         """Get bot by ID (chatbot or chatflow)."""
 
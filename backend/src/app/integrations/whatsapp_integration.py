@@ -194,19 +194,28 @@ class WhatsAppIntegration:
 
         phone_number_id = whatsapp_config["phone_number_id"]
 
-        # Send message via WhatsApp Cloud API
-        requests.post(
-            f"https://graph.facebook.com/v18.0/{phone_number_id}/messages",
-            headers={
-                "Authorization": f"Bearer {access_token}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "messaging_product": "whatsapp",
-                "to": to_number,
-                "type": "text",
-                "text": {"body": text}
-            }
+        from app.services.outbound_delivery_service import outbound_delivery_service
+
+        def build(chunk: str) -> tuple:
+            return (
+                "POST",
+                f"https://graph.facebook.com/v18.0/{phone_number_id}/messages",
+                {
+                    "messaging_product": "whatsapp",
+                    "to": to_number,
+                    "type": "text",
+                    "text": {"body": chunk}
+                },
+                {"Authorization": f"Bearer {access_token}"}
+            )
+
+        # Send message via WhatsApp Cloud API (pooled, rate limited)
+        await outbound_delivery_service.send_text(
+            platform="whatsapp",
+            bot_key=phone_number_id,
+            chat_key=to_number,
+            text=text,
+            build=build
         )
 
 
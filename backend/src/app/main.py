@@ -30,11 +30,60 @@ async def lifespan(app: FastAPI):
         print(f"⚠️  Database initialization warning: {e}")
         print("   (This is normal if database is not yet accessible)")
 
+    # Make sure this month's chat_messages partitions exist
+    # (also maintained daily by the maintain_chat_partitions beat task)
+    try:
+        from app.db.session import SessionLocal
+        from app.services.chat_partition_service import chat_partition_service
+
+        db = SessionLocal()
+        try:
+            chat_partition_service.ensure_partitions(db)
+        finally:
+            db.close()
+    except Exception as e:
+        print(f"⚠️  Chat partition check failed: {e}")
+
+    # Resume channel replies queued before a restart (handlers are
+    # registered by the webhook routes at import)
+    from app.services.channel_dispatcher import channel_dispatcher
+    channel_dispatcher.start()
+
+    # Pre-warm CodeNode sandbox workers
+    if getattr(settings, "CODE_SANDBOX_PREWARM", True):
+        try:
+            from app.chatflow.utils.code_sandbox import code_sandbox
+            code_sandbox.start()
+        except Exception as e:
+            print(f"⚠️  Code sandbox pre-warm failed: {e}")
+
     yield
 
     # Shutdown
     print(f"👋 {settings.PROJECT_NAME} Backend shutting down...")
 
+    # Let running channel replies finish (the rest stay queued in Redis)
+    await channel_dispatcher.drain()
+
+    # Close pooled outbound connections
+    from app.services.outbound_delivery_service import outbound_delivery_service
+    await outbound_delivery_service.aclose()
+
+    from app.services.node_http_client import node_http_client
+    await node_http_client.aclose()
+
+    # Close pooled DatabaseNode connections
+    from app.services.database_engine_registry import database_engine_registry
+    database_engine_registry.dispose_all()
+
+    # Write batched credential usage counts
+    from app.services.credential_cache import credential_cache
+    credential_cache.flush_usage()
+
+    # Stop code sandbox workers
+    from app.chatflow.utils.code_sandbox import code_sandbox
+    code_sandbox.close()
+
 
 # Create FastAPI app
 app = FastAPI(
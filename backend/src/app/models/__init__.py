@@ -19,6 +19,10 @@ from app.models.workspace import Workspace
 from app.models.workspace_member import WorkspaceMember
 from app.models.invitation import Invitation
 
+# Analytics models (IMPLEMENTED)
+from app.models.bot_analytics_rollup import BotAnalyticsRollup
+from app.models.workspace_usage import UsageFlushLog, WorkspaceUsage
+
 # NOTE: The following models are still pseudocode and not imported yet:
 # - Chatbot
 # - Chatflow
@@ -41,4 +45,8 @@ __all__ = [
     "Workspace",
     "WorkspaceMember",
     "Invitation",
+    # Analytics
+    "BotAnalyticsRollup",
+    "WorkspaceUsage",
+    "UsageFlushLog",
 ]
@@ -0,0 +1,136 @@
+"""
+BotAnalyticsRollup model - Pre-aggregated chatbot/chatflow analytics.
+
+WHY:
+- Analytics endpoints would otherwise scan chat_sessions and chat_messages
+  on every dashboard load
+- Dashboards only need per-hour / per-day totals
+- A few hundred rollup rows answer any "last N days" query
+
+HOW:
+- One row per (bot_type, bot_id, granularity, bucket_start)
+- Counters incremented atomically (INSERT ... ON CONFLICT DO UPDATE) on
+  every message write and feedback submission
+- Response times kept as a fixed-bucket histogram (percentiles without
+  storing raw latencies)
+- Can be rebuilt from raw messages (bot_analytics_service.rebuild)
+
+PSEUDOCODE:
+-----------
+class BotAnalyticsRollup(Base):
+    __tablename__ = "bot_analytics_rollups"
+
+    bot_type: str ("chatbot" | "chatflow")
+    bot_id: UUID
+    workspace_id: UUID (tenant isolation)
+
+    granularity: str ("hour" | "day")
+    bucket_start: datetime (UTC, truncated to hour/day)
+
+    # Counters
+    conversations: int      # Sessions whose first message landed in bucket
+    messages: int           # All messages
+    user_messages: int
+    assistant_messages: int
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+    errors: int             # Messages with error set
+    feedback_positive: int
+    feedback_negative: int
+
+    # Response time histogram (assistant messages, milliseconds)
+    response_time_count: int
+    response_time_sum_ms: int
+    rt_le_250 .. rt_le_5000, rt_gt_5000: int
+
+    UNIQUE (bot_type, bot_id, granularity, bucket_start)
+
+EXAMPLE QUERY:
+--------------
+# Last 7 days for one chatbot: at most 7 rows
+rows = db.query(BotAnalyticsRollup).filter(
+    BotAnalyticsRollup.bot_type == "chatbot",
+    BotAnalyticsRollup.bot_id == chatbot_id,
+    BotAnalyticsRollup.granularity == "day",
+    BotAnalyticsRollup.bucket_start >= since
+).all()
+"""
+
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.base_class import Base
+
+
+# Upper bounds (ms) of the response time histogram buckets
+RESPONSE_TIME_BUCKETS_MS = (250, 500, 1000, 2000, 5000)
+
+# Histogram column per bucket (last one is the overflow bucket)
+RESPONSE_TIME_COLUMNS = tuple(f"rt_le_{bound}" for bound in RESPONSE_TIME_BUCKETS_MS) + (
+    f"rt_gt_{RESPONSE_TIME_BUCKETS_MS[-1]}",
+)
+
+# Every additive counter column
+COUNTER_COLUMNS = (
+    "conversations",
+    "messages",
+    "user_messages",
+    "assistant_messages",
+    "prompt_tokens",
+    "completion_tokens",
+    "total_tokens",
+    "errors",
+    "feedback_positive",
+    "feedback_negative",
+    "response_time_count",
+    "response_time_sum_ms",
+) + RESPONSE_TIME_COLUMNS
+
+
+class BotAnalyticsRollup(Base):
+    """Hourly/daily analytics counters per chatbot or chatflow."""
+
+    __tablename__ = "bot_analytics_rollups"
+
+    # Bot identity
+    bot_type = Column(String(20), nullable=False)
+    bot_id = Column(UUID(as_uuid=True), nullable=False)
+    workspace_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+
+    # Bucket
+    granularity = Column(String(10), nullable=False)  # "hour" | "day"
+    bucket_start = Column(DateTime, nullable=False)
+
+    # Counters
+    conversations = Column(Integer, nullable=False, default=0)
+    messages = Column(Integer, nullable=False, default=0)
+    user_messages = Column(Integer, nullable=False, default=0)
+    assistant_messages = Column(Integer, nullable=False, default=0)
+    prompt_tokens = Column(BigInteger, nullable=False, default=0)
+    completion_tokens = Column(BigInteger, nullable=False, default=0)
+    total_tokens = Column(BigInteger, nullable=False, default=0)
+    errors = Column(Integer, nullable=False, default=0)
+    feedback_positive = Column(Integer, nullable=False, default=0)
+    feedback_negative = Column(Integer, nullable=False, default=0)
+
+    # Response time histogram
+    response_time_count = Column(Integer, nullable=False, default=0)
+    response_time_sum_ms = Column(BigInteger, nullable=False, default=0)
+    rt_le_250 = Column(Integer, nullable=False, default=0)
+    rt_le_500 = Column(Integer, nullable=False, default=0)
+    rt_le_1000 = Column(Integer, nullable=False, default=0)
+    rt_le_2000 = Column(Integer, nullable=False, default=0)
+    rt_le_5000 = Column(Integer, nullable=False, default=0)
+    rt_gt_5000 = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "bot_type", "bot_id", "granularity", "bucket_start",
+            name="uq_bot_analytics_rollups_bucket"
+        ),
+        Index("ix_bot_analytics_rollups_workspace_bucket", "workspace_id", "granularity", "bucket_start"),
+    )
+
+    def __repr__(self):
+        return f"<BotAnalyticsRollup {self.bot_type}/{self.bot_id} {self.granularity} {self.bucket_start}>"
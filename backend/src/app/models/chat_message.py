@@ -69,6 +69,7 @@ class ChatMessage(Base):
             "type": "chatflow",
             "chatflow_id": "uuid",
             "nodes_executed": ["start", "llm1", "kb_search", "response"],
+            "nodes_cached": ["kb_search"],  # served from the node memo
             "execution_time_ms": 1250,
 
             # RAG sources
@@ -211,9 +212,9 @@ WHY: Improve AI responses over time
 HOW: Users rate messages in widget
 
 def submit_feedback(message_id, rating, comment):
-    """User submits feedback on a message."""
+    # User submits feedback on a message.
 
-    message = db.query(ChatMessage).get(message_id)
+    message = db.query(ChatMessage).filter(ChatMessage.id == message_id).first()
 
     message.feedback = {
         "rating": rating,  # "positive" | "negative"
@@ -233,7 +234,7 @@ def submit_feedback(message_id, rating, comment):
 COST TRACKING:
 --------------
 def calculate_session_cost(session):
-    """Calculate total cost for a session."""
+    # Calculate total cost for a session.
 
     total_tokens = sum(
         msg.total_tokens or 0
@@ -276,7 +277,7 @@ WHY: Users can request data deletion
 HOW: Cascade delete from session
 
 def delete_user_data(email):
-    """Delete all messages for a user (GDPR)."""
+    # Delete all messages for a user (GDPR).
 
     # Find sessions by email in metadata
     sessions = db.query(ChatSession).filter(
@@ -288,6 +289,26 @@ def delete_user_data(email):
         db.delete(session)
 
     db.commit()
+
+
+PARTITIONING:
+-------------
+WHY: Table grows without bound; row-by-row retention bloats indexes
+HOW: PARTITION BY RANGE (created_at), one partition per calendar month
+
+    chat_messages                  (partitioned parent, no rows)
+    ├── chat_messages_p202501      [2025-01-01, 2025-02-01)
+    ├── chat_messages_p202502      [2025-02-01, 2025-03-01)
+    └── chat_messages_default      (safety net, should stay empty)
+
+- Primary key is (id, created_at) - Postgres requires the partition key
+  in every unique constraint. Look messages up by filter(id == ...), not get()
+- Indexes declared below are created on every partition automatically
+- Queries filtered by created_at (recent history, analytics ranges) are
+  pruned to the matching partitions
+- Retention: chat_partition_service.drop_expired_partitions() detaches and
+  drops whole months (no DELETE, no VACUUM)
+- New months: chat_partition_service.ensure_partitions() (daily task)
 """
 
 from sqlalchemy import Column, String, Integer, DateTime, Text, Index, Enum, ForeignKey
@@ -321,7 +342,7 @@ class ChatMessage(Base):
 
     __tablename__ = "chat_messages"
 
-    # Primary key
+    # Primary key (id, created_at) - partition key must be part of the PK
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
 
     # Foreign keys
@@ -359,8 +380,8 @@ class ChatMessage(Base):
     error = Column(Text, nullable=True)
     error_code = Column(String(50), nullable=True)
 
-    # Timestamps
-    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    # Timestamps (partition key)
+    created_at = Column(DateTime, primary_key=True, nullable=False, default=datetime.utcnow, index=True)
 
     # Relationships
     session = relationship("ChatSession", back_populates="messages")
@@ -375,6 +396,7 @@ class ChatMessage(Base):
             "feedback",
             postgresql_where=(Column("feedback").isnot(None))
         ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
 
     def __repr__(self):
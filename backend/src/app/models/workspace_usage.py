@@ -0,0 +1,93 @@
+"""
+WorkspaceUsage model - Compact daily usage counters per workspace and bot.
+
+WHY:
+- Token counts were only stored per ChatMessage (quota/billing = table scan)
+- Ingestion usage (embedding tokens, crawled pages) was not recorded at all
+- Billing needs durable, compact totals
+
+HOW:
+- One row per (workspace, bot, day, metric)
+- Workspace-level work (ingestion) uses bot_id = NIL_UUID
+- Written by usage_metering_service.flush() from Redis counters
+  (INSERT ... ON CONFLICT DO UPDATE SET value = value + excluded.value)
+- UsageFlushLog records each applied Redis snapshot id in the same
+  transaction, so a snapshot re-flushed after a crash is skipped
+
+PSEUDOCODE:
+-----------
+class WorkspaceUsage(Base):
+    __tablename__ = "workspace_usage"
+
+    workspace_id: UUID
+    bot_id: UUID (NIL_UUID for workspace-level usage)
+    period_start: date (UTC day)
+    metric: str ("messages" | "prompt_tokens" | "completion_tokens" |
+                 "embedding_tokens" | "crawl_pages")
+    value: bigint
+
+    UNIQUE (workspace_id, bot_id, period_start, metric)
+
+class UsageFlushLog(Base):
+    __tablename__ = "usage_flush_log"
+
+    snapshot_id: str (unique, "usage:flushing:{day}:{uuid}")
+
+EXAMPLE QUERY:
+--------------
+# Tokens used by a workspace this month (<= 31 rows per metric)
+db.query(func.sum(WorkspaceUsage.value)).filter(
+    WorkspaceUsage.workspace_id == workspace_id,
+    WorkspaceUsage.metric.in_(["prompt_tokens", "completion_tokens"]),
+    WorkspaceUsage.period_start >= month_start
+).scalar()
+"""
+
+import uuid
+
+from sqlalchemy import Column, String, BigInteger, Date, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.base_class import Base
+
+
+# bot_id for usage not attributable to a single bot (e.g. KB ingestion)
+NIL_UUID = uuid.UUID(int=0)
+
+
+class WorkspaceUsage(Base):
+    """Daily usage counter per workspace/bot/metric."""
+
+    __tablename__ = "workspace_usage"
+
+    workspace_id = Column(UUID(as_uuid=True), nullable=False)
+    bot_id = Column(UUID(as_uuid=True), nullable=False, default=NIL_UUID)
+    period_start = Column(Date, nullable=False)
+    metric = Column(String(50), nullable=False)
+    value = Column(BigInteger, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "workspace_id", "bot_id", "period_start", "metric",
+            name="uq_workspace_usage_period_metric"
+        ),
+        Index("ix_workspace_usage_workspace_period", "workspace_id", "period_start"),
+    )
+
+    def __repr__(self):
+        return f"<WorkspaceUsage {self.workspace_id} {self.metric}={self.value} ({self.period_start})>"
+
+
+class UsageFlushLog(Base):
+    """Redis usage snapshot already applied to workspace_usage."""
+
+    __tablename__ = "usage_flush_log"
+
+    snapshot_id = Column(String(100), nullable=False, unique=True)
+
+    __table_args__ = (
+        Index("ix_usage_flush_log_created_at", "created_at"),
+    )
+
+    def __repr__(self):
+        return f"<UsageFlushLog {self.snapshot_id}>"
@@ -0,0 +1,388 @@
+"""
+Bot Analytics Service - Incrementally maintained chatbot/chatflow rollups.
+
+WHY:
+- /chatbots/{id}/analytics and /chatflows/{id}/analytics returned zeros
+- Aggregating raw sessions/messages per dashboard load is a full scan
+- Counters only ever grow - they can be maintained as messages are written
+
+HOW:
+- Every saved message increments its hour and day rollup rows
+  (INSERT ... ON CONFLICT DO UPDATE SET col = col + excluded.col),
+  in the same transaction as the message itself
+- Feedback submissions adjust the feedback counters
+- Read path sums at most `days` daily rows
+- rebuild() recomputes a window from raw messages (backfill/repair job)
+
+PSEUDOCODE follows the existing codebase patterns.
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.bot_analytics_rollup import (
+    BotAnalyticsRollup,
+    COUNTER_COLUMNS,
+    RESPONSE_TIME_BUCKETS_MS,
+    RESPONSE_TIME_COLUMNS
+)
+
+
+GRANULARITIES = ("hour", "day")
+
+
+def truncate(moment: datetime, granularity: str) -> datetime:
+    """Start of the hour/day containing moment."""
+    if granularity == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def response_time_column(latency_ms: int) -> str:
+    """Histogram column for a response time."""
+    for bound, column in zip(RESPONSE_TIME_BUCKETS_MS, RESPONSE_TIME_COLUMNS):
+        if latency_ms <= bound:
+            return column
+    return RESPONSE_TIME_COLUMNS[-1]
+
+
+def histogram_percentile(histogram: dict, quantile: float) -> Optional[int]:
+    """
+    Estimate a percentile from the bucket histogram.
+
+    RETURNS:
+        Upper bound (ms) of the bucket containing the quantile
+        (overflow bucket reports the largest bound), None if empty
+    """
+    total = sum(histogram.values())
+    if not total:
+        return None
+
+    cumulative = 0
+    for bound, column in zip(RESPONSE_TIME_BUCKETS_MS, RESPONSE_TIME_COLUMNS):
+        cumulative += histogram.get(column, 0)
+        if cumulative >= quantile * total:
+            return bound
+    return RESPONSE_TIME_BUCKETS_MS[-1]
+
+
+class BotAnalyticsService:
+    """
+    Chatbot/chatflow analytics rollups.
+
+    WHY: Dashboard reads in O(days) rows instead of O(messages)
+    HOW: Atomic counter upserts on write, sums on read
+    """
+
+    def increment(
+        self,
+        db: Session,
+        bot_type: str,
+        bot_id: UUID,
+        workspace_id: UUID,
+        at: datetime,
+        deltas: dict
+    ):
+        """
+        Add deltas to the hour and day rollups containing `at`.
+
+        WHY: Concurrent writers must not lose increments
+        HOW: Single INSERT ... ON CONFLICT DO UPDATE for both rows;
+             caller commits (same transaction as the message)
+
+        ARGS:
+            deltas: {"messages": 1, "total_tokens": 150, ...}
+        """
+
+        deltas = {column: value for column, value in deltas.items() if value}
+        if not deltas:
+            return
+
+        table = BotAnalyticsRollup.__table__
+
+        rows = [
+            {
+                "bot_type": bot_type,
+                "bot_id": bot_id,
+                "workspace_id": workspace_id,
+                "granularity": granularity,
+                "bucket_start": truncate(at, granularity),
+                **deltas
+            }
+            for granularity in GRANULARITIES
+        ]
+
+        stmt = insert(table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_bot_analytics_rollups_bucket",
+            set_={
+                **{column: table.c[column] + stmt.excluded[column] for column in deltas},
+                "updated_at": datetime.utcnow()
+            }
+        )
+
+        db.execute(stmt)
+
+
+    def record_message(self, db: Session, session, message, new_conversation: bool):
+        """
+        Count a newly saved message.
+
+        WHY: Called from session_service.save_message (every write path)
+
+        ARGS:
+            session: ChatSession the message belongs to
+            message: ChatMessage (not yet committed)
+            new_conversation: True for the session's first message
+        """
+
+        role = message.role.value if hasattr(message.role, "value") else message.role
+        metadata = message.response_metadata or {}
+
+        deltas = {
+            "conversations": 1 if new_conversation else 0,
+            "messages": 1,
+            "user_messages": 1 if role == "user" else 0,
+            "assistant_messages": 1 if role == "assistant" else 0,
+            "prompt_tokens": message.prompt_tokens or 0,
+            "completion_tokens": message.completion_tokens or 0,
+            "total_tokens": message.total_tokens or 0,
+            "errors": 1 if message.error else 0
+        }
+
+        # Chatbots record latency_ms, chatflows execution_time_ms
+        latency_ms = metadata.get("latency_ms", metadata.get("execution_time_ms"))
+        if role == "assistant" and latency_ms is not None:
+            latency_ms = int(latency_ms)
+            deltas["response_time_count"] = 1
+            deltas["response_time_sum_ms"] = latency_ms
+            deltas[response_time_column(latency_ms)] = 1
+
+        bot_type = session.bot_type.value if hasattr(session.bot_type, "value") else session.bot_type
+
+        self.increment(
+            db=db,
+            bot_type=bot_type,
+            bot_id=session.bot_id,
+            workspace_id=session.workspace_id,
+            at=message.created_at or datetime.utcnow(),
+            deltas=deltas
+        )
+
+
+    def record_feedback(
+        self,
+        db: Session,
+        session,
+        message,
+        rating: str,
+        previous_rating: Optional[str] = None
+    ):
+        """
+        Count a feedback rating (replacing a previous one if resubmitted).
+
+        HOW: Attributed to the bucket of the rated message
+        """
+
+        deltas = {"feedback_positive": 0, "feedback_negative": 0}
+
+        if previous_rating in ("positive", "negative"):
+            deltas[f"feedback_{previous_rating}"] -= 1
+        if rating in ("positive", "negative"):
+            deltas[f"feedback_{rating}"] += 1
+
+        bot_type = session.bot_type.value if hasattr(session.bot_type, "value") else session.bot_type
+
+        self.increment(
+            db=db,
+            bot_type=bot_type,
+            bot_id=session.bot_id,
+            workspace_id=session.workspace_id,
+            at=message.created_at,
+            deltas=deltas
+        )
+
+
+    def get_summary(
+        self,
+        db: Session,
+        bot_type: str,
+        bot_id: UUID,
+        days: int = 7,
+        now: Optional[datetime] = None
+    ) -> dict:
+        """
+        Analytics summary for the last `days` days.
+
+        WHY: Backs the analytics endpoints
+        HOW: Sum at most `days` daily rollup rows
+
+        RETURNS:
+            {
+                "total_conversations": 1234,
+                "total_messages": 5678,
+                "avg_conversation_length": 4.6,
+                "avg_response_time_ms": 850,
+                "p50_response_time_ms": 500,
+                "p95_response_time_ms": 2000,
+                "user_satisfaction": 0.92,   # positive / rated (None if unrated)
+                "total_tokens": 120000,
+                "error_rate": 0.01,
+                "daily": [{"date": "2025-01-01", "conversations": 10, ...}]
+            }
+        """
+
+        since = truncate(now or datetime.utcnow(), "day") - timedelta(days=max(days, 1) - 1)
+
+        rows = db.query(BotAnalyticsRollup).filter(
+            BotAnalyticsRollup.bot_type == bot_type,
+            BotAnalyticsRollup.bot_id == bot_id,
+            BotAnalyticsRollup.granularity == "day",
+            BotAnalyticsRollup.bucket_start >= since
+        ).order_by(BotAnalyticsRollup.bucket_start).all()
+
+        return self.summarize(rows)
+
+
+    def summarize(self, rows: list) -> dict:
+        """Fold rollup rows into the summary shape (see get_summary)."""
+
+        totals = {column: 0 for column in COUNTER_COLUMNS}
+        daily = []
+
+        for row in rows:
+            for column in COUNTER_COLUMNS:
+                totals[column] += getattr(row, column) or 0
+
+            daily.append({
+                "date": row.bucket_start.date().isoformat(),
+                "conversations": row.conversations,
+                "messages": row.messages,
+                "total_tokens": row.total_tokens,
+                "errors": row.errors
+            })
+
+        rated = totals["feedback_positive"] + totals["feedback_negative"]
+        histogram = {column: totals[column] for column in RESPONSE_TIME_COLUMNS}
+
+        return {
+            "total_conversations": totals["conversations"],
+            "total_messages": totals["messages"],
+            "avg_conversation_length": (
+                round(totals["messages"] / totals["conversations"], 2)
+                if totals["conversations"] else 0
+            ),
+            "avg_response_time_ms": (
+                round(totals["response_time_sum_ms"] / totals["response_time_count"])
+                if totals["response_time_count"] else 0
+            ),
+            "p50_response_time_ms": histogram_percentile(histogram, 0.5),
+            "p95_response_time_ms": histogram_percentile(histogram, 0.95),
+            "user_satisfaction": round(totals["feedback_positive"] / rated, 4) if rated else None,
+            "feedback_positive": totals["feedback_positive"],
+            "feedback_negative": totals["feedback_negative"],
+            "prompt_tokens": totals["prompt_tokens"],
+            "completion_tokens": totals["completion_tokens"],
+            "total_tokens": totals["total_tokens"],
+            "errors": totals["errors"],
+            "error_rate": round(totals["errors"] / totals["messages"], 4) if totals["messages"] else 0,
+            "response_time_histogram": {
+                column.replace("rt_", ""): totals[column] for column in RESPONSE_TIME_COLUMNS
+            },
+            "daily": daily
+        }
+
+
+    def rebuild(self, db: Session, bot_type: str, bot_id: UUID, since: datetime) -> int:
+        """
+        Recompute rollups from raw messages (backfill or repair).
+
+        WHY: Rollups added after data exists, or counters drifted
+        HOW: Delete buckets >= since, re-insert GROUP BY date_trunc
+             (conversation = session whose first message is in the bucket)
+
+        RETURNS:
+            Number of rollup rows written
+        """
+
+        since = truncate(since, "day")
+
+        db.query(BotAnalyticsRollup).filter(
+            BotAnalyticsRollup.bot_type == bot_type,
+            BotAnalyticsRollup.bot_id == bot_id,
+            BotAnalyticsRollup.bucket_start >= since
+        ).delete(synchronize_session=False)
+
+        latency = (
+            "COALESCE((m.response_metadata->>'latency_ms')::numeric, "
+            "(m.response_metadata->>'execution_time_ms')::numeric)"
+        )
+        is_timed = f"(m.role = 'ASSISTANT' AND {latency} IS NOT NULL)"
+
+        histogram = []
+        lower = None
+        for bound, column in zip(RESPONSE_TIME_BUCKETS_MS, RESPONSE_TIME_COLUMNS):
+            condition = f"{latency} <= {bound}" + (f" AND {latency} > {lower}" if lower else "")
+            histogram.append(f"COUNT(*) FILTER (WHERE {is_timed} AND {condition})")
+            lower = bound
+        histogram.append(f"COUNT(*) FILTER (WHERE {is_timed} AND {latency} > {lower})")
+
+        written = 0
+        for granularity in GRANULARITIES:
+            result = db.execute(
+                text(f"""
+                    INSERT INTO bot_analytics_rollups (
+                        id, created_at, updated_at,
+                        bot_type, bot_id, workspace_id, granularity, bucket_start,
+                        {", ".join(COUNTER_COLUMNS)}
+                    )
+                    SELECT
+                        gen_random_uuid(), now(), now(),
+                        :bot_type, :bot_id, (array_agg(s.workspace_id))[1], :granularity,
+                        date_trunc(:granularity, m.created_at) AS bucket,
+                        COUNT(*) FILTER (WHERE m.created_at = first.first_at),
+                        COUNT(*),
+                        COUNT(*) FILTER (WHERE m.role = 'USER'),
+                        COUNT(*) FILTER (WHERE m.role = 'ASSISTANT'),
+                        COALESCE(SUM(m.prompt_tokens), 0),
+                        COALESCE(SUM(m.completion_tokens), 0),
+                        COALESCE(SUM(m.total_tokens), 0),
+                        COUNT(*) FILTER (WHERE m.error IS NOT NULL),
+                        COUNT(*) FILTER (WHERE m.feedback->>'rating' = 'positive'),
+                        COUNT(*) FILTER (WHERE m.feedback->>'rating' = 'negative'),
+                        COUNT(*) FILTER (WHERE {is_timed}),
+                        COALESCE(SUM({latency}) FILTER (WHERE {is_timed}), 0),
+                        {", ".join(histogram)}
+                    FROM chat_messages m
+                    JOIN chat_sessions s ON s.id = m.session_id
+                    JOIN (
+                        SELECT session_id, min(created_at) AS first_at
+                        FROM chat_messages
+                        GROUP BY session_id
+                    ) first ON first.session_id = m.session_id
+                    WHERE s.bot_type::text = :bot_type_enum
+                      AND s.bot_id = :bot_id
+                      AND m.created_at >= :since
+                    GROUP BY bucket
+                """),
+                {
+                    "bot_type": bot_type,
+                    "bot_type_enum": bot_type.upper(),
+                    "bot_id": bot_id,
+                    "granularity": granularity,
+                    "since": since
+                }
+            )
+            written += result.rowcount or 0
+
+        db.commit()
+        return written
+
+
+# Global instance
+bot_analytics_service = BotAnalyticsService()
@@ -0,0 +1,267 @@
+"""
+Bot Registry - Cached polymorphic bot lookup for hot request paths.
+
+WHY:
+- Every webhook queried Chatbot, fell back to Chatflow, then read
+  deployment_config just to check the channel is enabled
+- Public chat repeated a similar lookup per message
+- Bot configuration changes rarely compared to message volume
+
+HOW:
+- bot_id -> BotEntry(type, workspace_id, config, deployment_config, version)
+- Tier 1: in-process dict with short TTL (no I/O)
+- Tier 2: Redis JSON (shared across API workers)
+- Tier 3: Database (Chatbot, then Chatflow)
+- Populated on deploy (UnifiedDraftService.deploy_draft)
+- Invalidated on update/delete (Redis key deleted; other processes
+  drop their local copy when its TTL expires)
+- Unknown IDs are negatively cached briefly (junk webhook traffic)
+
+PSEUDOCODE follows the existing codebase patterns.
+"""
+
+import json
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+
+@dataclass
+class BotEntry:
+    """Cached bot metadata (no ORM state)."""
+
+    bot_id: str
+    bot_type: str  # "chatbot" | "chatflow"
+    workspace_id: str
+    config: dict = field(default_factory=dict)
+    deployment_config: dict = field(default_factory=dict)
+    version: int = 1
+
+    def channel_enabled(self, channel: str) -> bool:
+        """Check deployment_config["channels"] for a channel."""
+        return channel in self.deployment_config.get("channels", [])
+
+    def channel_config(self, channel: str) -> dict:
+        """Per-channel settings from deployment_config."""
+        return self.deployment_config.get(channel, {})
+
+
+class BotRegistry:
+    """
+    Two-tier bot metadata cache.
+
+    WHY: Webhook acknowledgement and API key checks without bot queries
+    HOW: Local TTL dict -> Redis -> database
+    """
+
+    _MISSING = object()
+
+    def __init__(self, redis_client=None):
+        """
+        Initialize registry.
+
+        ARGS:
+            redis_client: Optional Redis client (defaults to app.utils.redis)
+        """
+        self.local_ttl = getattr(settings, "BOT_REGISTRY_LOCAL_TTL_SECONDS", 15)
+        self.redis_ttl = getattr(settings, "BOT_REGISTRY_REDIS_TTL_SECONDS", 3600)
+        self.negative_ttl = getattr(settings, "BOT_REGISTRY_NEGATIVE_TTL_SECONDS", 10)
+        self.max_local_entries = getattr(settings, "BOT_REGISTRY_MAX_LOCAL_ENTRIES", 10000)
+
+        self._redis = redis_client
+        self._local: dict[str, tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        self._stats = {"local_hits": 0, "redis_hits": 0, "db_loads": 0, "invalidations": 0}
+
+
+    @property
+    def redis(self):
+        """Lazily resolve Redis client."""
+        if self._redis is None:
+            from app.utils.redis import redis_client
+            self._redis = redis_client
+        return self._redis
+
+
+    def _key(self, bot_id: str) -> str:
+        return f"bot_registry:{bot_id}"
+
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def get(self, db: Session, bot_id: UUID) -> Optional[BotEntry]:
+        """
+        Resolve bot metadata.
+
+        RETURNS:
+            BotEntry, or None when no (non-deleted) bot has this ID
+        """
+
+        bot_id = str(bot_id)
+
+        cached = self._get_local(bot_id)
+        if cached is not self._MISSING:
+            self._stats["local_hits"] += 1
+            return cached
+
+        entry = self._get_redis(bot_id)
+        if entry is not None:
+            self._stats["redis_hits"] += 1
+            self._set_local(bot_id, entry, self.local_ttl)
+            return entry
+
+        self._stats["db_loads"] += 1
+        _, bot = self._load_bot(db, bot_id)
+
+        if bot is None:
+            self._set_local(bot_id, None, self.negative_ttl)
+            return None
+
+        return self.register(bot)
+
+
+    def get_model(self, db: Session, bot_id: UUID) -> Tuple[str, Any]:
+        """
+        Load the ORM bot using the cached type (one query, no fallback).
+
+        WHY: Services like chatbot_service need the model instance
+
+        RAISES:
+            ValueError: Bot not found
+        """
+
+        entry = self.get(db, bot_id)
+        if entry is None:
+            raise ValueError("Bot not found")
+
+        if entry.bot_type == "chatbot":
+            from app.models.chatbot import Chatbot as model
+        else:
+            from app.models.chatflow import Chatflow as model
+
+        bot = db.query(model).get(UUID(entry.bot_id))
+        if bot is None:
+            # Deleted since it was cached
+            self.invalidate(entry.bot_id)
+            raise ValueError("Bot not found")
+
+        return entry.bot_type, bot
+
+
+    def _load_bot(self, db: Session, bot_id: str) -> Tuple[Optional[str], Any]:
+        """Polymorphic database lookup (chatbot first)."""
+
+        from app.models.chatbot import Chatbot
+        from app.models.chatflow import Chatflow
+
+        for bot_type, model in (("chatbot", Chatbot), ("chatflow", Chatflow)):
+            bot = db.query(model).get(UUID(bot_id))
+            if bot is not None and not getattr(bot, "is_deleted", False):
+                return bot_type, bot
+
+        return None, None
+
+
+    # ------------------------------------------------------------------
+    # Population / invalidation
+    # ------------------------------------------------------------------
+
+    def register(self, bot: Any, bot_type: Optional[str] = None) -> BotEntry:
+        """
+        Cache a bot model instance (deploy, or after a database load).
+
+        ARGS:
+            bot: Chatbot or Chatflow instance
+            bot_type: "chatbot" | "chatflow" (derived from class if omitted)
+        """
+
+        config = bot.config or {}
+
+        entry = BotEntry(
+            bot_id=str(bot.id),
+            bot_type=bot_type or type(bot).__name__.lower(),
+            workspace_id=str(bot.workspace_id),
+            config=config,
+            deployment_config=getattr(bot, "deployment_config", None) or config.get("deployment", {}),
+            version=getattr(bot, "version", None) or 1
+        )
+
+        try:
+            self.redis.set(self._key(entry.bot_id), json.dumps(asdict(entry), default=str), ex=self.redis_ttl)
+        except Exception as e:
+            print(f"Bot registry Redis write failed: {e}")
+
+        self._set_local(entry.bot_id, entry, self.local_ttl)
+
+        return entry
+
+
+    def invalidate(self, bot_id: UUID):
+        """
+        Drop a bot from both tiers.
+
+        WHY: Config updated or bot deleted
+        NOTE: Other processes serve their local copy for at most local_ttl
+        """
+
+        bot_id = str(bot_id)
+
+        with self._lock:
+            self._local.pop(bot_id, None)
+
+        try:
+            self.redis.delete(self._key(bot_id))
+        except Exception as e:
+            print(f"Bot registry Redis invalidation failed: {e}")
+
+        self._stats["invalidations"] += 1
+
+
+    # ------------------------------------------------------------------
+    # Tiers
+    # ------------------------------------------------------------------
+
+    def _get_local(self, bot_id: str) -> Any:
+        with self._lock:
+            cached = self._local.get(bot_id)
+            if cached is None:
+                return self._MISSING
+            expires_at, entry = cached
+            if expires_at <= time.monotonic():
+                del self._local[bot_id]
+                return self._MISSING
+            return entry
+
+
+    def _set_local(self, bot_id: str, entry: Optional[BotEntry], ttl: float):
+        with self._lock:
+            if len(self._local) >= self.max_local_entries:
+                # Drop the oldest insertion (dicts keep insertion order)
+                self._local.pop(next(iter(self._local)))
+            self._local[bot_id] = (time.monotonic() + ttl, entry)
+
+
+    def _get_redis(self, bot_id: str) -> Optional[BotEntry]:
+        try:
+            raw = self.redis.get(self._key(bot_id))
+        except Exception:
+            return None
+
+        return BotEntry(**json.loads(raw)) if raw else None
+
+
+    def get_stats(self) -> dict:
+        """Cache counters for monitoring."""
+        return {**self._stats, "local_entries": len(self._local)}
+
+
+# Global instance
+bot_registry = BotRegistry()
@@ -0,0 +1,337 @@
+"""
+Channel Dispatcher - Ordered, durable background processing for channel webhooks.
+
+WHY:
+- Telegram/WhatsApp/Discord webhooks ran the whole bot turn inside the
+  HTTP request; slow LLM calls caused platform timeouts and retries
+- Discord requires an interaction response within 3 seconds
+- Messages within one chat must still be answered in order
+- An acknowledged update is never redelivered, so a job held only in
+  process memory was lost on restart or crash
+
+HOW:
+- Webhook validates the update, submits a job, returns immediately
+- Jobs are JSON records {"kind", "payload"}; webhook routes register one
+  handler per kind at import (no closures, so jobs survive the process)
+- One Redis list per (bot_id, chat_id) partition:
+  "channel:queue:{bot_id}:{chat_id}" (RPUSH on submit)
+- One worker per partition holds the partition lease and drains the list
+  in order: peek the head, run it, then LPOP - a crash mid-job leaves the
+  job at the head to be replayed (at-least-once)
+- The lease keeps a chat ordered across API workers; partitions run
+  concurrently (bounded by a global semaphore)
+- recover() (startup, then every CHANNEL_RECOVERY_INTERVAL_SECONDS)
+  restarts partitions whose worker died with jobs still queued
+- Each job gets its own DB session (the request session is closed by then)
+- Redis unavailable -> submit() returns False (update not acknowledged,
+  the platform redelivers it)
+
+PSEUDOCODE follows the existing codebase patterns.
+"""
+
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Optional
+from uuid import uuid4
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+
+# Handler signature: async def handler(db: Session, payload: dict) -> None
+ChannelHandler = Callable[[Session, dict], Awaitable[Any]]
+
+PARTITIONS_KEY = "channel:partitions"
+
+
+class ChannelDispatcher:
+    """
+    Per-chat ordered, cross-chat concurrent job runner.
+
+    WHY: Fast webhook acknowledgement without reordering or losing replies
+    HOW: Redis list per chat, leased on-demand workers
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        max_pending_per_chat: Optional[int] = None,
+        job_timeout: Optional[float] = None,
+        session_factory: Optional[Callable[[], Session]] = None,
+        redis_client=None
+    ):
+        """
+        Initialize dispatcher.
+
+        ARGS:
+            max_concurrency: Chats processed at the same time
+            max_pending_per_chat: Queued jobs per chat before rejecting
+            job_timeout: Seconds a single job may run
+            session_factory: DB session factory (defaults to SessionLocal)
+            redis_client: Optional Redis client (defaults to app.utils.redis)
+        """
+        self.max_concurrency = max_concurrency or getattr(settings, "CHANNEL_MAX_CONCURRENCY", 32)
+        self.max_pending_per_chat = max_pending_per_chat or getattr(settings, "CHANNEL_MAX_PENDING_PER_CHAT", 20)
+        self.job_timeout = job_timeout or getattr(settings, "CHANNEL_JOB_TIMEOUT_SECONDS", 120.0)
+        self.recovery_interval = getattr(settings, "CHANNEL_RECOVERY_INTERVAL_SECONDS", 30.0)
+        # A lease outlives the longest job, so only a dead worker loses it
+        self.lease_ms = int(self.job_timeout * 2 * 1000)
+        self._session_factory = session_factory
+        self._redis = redis_client
+
+        self._handlers: dict[str, ChannelHandler] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._workers: dict[str, asyncio.Task] = {}
+        self._recovery_task: Optional[asyncio.Task] = None
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "recovered": 0,
+            "redis_errors": 0
+        }
+
+
+    @property
+    def redis(self):
+        """Lazily resolve Redis client."""
+        if self._redis is None:
+            from app.utils.redis import redis_client
+            self._redis = redis_client
+        return self._redis
+
+
+    def register(self, kind: str, handler: ChannelHandler):
+        """
+        Register the handler for a job kind.
+
+        WHY: Queued jobs are data; the handler is looked up when they run
+             (including jobs replayed after a restart)
+        """
+        self._handlers[kind] = handler
+
+
+    def _bind_loop(self):
+        """
+        Bind worker state to the running event loop.
+
+        WHY: asyncio primitives belong to one loop (tests start new loops)
+        """
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._workers = {}
+            self._recovery_task = None
+
+
+    def submit(self, bot_id: Any, chat_id: Any, kind: str, payload: dict) -> bool:
+        """
+        Queue a job for a chat.
+
+        WHY: Called from webhook handlers; never awaits the job
+        HOW: RPUSH onto the partition list, start a worker if none is running
+
+        ARGS:
+            bot_id: Chatbot/chatflow ID
+            chat_id: Platform chat identifier (chat, number, channel)
+            kind: Registered handler name ("telegram", "whatsapp", ...)
+            payload: JSON-serializable job arguments
+
+        RETURNS:
+            False when the chat's queue is full or Redis is unavailable
+            (caller should not acknowledge the update)
+        """
+
+        self._bind_loop()
+
+        partition = f"{bot_id}:{chat_id}"
+        queue_key = f"channel:queue:{partition}"
+        record = json.dumps({"kind": kind, "payload": payload}, default=str)
+
+        try:
+            if self.redis.llen(queue_key) >= self.max_pending_per_chat:
+                self._stats["rejected"] += 1
+                return False
+
+            self.redis.rpush(queue_key, record)
+            self.redis.sadd(PARTITIONS_KEY, partition)
+        except Exception as e:
+            self._stats["redis_errors"] += 1
+            print(f"Channel job not queued: {type(e).__name__}: {e}")
+            return False
+
+        self._stats["submitted"] += 1
+        self._start_worker(partition)
+
+        return True
+
+
+    def _start_worker(self, partition: str):
+        if partition not in self._workers:
+            self._workers[partition] = asyncio.create_task(self._drain_partition(partition))
+
+
+    async def _drain_partition(self, partition: str):
+        """
+        Run a partition's jobs one at a time until its list is empty.
+
+        HOW: Exits at once when another worker holds the lease. After
+             releasing the lease the list is checked again - a job pushed
+             meanwhile had its own worker turned away by our lease.
+
+        NOTE: The final empty check and the cleanup run without an await
+        in between, so submit() can never rely on an exiting worker.
+        """
+
+        queue_key = f"channel:queue:{partition}"
+        lease_key = f"channel:lease:{partition}"
+        token = uuid4().hex
+
+        try:
+            while self.redis.set(lease_key, token, nx=True, px=self.lease_ms):
+                try:
+                    while True:
+                        record = self.redis.lindex(queue_key, 0)
+                        if record is None:
+                            break
+
+                        async with self._semaphore:
+                            await self._run(record)
+
+                        # Removed only once handled (at-least-once)
+                        self.redis.lpop(queue_key)
+                        self.redis.pexpire(lease_key, self.lease_ms)
+                finally:
+                    self._release(lease_key, token)
+
+                if not self.redis.llen(queue_key):
+                    break
+        except Exception as e:
+            # Jobs stay queued; recover() picks the partition up again
+            self._stats["redis_errors"] += 1
+            print(f"Channel partition {partition} stalled: {type(e).__name__}: {e}")
+        finally:
+            self._workers.pop(partition, None)
+
+
+    def _release(self, lease_key: str, token: str):
+        """Release the lease only if we still own it (it may have expired)."""
+        owner = self.redis.get(lease_key)
+        if owner is not None and (owner.decode() if isinstance(owner, bytes) else owner) == token:
+            self.redis.delete(lease_key)
+
+
+    async def _run(self, record: Any):
+        """Run one job with its own DB session and a timeout."""
+
+        if self._session_factory is None:
+            from app.db.session import SessionLocal
+            self._session_factory = SessionLocal
+
+        db = self._session_factory()
+
+        try:
+            job = json.loads(record)
+            handler = self._handlers.get(job.get("kind"))
+            if handler is None:
+                raise LookupError(f"No channel handler for '{job.get('kind')}'")
+
+            await asyncio.wait_for(handler(db, job["payload"]), timeout=self.job_timeout)
+            self._stats["completed"] += 1
+        except Exception as e:
+            # Failures stay inside the chat's job; later messages still run
+            self._stats["failed"] += 1
+            print(f"Channel job failed: {type(e).__name__}: {e}")
+        finally:
+            db.close()
+
+
+    def recover(self) -> int:
+        """
+        Start workers for partitions with queued jobs and no live worker.
+
+        WHY: Jobs acknowledged by a process that died (or whose worker hit
+             a Redis error) would otherwise wait for the chat's next message
+
+        RETURNS:
+            Number of partitions restarted
+        """
+
+        self._bind_loop()
+        started = 0
+
+        try:
+            for partition in self.redis.smembers(PARTITIONS_KEY):
+                if isinstance(partition, bytes):
+                    partition = partition.decode()
+                if partition in self._workers:
+                    continue
+
+                if not self.redis.llen(f"channel:queue:{partition}"):
+                    self.redis.srem(PARTITIONS_KEY, partition)
+                    continue
+
+                # A live lease means another worker is draining it
+                if self.redis.exists(f"channel:lease:{partition}"):
+                    continue
+
+                self._start_worker(partition)
+                started += 1
+        except Exception as e:
+            self._stats["redis_errors"] += 1
+            print(f"Channel recovery failed: {type(e).__name__}: {e}")
+
+        self._stats["recovered"] += started
+        return started
+
+
+    def start(self):
+        """
+        Recover queued jobs now and periodically.
+
+        WHY: Called from the app lifespan once handlers are registered
+        """
+
+        self._bind_loop()
+        if self._recovery_task is None:
+            self._recovery_task = asyncio.create_task(self._recovery_loop())
+
+
+    async def _recovery_loop(self):
+        while True:
+            self.recover()
+            await asyncio.sleep(self.recovery_interval)
+
+
+    async def drain(self, timeout: float = 30.0):
+        """
+        Wait for running workers to finish.
+
+        WHY: Graceful shutdown (and deterministic tests); jobs still queued
+             afterwards stay in Redis for the next start
+        """
+
+        if self._recovery_task is not None:
+            self._recovery_task.cancel()
+            self._recovery_task = None
+
+        workers = list(self._workers.values())
+        if workers:
+            await asyncio.wait(workers, timeout=timeout)
+
+
+    def get_stats(self) -> dict:
+        """Dispatcher counters for monitoring."""
+
+        return {
+            **self._stats,
+            "active_chats": len(self._workers)
+        }
+
+
+# Global instance
+channel_dispatcher = ChannelDispatcher()
@@ -0,0 +1,242 @@
+"""
+Chat Partition Service - Monthly range partitions for chat_messages.
+
+WHY:
+- chat_messages grows without bound (every turn writes two rows)
+- Row-by-row retention deletes bloat the table and its (session, workspace,
+  role) x created_at indexes and need VACUUM to reclaim space
+- Recent-history queries should only touch the hot partition(s)
+
+HOW:
+- chat_messages is PARTITION BY RANGE (created_at), one partition per month
+  named chat_messages_pYYYYMM, plus chat_messages_default as a safety net
+- ensure_partitions(): create current + upcoming months ahead of time
+- drop_expired_partitions(): DETACH + DROP whole months past retention
+  (O(1) metadata operation instead of millions of row deletes)
+- Scheduled daily via maintenance_tasks.maintain_chat_partitions (celery
+  beat, see tasks/celery_worker.py); ensure_partitions() also runs at API
+  startup
+
+PSEUDOCODE follows the existing codebase patterns.
+"""
+
+import re
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+
+PARENT_TABLE = "chat_messages"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+_PARTITION_PATTERN = re.compile(rf"^{PARENT_TABLE}_p(\d{{4}})(\d{{2}})$")
+
+
+def month_start(value: date) -> date:
+    """First day of the month containing value."""
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    """First day of the month `months` after value's month."""
+    index = value.year * 12 + (value.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """chat_messages_pYYYYMM for the month containing `month`."""
+    return f"{PARENT_TABLE}_p{month.year:04d}{month.month:02d}"
+
+
+def partition_ddl(month: date) -> str:
+    """CREATE TABLE ... PARTITION OF statement for one month."""
+    start = month_start(month)
+    end = add_months(start, 1)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(start)} "
+        f"PARTITION OF {PARENT_TABLE} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+
+class ChatPartitionService:
+    """
+    Monthly partition management for chat_messages.
+
+    WHY: O(1) retention and partition-pruned recent-history queries
+    HOW: Pre-create upcoming partitions, detach and drop expired ones
+    """
+
+    def __init__(self):
+        """
+        Initialize partition service.
+
+        WHY: Tunable retention without code changes
+        HOW: Read optional settings with defaults
+        """
+        self.retention_days = getattr(settings, "CHAT_MESSAGE_RETENTION_DAYS", 365)
+        self.months_ahead = getattr(settings, "CHAT_PARTITION_MONTHS_AHEAD", 2)
+
+
+    def is_partitioned(self, db: Session) -> bool:
+        """
+        Check whether chat_messages is a partitioned table.
+
+        WHY: Deployments migrate at different times - fall back gracefully
+        """
+        return bool(db.execute(
+            text(
+                "SELECT 1 FROM pg_partitioned_table pt "
+                "JOIN pg_class c ON c.oid = pt.partrelid "
+                "WHERE c.relname = :table"
+            ),
+            {"table": PARENT_TABLE}
+        ).scalar())
+
+
+    def list_partitions(self, db: Session) -> list[dict]:
+        """
+        List monthly partitions.
+
+        RETURNS:
+            [
+                {"name": "chat_messages_p202501", "start": date(2025, 1, 1), "end": date(2025, 2, 1)},
+                ...
+            ]  # Oldest first (default partition excluded)
+        """
+        partitions = []
+        for name in self._child_names(db):
+            match = _PARTITION_PATTERN.match(name)
+            if not match:
+                continue
+            start = date(int(match.group(1)), int(match.group(2)), 1)
+            partitions.append({"name": name, "start": start, "end": add_months(start, 1)})
+
+        return sorted(partitions, key=lambda partition: partition["start"])
+
+
+    def ensure_partitions(
+        self,
+        db: Session,
+        months_ahead: Optional[int] = None,
+        today: Optional[date] = None
+    ) -> list[str]:
+        """
+        Create partitions for the current month and the next months_ahead.
+
+        WHY: Inserts must never land in the default partition (attaching a
+             month later would have to scan and move those rows)
+        HOW: CREATE TABLE IF NOT EXISTS ... PARTITION OF (idempotent)
+
+        RETURNS:
+            Names of partitions that were created
+        """
+        if not self.is_partitioned(db):
+            return []
+
+        months_ahead = self.months_ahead if months_ahead is None else months_ahead
+        current = month_start(today or datetime.utcnow().date())
+        existing = {partition["name"] for partition in self.list_partitions(db)}
+
+        created = []
+        if DEFAULT_PARTITION not in self._child_names(db):
+            db.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT"))
+            created.append(DEFAULT_PARTITION)
+
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            name = partition_name(month)
+            if name in existing:
+                continue
+            db.execute(text(partition_ddl(month)))
+            created.append(name)
+
+        db.commit()
+        return created
+
+
+    def drop_expired_partitions(
+        self,
+        db: Session,
+        retention_days: Optional[int] = None,
+        today: Optional[date] = None
+    ) -> list[str]:
+        """
+        Drop monthly partitions entirely older than the retention window.
+
+        WHY: Retention without row deletes, index bloat or VACUUM
+        HOW: A partition is dropped only when its upper bound <= cutoff,
+             so no message younger than retention_days is ever removed
+
+        RETURNS:
+            Names of dropped partitions
+        """
+        if not self.is_partitioned(db):
+            return []
+
+        retention_days = self.retention_days if retention_days is None else retention_days
+        cutoff = (today or datetime.utcnow().date()) - timedelta(days=retention_days)
+
+        dropped = []
+        for partition in self.list_partitions(db):
+            if partition["end"] > cutoff:
+                break
+
+            db.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {partition['name']}"))
+            db.execute(text(f"DROP TABLE {partition['name']}"))
+            dropped.append(partition["name"])
+
+        db.commit()
+        return dropped
+
+
+    def get_stats(self, db: Session) -> dict:
+        """
+        Partition sizes for monitoring.
+
+        RETURNS:
+            {
+                "partitioned": True,
+                "partitions": [{"name": "chat_messages_p202501", "rows": 120000, "bytes": 52428800}],
+                "default_rows": 0   # Should stay 0 - otherwise ensure_partitions lags
+            }
+        """
+        if not self.is_partitioned(db):
+            return {"partitioned": False, "partitions": [], "default_rows": 0}
+
+        partitions = []
+        for partition in self.list_partitions(db):
+            row = db.execute(
+                text(
+                    "SELECT c.reltuples::bigint, pg_total_relation_size(c.oid) "
+                    "FROM pg_class c WHERE c.relname = :name"
+                ),
+                {"name": partition["name"]}
+            ).one()
+            partitions.append({"name": partition["name"], "rows": max(row[0], 0), "bytes": row[1]})
+
+        default_rows = db.execute(
+            text(f"SELECT count(*) FROM {DEFAULT_PARTITION}")
+        ).scalar() if DEFAULT_PARTITION in self._child_names(db) else 0
+
+        return {"partitioned": True, "partitions": partitions, "default_rows": default_rows}
+
+
+    def _child_names(self, db: Session) -> set[str]:
+        """All child table names of chat_messages."""
+        return set(db.execute(
+            text(
+                "SELECT child.relname FROM pg_inherits i "
+                "JOIN pg_class parent ON parent.oid = i.inhparent "
+                "JOIN pg_class child ON child.oid = i.inhrelid "
+                "WHERE parent.relname = :table"
+            ),
+            {"table": PARENT_TABLE}
+        ).scalars().all())
+
+
+# Global instance
+chat_partition_service = ChatPartitionService()
@@ -9,7 +9,8 @@ WHY:
 HOW:
 - Get chat history from session
 - Retrieve context from knowledge bases (if configured)
-- Build prompt with system prompt + context + history
+- Retrieval runs concurrently with session bookkeeping (independent stages)
+- Build prompt with system prompt + context + history (token-budgeted)
 - Single AI call via inference_service
 - Save message to history
 - Return response
@@ -17,15 +18,20 @@ HOW:
 PSEUDOCODE follows the existing codebase patterns.
 """
 
+import asyncio
+import time
 from uuid import UUID, uuid4
 from datetime import datetime
-from typing import Optional
+from typing import Awaitable, Callable, Optional
 
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+
 from app.models.chatbot import Chatbot
 from app.services.inference_service import inference_service
 from app.services.session_service import session_service
+from app.services.token_budget_service import token_budget_service
 from app.services.draft_service import DraftType
 
 
@@ -44,6 +50,11 @@ class ChatbotService:
         """
         self.inference_service = inference_service
         self.session_service = session_service
+        self.token_budget_service = token_budget_service
+
+        # Per-stage timeouts (seconds)
+        self.retrieval_timeout = getattr(settings, "CHATBOT_RETRIEVAL_TIMEOUT_SECONDS", 5.0)
+        self.kb_search_timeout = getattr(settings, "CHATBOT_KB_SEARCH_TIMEOUT_SECONDS", 3.0)
 
 
     async def process_message(
@@ -52,20 +63,25 @@ class ChatbotService:
         chatbot: Chatbot,
         user_message: str,
         session_id: str,
-        channel_context: Optional[dict] = None
+        channel_context: Optional[dict] = None,
+        on_partial: Optional[Callable[[str], Awaitable]] = None
     ) -> dict:
         """
         Process user message through chatbot.
 
-        FLOW:
-        1. Get or create session
-        2. Save user message
-        3. Retrieve context from KB (if configured)
-        4. Get chat history
-        5. Build prompt
-        6. Call AI (inference_service)
-        7. Save assistant message
-        8. Return response
+        FLOW (stage graph, independent branches run concurrently):
+
+            session -> history -> save user message --+
+                                                      +--> prompt -> inference -> save reply
+            retrieval (per-KB searches in parallel) --+
+
+        1. Start KB retrieval (own DB session, per-KB timeouts)
+        2. Meanwhile: get or create session, load history, save user message
+           (worker thread, request DB session)
+        3. Build token-budgeted prompt
+        4. Call AI (inference_service; streamed when on_partial is given)
+        5. Save assistant message (with per-stage timings)
+        6. Return response
 
         ARGS:
             db: Database session
@@ -73,6 +89,8 @@ class ChatbotService:
             user_message: User's input text
             session_id: Conversation session ID
             channel_context: Channel-specific data (e.g., Telegram user_id)
+            on_partial: Optional async callback receiving the accumulated
+                        reply text while it streams (progressive delivery)
 
         RETURNS:
             {
@@ -83,65 +101,103 @@ class ChatbotService:
             }
         """
 
-        # 1. Get or create session
-        session = self.session_service.get_or_create_session(
-            db=db,
-            bot_type="chatbot",
-            bot_id=chatbot.id,
-            session_id=session_id,
-            workspace_id=chatbot.workspace_id,
-            channel_context=channel_context
-        )
-
-        # 2. Save user message
-        user_msg = self.session_service.save_message(
-            db=db,
-            session_id=session.id,
-            role="user",
-            content=user_message
-        )
-
-        # 3. Retrieve context from knowledge bases (RAG)
-        context = ""
-        sources = []
+        turn_start = time.perf_counter()
+        timings = {}
 
+        # 1. Retrieval does not depend on the session - start it first
+        retrieval_task = None
         if chatbot.config.get("knowledge_bases"):
-            retrieval_result = await self._retrieve_context(
-                db=db,
-                chatbot=chatbot,
-                query=user_message
+            retrieval_task = asyncio.create_task(
+                self._timed_stage(
+                    "retrieval",
+                    self._retrieve_context(db=None, chatbot=chatbot, query=user_message),
+                    timings,
+                    timeout=self.retrieval_timeout
+                )
             )
-            context = retrieval_result["context"]
-            sources = retrieval_result["sources"]
 
-        # 4. Get chat history for memory
-        history = self.session_service.get_context_messages(
-            db=db,
-            session_id=session.id,
-            max_messages=chatbot.config.get("memory", {}).get("max_messages", 10)
-        )
+        # 2. Session bookkeeping chain (sync SQLAlchemy - run off the event loop)
+        max_history = chatbot.config.get("memory", {}).get("max_messages", 10)
+
+        try:
+            session, history, user_msg = await self._timed_stage(
+                "session_bookkeeping",
+                asyncio.to_thread(
+                    self._prepare_session,
+                    db,
+                    chatbot,
+                    user_message,
+                    session_id,
+                    channel_context,
+                    max_history,
+                    timings
+                ),
+                timings
+            )
+        except BaseException:
+            if retrieval_task:
+                retrieval_task.cancel()
+            raise
 
-        # 5. Build prompt
-        prompt = self._build_prompt(
-            chatbot=chatbot,
+        sources = []
+        if retrieval_task:
+            try:
+                retrieval_result = await retrieval_task
+                sources = retrieval_result["sources"]
+                timings.update(retrieval_result.get("timings", {}))
+            except Exception as e:
+                # Answer without KB context rather than failing the turn
+                # (the user message is already saved)
+                print(f"Retrieval failed for chatbot {chatbot.id}: {e}")
+                sources = []
+
+        # 3. Plan token budget and build prompt
+        model = chatbot.config.get("model", "secret-ai-v1")
+        max_tokens = chatbot.config.get("max_tokens", 2000)
+
+        prompt_plan = self.token_budget_service.plan_prompt(
+            system_prompt=chatbot.config.get("system_prompt", "You are a helpful assistant."),
             user_message=user_message,
-            context=context,
-            history=history
+            context_chunks=sources,
+            history=[
+                {"role": msg.role.value, "content": msg.content}
+                for msg in history
+            ],
+            model=model,
+            max_completion_tokens=max_tokens,
+            context_window=chatbot.config.get("context_window")
         )
 
-        # 6. Call AI
+        prompt = self._build_prompt(plan=prompt_plan)
+
+        # 4. Call AI
         try:
-            ai_response = await self.inference_service.generate(
-                prompt=prompt,
-                model=chatbot.config.get("model", "secret-ai-v1"),
-                temperature=chatbot.config.get("temperature", 0.7),
-                max_tokens=chatbot.config.get("max_tokens", 2000)
-            )
+            if on_partial is None:
+                generation = self.inference_service.generate(
+                    prompt=prompt,
+                    model=model,
+                    temperature=chatbot.config.get("temperature", 0.7),
+                    max_tokens=max_tokens
+                )
+            else:
+                generation = self._generate_streamed(
+                    prompt=prompt,
+                    model=model,
+                    temperature=chatbot.config.get("temperature", 0.7),
+                    max_tokens=max_tokens,
+                    estimated_prompt_tokens=prompt_plan["prompt_tokens"],
+                    on_partial=on_partial,
+                    timings=timings
+                )
+
+            ai_response = await self._timed_stage("inference", generation, timings)
 
             response_text = ai_response["text"]
             tokens_used = ai_response["usage"]
 
-            # 7. Save assistant message
+            timings["total"] = self._elapsed_ms(turn_start)
+
+            # 5. Save assistant message
             assistant_msg = self.session_service.save_message(
                 db=db,
                 session_id=session.id,
@@ -155,7 +211,17 @@ class ChatbotService:
                     "tokens_used": tokens_used,
                     "sources": sources,
                     "has_citations": len(sources) > 0,
-                    "citation_count": len(sources)
+                    "citation_count": len(sources),
+                    "prompt_budget": {
+                        "estimated_prompt_tokens": prompt_plan["prompt_tokens"],
+                        "context_window": prompt_plan["context_window"],
+                        "chunks_used": len(prompt_plan["context_chunks"]),
+                        "chunks_dropped": prompt_plan["chunks_dropped"],
+                        "history_omitted": prompt_plan["history_omitted"]
+                    },
+                    "latency_ms": timings["total"],
+                    "stage_timings_ms": timings,
+                    "streamed": on_partial is not None
                 },
                 prompt_tokens=tokens_used.get("prompt_tokens"),
                 completion_tokens=tokens_used.get("completion_tokens")
@@ -182,80 +248,261 @@ class ChatbotService:
             raise
 
 
-    async def _retrieve_context(
+    async def _generate_streamed(
+        self,
+        prompt: str,
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        estimated_prompt_tokens: int,
+        on_partial: Callable[[str], Awaitable],
+        timings: dict
+    ) -> dict:
+        """
+        Stream a completion, reporting the growing text to on_partial.
+
+        WHY: Messaging channels show the reply while it is generated
+        HOW: inference_service.generate_stream; usage from the stream's
+             usage block, else estimated with token_budget_service
+
+        RETURNS:
+            {"text": "...", "usage": {...}} (same shape as generate())
+        """
+
+        stage_start = time.perf_counter()
+        usage = {}
+        parts = []
+
+        async for chunk in self.inference_service.generate_stream(
+            prompt=prompt,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            usage=usage
+        ):
+            if not parts:
+                timings["first_token"] = self._elapsed_ms(stage_start)
+            parts.append(chunk)
+
+            try:
+                await on_partial("".join(parts))
+            except Exception as e:
+                # Delivery hiccups must not abort generation
+                print(f"Partial delivery failed: {e}")
+
+        text = "".join(parts)
+
+        if not usage:
+            usage = {
+                "prompt_tokens": estimated_prompt_tokens,
+                "completion_tokens": self.token_budget_service.count_tokens(text),
+                "estimated": True
+            }
+            usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+
+        return {"text": text, "usage": usage}
+
+
+    def _prepare_session(
         self,
         db: Session,
         chatbot: Chatbot,
+        user_message: str,
+        session_id: str,
+        channel_context: Optional[dict],
+        max_history: int,
+        timings: dict
+    ) -> tuple:
+        """
+        Session bookkeeping chain: session -> history -> user message.
+
+        WHY: These steps share the request DB session and must run in order
+        HOW: Runs in a worker thread so KB retrieval overlaps with it;
+             history is loaded before the user message is saved so the
+             current message is not repeated in the prompt history
+
+        RETURNS:
+            (session, history, user_msg)
+        """
+
+        stage_start = time.perf_counter()
+        session = self.session_service.get_or_create_session(
+            db=db,
+            bot_type="chatbot",
+            bot_id=chatbot.id,
+            session_id=session_id,
+            workspace_id=chatbot.workspace_id,
+            channel_context=channel_context
+        )
+        timings["session"] = self._elapsed_ms(stage_start)
+
+        stage_start = time.perf_counter()
+        history = self.session_service.get_context_messages(
+            db=db,
+            session_id=session.id,
+            max_messages=max_history
+        )
+        timings["history"] = self._elapsed_ms(stage_start)
+
+        stage_start = time.perf_counter()
+        user_msg = self.session_service.save_message(
+            db=db,
+            session_id=session.id,
+            role="user",
+            content=user_message
+        )
+        timings["save_user_message"] = self._elapsed_ms(stage_start)
+
+        return session, history, user_msg
+
+
+    async def _timed_stage(
+        self,
+        name: str,
+        awaitable: Awaitable,
+        timings: dict,
+        timeout: Optional[float] = None
+    ):
+        """
+        Await a stage, recording its wall time in timings[name] (ms).
+
+        WHY: Per-stage latency in response_metadata to measure the turn
+        HOW: perf_counter around the await, optional asyncio timeout
+        """
+
+        stage_start = time.perf_counter()
+        try:
+            if timeout:
+                return await asyncio.wait_for(awaitable, timeout=timeout)
+            return await awaitable
+        finally:
+            timings[name] = self._elapsed_ms(stage_start)
+
+
+    def _elapsed_ms(self, start: float) -> int:
+        """Milliseconds since a perf_counter() reading."""
+        return int((time.perf_counter() - start) * 1000)
+
+
+    async def _retrieve_context(
+        self,
+        db: Optional[Session],
+        chatbot: Chatbot,
         query: str
     ) -> dict:
         """
         Retrieve context from configured knowledge bases.
 
         WHY: RAG - augment AI with relevant information
-        HOW: Query each KB, combine results
+        HOW: Query all enabled KBs concurrently, each with its own timeout
+             and its own session (a Session is not safe to share between
+             concurrent searches); a slow or failing KB is skipped instead
+             of failing the turn
+
+        ARGS:
+            db: Database session, used only for a single KB search (None =
+                dedicated sessions, so retrieval can overlap with
+                request-session bookkeeping)
+            chatbot: Chatbot with knowledge_bases config
+            query: Search query
 
         RETURNS:
             {
                 "context": "Combined text from all chunks",
-                "sources": [...]
+                "sources": [...],  # Ranked best-first
+                "timings": {"kb:<kb_id>": 120, ...}
             }
         """
 
-        all_sources = []
-        context_parts = []
-
-        for kb_config in chatbot.config.get("knowledge_bases", []):
-            if not kb_config.get("enabled"):
-                continue
-
-            kb_id = kb_config["kb_id"]
-
-            # Get retrieval settings (KB-level or chatbot override)
-            retrieval_settings = kb_config.get("override_retrieval", {})
-            top_k = retrieval_settings.get("top_k", 5)
-            search_method = retrieval_settings.get("search_method", "hybrid")
-            threshold = retrieval_settings.get("similarity_threshold", 0.7)
+        kb_configs = [
+            kb_config for kb_config in chatbot.config.get("knowledge_bases", [])
+            if kb_config.get("enabled")
+        ]
 
-            # Retrieve from this KB (placeholder - requires retrieval_service)
-            # results = await self.retrieval_service.search(
-            #     kb_id=kb_id,
-            #     query=query,
-            #     top_k=top_k,
-            #     search_method=search_method,
-            #     threshold=threshold
-            # )
+        if not kb_configs:
+            return {"context": "", "sources": [], "timings": {}}
 
-            # Placeholder for now
-            results = []
+        # A caller's session can serve one search, never several at once
+        search_db = db if len(kb_configs) == 1 else None
+        timings = {}
 
-            # Add to sources
-            all_sources.extend(results)
+        results_per_kb = await asyncio.gather(*[
+            self._search_kb(search_db, kb_config, query, timings)
+            for kb_config in kb_configs
+        ])
 
-            # Add to context
-            for result in results:
-                context_parts.append(result["content"])
+        all_sources = [result for results in results_per_kb for result in results]
+        all_sources.sort(key=lambda result: result.get("score", 0.0), reverse=True)
 
         # Combine context
-        context = "\n\n".join(context_parts)
+        context = "\n\n".join(result["content"] for result in all_sources)
 
         return {
             "context": context,
-            "sources": all_sources
+            "sources": all_sources,
+            "timings": timings
         }
 
 
-    def _build_prompt(
+    async def _search_kb(
         self,
-        chatbot: Chatbot,
-        user_message: str,
-        context: str,
-        history: list
-    ) -> str:
+        db: Optional[Session],
+        kb_config: dict,
+        query: str,
+        timings: dict
+    ) -> list:
+        """
+        Search one knowledge base with a timeout.
+
+        ARGS:
+            db: Database session (None = open and close one for this search)
+
+        RETURNS:
+            List of retrieval results ([] on timeout or error)
         """
-        Build prompt for AI model.
 
-        WHY: Structure input for optimal AI response
+        from app.db.session import SessionLocal
+        from app.services.retrieval_service import retrieval_service
+
+        kb_id = kb_config["kb_id"]
+
+        # Get retrieval settings (KB-level or chatbot override)
+        retrieval_settings = kb_config.get("override_retrieval", {})
+
+        owns_session = db is None
+        stage_start = time.perf_counter()
+        try:
+            if owns_session:
+                db = SessionLocal()
+
+            return await asyncio.wait_for(
+                retrieval_service.search(
+                    db=db,
+                    kb_id=UUID(str(kb_id)),
+                    query=query,
+                    top_k=retrieval_settings.get("top_k", 5),
+                    search_method=retrieval_settings.get("search_method", "hybrid"),
+                    threshold=retrieval_settings.get("similarity_threshold", 0.7)
+                ),
+                timeout=self.kb_search_timeout
+            )
+        except Exception as e:
+            # Log error but continue with other KBs
+            print(f"KB retrieval failed for {kb_id}: {e}")
+            return []
+        finally:
+            if owns_session and db is not None:
+                db.close()
+            timings[f"kb:{kb_id}"] = self._elapsed_ms(stage_start)
+
+
+    def _build_prompt(self, plan: dict) -> str:
+        """
+        Build prompt for AI model from a token budget plan.
+
+        WHY: Structure input for optimal AI response within the context window
         HOW: System prompt + KB context + history + user message
+             (sections already trimmed by token_budget_service.plan_prompt)
 
         TEMPLATE:
             System: {system_prompt}
@@ -264,6 +511,7 @@ class ChatbotService:
             {context}
 
             Chat history:
+            [N earlier messages omitted]
             {history}
 
             User: {user_message}
@@ -273,23 +521,24 @@ class ChatbotService:
         parts = []
 
         # System prompt
-        system_prompt = chatbot.config.get("system_prompt", "You are a helpful assistant.")
-        parts.append(f"System: {system_prompt}")
+        parts.append(f"System: {plan['system_prompt']}")
 
-        # Knowledge base context
-        if context:
+        # Knowledge base context (best-first)
+        if plan["context_chunks"]:
             parts.append("\nContext from knowledge base:")
-            parts.append(context)
+            parts.append("\n\n".join(chunk["content"] for chunk in plan["context_chunks"]))
 
-        # Chat history
-        if history:
+        # Chat history (newest turns that fit, chronological order)
+        if plan["history"] or plan["history_omitted"]:
             parts.append("\nChat history:")
-            for msg in history:
-                role = "User" if msg.role.value == "user" else "Assistant"
-                parts.append(f"{role}: {msg.content}")
+            if plan["history_omitted"]:
+                parts.append(f"[{plan['history_omitted']} earlier messages omitted]")
+            for msg in plan["history"]:
+                role = "User" if msg["role"] == "user" else "Assistant"
+                parts.append(f"{role}: {msg['content']}")
 
         # Current user message
-        parts.append(f"\nUser: {user_message}")
+        parts.append(f"\nUser: {plan['user_message']}")
         parts.append("Assistant:")
 
         return "\n".join(parts)
@@ -358,13 +607,14 @@ class ChatbotService:
     def get_chatbot_stats(
         self,
         db: Session,
-        chatbot_id: UUID
+        chatbot_id: UUID,
+        days: int = 30
     ) -> dict:
         """
         Get chatbot usage statistics.
 
         WHY: Analytics dashboard
-        HOW: Aggregate session and message data
+        HOW: Sum pre-aggregated daily rollups (no session/message scan)
 
         RETURNS:
             {
@@ -374,20 +624,20 @@ class ChatbotService:
             }
         """
 
-        from app.models.chatbot import Chatbot
-
-        chatbot = db.query(Chatbot).get(chatbot_id)
-        if not chatbot:
-            raise ValueError("Chatbot not found")
+        from app.services.bot_analytics_service import bot_analytics_service
 
-        stats = self.session_service.get_session_stats(
+        summary = bot_analytics_service.get_summary(
             db=db,
-            workspace_id=chatbot.workspace_id,
             bot_type="chatbot",
-            bot_id=chatbot_id
+            bot_id=chatbot_id,
+            days=days
         )
 
-        return stats
+        return {
+            "total_sessions": summary["total_conversations"],
+            "total_messages": summary["total_messages"],
+            "avg_messages_per_session": summary["avg_conversation_length"]
+        }
 
 
 # Global instance
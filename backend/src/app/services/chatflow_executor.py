@@ -16,11 +16,37 @@ HOW:
 PSEUDOCODE follows the existing codebase patterns.
 """
 
-from typing import Any, Optional
-from uuid import UUID
+import time
+from typing import Any, Awaitable, Optional
 
 from sqlalchemy.orm import Session
 
+from app.chatflow.utils.expression import evaluate
+from app.chatflow.utils.template import compile_template, layered_scope
+
+
+def render_node_template(template: str, context: dict) -> str:
+    """
+    Render a node template against the execution context.
+
+    WHY: One pass over a cached compiled template instead of one
+         .replace per variable
+    HOW: {{input}} / {{user_message}} layered over context variables
+    """
+
+    return compile_template(template).render(node_scope(context))
+
+
+def node_scope(context: dict):
+    """{{input}} / {{user_message}} layered over the context variables."""
+
+    user_message = context.get("user_message", "")
+
+    return layered_scope(
+        {"input": user_message, "user_message": user_message},
+        context.get("variables", {})
+    )
+
 
 class BaseNodeExecutor:
     """
@@ -30,6 +56,17 @@ class BaseNodeExecutor:
     HOW: Inherit and implement execute()
     """
 
+    # Templates used when the config omits them (memo keys must see them)
+    memo_defaults: dict = {}
+
+    def is_cacheable(self, node_config: dict) -> bool:
+        """
+        Whether results depend only on config and resolved inputs.
+
+        WHY: Only deterministic nodes may be memoized (default: no)
+        """
+        return False
+
     async def execute(
         self,
         db: Session,
@@ -78,6 +115,12 @@ class LLMNodeExecutor(BaseNodeExecutor):
     HOW: Call inference_service
     """
 
+    memo_defaults = {"prompt": "{{input}}"}
+
+    def is_cacheable(self, node_config: dict) -> bool:
+        """Only greedy decoding (temperature 0) is deterministic."""
+        return node_config.get("temperature", 0.7) == 0
+
     async def execute(self, db: Session, node_config: dict, context: dict) -> dict:
         from app.services.inference_service import inference_service
 
@@ -89,6 +132,7 @@ class LLMNodeExecutor(BaseNodeExecutor):
             prompt = self._render_template(prompt_template, context)
 
             # Call LLM
+            upstream_start = time.perf_counter()
             result = await inference_service.generate(
                 prompt=prompt,
                 model=node_config.get("model", "secret-ai-v1"),
@@ -101,7 +145,8 @@ class LLMNodeExecutor(BaseNodeExecutor):
                 "success": True,
                 "error": None,
                 "metadata": {
-                    "tokens_used": result["usage"]
+                    "tokens_used": result["usage"],
+                    "upstream_ms": round((time.perf_counter() - upstream_start) * 1000, 2)
                 }
             }
 
@@ -113,19 +158,8 @@ class LLMNodeExecutor(BaseNodeExecutor):
             }
 
     def _render_template(self, template: str, context: dict) -> str:
-        """Replace {{variable}} placeholders in template."""
-
-        result = template
-
-        # Replace user_message
-        result = result.replace("{{input}}", context.get("user_message", ""))
-        result = result.replace("{{user_message}}", context.get("user_message", ""))
-
-        # Replace context variables
-        for key, value in context.get("variables", {}).items():
-            result = result.replace(f"{{{{{key}}}}}", str(value))
-
-        return result
+        """Replace {{variable}} placeholders in template (compiled once, cached)."""
+        return render_node_template(template, context)
 
 
 class HTTPRequestNodeExecutor(BaseNodeExecutor):
@@ -136,37 +170,41 @@ class HTTPRequestNodeExecutor(BaseNodeExecutor):
     HOW: Execute HTTP request with credentials
     """
 
+    def is_cacheable(self, node_config: dict) -> bool:
+        """GETs are idempotent; other methods have side effects."""
+        return node_config.get("method", "GET").upper() == "GET"
+
     async def execute(self, db: Session, node_config: dict, context: dict) -> dict:
-        import requests
+        from app.services.node_http_client import cache_ttl_from_config, node_http_client
 
         try:
             # Get request config
             method = node_config.get("method", "GET")
             url = node_config.get("url")
-            headers = node_config.get("headers", {})
+            headers = dict(node_config.get("headers", {}))
             body = node_config.get("body", {})
 
             # Get credentials if specified
             credential_id = node_config.get("credential_id")
             if credential_id:
-                from app.services.credential_service import credential_service
-                from app.models.credential import Credential
+                from app.services.credential_cache import credential_cache
 
-                credential = db.query(Credential).get(UUID(credential_id))
+                credential = credential_cache.get(db, credential_id)
                 if credential:
-                    cred_data = credential_service.get_decrypted_data(db, credential)
-
                     # Add auth to headers
-                    if "api_key" in cred_data:
-                        headers["Authorization"] = f"Bearer {cred_data['api_key']}"
-
-            # Make request
-            response = requests.request(
-                method=method,
-                url=url,
+                    if "api_key" in credential.data:
+                        headers["Authorization"] = f"Bearer {credential.data['api_key']}"
+
+            # Make request (pooled connection, optional GET cache)
+            upstream_start = time.perf_counter()
+            response, cache_status = await node_http_client.request(
+                method,
+                url,
                 headers=headers,
-                json=body,
-                timeout=30
+                json_body=body,
+                timeout=node_config.get("timeout", 30),
+                cache_ttl=cache_ttl_from_config(node_config),
+                credential_id=credential_id
             )
 
             response.raise_for_status()
@@ -176,7 +214,9 @@ class HTTPRequestNodeExecutor(BaseNodeExecutor):
                 "success": True,
                 "error": None,
                 "metadata": {
-                    "status_code": response.status_code
+                    "status_code": response.status_code,
+                    "cache": cache_status,
+                    "upstream_ms": round((time.perf_counter() - upstream_start) * 1000, 2)
                 }
             }
 
@@ -200,8 +240,7 @@ class ConditionNodeExecutor(BaseNodeExecutor):
         try:
             condition = node_config.get("condition", "true")
 
-            # Simple condition evaluation (placeholder)
-            # Production would use safe expression evaluator
+            # Compiled once per expression text, evaluated without eval()
             result = self._evaluate_condition(condition, context)
 
             return {
@@ -219,14 +258,15 @@ class ConditionNodeExecutor(BaseNodeExecutor):
             }
 
     def _evaluate_condition(self, condition: str, context: dict) -> bool:
-        """Evaluate condition (simplified)."""
+        """
+        Evaluate condition with the safe expression engine.
 
-        # Placeholder - production would use safe evaluator
-        # Examples:
-        # - "{{variable}} > 10"
-        # - "{{input}} contains 'help'"
+        EXAMPLES:
+        - "{{variable}} > 10"
+        - "{{input}} contains 'help'"
+        """
 
-        return True  # Always true for placeholder
+        return evaluate(condition, node_scope(context))
 
 
 class ResponseNodeExecutor(BaseNodeExecutor):
@@ -242,16 +282,8 @@ class ResponseNodeExecutor(BaseNodeExecutor):
             # Get response template
             response_template = node_config.get("message", "{{input}}")
 
-            # Replace variables
-            response = response_template
-
-            # Replace user_message
-            response = response.replace("{{input}}", context.get("user_message", ""))
-            response = response.replace("{{user_message}}", context.get("user_message", ""))
-
-            # Replace context variables
-            for key, value in context.get("variables", {}).items():
-                response = response.replace(f"{{{{{key}}}}}", str(value))
+            # Replace variables (single pass over the compiled template)
+            response = render_node_template(response_template, context)
 
             return {
                 "output": response,
@@ -321,14 +353,38 @@ class ChatflowExecutor:
                 "error": f"Unknown node type: {node_type}"
             }
 
-        # Execute node
-        result = await executor.execute(
-            db=db,
-            node_config=node.get("config", {}),
-            context=context
-        )
+        node_config = node.get("config", {})
+
+        def run() -> Awaitable[dict]:
+            return executor.execute(db=db, node_config=node_config, context=context)
+
+        # Deterministic nodes that opted in are memoized by resolved inputs
+        if self.is_memoized(node):
+            from app.chatflow.utils.node_memo import node_memo
+
+            return await node_memo.run(
+                node_type=node_type,
+                config=node_config,
+                scope=node_scope(context),
+                compute=run,
+                defaults=executor.memo_defaults
+            )
+
+        return await run()
+
+    def is_memoized(self, node: dict) -> bool:
+        """
+        Whether a node's result may come from the memo store.
+
+        WHY: Node type must be deterministic AND the config must opt in
+             ("memoize" / "memoize_ttl")
+        """
+        from app.chatflow.utils.node_memo import memo_ttl
+
+        executor = self.executors.get(node.get("type"))
+        node_config = node.get("config", {})
 
-        return result
+        return executor is not None and memo_ttl(node_config) is not None and executor.is_cacheable(node_config)
 
     def register_executor(self, node_type: str, executor: BaseNodeExecutor):
         """
@@ -9,13 +9,14 @@ WHY:
 
 HOW:
 - Parse chatflow graph (nodes + edges)
-- Execute nodes in order (topological sort)
+- Execute nodes in topological order, independent branches concurrently
 - Track execution state and context
 - Handle errors and fallbacks
 
 PSEUDOCODE follows the existing codebase patterns.
 """
 
+import time
 from uuid import UUID, uuid4
 from datetime import datetime
 from typing import Optional, Any
@@ -114,6 +115,13 @@ class ChatflowService:
             )
         }
 
+        # Sampled per-node trace (drafts are not profiled)
+        from app.services.chatflow_trace_service import chatflow_trace_service
+
+        trace = None if getattr(chatflow, "is_preview", False) else chatflow_trace_service.start(chatflow.id)
+        if trace is not None:
+            context["trace"] = trace
+
         # 4. Execute chatflow graph
         try:
             execution_result = await self._execute_graph(
@@ -124,11 +132,15 @@ class ChatflowService:
 
             response_text = execution_result["output"]
             nodes_executed = execution_result["nodes_executed"]
+            nodes_cached = execution_result.get("nodes_cached", [])
 
             # 5. Calculate execution time
             end_time = datetime.utcnow()
             execution_time_ms = int((end_time - start_time).total_seconds() * 1000)
 
+            if trace is not None:
+                chatflow_trace_service.record(trace)
+
             # 6. Save assistant message
             assistant_msg = self.session_service.save_message(
                 db=db,
@@ -139,6 +151,7 @@ class ChatflowService:
                     "type": "chatflow",
                     "chatflow_id": str(chatflow.id),
                     "nodes_executed": nodes_executed,
+                    "nodes_cached": nodes_cached,
                     "execution_time_ms": execution_time_ms
                 }
             )
@@ -148,10 +161,14 @@ class ChatflowService:
                 "session_id": str(session.id),
                 "message_id": str(assistant_msg.id),
                 "nodes_executed": nodes_executed,
+                "nodes_cached": nodes_cached,
                 "execution_time_ms": execution_time_ms
             }
 
         except Exception as e:
+            if trace is not None:
+                chatflow_trace_service.record(trace, status="error", error=str(e))
+
             # Save error message
             error_msg = self.session_service.save_message(
                 db=db,
@@ -175,31 +192,60 @@ class ChatflowService:
         Execute chatflow graph (nodes + edges).
 
         WHY: Core execution logic
-        HOW: Traverse graph, execute nodes, track state
+        HOW: Schedule the cached ExecutionPlan (independent branches in
+             parallel), execute nodes, track state
 
         RETURNS:
             {
                 "output": "Final response text",
-                "nodes_executed": ["start", "llm1", "response"]
+                "nodes_executed": ["start", "llm1", "response"],
+                "nodes_cached": ["llm1"]  # served from the node memo
             }
         """
 
-        nodes = chatflow.config.get("nodes", [])
-        edges = chatflow.config.get("edges", [])
+        from app.chatflow.utils.execution_plan import execution_plan_cache
+        from app.chatflow.utils.dag_scheduler import dag_scheduler
 
-        # Find start node (trigger)
-        start_node = None
-        for node in nodes:
-            if node["type"] == "trigger":
-                start_node = node
-                break
+        # Compiled once per chatflow version (node table + adjacency)
+        plan = execution_plan_cache.get_plan(chatflow)
+
+        # Cyclic graphs cannot be scheduled - follow edges one node at a time
+        if plan.order is None:
+            return await self._walk_graph(db=db, plan=plan, context=context)
+
+        async def execute_node(node: dict, node_context: dict) -> dict:
+            return await self._execute_node(db=db, node=node, context=node_context)
+
+        # Independent branches run concurrently, merges wait for all inputs
+        flow_settings = (chatflow.config or {}).get("settings", {})
+
+        return await dag_scheduler.run(
+            plan=plan,
+            execute_node=execute_node,
+            context=context,
+            max_parallelism=flow_settings.get("max_parallelism")
+        )
+
+
+    async def _walk_graph(
+        self,
+        db: Session,
+        plan: Any,
+        context: dict
+    ) -> dict:
+        """
+        Execute a plan one node at a time (first edge / selected branch).
 
-        if not start_node:
-            raise ValueError("No trigger node found in chatflow")
+        WHY: Fallback for graphs with cycles, which the DAG scheduler
+             cannot order
+        """
+
+        from app.services.chatflow_executor import node_scope
 
         # Execute nodes starting from trigger
-        current_node = start_node
+        current_node = plan.nodes[plan.start_node]
         nodes_executed = []
+        nodes_cached = []
         output = ""
 
         while current_node:
@@ -211,6 +257,8 @@ class ChatflowService:
             )
 
             nodes_executed.append(current_node["id"])
+            if (node_result.get("metadata") or {}).get("cache_hit"):
+                nodes_cached.append(current_node["id"])
 
             # Update context with node output
             if node_result.get("output"):
@@ -221,17 +269,14 @@ class ChatflowService:
                 output = node_result.get("output", "")
                 break
 
-            # Find next node
-            current_node = self._get_next_node(
-                current_node_id=current_node["id"],
-                edges=edges,
-                nodes=nodes,
-                context=context
-            )
+            # Find next node (O(1) plan lookup, follows branch handles)
+            edge_scope = node_scope(context).child({"output": node_result.get("output")})
+            current_node = plan.next_node(current_node["id"], node_result, edge_scope)
 
         return {
             "output": output,
-            "nodes_executed": nodes_executed
+            "nodes_executed": nodes_executed,
+            "nodes_cached": nodes_cached
         }
 
 
@@ -240,6 +285,49 @@ class ChatflowService:
         db: Session,
         node: dict,
         context: dict
+    ) -> dict:
+        """
+        Execute single node (memoized when allowed).
+
+        WHY: Deterministic nodes that opted in ("memoize" / "memoize_ttl")
+             skip repeated work for identical inputs
+        HOW: ChatflowExecutor declares which node types are cacheable;
+             node_memo keys results by config version + resolved inputs
+             and sets metadata["cache_hit"]
+
+        TRACING:
+            When the execution is sampled (context["trace"]), the call is
+            recorded as a span (duration, sizes, cache hit, upstream ms)
+        """
+
+        from app.services.chatflow_executor import chatflow_executor, node_scope
+
+        async def run() -> dict:
+            if not chatflow_executor.is_memoized(node):
+                return await self._run_node(db=db, node=node, context=context)
+
+            from app.chatflow.utils.node_memo import node_memo
+
+            return await node_memo.run(
+                node_type=node["type"],
+                config=node.get("config", {}),
+                scope=node_scope(context),
+                compute=lambda: self._run_node(db=db, node=node, context=context),
+                defaults=chatflow_executor.executors[node["type"]].memo_defaults
+            )
+
+        trace = context.get("trace")
+        if trace is None:
+            return await run()
+
+        return await trace.span(node, context, run)
+
+
+    async def _run_node(
+        self,
+        db: Session,
+        node: dict,
+        context: dict
     ) -> dict:
         """
         Execute single node.
@@ -265,32 +353,33 @@ class ChatflowService:
             # Placeholder - would call inference_service
             from app.services.inference_service import inference_service
 
-            prompt = node["config"].get("prompt", "").replace(
-                "{{input}}",
-                context["user_message"]
-            )
+            from app.services.chatflow_executor import render_node_template
+
+            prompt = render_node_template(node["config"].get("prompt", ""), context)
 
+            upstream_start = time.perf_counter()
             result = await inference_service.generate(
                 prompt=prompt,
                 model=node["config"].get("model", "secret-ai-v1"),
                 temperature=node["config"].get("temperature", 0.7)
             )
 
-            return {"output": result["text"]}
+            return {
+                "output": result["text"],
+                "metadata": {"upstream_ms": round((time.perf_counter() - upstream_start) * 1000, 2)}
+            }
 
         elif node_type == "response":
-            # Format response template
-            response_template = node["config"].get("message", "{{input}}")
-            response = response_template.replace("{{input}}", context["user_message"])
+            from app.services.chatflow_executor import render_node_template
 
-            # Replace variables
-            for var_name, var_value in context["variables"].items():
-                response = response.replace(f"{{{{{var_name}}}}}", str(var_value))
+            # Format response template (compiled once, single pass)
+            response_template = node["config"].get("message", "{{input}}")
+            response = render_node_template(response_template, context)
 
             return {"output": response}
 
         elif node_type == "condition":
-            # Evaluate condition (simplified)
+            # Evaluate condition (compiled safe expression)
             condition = node["config"].get("condition", "")
             result = self._evaluate_condition(condition, context)
 
@@ -310,52 +399,25 @@ class ChatflowService:
         Evaluate conditional expression.
 
         WHY: Branching logic in workflows
-        HOW: Parse and evaluate condition (simplified)
+        HOW: Expression compiled once (cached by text), evaluated as
+             closures against the node scope - never eval()
 
         EXAMPLE CONDITIONS:
         - "{{user_message}} contains 'help'"
         - "{{variable1}} > 10"
-        """
-
-        # Simplified condition evaluation (production would use safe expression parser)
-        return True  # Placeholder
-
-
-    def _get_next_node(
-        self,
-        current_node_id: str,
-        edges: list,
-        nodes: list,
-        context: dict
-    ) -> Optional[dict]:
-        """
-        Find next node to execute.
-
-        WHY: Graph traversal
-        HOW: Follow edges from current node
 
-        HANDLES:
-        - Linear flow (single edge)
-        - Branching (conditional edges)
+        RAISES:
+            ExpressionError: Invalid expression
         """
 
-        # Find outgoing edges
-        outgoing_edges = [e for e in edges if e["source"] == current_node_id]
+        from app.chatflow.utils.expression import evaluate
+        from app.services.chatflow_executor import node_scope
 
-        if not outgoing_edges:
-            return None
+        # No condition configured - branch unconditionally (previous behaviour)
+        if not condition or not condition.strip():
+            return True
 
-        # If multiple edges (branching), choose based on conditions
-        # For now, just take first edge
-        next_edge = outgoing_edges[0]
-        next_node_id = next_edge["target"]
-
-        # Find node by ID
-        for node in nodes:
-            if node["id"] == next_node_id:
-                return node
-
-        return None
+        return evaluate(condition, node_scope(context))
 
 
     async def preview_execution(
@@ -381,6 +443,8 @@ class ChatflowService:
 
         # Create temporary chatflow-like object
         class TempChatflow:
+            is_preview = True
+
             def __init__(self, draft_data):
                 self.id = uuid4()
                 self.workspace_id = UUID(draft_data["workspace_id"])
@@ -409,6 +473,7 @@ class ChatflowService:
                     "last_message": user_message,
                     "last_response": response["response"],
                     "nodes_executed": response["nodes_executed"],
+                    "nodes_cached": response["nodes_cached"],
                     "timestamp": datetime.utcnow().isoformat()
                 }
             }
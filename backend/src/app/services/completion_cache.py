@@ -0,0 +1,241 @@
+"""
+Completion Cache - Exact-match cache for deterministic LLM completions.
+
+WHY:
+- Chatflow LLM nodes used as classifiers/routers send identical prompts
+- At temperature 0 the provider returns the same answer every time
+- Every repeat costs a full provider round trip and tokens
+- Cache hits answer in microseconds (memory) or ~1ms (Redis)
+
+HOW:
+- Key = sha256 of (model, prompt-or-messages, temperature, max_tokens, stop)
+- Tier 1: in-process LRU (bounded size, per-entry TTL)
+- Tier 2: Redis (shared across workers, TTL via SETEX)
+- Only used when the request is deterministic (temperature == 0)
+- Hit/miss counters exposed via get_stats()
+
+PSEUDOCODE follows the existing codebase patterns.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Union
+
+from app.core.config import settings
+
+
+class CompletionCache:
+    """
+    Two-tier (LRU + Redis) exact-match completion cache.
+
+    WHY: Skip provider calls for repeated deterministic prompts
+    HOW: Hash request parameters, look up memory then Redis
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[int] = None,
+        redis_client=None
+    ):
+        """
+        Initialize completion cache.
+
+        WHY: Bounded memory use, shared Redis tier
+        HOW: OrderedDict for LRU order, lazy Redis client
+
+        ARGS:
+            max_entries: Max entries kept in process memory
+            ttl_seconds: Entry lifetime (both tiers)
+            redis_client: Optional Redis client (defaults to app.utils.redis)
+        """
+        self.max_entries = max_entries or getattr(settings, "COMPLETION_CACHE_MAX_ENTRIES", 1000)
+        self.ttl_seconds = ttl_seconds or getattr(settings, "COMPLETION_CACHE_TTL_SECONDS", 3600)
+        self.enabled = getattr(settings, "COMPLETION_CACHE_ENABLED", True)
+        self.key_prefix = "completion_cache:"
+
+        self._redis = redis_client
+        self._entries: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._stats = {
+            "memory_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "redis_errors": 0
+        }
+
+
+    @property
+    def redis(self):
+        """
+        Lazily resolve Redis client.
+
+        WHY: Importing the cache must not require a live Redis
+        HOW: Import shared client on first use
+        """
+        if self._redis is None:
+            from app.utils.redis import redis_client
+            self._redis = redis_client
+        return self._redis
+
+
+    def is_cacheable(self, temperature: Optional[float]) -> bool:
+        """
+        Check whether a request is deterministic enough to cache.
+
+        WHY: Sampled (temperature > 0) responses must stay varied
+        """
+        return self.enabled and temperature is not None and float(temperature) == 0.0
+
+
+    def build_key(
+        self,
+        model: str,
+        prompt_or_messages: Union[str, list],
+        temperature: float,
+        max_tokens: int,
+        stop: Optional[list[str]] = None
+    ) -> str:
+        """
+        Build cache key from request parameters.
+
+        WHY: Exact-match only - any parameter change is a different entry
+        HOW: Canonical JSON (sorted keys) hashed with sha256
+
+        RETURNS:
+            "completion_cache:<sha256 hex>"
+        """
+        canonical = json.dumps(
+            {
+                "model": model,
+                "input": prompt_or_messages,
+                "temperature": float(temperature),
+                "max_tokens": max_tokens,
+                "stop": list(stop or [])
+            },
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False
+        )
+
+        digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+        return f"{self.key_prefix}{digest}"
+
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Look up cached completion.
+
+        FLOW:
+        1. Memory tier (drop entry if expired)
+        2. Redis tier (promote hit into memory)
+
+        RETURNS:
+            Cached {"text": ..., "usage": ...} or None
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return value
+
+                del self._entries[key]
+                self._stats["expirations"] += 1
+
+        try:
+            raw = self.redis.get(key)
+        except Exception:
+            # Redis is an optimisation - never fail the request over it
+            raw = None
+            self._stats["redis_errors"] += 1
+
+        if raw:
+            value = json.loads(raw)
+            self._store_memory(key, value, now)
+            with self._lock:
+                self._stats["redis_hits"] += 1
+            return value
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+
+    def set(self, key: str, value: dict):
+        """
+        Store completion in both tiers.
+
+        WHY: Later identical requests (any worker) skip the provider
+        """
+        self._store_memory(key, value, time.monotonic())
+
+        try:
+            self.redis.setex(key, self.ttl_seconds, json.dumps(value))
+        except Exception:
+            self._stats["redis_errors"] += 1
+
+        with self._lock:
+            self._stats["stores"] += 1
+
+
+    def _store_memory(self, key: str, value: dict, now: float):
+        """Insert into LRU tier, evicting least recently used entries."""
+
+        with self._lock:
+            self._entries[key] = (now + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+
+    def clear(self):
+        """
+        Clear the in-process tier.
+
+        NOTE: Redis entries expire on their own TTL
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+    def get_stats(self) -> dict:
+        """
+        Get hit/miss metrics.
+
+        RETURNS:
+            {
+                "memory_hits": 10,
+                "redis_hits": 2,
+                "misses": 5,
+                "hit_rate": 0.71,
+                "size": 12,
+                ...
+            }
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+
+        hits = stats["memory_hits"] + stats["redis_hits"]
+        lookups = hits + stats["misses"]
+        stats["hit_rate"] = round(hits / lookups, 4) if lookups else 0.0
+
+        return stats
+
+
+# Global instance
+completion_cache = CompletionCache()
@@ -0,0 +1,303 @@
+"""
+Credential Cache - Short-lived decrypted credentials for chatflow nodes.
+
+WHY:
+- HTTP and database nodes loaded the Credential row and Fernet-decrypted
+  it on every execution, then committed a usage_count update: one SELECT,
+  one decryption and one UPDATE + COMMIT per node per message
+
+HOW:
+- Decrypted payloads are kept in process memory for
+  CREDENTIAL_CACHE_TTL_SECONDS (bounded LRU, CREDENTIAL_CACHE_MAX_ENTRIES)
+- Payloads are held as bytearrays and overwritten with zeros when an
+  entry expires, is evicted or is invalidated; callers get a fresh dict
+  per call, so the cached copy is never shared
+- Invalidated on credential update / delete and cleared on encryption key
+  rotation; other worker processes pick changes up within the TTL
+- Usage (usage_count / last_used_at) is counted in memory and written in
+  one UPDATE per credential every CREDENTIAL_USAGE_FLUSH_SECONDS (or
+  CREDENTIAL_USAGE_FLUSH_CALLS uses), on its own session in a background
+  thread (get() never waits for the database, one flush at a time)
+
+PSEUDOCODE follows the existing codebase patterns.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from app.core.config import settings
+
+
+class DecryptedCredential:
+    """Credential fields a node needs, plus its decrypted data."""
+
+    __slots__ = ("id", "name", "credential_type", "version", "data")
+
+    def __init__(self, credential_id: UUID, name: str, credential_type: str, version: str, data: dict):
+        self.id = credential_id
+        self.name = name
+        self.credential_type = credential_type
+        self.version = version
+        self.data = data
+
+
+class _CacheEntry:
+    """Cached credential (plaintext JSON in a wipeable buffer)."""
+
+    __slots__ = ("name", "credential_type", "version", "payload", "expires_at")
+
+    def __init__(self, name: str, credential_type: str, version: str, payload: bytearray, expires_at: float):
+        self.name = name
+        self.credential_type = credential_type
+        self.version = version
+        self.payload = payload
+        self.expires_at = expires_at
+
+    def wipe(self):
+        """Overwrite the decrypted payload in place."""
+        self.payload[:] = bytes(len(self.payload))
+
+
+class CredentialCache:
+    """
+    Decrypted credential cache with batched usage tracking.
+
+    WHY: No SQL and no decryption per node execution
+    HOW: TTL + LRU of wipeable payload buffers, usage counters flushed in batch
+    """
+
+    def __init__(self):
+        """Initialize cache."""
+
+        self.ttl = getattr(settings, "CREDENTIAL_CACHE_TTL_SECONDS", 60)
+        self.max_entries = getattr(settings, "CREDENTIAL_CACHE_MAX_ENTRIES", 1000)
+        self.flush_seconds = getattr(settings, "CREDENTIAL_USAGE_FLUSH_SECONDS", 30)
+        self.flush_calls = getattr(settings, "CREDENTIAL_USAGE_FLUSH_CALLS", 100)
+
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._usage: Dict[str, Tuple[int, datetime]] = {}
+        self._usage_calls = 0
+        self._last_flush = time.monotonic()
+        self._usage_lock = threading.Lock()
+        self._flushing = False
+
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evicted": 0, "invalidated": 0, "usage_flushes": 0}
+
+
+    def get(self, db: Any, credential_id: Any) -> Optional[DecryptedCredential]:
+        """
+        Get a decrypted credential (cached for a short TTL).
+
+        ARGS:
+            db: Database session (only used on a cache miss)
+            credential_id: Credential UUID (or string)
+
+        RETURNS:
+            DecryptedCredential, or None if the credential does not exist
+
+        RAISES:
+            ValueError: If credential is disabled
+        """
+
+        credential_id = UUID(str(credential_id))
+        key = str(credential_id)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                self._drop(key)
+                self._stats["expired"] += 1
+                entry = None
+
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                result = self._materialize(credential_id, entry)
+
+        if entry is None:
+            self._stats["misses"] += 1
+            loaded = self._load(db, credential_id)
+            if loaded is None:
+                return None
+
+            entry = _CacheEntry(*loaded, expires_at=time.monotonic() + self.ttl)
+            result = self._materialize(credential_id, entry)
+            self._store(key, entry)
+
+        self.record_usage(key)
+        return result
+
+
+    def invalidate(self, credential_id: Any):
+        """Drop (and wipe) one cached credential."""
+
+        with self._lock:
+            if self._drop(str(credential_id)):
+                self._stats["invalidated"] += 1
+
+
+    def clear(self):
+        """Drop (and wipe) every cached credential (e.g. key rotation)."""
+
+        with self._lock:
+            for key in list(self._entries):
+                self._drop(key)
+
+
+    def record_usage(self, credential_id: str):
+        """Count one use; flushed to the database in batch."""
+
+        now = datetime.utcnow()
+        with self._usage_lock:
+            count, _ = self._usage.get(credential_id, (0, now))
+            self._usage[credential_id] = (count + 1, now)
+            self._usage_calls += 1
+
+            due = not self._flushing and (
+                self._usage_calls >= self.flush_calls
+                or time.monotonic() - self._last_flush >= self.flush_seconds
+            )
+            if due:
+                self._flushing = True
+
+        if due:
+            # Called from node execution on the event loop - the UPDATE and
+            # COMMIT run in a worker thread
+            threading.Thread(target=self._background_flush, daemon=True).start()
+
+
+    def _background_flush(self):
+        try:
+            self.flush_usage()
+        finally:
+            with self._usage_lock:
+                self._flushing = False
+
+
+    def flush_usage(self):
+        """
+        Write pending usage counts (one UPDATE per credential).
+
+        WHY: Blocking - called from a background thread when due, and
+             directly at shutdown
+
+        NOTE: Best effort - a failed flush is logged, counts are dropped
+        """
+
+        with self._usage_lock:
+            batch, self._usage = self._usage, {}
+            self._usage_calls = 0
+            self._last_flush = time.monotonic()
+
+        if not batch:
+            return
+
+        try:
+            self._write_usage(batch)
+            self._stats["usage_flushes"] += 1
+        except Exception as e:
+            print(f"Credential usage flush failed: {e}")
+
+
+    def get_stats(self) -> dict:
+        """Cache counters for monitoring."""
+        return {**self._stats, "entries": len(self._entries), "pending_usage": len(self._usage)}
+
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _materialize(self, credential_id: UUID, entry: _CacheEntry) -> DecryptedCredential:
+        return DecryptedCredential(
+            credential_id,
+            entry.name,
+            entry.credential_type,
+            entry.version,
+            json.loads(bytes(entry.payload))
+        )
+
+
+    def _store(self, key: str, entry: _CacheEntry):
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = entry
+
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self._stats["evicted"] += 1
+
+
+    def _drop(self, key: str) -> bool:
+        """Remove and wipe an entry (caller holds the lock)."""
+
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        entry.wipe()
+        return True
+
+
+    def _load(self, db: Any, credential_id: UUID) -> Optional[Tuple[str, str, str, bytearray]]:
+        """
+        Load and decrypt a credential.
+
+        RETURNS:
+            (name, credential_type, version, plaintext JSON buffer) or None
+        """
+
+        from app.models.credential import Credential
+        from app.services.credential_service import credential_service
+        from app.services.database_engine_registry import credential_version
+
+        credential = db.query(Credential).get(credential_id)
+        if not credential:
+            return None
+
+        if not credential.is_active:
+            raise ValueError(f"Credential '{credential.name}' is disabled")
+
+        credential_type = getattr(credential.credential_type, "value", credential.credential_type)
+
+        return (
+            credential.name,
+            credential_type,
+            credential_version(credential),
+            bytearray(credential_service.fernet.decrypt(credential.encrypted_data))
+        )
+
+
+    def _write_usage(self, batch: Dict[str, Tuple[int, datetime]]):
+        """Apply batched usage counters on a dedicated session."""
+
+        from sqlalchemy import update
+
+        from app.db.session import SessionLocal
+        from app.models.credential import Credential
+
+        db = SessionLocal()
+        try:
+            for credential_id, (count, last_used_at) in batch.items():
+                db.execute(
+                    update(Credential)
+                    .where(Credential.id == UUID(credential_id))
+                    .values(
+                        usage_count=Credential.usage_count + count,
+                        last_used_at=last_used_at
+                    )
+                )
+            db.commit()
+        finally:
+            db.close()
+
+
+# Global instance
+credential_cache = CredentialCache()
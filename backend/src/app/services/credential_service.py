@@ -204,6 +204,8 @@ class CredentialService:
         RETURNS:
             Updated Credential instance
         """
+        invalidate = "data" in updates or "is_active" in updates
+
         # Handle data updates (requires re-encryption)
         if "data" in updates:
             new_data = updates.pop("data")
@@ -218,6 +220,15 @@ class CredentialService:
         db.commit()
         db.refresh(credential)
 
+        # Pooled database connections and cached decrypted data use the old
+        # data / active state. Dropped only after the commit, so a concurrent
+        # miss cannot re-cache the pre-update row.
+        if invalidate:
+            from app.services.credential_cache import credential_cache
+            from app.services.database_engine_registry import database_engine_registry
+            database_engine_registry.invalidate(credential.id)
+            credential_cache.invalidate(credential.id)
+
         return credential
 
 
@@ -265,6 +276,12 @@ class CredentialService:
 
         db.commit()
 
+        # Reconnect pooled database engines with freshly decrypted credentials
+        from app.services.credential_cache import credential_cache
+        from app.services.database_engine_registry import database_engine_registry
+        database_engine_registry.dispose_all()
+        credential_cache.clear()
+
 
     def _validate_credential_data(self, credential_type: str, data: dict):
         """
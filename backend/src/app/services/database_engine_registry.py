@@ -0,0 +1,253 @@
+"""
+Database Engine Registry - Pooled SQLAlchemy engines for DatabaseNode.
+
+WHY:
+- DatabaseNode called create_engine() on every execution: a full
+  TCP + TLS + auth handshake per chatflow run
+- Those engines were never disposed, leaking pools and sockets
+
+HOW:
+- One engine per (credential_id, credential version), reused across runs
+- Version = encryption key id + updated_at, so an edited credential gets a
+  new engine (also in processes that missed the invalidation) and older
+  versions of that credential are disposed
+- Bounded pools (pool_size / max_overflow / pool_timeout), pre-ping and
+  recycle for long-lived connections
+- Bounded registry (LRU) and idle eviction; engines with checked-out
+  connections are never evicted
+- Disposed on credential update/delete and encryption key rotation
+- Per-pool metrics via get_stats()
+
+PSEUDOCODE follows the existing codebase patterns.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+from uuid import UUID
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, Engine
+
+from app.core.config import settings
+
+
+class _PooledEngine:
+    """Registry entry."""
+
+    __slots__ = ("engine", "created_at", "last_used", "uses")
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.uses = 0
+
+
+def credential_version(credential: Any) -> str:
+    """
+    Version of a credential's connection data.
+
+    WHY: No version column; updated_at changes on every update and the
+         key id on rotation
+    """
+    updated_at = getattr(credential, "updated_at", None)
+    stamp = updated_at.isoformat() if updated_at else ""
+    return f"{getattr(credential, 'encryption_key_id', '')}:{stamp}"
+
+
+class DatabaseEngineRegistry:
+    """
+    Engines keyed by credential.
+
+    WHY: Reuse warm connections to customer databases
+    HOW: LRU of engines with bounded QueuePools
+    """
+
+    def __init__(self):
+        """Initialize registry."""
+
+        self.max_engines = getattr(settings, "DATABASE_NODE_MAX_ENGINES", 50)
+        self.pool_size = getattr(settings, "DATABASE_NODE_POOL_SIZE", 5)
+        self.max_overflow = getattr(settings, "DATABASE_NODE_MAX_OVERFLOW", 5)
+        self.pool_timeout = getattr(settings, "DATABASE_NODE_POOL_TIMEOUT", 10)
+        self.pool_recycle = getattr(settings, "DATABASE_NODE_POOL_RECYCLE_SECONDS", 1800)
+        self.idle_seconds = getattr(settings, "DATABASE_NODE_ENGINE_IDLE_SECONDS", 600)
+
+        self._engines: "OrderedDict[Tuple[str, str], _PooledEngine]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+        self._stats = {
+            "created": 0,
+            "reused": 0,
+            "disposed": 0,
+            "evicted_idle": 0,
+            "evicted_lru": 0
+        }
+
+
+    def get_engine(self, credential_id: UUID, version: str, url: URL) -> Engine:
+        """
+        Get (or create) the engine for a credential version.
+
+        ARGS:
+            credential_id: Database credential ID
+            version: credential_version(credential)
+            url: Connection URL built from the decrypted credential
+
+        RETURNS:
+            Pooled Engine (do not dispose; the registry owns it)
+        """
+
+        key = (str(credential_id), version)
+        stale = []
+
+        with self._lock:
+            entry = self._engines.get(key)
+
+            if entry is not None:
+                self._engines.move_to_end(key)
+                self._stats["reused"] += 1
+            else:
+                # Older versions of this credential are no longer valid
+                stale = [k for k in self._engines if k[0] == key[0]]
+                stale = [self._engines.pop(k) for k in stale]
+
+                entry = _PooledEngine(self._create_engine(url))
+                self._engines[key] = entry
+                self._stats["created"] += 1
+
+                while len(self._engines) > self.max_engines:
+                    _, evicted = self._engines.popitem(last=False)
+                    stale.append(evicted)
+                    self._stats["evicted_lru"] += 1
+
+            entry.uses += 1
+            entry.last_used = time.monotonic()
+
+        for old in stale:
+            self._dispose(old)
+
+        self._maybe_evict_idle()
+
+        return entry.engine
+
+
+    def _create_engine(self, url: URL) -> Engine:
+        return create_engine(
+            url,
+            pool_size=self.pool_size,
+            max_overflow=self.max_overflow,
+            pool_timeout=self.pool_timeout,
+            pool_recycle=self.pool_recycle,
+            pool_pre_ping=True
+        )
+
+
+    def _dispose(self, entry: _PooledEngine):
+        """
+        Dispose an engine.
+
+        NOTE: Checked-out connections finish their work and are closed
+        when returned
+        """
+        try:
+            entry.engine.dispose()
+        except Exception as e:
+            print(f"Database engine dispose failed: {e}")
+        self._stats["disposed"] += 1
+
+
+    def invalidate(self, credential_id: UUID):
+        """
+        Dispose all engines of a credential.
+
+        WHY: Credential updated, disabled or deleted
+        """
+
+        credential_id = str(credential_id)
+
+        with self._lock:
+            keys = [key for key in self._engines if key[0] == credential_id]
+            entries = [self._engines.pop(key) for key in keys]
+
+        for entry in entries:
+            self._dispose(entry)
+
+
+    def dispose_all(self):
+        """
+        Dispose every engine.
+
+        WHY: Encryption key rotation, shutdown
+        """
+
+        with self._lock:
+            entries = list(self._engines.values())
+            self._engines.clear()
+
+        for entry in entries:
+            self._dispose(entry)
+
+
+    def evict_idle(self) -> int:
+        """
+        Dispose engines unused for idle_seconds (and with nothing checked out).
+
+        RETURNS:
+            Number of engines evicted
+        """
+
+        now = time.monotonic()
+        self._last_sweep = now
+
+        with self._lock:
+            keys = [
+                key for key, entry in self._engines.items()
+                if now - entry.last_used > self.idle_seconds and entry.engine.pool.checkedout() == 0
+            ]
+            entries = [self._engines.pop(key) for key in keys]
+            self._stats["evicted_idle"] += len(entries)
+
+        for entry in entries:
+            self._dispose(entry)
+
+        return len(entries)
+
+
+    def _maybe_evict_idle(self):
+        # Sweep at most once per idle window fraction
+        if time.monotonic() - self._last_sweep > min(self.idle_seconds / 4, 60):
+            self.evict_idle()
+
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Registry counters and per-pool metrics.
+
+        RETURNS:
+            {"engines", "created", "reused", ..., "pools": [{...}]}
+        """
+
+        now = time.monotonic()
+        with self._lock:
+            pools = [
+                {
+                    "credential_id": credential_id,
+                    "version": version,
+                    "pool_size": entry.engine.pool.size(),
+                    "checked_out": entry.engine.pool.checkedout(),
+                    "checked_in": entry.engine.pool.checkedin(),
+                    "overflow": entry.engine.pool.overflow(),
+                    "uses": entry.uses,
+                    "idle_seconds": round(now - entry.last_used, 1)
+                }
+                for (credential_id, version), entry in self._engines.items()
+            ]
+
+        return {**self._stats, "engines": len(pools), "pools": pools}
+
+
+# Global instance
+database_engine_registry = DatabaseEngineRegistry()
@@ -162,6 +162,8 @@ class UnifiedDraftService:
             draft_type: Type of entity
             draft_id: Draft identifier
             updates: Partial updates to apply
+                     (chatflow editors may send data.graph_delta instead of
+                     full node/edge lists - see _merge_graph_delta)
             extend_ttl: Whether to reset TTL to 24 hours
         """
 
@@ -170,17 +172,37 @@ class UnifiedDraftService:
         if not draft:
             raise ValueError(f"Draft not found or expired: {draft_id}")
 
+        # Version the graph state was last validated at (see incremental_graph)
+        base_version = draft.get("updated_at")
+        now = datetime.utcnow().isoformat()
+
         # Merge updates
-        if "data" in updates:
+        data_updates = dict(updates.get("data", {}))
+        graph_delta = data_updates.pop("graph_delta", None)
+
+        if data_updates:
             # Deep merge data field
-            draft["data"].update(updates["data"])
+            draft["data"].update(data_updates)
+
+        if graph_delta:
+            self._merge_graph_delta(draft["data"], graph_delta)
 
         if "preview" in updates:
             draft["preview"] = updates["preview"]
 
+        # Live validation for the editor (incremental - only the graph delta is checked)
+        if draft_type == DraftType.CHATFLOW and (graph_delta or {"nodes", "edges"} & data_updates.keys()):
+            draft["updated_at"] = now
+            errors, warnings = self._validate_chatflow(draft, graph_delta, base_version)
+            draft["validation"] = {
+                "valid": len(errors) == 0,
+                "errors": errors,
+                "warnings": warnings
+            }
+
         # Update timestamps
-        draft["updated_at"] = datetime.utcnow().isoformat()
-        draft["last_auto_save"] = datetime.utcnow().isoformat()
+        draft["updated_at"] = now
+        draft["last_auto_save"] = now
 
         # Save back to Redis
         redis_key = f"draft:{draft_type.value}:{draft_id}"
@@ -198,6 +220,40 @@ class UnifiedDraftService:
         )
 
 
+    def _merge_graph_delta(self, data: dict, delta: dict):
+        """
+        Apply a chatflow editor delta to the stored node/edge lists.
+
+        DELTA:
+            {
+                "nodes": [...],           # Added or changed nodes
+                "edges": [...],           # Added or re-pointed edges
+                "removed_nodes": ["id"],
+                "removed_edges": ["id"]   # Edge ids (edge_key)
+            }
+        """
+
+        from app.chatflow.utils.incremental_graph import edge_key
+
+        removed = set(delta.get("removed_nodes", []))
+        changed = {node["id"]: node for node in delta.get("nodes", []) if node.get("id")}
+        nodes = [
+            changed.pop(node.get("id"), node)
+            for node in data.get("nodes", [])
+            if node.get("id") not in removed
+        ]
+        data["nodes"] = nodes + list(changed.values())
+
+        removed = set(delta.get("removed_edges", []))
+        changed = {edge_key(edge): edge for edge in delta.get("edges", [])}
+        edges = [
+            changed.pop(edge_key(edge), edge)
+            for edge in data.get("edges", [])
+            if edge_key(edge) not in removed
+        ]
+        data["edges"] = edges + list(changed.values())
+
+
     def delete_draft(
         self,
         draft_type: DraftType,
@@ -212,6 +268,10 @@ class UnifiedDraftService:
         redis_key = f"draft:{draft_type.value}:{draft_id}"
         self.redis_client.delete(redis_key)
 
+        if draft_type == DraftType.CHATFLOW:
+            from app.chatflow.utils.incremental_graph import draft_graphs
+            draft_graphs.discard(draft_id)
+
 
     def list_drafts(
         self,
@@ -337,8 +397,25 @@ class UnifiedDraftService:
         return errors, warnings
 
 
-    def _validate_chatflow(self, draft: dict) -> tuple[list, list]:
-        """Validate chatflow draft."""
+    def _validate_chatflow(
+        self,
+        draft: dict,
+        graph_delta: Optional[dict] = None,
+        base_version: Optional[str] = None
+    ) -> tuple[list, list]:
+        """
+        Validate chatflow draft.
+
+        WHY: Runs on every autosave of the editor
+        HOW: Graph checks (trigger/response nodes, node configs, unknown
+             edge endpoints, nodes unreachable from the trigger, cycles)
+             are incremental per draft - see incremental_graph. With a
+             graph_delta only the changes are applied; otherwise (or when
+             the kept graph state is not at base_version) the full lists
+             are diffed.
+        """
+
+        from app.chatflow.utils.incremental_graph import draft_graphs
 
         errors = []
         warnings = []
@@ -351,28 +428,26 @@ class UnifiedDraftService:
         if not data.get("nodes"):
             errors.append("Workflow has no nodes")
 
-        # Check for start node
-        nodes = data.get("nodes", [])
-        has_start = any(node["type"] == "trigger" for node in nodes)
-        if not has_start:
-            errors.append("Workflow must have a start/trigger node")
-
-        # Check for response node
-        has_response = any(node["type"] == "response" for node in nodes)
-        if not has_response:
-            errors.append("Workflow must have a response node")
-
-        # Check for disconnected nodes
-        edges = data.get("edges", [])
-        node_ids = {node["id"] for node in nodes}
-        connected_nodes = set()
-        for edge in edges:
-            connected_nodes.add(edge["source"])
-            connected_nodes.add(edge["target"])
-
-        disconnected = node_ids - connected_nodes
-        if disconnected and len(disconnected) > 1:  # Start node might not have incoming edges
-            warnings.append(f"Disconnected nodes: {', '.join(disconnected)}")
+        graph_result = None
+        if graph_delta:
+            graph_result = draft_graphs.validate_delta(
+                draft["id"],
+                graph_delta,
+                base_version=base_version,
+                version=draft.get("updated_at")
+            )
+
+        if graph_result is None:
+            graph_result = draft_graphs.validate(
+                draft["id"],
+                data.get("nodes", []),
+                data.get("edges", []),
+                version=draft.get("updated_at")
+            )
+
+        graph_errors, graph_warnings = graph_result
+        errors.extend(graph_errors)
+        warnings.extend(graph_warnings)
 
         # At least one deployment channel
         deployment = data.get("deployment", {})
@@ -415,7 +490,7 @@ class UnifiedDraftService:
 
         FLOW:
         1. Validate draft
-        2. Create database record
+        2. Create database record (and register in bot_registry)
         3. Type-specific initialization (webhooks, API keys, etc.)
         4. Delete draft from Redis
         5. Return deployment results
@@ -491,6 +566,10 @@ class UnifiedDraftService:
         db.add(api_key)
         db.commit()  # Commit chatbot + API key
 
+        # Warm the bot registry (first webhook/API call skips the lookup)
+        from app.services.bot_registry import bot_registry
+        bot_registry.register(chatbot, "chatbot")
+
         # Initialize multi-channel deployments
         deployment_results = self._initialize_channels(
             entity_id=chatbot.id,
@@ -539,6 +618,14 @@ class UnifiedDraftService:
         db.add(api_key)
         db.commit()
 
+        # Warm the bot registry (first webhook/API call skips the lookup)
+        from app.services.bot_registry import bot_registry
+        bot_registry.register(chatflow, "chatflow")
+
+        # Drop any plan compiled for an earlier version of this chatflow
+        from app.chatflow.utils.execution_plan import execution_plan_cache
+        execution_plan_cache.invalidate(chatflow.id)
+
         # Initialize multi-channel deployments (reuses chatbot logic)
         deployment_results = self._initialize_channels(
             entity_id=chatflow.id,
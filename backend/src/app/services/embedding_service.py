@@ -130,6 +130,20 @@ class EmbeddingService:
 
         return embedding
 
+    async def embed_query(self, kb: KnowledgeBase, text: str) -> list[float]:
+        WHY: Search queries arrive in bursts (same question, many users)
+        HOW: Single-flight via embedding_coalescer (request_coalescer.py),
+             keyed by (provider, model, text) - concurrent identical
+             queries share one provider call
+
+        config = kb.embedding_config
+        key = embedding_coalescer.build_key(config["provider"], config["model"], text)
+
+        return await embedding_coalescer.run(
+            key,
+            lambda: asyncio.to_thread(self.embed_text, kb, text)
+        )
+
     def embed_chunks(self, kb: KnowledgeBase, chunks: list[Chunk]) -> list[list[float]]:
         WHY: Generate embeddings for multiple chunks (efficient)
         HOW: Batch processing with provider adapter
@@ -163,16 +177,12 @@ class EmbeddingService:
 
     def _truncate_text(self, text: str, max_tokens: int) -> str:
         WHY: Prevent exceeding model limits
-        HOW: Use tokenizer to count and truncate
-
-        # Simple approximation: 1 token ≈ 4 characters
-        # For production, use tiktoken or provider tokenizer
-        max_chars = max_tokens * 4
+        HOW: Shared cached BPE tokenizer (same one used for prompt budgets)
 
-        if len(text) <= max_chars:
-            return text
+        from app.services.token_budget_service import token_budget_service
 
-        return text[:max_chars]
+        # Exact token boundary instead of the old len/4 approximation
+        return token_budget_service.truncate_to_tokens(text, max_tokens)
 
     def validate_embedding_config(self, config: dict) -> bool:
         WHY: Verify config before creating KB
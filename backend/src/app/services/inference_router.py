@@ -0,0 +1,430 @@
+"""
+Inference Router - Latency-aware routing across upstream inference endpoints.
+
+WHY:
+- InferenceService targeted one SECRET_AI_BASE_URL (single point of failure)
+- One slow upstream replica sets the tail latency for every chat
+- Retrying only after a 30s timeout is far too late for chat UX
+
+HOW:
+- Each logical model maps to one or more endpoints (base_url, api_key, model)
+- Per endpoint: EWMA latency, EWMA error rate, recent latency window (p95)
+- Route to the lowest-score healthy endpoint (latency penalised by errors)
+- Hedging: if the primary has not answered by its observed p95, fire the
+  same request at the next-best endpoint and take whichever answers first
+- Hedges are capped at a fraction of traffic (no load amplification)
+- Circuit breaker: consecutive failures open the circuit for a cooldown,
+  then a single half-open probe decides whether to close it again
+- Fast failures fail over to the next endpoint immediately
+
+CONFIG (settings.SECRET_AI_ENDPOINTS, dict or JSON string):
+    {
+        "secret-ai-v1": [
+            {"base_url": "https://a.example/v1", "api_key": "...", "model": "secret-ai-v1"},
+            {"base_url": "https://b.example/v1"}
+        ]
+    }
+    Unlisted models use SECRET_AI_BASE_URL / SECRET_AI_API_KEY.
+
+PSEUDOCODE follows the existing codebase patterns.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+
+
+class NoHealthyEndpointError(Exception):
+    """Every endpoint for the model failed."""
+    pass
+
+
+@dataclass
+class Endpoint:
+    """One upstream inference endpoint and its live health statistics."""
+
+    name: str
+    base_url: str
+    api_key: str = ""
+    model: Optional[str] = None  # Upstream model name (None = logical name)
+
+    ewma_latency: Optional[float] = None  # Seconds
+    ewma_error_rate: float = 0.0
+    latencies: deque = field(default_factory=lambda: deque(maxlen=200))
+    inflight: int = 0
+    requests: int = 0
+    failures: int = 0
+
+    # Circuit breaker
+    consecutive_failures: int = 0
+    opened_at: Optional[float] = None
+    probe_inflight: bool = False
+
+
+    def p95(self, min_samples: int) -> Optional[float]:
+        """95th percentile latency of the recent window (None if too few samples)."""
+        if len(self.latencies) < min_samples:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)]
+
+
+class InferenceRouter:
+    """
+    Route inference calls to the fastest healthy endpoint, with hedging.
+
+    WHY: Lower tail latency and survive endpoint failures
+    HOW: EWMA scoring + p95 hedge timer + circuit breaker per endpoint
+    """
+
+    def __init__(self, endpoints: Optional[dict[str, list[dict]]] = None):
+        """
+        Initialize router.
+
+        ARGS:
+            endpoints: {logical_model: [endpoint config]} (default: settings)
+        """
+        self.ewma_alpha = getattr(settings, "INFERENCE_EWMA_ALPHA", 0.2)
+        self.error_penalty = getattr(settings, "INFERENCE_ERROR_PENALTY", 4.0)
+        self.breaker_threshold = getattr(settings, "INFERENCE_BREAKER_FAILURES", 5)
+        self.breaker_cooldown = getattr(settings, "INFERENCE_BREAKER_COOLDOWN_SECONDS", 30.0)
+        self.hedge_enabled = getattr(settings, "INFERENCE_HEDGE_ENABLED", True)
+        self.hedge_min_samples = getattr(settings, "INFERENCE_HEDGE_MIN_SAMPLES", 20)
+        self.hedge_max_ratio = getattr(settings, "INFERENCE_HEDGE_MAX_RATIO", 0.1)
+        self.max_attempts = getattr(settings, "INFERENCE_MAX_ATTEMPTS", 3)
+
+        if endpoints is None:
+            endpoints = getattr(settings, "SECRET_AI_ENDPOINTS", None) or {}
+            if isinstance(endpoints, str):
+                endpoints = json.loads(endpoints)
+
+        self.default_endpoint = {
+            "base_url": getattr(settings, "SECRET_AI_BASE_URL", "https://api.secret.ai/v1"),
+            "api_key": getattr(settings, "SECRET_AI_API_KEY", "")
+        }
+
+        self._pools: dict[str, list[Endpoint]] = {}
+        self._lock = threading.Lock()
+        self._stats = {"routed": 0, "hedged": 0, "hedge_wins": 0, "failovers": 0}
+
+        for logical_model, configs in endpoints.items():
+            self._pools[logical_model] = [
+                self._make_endpoint(logical_model, index, config)
+                for index, config in enumerate(configs)
+            ]
+
+
+    def _make_endpoint(self, logical_model: str, index: int, config: dict) -> Endpoint:
+        """Build Endpoint from config dict (missing keys use defaults)."""
+        return Endpoint(
+            name=config.get("name") or f"{logical_model}#{index}",
+            base_url=config.get("base_url", self.default_endpoint["base_url"]).rstrip("/"),
+            api_key=config.get("api_key", self.default_endpoint["api_key"]),
+            model=config.get("model")
+        )
+
+
+    def get_endpoints(self, logical_model: str) -> list[Endpoint]:
+        """Endpoints for a logical model (single default endpoint if unconfigured)."""
+        with self._lock:
+            if logical_model not in self._pools:
+                self._pools[logical_model] = [
+                    self._make_endpoint(logical_model, 0, self.default_endpoint)
+                ]
+            return self._pools[logical_model]
+
+
+    # ------------------------------------------------------------------
+    # Selection and health
+    # ------------------------------------------------------------------
+
+    def _score(self, endpoint: Endpoint) -> float:
+        """
+        Lower is better.
+
+        HOW: EWMA latency inflated by error rate and current load;
+             unmeasured endpoints score 0 so they get sampled
+        """
+        latency = endpoint.ewma_latency or 0.0
+        return latency * (1 + self.error_penalty * endpoint.ewma_error_rate) * (1 + endpoint.inflight)
+
+
+    def _is_available(self, endpoint: Endpoint, now: float) -> bool:
+        """Circuit closed, or open long enough to allow one half-open probe."""
+        if endpoint.opened_at is None:
+            return True
+        return now - endpoint.opened_at >= self.breaker_cooldown and not endpoint.probe_inflight
+
+
+    def _ranked(self, logical_model: str, exclude: tuple = ()) -> list[Endpoint]:
+        """Available endpoints best-first (all endpoints if every circuit is open)."""
+        endpoints = [e for e in self.get_endpoints(logical_model) if e not in exclude]
+        now = time.monotonic()
+
+        with self._lock:
+            available = [e for e in endpoints if self._is_available(e, now)]
+            if not available and not exclude:
+                # Everything is open - best effort rather than hard failure
+                available = sorted(endpoints, key=lambda e: e.opened_at or 0.0)
+                return available
+            return sorted(available, key=self._score)
+
+
+    def _acquire(self, endpoint: Endpoint):
+        """Mark request start (half-open endpoints allow a single probe)."""
+        with self._lock:
+            endpoint.inflight += 1
+            endpoint.requests += 1
+            if endpoint.opened_at is not None:
+                endpoint.probe_inflight = True
+
+
+    def _record(self, endpoint: Endpoint, latency: float, ok: bool):
+        """Update EWMA statistics and circuit breaker after a call."""
+        alpha = self.ewma_alpha
+
+        with self._lock:
+            endpoint.inflight -= 1
+            endpoint.ewma_error_rate += alpha * ((0.0 if ok else 1.0) - endpoint.ewma_error_rate)
+
+            if ok:
+                endpoint.latencies.append(latency)
+                if endpoint.ewma_latency is None:
+                    endpoint.ewma_latency = latency
+                else:
+                    endpoint.ewma_latency += alpha * (latency - endpoint.ewma_latency)
+
+                endpoint.consecutive_failures = 0
+                endpoint.opened_at = None
+            else:
+                endpoint.failures += 1
+                endpoint.consecutive_failures += 1
+                if endpoint.opened_at is not None or endpoint.consecutive_failures >= self.breaker_threshold:
+                    # Trip (or re-trip after a failed probe)
+                    endpoint.opened_at = time.monotonic()
+
+            endpoint.probe_inflight = False
+
+
+    def _invoke(self, endpoint: Endpoint, call: Callable[[Endpoint], Any], is_failure: Callable[[Exception], bool]):
+        """
+        Run call(endpoint) and record the outcome.
+
+        NOTE: Runs in a worker thread; a hedge loser still finishes here,
+              so its latency is recorded even though its result is discarded
+        """
+        self._acquire(endpoint)
+        start = time.perf_counter()
+        try:
+            result = call(endpoint)
+        except Exception as e:
+            self._record(endpoint, time.perf_counter() - start, ok=not is_failure(e))
+            raise
+        self._record(endpoint, time.perf_counter() - start, ok=True)
+        return result
+
+
+    def _hedge_allowed(self) -> bool:
+        """Keep hedges under hedge_max_ratio of routed requests."""
+        with self._lock:
+            return self._stats["hedged"] < self._stats["routed"] * self.hedge_max_ratio + 1
+
+
+    # ------------------------------------------------------------------
+    # Routing
+    # ------------------------------------------------------------------
+
+    async def call(
+        self,
+        logical_model: str,
+        call: Callable[[Endpoint], Any],
+        is_failure: Callable[[Exception], bool] = lambda e: True,
+        hedge: bool = True
+    ) -> Any:
+        """
+        Route a blocking call to the best endpoint (with hedging and failover).
+
+        FLOW:
+        1. Start call on best endpoint (worker thread)
+        2. Not finished by its p95? Start hedge on next-best endpoint
+        3. First success wins
+        4. A failure the endpoint is to blame for (is_failure) fails over
+           to the next untried endpoint, up to max_attempts; other errors
+           (bad request, auth) are raised as-is
+
+        ARGS:
+            logical_model: Model name used by callers
+            call: Blocking function (endpoint) -> result
+            is_failure: Whether an exception counts against the endpoint
+            hedge: Allow hedged requests (off when a discarded result would
+                   leak a resource, e.g. an open stream)
+
+        RETURNS:
+            call() result from the winning endpoint
+        """
+
+        with self._lock:
+            self._stats["routed"] += 1
+
+        tried: list[Endpoint] = []
+        pending: dict[asyncio.Task, Endpoint] = {}
+        last_error: Optional[Exception] = None
+        hedged = False
+
+        def launch(endpoint: Endpoint):
+            tried.append(endpoint)
+            task = asyncio.ensure_future(
+                asyncio.to_thread(self._invoke, endpoint, call, is_failure)
+            )
+            pending[task] = endpoint
+
+        try:
+            while True:
+                if not pending:
+                    candidates = self._ranked(logical_model, exclude=tuple(tried))
+                    if not candidates or len(tried) >= self.max_attempts:
+                        break
+                    if tried:
+                        with self._lock:
+                            self._stats["failovers"] += 1
+                    launch(candidates[0])
+
+                # Hedge timer: primary's p95 (only once, only with enough data)
+                timeout = None
+                if hedge and self.hedge_enabled and not hedged and len(pending) == 1:
+                    primary = next(iter(pending.values()))
+                    timeout = primary.p95(self.hedge_min_samples)
+
+                done, _ = await asyncio.wait(
+                    pending.keys(),
+                    timeout=timeout,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not done:
+                    # Primary is slower than its p95 - hedge
+                    hedged = True
+                    candidates = self._ranked(logical_model, exclude=tuple(tried))
+                    if candidates and self._hedge_allowed():
+                        with self._lock:
+                            self._stats["hedged"] += 1
+                        launch(candidates[0])
+                    continue
+
+                for task in done:
+                    endpoint = pending.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        if not is_failure(e):
+                            raise
+                        last_error = e
+                        continue
+
+                    if endpoint is not tried[0]:
+                        with self._lock:
+                            self._stats["hedge_wins"] += 1
+                    return result
+        finally:
+            # Losers keep running in their threads (and still record stats)
+            for task in pending:
+                task.cancel()
+
+        if last_error is not None:
+            raise last_error
+        raise NoHealthyEndpointError(f"No healthy endpoint for model '{logical_model}'")
+
+
+    def call_sync(
+        self,
+        logical_model: str,
+        call: Callable[[Endpoint], Any],
+        is_failure: Callable[[Exception], bool] = lambda e: True
+    ) -> Any:
+        """
+        Blocking variant for non-async contexts (Celery tasks).
+
+        HOW: Best endpoint + failover, no hedging
+        """
+
+        with self._lock:
+            self._stats["routed"] += 1
+
+        tried: list[Endpoint] = []
+        last_error: Optional[Exception] = None
+
+        while len(tried) < self.max_attempts:
+            candidates = self._ranked(logical_model, exclude=tuple(tried))
+            if not candidates:
+                break
+            if tried:
+                with self._lock:
+                    self._stats["failovers"] += 1
+
+            endpoint = candidates[0]
+            tried.append(endpoint)
+            try:
+                return self._invoke(endpoint, call, is_failure)
+            except Exception as e:
+                if not is_failure(e):
+                    raise
+                last_error = e
+
+        if last_error is not None:
+            raise last_error
+        raise NoHealthyEndpointError(f"No healthy endpoint for model '{logical_model}'")
+
+
+    def get_stats(self) -> dict:
+        """
+        Get routing metrics and per-endpoint health.
+
+        RETURNS:
+            {
+                "routed": 100, "hedged": 4, "hedge_wins": 3, "failovers": 1,
+                "endpoints": {
+                    "secret-ai-v1#0": {
+                        "ewma_latency_ms": 820, "p95_ms": 1400,
+                        "error_rate": 0.02, "circuit": "closed", ...
+                    }
+                }
+            }
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            stats = dict(self._stats)
+            stats["endpoints"] = {}
+
+            for endpoints in self._pools.values():
+                for endpoint in endpoints:
+                    if endpoint.opened_at is None:
+                        circuit = "closed"
+                    elif now - endpoint.opened_at >= self.breaker_cooldown:
+                        circuit = "half_open"
+                    else:
+                        circuit = "open"
+
+                    p95 = endpoint.p95(1)
+                    stats["endpoints"][endpoint.name] = {
+                        "base_url": endpoint.base_url,
+                        "ewma_latency_ms": round(endpoint.ewma_latency * 1000) if endpoint.ewma_latency else None,
+                        "p95_ms": round(p95 * 1000) if p95 else None,
+                        "error_rate": round(endpoint.ewma_error_rate, 4),
+                        "requests": endpoint.requests,
+                        "failures": endpoint.failures,
+                        "inflight": endpoint.inflight,
+                        "circuit": circuit
+                    }
+
+        return stats
+
+
+# Global instance
+inference_router = InferenceRouter()
@@ -12,15 +12,23 @@ HOW:
 - Handle streaming responses
 - Track token usage
 - Retry on failures
+- Serve repeated temperature-0 requests from completion_cache
+- Coalesce identical concurrent temperature-0 requests into one upstream call
+- Route across upstream endpoints via inference_router (EWMA, hedging,
+  circuit breaker)
 
 PSEUDOCODE follows the existing codebase patterns.
 """
 
+import asyncio
 import requests
 import json
 from typing import AsyncIterator, Optional
 
 from app.core.config import settings
+from app.services.completion_cache import completion_cache
+from app.services.request_coalescer import inference_coalescer
+from app.services.inference_router import Endpoint, inference_router
 
 
 class InferenceError(Exception):
@@ -38,6 +46,11 @@ class AuthError(InferenceError):
     pass
 
 
+class UpstreamError(InferenceError):
+    """Upstream server error (5xx) - another endpoint may succeed."""
+    pass
+
+
 class InferenceService:
     """
     Secret AI integration for LLM inference.
@@ -53,8 +66,11 @@ class InferenceService:
         WHY: Load API key from settings
         HOW: Configure base URL and auth
         """
-        self.api_key = settings.SECRET_AI_API_KEY
+        self.api_key = getattr(settings, "SECRET_AI_API_KEY", "")
         self.base_url = getattr(settings, "SECRET_AI_BASE_URL", "https://api.secret.ai/v1")
+        self.completion_cache = completion_cache
+        self.coalescer = inference_coalescer
+        self.router = inference_router
 
 
     async def generate(
@@ -63,7 +79,8 @@ class InferenceService:
         model: str = "secret-ai-v1",
         temperature: float = 0.7,
         max_tokens: int = 2000,
-        stop: Optional[list[str]] = None
+        stop: Optional[list[str]] = None,
+        use_cache: bool = True
     ) -> dict:
         """
         Generate AI response (non-streaming).
@@ -74,6 +91,7 @@ class InferenceService:
             temperature: Randomness (0.0 = deterministic, 1.0 = creative)
             max_tokens: Maximum response length
             stop: Stop sequences
+            use_cache: Serve/store via completion cache (temperature 0 only)
 
         RETURNS:
             {
@@ -86,11 +104,6 @@ class InferenceService:
             }
         """
 
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-
         payload = {
             "model": model,
             "prompt": prompt,
@@ -99,21 +112,89 @@ class InferenceService:
             "stop": stop or []
         }
 
+        # Deterministic requests can be answered from the completion cache
+        cache_key = None
+        if use_cache and self.completion_cache.is_cacheable(temperature):
+            cache_key = self.completion_cache.build_key(model, prompt, temperature, max_tokens, stop)
+            cached = self.completion_cache.get(cache_key)
+            if cached is not None:
+                return self._cache_hit(cached)
+
+        async def request_completion():
+            data = await self.router.call(
+                model,
+                lambda endpoint: self._post_json(endpoint, "/completions", payload),
+                is_failure=self._is_endpoint_failure
+            )
+
+            result = {
+                "text": data["choices"][0]["text"],
+                "usage": data["usage"]
+            }
+
+            if cache_key:
+                self.completion_cache.set(cache_key, result)
+
+            return result
+
+        # Sampled requests must stay independent (each user gets their own sample)
+        if not self._is_deterministic(temperature):
+            return await request_completion()
+
+        # Identical concurrent requests share one upstream call
+        coalesce_key = self.coalescer.build_key("completions", payload)
+        return await self.coalescer.run(coalesce_key, request_completion)
+
+
+    @staticmethod
+    def _is_deterministic(temperature: Optional[float]) -> bool:
+        """Greedy decoding (temperature 0) - identical requests, identical answers."""
+        return temperature is not None and float(temperature) == 0.0
+
+
+    @staticmethod
+    def _cache_hit(cached: dict) -> dict:
+        """
+        Result served from completion_cache.
+
+        WHY: No upstream tokens were spent - metering and analytics bill the
+             returned usage, so it is zeroed (original kept as cached_usage)
+        """
+        usage = cached.get("usage") or {}
+        return {
+            **cached,
+            "usage": {key: 0 for key in usage} or {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            "cached_usage": usage,
+            "cached": True
+        }
+
+
+    def _post_json(self, endpoint: Endpoint, path: str, payload: dict) -> dict:
+        """
+        POST to one upstream endpoint and map errors.
+
+        WHY: Shared by all non-streaming generators (called by inference_router)
+        HOW: requests.post + status code -> InferenceError subclasses
+        """
+
+        headers = {
+            "Authorization": f"Bearer {endpoint.api_key or self.api_key}",
+            "Content-Type": "application/json"
+        }
+
+        if endpoint.model:
+            payload = {**payload, "model": endpoint.model}
+
         try:
             response = requests.post(
-                f"{self.base_url}/completions",
+                f"{endpoint.base_url}{path}",
                 headers=headers,
                 json=payload,
                 timeout=30
             )
 
             response.raise_for_status()
-            data = response.json()
-
-            return {
-                "text": data["choices"][0]["text"],
-                "usage": data["usage"]
-            }
+            return response.json()
 
         except requests.exceptions.Timeout:
             raise TimeoutError("Secret AI request timed out")
@@ -123,62 +204,167 @@ class InferenceService:
                 raise RateLimitError("Rate limit exceeded")
             elif e.response.status_code == 401:
                 raise AuthError("Invalid API key")
+            elif e.response.status_code >= 500:
+                raise UpstreamError(f"API error: {e}")
             else:
                 raise InferenceError(f"API error: {e}")
 
 
+    def _is_endpoint_failure(self, error: Exception) -> bool:
+        """
+        Whether an error counts against the endpoint (failover + breaker).
+
+        WHY: A bad request fails on every endpoint - don't retry it
+        """
+        return isinstance(error, (
+            TimeoutError,
+            RateLimitError,
+            UpstreamError,
+            requests.exceptions.ConnectionError
+        ))
+
+
     async def generate_stream(
         self,
         prompt: str,
         model: str = "secret-ai-v1",
         temperature: float = 0.7,
-        max_tokens: int = 2000
+        max_tokens: int = 2000,
+        usage: Optional[dict] = None
     ) -> AsyncIterator[str]:
         """
         Generate AI response with streaming.
 
-        WHY: Real-time response display in widget
-        HOW: Server-sent events (SSE)
+        WHY: Real-time response display in widget and messaging channels
+        HOW: Server-sent events (SSE) from the endpoint inference_router
+             picks; blocking reads run in a worker thread so the event
+             loop keeps serving other chats
+
+        ARGS:
+            usage: Optional dict filled with the final usage block
+                   (when the upstream reports one)
 
         YIELDS:
             Text chunks as they arrive
         """
 
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-
         payload = {
             "model": model,
             "prompt": prompt,
             "temperature": temperature,
             "max_tokens": max_tokens,
-            "stream": True
+            "stream": True,
+            "stream_options": {"include_usage": True}
         }
 
-        response = requests.post(
-            f"{self.base_url}/completions",
-            headers=headers,
-            json=payload,
-            stream=True,
-            timeout=60
+        # Endpoint chosen by the router; failures up to the first token fail
+        # over, once text has been yielded the stream stays on its endpoint
+        response, lines, buffered = await self.router.call(
+            model,
+            lambda endpoint: self._open_stream(endpoint, "/completions", payload),
+            is_failure=self._is_endpoint_failure,
+            hedge=False
         )
 
-        response.raise_for_status()
+        try:
+            event = buffered.pop(0) if buffered else None
+            while event is not None:
+                if usage is not None and event.get("usage"):
+                    usage.update(event["usage"])
+
+                if event.get("choices"):
+                    chunk = event["choices"][0].get("text", "")
+                    if chunk:
+                        yield chunk
+
+                if buffered:
+                    event = buffered.pop(0)
+                else:
+                    event = await asyncio.to_thread(self._next_event, lines)
+        finally:
+            response.close()
+
+
+    def _open_stream(self, endpoint: Endpoint, path: str, payload: dict):
+        """
+        Open an SSE stream on one endpoint and read up to its first token.
+
+        WHY: Called by inference_router - a refused connection, 5xx or a
+             stream that dies before any text still fails over
+             (the recorded latency is time to first token)
+
+        RETURNS:
+            (response, line iterator, events read so far)
+        """
+
+        headers = {
+            "Authorization": f"Bearer {endpoint.api_key or self.api_key}",
+            "Content-Type": "application/json"
+        }
+
+        if endpoint.model:
+            payload = {**payload, "model": endpoint.model}
 
-        # Parse SSE stream
-        for line in response.iter_lines():
-            if line:
-                line = line.decode('utf-8')
+        try:
+            response = requests.post(
+                f"{endpoint.base_url}{path}",
+                headers=headers,
+                json=payload,
+                stream=True,
+                timeout=60
+            )
+        except requests.exceptions.Timeout:
+            raise TimeoutError("Secret AI request timed out")
 
-                if line.startswith("data: "):
-                    data = json.loads(line[6:])
+        try:
+            response.raise_for_status()
+            lines = response.iter_lines()
+
+            buffered = []
+            while True:
+                event = self._next_event(lines)
+                if event is None:
+                    return response, lines, buffered
+                buffered.append(event)
+                if event.get("choices") and event["choices"][0].get("text"):
+                    return response, lines, buffered
+
+        except requests.exceptions.HTTPError as e:
+            response.close()
+            if e.response.status_code == 429:
+                raise RateLimitError("Rate limit exceeded")
+            elif e.response.status_code == 401:
+                raise AuthError("Invalid API key")
+            elif e.response.status_code >= 500:
+                raise UpstreamError(f"API error: {e}")
+            else:
+                raise InferenceError(f"API error: {e}")
 
-                    if data.get("choices"):
-                        chunk = data["choices"][0].get("text", "")
-                        if chunk:
-                            yield chunk
+        except requests.exceptions.RequestException as e:
+            response.close()
+            raise UpstreamError(f"Stream failed before first event: {e}")
+
+        except BaseException:
+            response.close()
+            raise
+
+
+    @staticmethod
+    def _next_event(lines) -> Optional[dict]:
+        """Next parsed SSE data event (None at [DONE] / end of stream)."""
+
+        for line in lines:
+            if not line:
+                continue
+
+            line = line.decode('utf-8')
+
+            if line.startswith("data: "):
+                if line[6:].strip() == "[DONE]":
+                    return None
+                return json.loads(line[6:])
+
+        return None
 
 
     async def generate_chat(
@@ -186,7 +372,8 @@ class InferenceService:
         messages: list[dict],
         model: str = "secret-ai-v1",
         temperature: float = 0.7,
-        max_tokens: int = 2000
+        max_tokens: int = 2000,
+        use_cache: bool = True
     ) -> dict:
         """
         Generate response using chat completion API.
@@ -201,6 +388,7 @@ class InferenceService:
                 {"role": "assistant", "content": "Hi!"},
                 {"role": "user", "content": "How are you?"}
             ]
+            use_cache: Serve/store via completion cache (temperature 0 only)
 
         RETURNS:
             {
@@ -209,11 +397,6 @@ class InferenceService:
             }
         """
 
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-
         payload = {
             "model": model,
             "messages": messages,
@@ -221,32 +404,38 @@ class InferenceService:
             "max_tokens": max_tokens
         }
 
-        try:
-            response = requests.post(
-                f"{self.base_url}/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=30
+        # Deterministic requests can be answered from the completion cache
+        cache_key = None
+        if use_cache and self.completion_cache.is_cacheable(temperature):
+            cache_key = self.completion_cache.build_key(model, messages, temperature, max_tokens)
+            cached = self.completion_cache.get(cache_key)
+            if cached is not None:
+                return self._cache_hit(cached)
+
+        async def request_chat_completion():
+            data = await self.router.call(
+                model,
+                lambda endpoint: self._post_json(endpoint, "/chat/completions", payload),
+                is_failure=self._is_endpoint_failure
             )
 
-            response.raise_for_status()
-            data = response.json()
-
-            return {
+            result = {
                 "text": data["choices"][0]["message"]["content"],
                 "usage": data["usage"]
             }
 
-        except requests.exceptions.Timeout:
-            raise TimeoutError("Secret AI request timed out")
+            if cache_key:
+                self.completion_cache.set(cache_key, result)
 
-        except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 429:
-                raise RateLimitError("Rate limit exceeded")
-            elif e.response.status_code == 401:
-                raise AuthError("Invalid API key")
-            else:
-                raise InferenceError(f"API error: {e}")
+            return result
+
+        # Sampled requests must stay independent (each user gets their own sample)
+        if not self._is_deterministic(temperature):
+            return await request_chat_completion()
+
+        # Identical concurrent requests share one upstream call
+        coalesce_key = self.coalescer.build_key("chat/completions", payload)
+        return await self.coalescer.run(coalesce_key, request_chat_completion)
 
 
     def generate_sync(
@@ -255,7 +444,8 @@ class InferenceService:
         model: str = "secret-ai-v1",
         temperature: float = 0.7,
         max_tokens: int = 2000,
-        stop: Optional[list[str]] = None
+        stop: Optional[list[str]] = None,
+        use_cache: bool = True
     ) -> dict:
         """
         Generate AI response (synchronous version).
@@ -269,6 +459,7 @@ class InferenceService:
             temperature: Randomness
             max_tokens: Maximum response length
             stop: Stop sequences
+            use_cache: Serve/store via completion cache (temperature 0 only)
 
         RETURNS:
             {
@@ -277,11 +468,6 @@ class InferenceService:
             }
         """
 
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-
         payload = {
             "model": model,
             "prompt": prompt,
@@ -290,32 +476,29 @@ class InferenceService:
             "stop": stop or []
         }
 
-        try:
-            response = requests.post(
-                f"{self.base_url}/completions",
-                headers=headers,
-                json=payload,
-                timeout=30
-            )
-
-            response.raise_for_status()
-            data = response.json()
+        # Deterministic requests can be answered from the completion cache
+        cache_key = None
+        if use_cache and self.completion_cache.is_cacheable(temperature):
+            cache_key = self.completion_cache.build_key(model, prompt, temperature, max_tokens, stop)
+            cached = self.completion_cache.get(cache_key)
+            if cached is not None:
+                return self._cache_hit(cached)
+
+        data = self.router.call_sync(
+            model,
+            lambda endpoint: self._post_json(endpoint, "/completions", payload),
+            is_failure=self._is_endpoint_failure
+        )
 
-            return {
-                "text": data["choices"][0]["text"],
-                "usage": data["usage"]
-            }
+        result = {
+            "text": data["choices"][0]["text"],
+            "usage": data["usage"]
+        }
 
-        except requests.exceptions.Timeout:
-            raise TimeoutError("Secret AI request timed out")
+        if cache_key:
+            self.completion_cache.set(cache_key, result)
 
-        except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 429:
-                raise RateLimitError("Rate limit exceeded")
-            elif e.response.status_code == 401:
-                raise AuthError("Invalid API key")
-            else:
-                raise InferenceError(f"API error: {e}")
+        return result
 
 
     def generate_chat_sync(
@@ -323,7 +506,8 @@ class InferenceService:
         messages: list[dict],
         model: str = "secret-ai-v1",
         temperature: float = 0.7,
-        max_tokens: int = 2000
+        max_tokens: int = 2000,
+        use_cache: bool = True
     ) -> dict:
         """
         Generate chat response (synchronous version).
@@ -336,6 +520,7 @@ class InferenceService:
             model: Model name
             temperature: Randomness
             max_tokens: Maximum response length
+            use_cache: Serve/store via completion cache (temperature 0 only)
 
         RETURNS:
             {
@@ -344,11 +529,6 @@ class InferenceService:
             }
         """
 
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-
         payload = {
             "model": model,
             "messages": messages,
@@ -356,32 +536,29 @@ class InferenceService:
             "max_tokens": max_tokens
         }
 
-        try:
-            response = requests.post(
-                f"{self.base_url}/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=30
-            )
-
-            response.raise_for_status()
-            data = response.json()
+        # Deterministic requests can be answered from the completion cache
+        cache_key = None
+        if use_cache and self.completion_cache.is_cacheable(temperature):
+            cache_key = self.completion_cache.build_key(model, messages, temperature, max_tokens)
+            cached = self.completion_cache.get(cache_key)
+            if cached is not None:
+                return self._cache_hit(cached)
+
+        data = self.router.call_sync(
+            model,
+            lambda endpoint: self._post_json(endpoint, "/chat/completions", payload),
+            is_failure=self._is_endpoint_failure
+        )
 
-            return {
-                "text": data["choices"][0]["message"]["content"],
-                "usage": data["usage"]
-            }
+        result = {
+            "text": data["choices"][0]["message"]["content"],
+            "usage": data["usage"]
+        }
 
-        except requests.exceptions.Timeout:
-            raise TimeoutError("Secret AI request timed out")
+        if cache_key:
+            self.completion_cache.set(cache_key, result)
 
-        except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 429:
-                raise RateLimitError("Rate limit exceeded")
-            elif e.response.status_code == 401:
-                raise AuthError("Invalid API key")
-            else:
-                raise InferenceError(f"API error: {e}")
+        return result
 
 
 # Global instance
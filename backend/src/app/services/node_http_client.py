@@ -0,0 +1,321 @@
+"""
+Node HTTP Client - Shared async HTTP client and GET cache for chatflow nodes.
+
+WHY:
+- HTTP nodes called blocking requests.request() inside async code,
+  stalling the event loop (and every concurrent branch) per call
+- A new connection (TCP + TLS) was opened for every request
+- Lookup APIs called with the same URL on every message dominated flow
+  latency
+
+HOW:
+- One pooled httpx.AsyncClient (keep-alive) per event loop
+- Per-host concurrency limit (semaphore) on top of the global pool limits,
+  so one slow API cannot take every connection
+- Opt-in GET cache (node config "cache": true / "cache_ttl": seconds):
+  - Key: method + resolved URL + request headers + credential id
+  - Cache-Control: no-store is never cached; max-age / s-maxage sets
+    freshness; otherwise the node TTL applies
+  - Stale entries with ETag / Last-Modified are revalidated with
+    If-None-Match / If-Modified-Since; a 304 refreshes the entry
+  - Only 200 responses up to NODE_HTTP_CACHE_MAX_BODY_BYTES, bounded LRU
+
+PSEUDOCODE follows the existing codebase patterns.
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.core.config import settings
+
+
+# Body is stored decoded; these would describe the wire format
+STRIPPED_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+
+class _CachedResponse:
+    """Stored GET response."""
+
+    __slots__ = ("content", "headers", "fresh_until", "etag", "last_modified")
+
+    def __init__(self, content: bytes, headers: dict, fresh_until: float):
+        self.content = content
+        self.headers = headers
+        self.fresh_until = fresh_until
+        self.etag = headers.get("etag")
+        self.last_modified = headers.get("last-modified")
+
+    @property
+    def revalidatable(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+
+def parse_cache_control(value: Optional[str]) -> dict:
+    """
+    "max-age=60, no-cache" -> {"max-age": "60", "no-cache": True}
+    """
+
+    directives = {}
+    for part in (value or "").split(","):
+        name, _, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip('" ') if argument else True
+    return directives
+
+
+def cache_ttl_from_config(config: dict) -> Optional[float]:
+    """
+    Node cache setting -> request(cache_ttl=...).
+
+    CONFIG:
+        "cache_ttl": 60     # cache GETs, 60s unless the response says otherwise
+        "cache": true       # cache GETs per Cache-Control / ETag only
+    """
+
+    if config.get("cache_ttl") is not None:
+        return float(config["cache_ttl"])
+    return 0.0 if config.get("cache") else None
+
+
+class NodeHTTPClient:
+    """
+    Shared HTTP client for chatflow nodes.
+
+    WHY: Keep-alive connections and cached lookups across flow runs
+    HOW: Loop-bound pooled client + per-host semaphores + LRU GET cache
+    """
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        """
+        Initialize client settings (connections are opened lazily).
+
+        ARGS:
+            transport: Optional httpx transport (tests)
+        """
+
+        self.max_connections = getattr(settings, "NODE_HTTP_MAX_CONNECTIONS", 100)
+        self.max_keepalive = getattr(settings, "NODE_HTTP_MAX_KEEPALIVE_CONNECTIONS", 20)
+        self.keepalive_expiry = getattr(settings, "NODE_HTTP_KEEPALIVE_EXPIRY_SECONDS", 30.0)
+        self.max_per_host = getattr(settings, "NODE_HTTP_MAX_CONNECTIONS_PER_HOST", 10)
+        self.cache_max_entries = getattr(settings, "NODE_HTTP_CACHE_MAX_ENTRIES", 1000)
+        self.cache_max_body = getattr(settings, "NODE_HTTP_CACHE_MAX_BODY_BYTES", 1024 * 1024)
+
+        self._transport = transport
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._hosts: dict[str, asyncio.Semaphore] = {}
+
+        self._cache: "OrderedDict[str, _CachedResponse]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._stats = {"requests": 0, "hits": 0, "misses": 0, "revalidated": 0, "stored": 0}
+
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[dict] = None,
+        json_body: Any = None,
+        timeout: float = 30,
+        cache_ttl: Optional[float] = None,
+        credential_id: Optional[str] = None
+    ) -> Tuple[httpx.Response, str]:
+        """
+        Send a request through the shared pool.
+
+        ARGS:
+            method: HTTP method
+            url: Resolved URL
+            headers: Request headers (including auth)
+            json_body: JSON body (ignored for GET)
+            timeout: Request timeout in seconds
+            cache_ttl: Enables the GET cache; fallback freshness in seconds
+                       when the response has no max-age (0 = revalidate only)
+            credential_id: Credential used (part of the cache key)
+
+        RETURNS:
+            (response, cache_status) where cache_status is
+            "bypass" | "miss" | "hit" | "revalidated"
+        """
+
+        method = method.upper()
+        headers = dict(headers or {})
+        self._stats["requests"] += 1
+
+        if method != "GET" or cache_ttl is None:
+            return await self._send(method, url, headers, json_body, timeout), "bypass"
+
+        key = self._cache_key(method, url, headers, credential_id)
+        entry = self._cache_get(key)
+
+        if entry is not None and entry.fresh_until > time.monotonic():
+            self._stats["hits"] += 1
+            return self._from_cache(method, url, entry), "hit"
+
+        if entry is not None and entry.revalidatable:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        response = await self._send(method, url, headers, None, timeout)
+
+        if response.status_code == 304 and entry is not None:
+            self._stats["revalidated"] += 1
+            merged = {**entry.headers, **{k.lower(): v for k, v in response.headers.items()}}
+            self._store(key, entry.content, merged, cache_ttl)
+            return self._from_cache(method, url, self._cache_get(key) or entry), "revalidated"
+
+        self._stats["misses"] += 1
+        if response.status_code == 200:
+            await response.aread()
+            self._store(key, response.content, {k.lower(): v for k, v in response.headers.items()}, cache_ttl)
+
+        return response, "miss"
+
+
+    def invalidate(self, url: Optional[str] = None):
+        """Drop cached responses (all, or every entry for a URL)."""
+
+        with self._cache_lock:
+            if url is None:
+                self._cache.clear()
+                return
+            marker = f"\n{url}\n"
+            for key in [k for k in self._cache if marker in k]:
+                del self._cache[key]
+
+
+    async def aclose(self):
+        """Close pooled connections (application shutdown)."""
+
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+        self._hosts = {}
+
+
+    def get_stats(self) -> dict:
+        """Client and cache counters for monitoring."""
+        return {**self._stats, "cache_entries": len(self._cache), "hosts": len(self._hosts)}
+
+
+    # ------------------------------------------------------------------
+    # Transport
+    # ------------------------------------------------------------------
+
+    async def _send(self, method: str, url: str, headers: dict, json_body: Any, timeout: float) -> httpx.Response:
+        client = self._get_client()
+
+        host = urlsplit(url).netloc
+        semaphore = self._hosts.get(host)
+        if semaphore is None:
+            semaphore = self._hosts[host] = asyncio.Semaphore(self.max_per_host)
+
+        async with semaphore:
+            return await client.request(
+                method,
+                url,
+                headers=headers,
+                json=json_body if method in ("POST", "PUT", "PATCH") else None,
+                timeout=timeout
+            )
+
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Pooled client for the running loop (rebuilt if the loop changed)."""
+
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop or self._client is None:
+            self._loop = loop
+            self._hosts = {}
+            self._client = httpx.AsyncClient(
+                follow_redirects=True,
+                transport=self._transport,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive,
+                    keepalive_expiry=self.keepalive_expiry
+                )
+            )
+        return self._client
+
+
+    # ------------------------------------------------------------------
+    # Cache
+    # ------------------------------------------------------------------
+
+    def _cache_key(self, method: str, url: str, headers: dict, credential_id: Optional[str]) -> str:
+        """Key readable up to the URL, hashed after (headers hold secrets)."""
+
+        header_items = sorted((k.lower(), str(v)) for k, v in headers.items())
+        digest = hashlib.sha256(
+            json.dumps([header_items, str(credential_id or "")], separators=(",", ":")).encode()
+        ).hexdigest()
+        return f"{method}\n{url}\n{digest}"
+
+
+    def _cache_get(self, key: str) -> Optional[_CachedResponse]:
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+            return entry
+
+
+    def _store(self, key: str, content: bytes, headers: dict, cache_ttl: float):
+        """Store a response if its Cache-Control allows it."""
+
+        directives = parse_cache_control(headers.get("cache-control"))
+
+        if "no-store" in directives or len(content) > self.cache_max_body:
+            return
+
+        if "no-cache" in directives:
+            ttl = 0.0
+        else:
+            max_age = directives.get("s-maxage") or directives.get("max-age")
+            try:
+                ttl = float(max_age) if max_age not in (None, True) else float(cache_ttl)
+            except ValueError:
+                ttl = float(cache_ttl)
+
+        headers = {k: v for k, v in headers.items() if k not in STRIPPED_HEADERS}
+        entry = _CachedResponse(content, headers, time.monotonic() + max(ttl, 0.0))
+
+        # Nothing to serve fresh and nothing to revalidate with
+        if ttl <= 0 and not entry.revalidatable:
+            return
+
+        with self._cache_lock:
+            self._cache[key] = entry
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_max_entries:
+                self._cache.popitem(last=False)
+
+        self._stats["stored"] += 1
+
+
+    def _from_cache(self, method: str, url: str, entry: _CachedResponse) -> httpx.Response:
+        return httpx.Response(
+            status_code=200,
+            headers=entry.headers,
+            content=entry.content,
+            request=httpx.Request(method, url)
+        )
+
+
+# Global instance
+node_http_client = NodeHTTPClient()
@@ -0,0 +1,419 @@
+"""
+Outbound Delivery Service - Rate-aware, pooled message delivery to channels.
+
+WHY:
+- Integrations sent each reply with a blocking requests.post (new
+  connection per reply, no pooling)
+- Platform limits were ignored (Telegram ~30 msg/s per bot and ~1 msg/s
+  per chat); bursts got 429s and replies were dropped
+- 429 responses carry Retry-After hints that were never honoured
+
+HOW:
+- One pooled httpx.AsyncClient per platform (keep-alive connections)
+- Token buckets per bot and per chat; callers wait for capacity instead
+  of being rejected by the platform
+- 429: pause the bucket for Retry-After (header or JSON body), retry
+- 5xx / transport errors: exponential backoff, bounded retries
+- Batched delivery: replies queued for the same chat while it is
+  throttled are merged into one message (up to the platform's length
+  limit); texts over the limit are split into several messages
+
+PLATFORM LIMITS (defaults, override via OUTBOUND_RATE_LIMITS):
+- telegram: 30/s per bot, 1/s per chat, 4096 chars
+- whatsapp: 80/s per phone number, 1/s per recipient, 4096 chars
+- discord:  50/s per application, 5 per 2s per interaction, 2000 chars
+
+PSEUDOCODE follows the existing codebase patterns.
+"""
+
+import asyncio
+import hashlib
+import time
+from typing import Any, Callable, Optional
+
+import httpx
+
+from app.core.config import settings
+
+
+DEFAULT_PLATFORM_LIMITS = {
+    "telegram": {"bot_rate": 30.0, "bot_burst": 30, "chat_rate": 1.0, "chat_burst": 1, "max_length": 4096},
+    "whatsapp": {"bot_rate": 80.0, "bot_burst": 80, "chat_rate": 1.0, "chat_burst": 1, "max_length": 4096},
+    "discord": {"bot_rate": 50.0, "bot_burst": 50, "chat_rate": 2.5, "chat_burst": 5, "max_length": 2000}
+}
+
+# build(text) -> (method, url, json_body, headers)
+RequestBuilder = Callable[[str], tuple]
+
+
+class DeliveryError(Exception):
+    """Message could not be delivered after retries."""
+    pass
+
+
+class TokenBucket:
+    """
+    Reservation-based token bucket.
+
+    WHY: FIFO waiting without locks (single event loop)
+    HOW: reserve() takes a token now (balance may go negative) and
+         returns how long the caller must sleep before using it
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def reserve(self) -> float:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        self.tokens -= 1
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+        return max(wait, self.blocked_until - now)
+
+    def pause(self, seconds: float):
+        """Block the bucket (platform asked us to back off)."""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class OutboundDeliveryService:
+    """
+    Pooled, rate-limited outbound messaging.
+
+    WHY: Replies survive bursts without 429s or dropped messages
+    HOW: Per-platform client pool + per-bot/per-chat token buckets
+    """
+
+    def __init__(self, limits: Optional[dict] = None):
+        """
+        Initialize delivery service.
+
+        ARGS:
+            limits: Platform limits (defaults to DEFAULT_PLATFORM_LIMITS)
+        """
+        self.limits = limits or getattr(settings, "OUTBOUND_RATE_LIMITS", None) or DEFAULT_PLATFORM_LIMITS
+        self.max_retries = getattr(settings, "OUTBOUND_MAX_RETRIES", 4)
+        self.timeout = getattr(settings, "OUTBOUND_TIMEOUT_SECONDS", 10.0)
+        self.max_connections = getattr(settings, "OUTBOUND_MAX_CONNECTIONS", 50)
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self._buckets: dict[tuple, TokenBucket] = {}
+        self._batches: dict[tuple, list] = {}
+        self._senders: dict[tuple, asyncio.Task] = {}
+        self._stats = {"sent": 0, "merged": 0, "rate_limited": 0, "retries": 0, "failed": 0}
+
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def send_text(
+        self,
+        platform: str,
+        bot_key: str,
+        chat_key: Any,
+        text: str,
+        build: RequestBuilder
+    ) -> Optional[httpx.Response]:
+        """
+        Deliver a text message, respecting platform limits.
+
+        WHY: Single entry point for integrations' _send_message
+        HOW: Queue on the chat's batch; one sender per chat drains it
+
+        ARGS:
+            platform: "telegram" | "whatsapp" | "discord"
+            bot_key: Bot identity for the per-bot bucket (never logged)
+            chat_key: Chat/recipient identity for the per-chat bucket
+            text: Message text
+            build: text -> (method, url, json_body, headers)
+
+        RETURNS:
+            Last platform response for this text
+
+        RAISES:
+            DeliveryError: Retries exhausted
+        """
+
+        self._bind_loop()
+
+        key = (platform, self._hash(bot_key), str(chat_key))
+        future = self._loop.create_future()
+
+        self._batches.setdefault(key, []).append((text, build, future))
+
+        if key not in self._senders:
+            self._senders[key] = asyncio.create_task(self._drain_chat(key))
+
+        return await future
+
+
+    async def request(
+        self,
+        platform: str,
+        bot_key: str,
+        chat_key: Any,
+        request: tuple
+    ) -> httpx.Response:
+        """
+        Single rate-limited API call (no merging or splitting).
+
+        WHY: Message edits / placeholders must not be merged with replies
+             but still share the chat's rate limit and retry handling
+
+        ARGS:
+            request: (method, url, json_body, headers)
+        """
+
+        self._bind_loop()
+
+        return await self._send((platform, self._hash(bot_key), str(chat_key)), request)
+
+
+    async def aclose(self):
+        """Close pooled connections (application shutdown)."""
+
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients = {}
+
+
+    def get_stats(self) -> dict:
+        """Delivery counters for monitoring."""
+        return {**self._stats, "active_chats": len(self._senders)}
+
+
+    # ------------------------------------------------------------------
+    # Batching
+    # ------------------------------------------------------------------
+
+    async def _drain_chat(self, key: tuple):
+        """
+        Send everything queued for one chat, in order.
+
+        NOTE: Emptiness check and cleanup run without an await in between,
+        so send_text() never appends to a batch whose sender has exited.
+        """
+
+        platform = key[0]
+        max_length = self.limits[platform]["max_length"]
+        batch = self._batches[key]
+
+        try:
+            while batch:
+                group = self._take_group(batch, max_length)
+                text = "\n\n".join(item[0] for item in group)
+                build = group[0][1]
+
+                if len(group) > 1:
+                    self._stats["merged"] += len(group) - 1
+
+                try:
+                    response = None
+                    for chunk in self._split(text, max_length):
+                        response = await self._send(key, build(chunk))
+                except Exception as e:
+                    for _, _, future in group:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+
+                for _, _, future in group:
+                    if not future.done():
+                        future.set_result(response)
+        finally:
+            self._senders.pop(key, None)
+            if not batch:
+                self._batches.pop(key, None)
+
+
+    def _take_group(self, batch: list, max_length: int) -> list:
+        """Pop the queued texts that fit in one message (at least one)."""
+
+        group = [batch.pop(0)]
+        length = len(group[0][0])
+
+        while batch and length + 2 + len(batch[0][0]) <= max_length:
+            item = batch.pop(0)
+            length += 2 + len(item[0])
+            group.append(item)
+
+        return group
+
+
+    def _split(self, text: str, max_length: int) -> list[str]:
+        """Split text over the platform limit (prefer newline boundaries)."""
+
+        chunks = []
+        while len(text) > max_length:
+            cut = text.rfind("\n", 0, max_length)
+            if cut <= 0:
+                cut = max_length
+            chunks.append(text[:cut])
+            text = text[cut:].lstrip("\n")
+
+        chunks.append(text)
+        return chunks
+
+
+    # ------------------------------------------------------------------
+    # Sending
+    # ------------------------------------------------------------------
+
+    async def _send(self, key: tuple, request: tuple) -> httpx.Response:
+        """
+        One message with rate limiting and retries.
+
+        FLOW:
+        1. Wait for per-bot and per-chat capacity
+        2. Send via pooled client
+        3. 429 -> pause bucket for Retry-After, retry
+        4. 5xx / transport error -> backoff, retry
+        5. Anything else -> return response
+        """
+
+        platform, bot_hash, chat_key = key
+        method, url, body, headers = request
+        bot_bucket, chat_bucket = self._get_buckets(key)
+        client = self._get_client(platform)
+
+        for attempt in range(self.max_retries + 1):
+            wait = max(bot_bucket.reserve(), chat_bucket.reserve())
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            try:
+                response = await client.request(method, url, json=body, headers=headers)
+            except httpx.TransportError:
+                self._stats["retries"] += 1
+                await asyncio.sleep(min(2 ** attempt * 0.5, 8.0))
+                continue
+
+            if response.status_code == 429:
+                self._stats["rate_limited"] += 1
+                retry_after = self._retry_after(response)
+                if response.headers.get("X-RateLimit-Global") == "true":
+                    bot_bucket.pause(retry_after)
+                chat_bucket.pause(retry_after)
+                continue
+
+            if response.status_code >= 500:
+                self._stats["retries"] += 1
+                await asyncio.sleep(min(2 ** attempt * 0.5, 8.0))
+                continue
+
+            if response.status_code >= 400:
+                print(f"Outbound {platform} message rejected: HTTP {response.status_code}")
+
+            self._stats["sent"] += 1
+            return response
+
+        self._stats["failed"] += 1
+        raise DeliveryError(f"{platform} delivery failed after {self.max_retries + 1} attempts")
+
+
+    def _retry_after(self, response: httpx.Response) -> float:
+        """
+        Seconds to back off after a 429.
+
+        SOURCES:
+        - Retry-After header (WhatsApp, Discord)
+        - {"parameters": {"retry_after": 5}} (Telegram)
+        - {"retry_after": 1.5} (Discord)
+        """
+
+        header = response.headers.get("Retry-After")
+        if header:
+            try:
+                return float(header)
+            except ValueError:
+                pass
+
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+
+        if isinstance(body, dict):
+            value = body.get("retry_after") or body.get("parameters", {}).get("retry_after")
+            if value:
+                return float(value)
+
+        return 1.0
+
+
+    # ------------------------------------------------------------------
+    # Pools and buckets
+    # ------------------------------------------------------------------
+
+    def _bind_loop(self):
+        """Rebind loop-bound state when the running loop changes."""
+
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._clients = {}
+            self._batches = {}
+            self._senders = {}
+
+
+    def _get_client(self, platform: str) -> httpx.AsyncClient:
+        """Pooled client per platform (connections reused across replies)."""
+
+        client = self._clients.get(platform)
+        if client is None:
+            client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                )
+            )
+            self._clients[platform] = client
+        return client
+
+
+    def _get_buckets(self, key: tuple) -> tuple[TokenBucket, TokenBucket]:
+        platform, bot_hash, chat_key = key
+        limits = self.limits[platform]
+
+        bot_bucket = self._buckets.get((platform, bot_hash))
+        if bot_bucket is None:
+            bot_bucket = self._buckets[(platform, bot_hash)] = TokenBucket(limits["bot_rate"], limits["bot_burst"])
+
+        chat_bucket = self._buckets.get(key)
+        if chat_bucket is None:
+            chat_bucket = self._buckets[key] = TokenBucket(limits["chat_rate"], limits["chat_burst"])
+
+        self._prune_buckets()
+
+        return bot_bucket, chat_bucket
+
+
+    def _prune_buckets(self):
+        """Forget idle, full buckets (bounded memory with many chats)."""
+
+        if len(self._buckets) < 10000:
+            return
+
+        now = time.monotonic()
+        for bucket_key, bucket in list(self._buckets.items()):
+            idle = now - bucket.updated
+            if idle * bucket.rate >= bucket.capacity and bucket.blocked_until < now:
+                del self._buckets[bucket_key]
+
+
+    def _hash(self, value: str) -> str:
+        """Bucket key for secrets like bot tokens."""
+        return hashlib.sha256(str(value).encode()).hexdigest()[:16]
+
+
+# Global instance
+outbound_delivery_service = OutboundDeliveryService()
@@ -0,0 +1,155 @@
+"""
+Progressive Message - Stream a reply into a channel message by editing it.
+
+WHY:
+- Telegram/Discord users saw nothing until the whole answer was generated
+- Editing on every token would hit platform edit rate limits
+
+HOW:
+- A placeholder message is shown first (Telegram sendMessage, Discord
+  deferred interaction response)
+- update(text) records the latest text; a single flusher edits the
+  message at most once per min_interval (intermediate texts coalesce)
+- finish(text) waits for the in-flight edit, then writes the final text;
+  anything over the platform length limit is sent as extra messages
+- Edits go through outbound_delivery_service so they share the chat's
+  rate limit and 429 handling with normal replies
+
+PSEUDOCODE follows the existing codebase patterns.
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional
+
+from app.core.config import settings
+
+
+class ProgressiveMessage:
+    """
+    Coalescing editor for one streamed reply.
+
+    WHY: Live replies within platform edit limits
+    HOW: Latest-wins flusher with a minimum interval between edits
+    """
+
+    CURSOR = " ▌"
+
+    def __init__(
+        self,
+        edit: Callable[[str, bool], Awaitable],
+        max_length: int,
+        overflow: Optional[Callable[[str], Awaitable]] = None,
+        min_interval: Optional[float] = None
+    ):
+        """
+        Initialize progressive message.
+
+        ARGS:
+            edit: async (text, final) -> None, replaces the message text
+            max_length: Platform message length limit
+            overflow: async (text) -> None, sends an extra message
+            min_interval: Seconds between edits
+        """
+        self._edit = edit
+        self._overflow = overflow
+        self.max_length = max_length
+        self.min_interval = min_interval or getattr(settings, "CHANNEL_STREAM_EDIT_INTERVAL_SECONDS", 1.0)
+
+        self._latest = ""
+        self._shown = ""
+        self._last_edit = 0.0
+        self._closed = False
+        self._editing = False
+        self._flusher: Optional[asyncio.Task] = None
+        self.edits = 0
+
+
+    async def update(self, text: str):
+        """
+        Record the reply so far (cheap; never waits for the platform).
+
+        WHY: Called for every streamed chunk
+        """
+
+        if self._closed:
+            return
+
+        self._latest = text
+
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush())
+
+
+    async def _flush(self):
+        """Edit until the shown text catches up with the latest text."""
+
+        while not self._closed and self._latest != self._shown:
+            wait = self._last_edit + self.min_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+                if self._closed:
+                    return
+
+            text = self._latest
+            self._editing = True
+            try:
+                await self._edit(self._preview(text), False)
+            except Exception as e:
+                print(f"Progressive edit failed: {e}")
+            finally:
+                self._editing = False
+
+            self._shown = text
+            self._last_edit = time.monotonic()
+            self.edits += 1
+
+
+    async def finish(self, text: str):
+        """
+        Write the final reply.
+
+        HOW: Stop the flusher (a sleeping flusher is cancelled, an
+             in-flight edit lands first so edits cannot arrive out of
+             order), final edit, overflow messages
+        """
+
+        self._closed = True
+
+        if self._flusher is not None and not self._flusher.done():
+            if self._editing:
+                await self._flusher
+            else:
+                self._flusher.cancel()
+
+        chunks = self._split(text or "…")
+
+        await self._edit(chunks[0], True)
+        self.edits += 1
+
+        for chunk in chunks[1:]:
+            if self._overflow is None:
+                break
+            await self._overflow(chunk)
+
+
+    def _preview(self, text: str) -> str:
+        """In-progress text with a cursor, clipped to the length limit."""
+
+        limit = self.max_length - len(self.CURSOR)
+        return text[:limit] + self.CURSOR
+
+
+    def _split(self, text: str) -> list[str]:
+        """Split at newlines where possible."""
+
+        chunks = []
+        while len(text) > self.max_length:
+            cut = text.rfind("\n", 0, self.max_length)
+            if cut <= 0:
+                cut = self.max_length
+            chunks.append(text[:cut])
+            text = text[cut:].lstrip("\n")
+
+        chunks.append(text)
+        return chunks
@@ -0,0 +1,325 @@
+"""
+Request Coalescer - Single-flight execution of identical in-flight calls.
+
+WHY:
+- A popular widget gets bursts of the same question
+- Each request embedded the query, searched the KB and called the LLM itself
+- N identical concurrent requests = N identical upstream calls
+- The completion cache only helps after the first call has finished
+
+HOW:
+- Key = sha256 of the call parameters (caller decides what is "identical")
+- Tier 1 (in-process): first caller starts the call as a task owned by
+  the coalescer; concurrent callers with the same key await that task
+  (shielded: a caller that times out or is cancelled only stops waiting
+  for itself; the call is cancelled once nobody waits for it anymore)
+- Tier 2 (optional, Redis): leader takes SET NX lock, stores the result
+  under a short-lived result key; followers in other workers poll the
+  result key instead of calling upstream
+- Followers receive deep copies (callers mutate results, e.g. boosting)
+- Leader errors propagate to in-process followers; remote followers
+  fall back to running the call themselves
+- Redis failures never fail the request (run locally instead)
+
+PSEUDOCODE follows the existing codebase patterns.
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Optional
+
+from app.core.config import settings
+
+
+class _Flight:
+    """One in-flight call shared by its waiters."""
+
+    __slots__ = ("loop", "task", "waiters")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, task: asyncio.Task):
+        self.loop = loop
+        self.task = task
+        self.waiters = 0
+
+
+class RequestCoalescer:
+    """
+    Single-flight coalescing of identical concurrent calls.
+
+    WHY: Collapse bursts of identical upstream calls into one
+    HOW: Shared in-flight future per key (+ optional Redis lock/result)
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        distributed: Optional[bool] = None,
+        redis_client=None,
+        lock_ttl_seconds: Optional[float] = None,
+        result_ttl_seconds: Optional[float] = None,
+        wait_timeout_seconds: Optional[float] = None,
+        poll_interval_seconds: float = 0.05
+    ):
+        """
+        Initialize coalescer.
+
+        WHY: One coalescer per call type (keys never collide across types)
+        HOW: Namespace prefixes both in-process and Redis keys
+
+        ARGS:
+            namespace: Key prefix, e.g. "inference", "embedding"
+            distributed: Enable Redis tier (default: settings.COALESCE_DISTRIBUTED)
+            redis_client: Optional Redis client (defaults to app.utils.redis)
+            lock_ttl_seconds: Leader lock lifetime (covers a crashed leader)
+            result_ttl_seconds: How long the shared result stays readable
+            wait_timeout_seconds: Max time a remote follower waits
+            poll_interval_seconds: Remote follower poll interval
+        """
+        self.namespace = namespace
+        self.enabled = getattr(settings, "COALESCE_ENABLED", True)
+        self.distributed = (
+            distributed if distributed is not None
+            else getattr(settings, "COALESCE_DISTRIBUTED", False)
+        )
+        self.lock_ttl = lock_ttl_seconds or getattr(settings, "COALESCE_LOCK_TTL_SECONDS", 60)
+        self.result_ttl = result_ttl_seconds or getattr(settings, "COALESCE_RESULT_TTL_SECONDS", 5)
+        self.wait_timeout = wait_timeout_seconds or getattr(settings, "COALESCE_WAIT_TIMEOUT_SECONDS", 30)
+        self.poll_interval = poll_interval_seconds
+
+        self._redis = redis_client
+        self._inflight: dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+
+        self._stats = {
+            "leaders": 0,
+            "coalesced": 0,
+            "remote_hits": 0,
+            "remote_fallbacks": 0,
+            "publish_skipped": 0,
+            "redis_errors": 0
+        }
+
+
+    @property
+    def redis(self):
+        """
+        Lazily resolve Redis client.
+
+        WHY: Importing services must not require a live Redis
+        HOW: Import shared client on first use
+        """
+        if self._redis is None:
+            from app.utils.redis import redis_client
+            self._redis = redis_client
+        return self._redis
+
+
+    @staticmethod
+    def build_key(*parts: Any) -> str:
+        """
+        Build coalescing key from call parameters.
+
+        HOW: Canonical JSON (sorted keys, str() for UUIDs etc.) hashed with sha256
+        """
+        canonical = json.dumps(
+            parts,
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False,
+            default=str
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run factory() once per key among concurrent callers.
+
+        FLOW:
+        1. Identical call already in flight (same event loop)? Await it
+        2. Otherwise start it as a coalescer-owned task:
+           a. Distributed: coordinate through Redis (may reuse remote result)
+           b. Local only: call factory()
+        3. Every caller awaits the task through a shield; cancelling one
+           caller (e.g. wait_for timeout) never cancels the others
+
+        ARGS:
+            key: Coalescing key (see build_key)
+            factory: Zero-arg callable returning the awaitable to run
+
+        RETURNS:
+            factory() result (deep copy for followers)
+        """
+
+        if not self.enabled:
+            return await factory()
+
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            flight = self._inflight.get(key)
+            # Tasks are bound to their event loop - only share within one
+            if flight is not None and flight.loop is loop:
+                leader = False
+                self._stats["coalesced"] += 1
+            else:
+                leader = True
+                flight = _Flight(loop, loop.create_task(self._call(key, factory)))
+                flight.task.add_done_callback(lambda task, key=key, flight=flight: self._finish(key, flight))
+                self._inflight[key] = flight
+                self._stats["leaders"] += 1
+
+            flight.waiters += 1
+
+        try:
+            result = await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            flight.waiters -= 1
+            # Last waiter gone - nobody needs the result anymore
+            if flight.waiters == 0 and not flight.task.done():
+                self._forget(key, flight)
+                flight.task.cancel()
+            raise
+        except BaseException:
+            flight.waiters -= 1
+            raise
+
+        flight.waiters -= 1
+        return result if leader else copy.deepcopy(result)
+
+
+    async def _call(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """The shared call (runs as its own task)."""
+
+        if self.distributed:
+            return await self._run_distributed(key, factory)
+        return await factory()
+
+
+    def _finish(self, key: str, flight: _Flight):
+        """Task done: stop sharing it, mark its exception as retrieved."""
+
+        self._forget(key, flight)
+        if not flight.task.cancelled():
+            flight.task.exception()
+
+
+    def _forget(self, key: str, flight: _Flight):
+        with self._lock:
+            if self._inflight.get(key) is flight:
+                del self._inflight[key]
+
+
+    async def _run_distributed(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Coordinate identical calls across workers through Redis.
+
+        FLOW:
+        1. Result already published? Use it
+        2. SET lock NX -> we lead: run, publish result, release lock
+        3. Lock held elsewhere -> poll result key until published,
+           the lock disappears (leader failed) or wait_timeout
+        4. No remote result -> run locally
+        """
+
+        lock_key = f"coalesce:{self.namespace}:lock:{key}"
+        result_key = f"coalesce:{self.namespace}:result:{key}"
+        token = uuid.uuid4().hex
+
+        try:
+            cached = self.redis.get(result_key)
+            if cached:
+                self._stats["remote_hits"] += 1
+                return json.loads(cached)
+
+            acquired = self.redis.set(lock_key, token, nx=True, ex=max(int(self.lock_ttl), 1))
+        except Exception:
+            # Redis is an optimisation - never fail the request over it
+            self._stats["redis_errors"] += 1
+            return await factory()
+
+        if acquired:
+            try:
+                result = await factory()
+                self._publish(result_key, result)
+                return result
+            finally:
+                self._release(lock_key, token)
+
+        # Another worker is leading - wait for its result
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                cached = self.redis.get(result_key)
+                if cached:
+                    self._stats["remote_hits"] += 1
+                    return json.loads(cached)
+                if not self.redis.exists(lock_key):
+                    break
+            except Exception:
+                self._stats["redis_errors"] += 1
+                break
+
+        self._stats["remote_fallbacks"] += 1
+        return await factory()
+
+
+    def _publish(self, result_key: str, result: Any):
+        """
+        Store result for remote followers.
+
+        HOW: Non-JSON values (UUID, datetime, Decimal) are published as
+             strings; a result that still cannot be encoded (circular)
+             is skipped and counted in publish_skipped
+        """
+        try:
+            payload = json.dumps(result, default=str)
+        except (TypeError, ValueError):
+            self._stats["publish_skipped"] += 1
+            return
+
+        try:
+            self.redis.set(result_key, payload, px=max(int(self.result_ttl * 1000), 1))
+        except Exception:
+            self._stats["redis_errors"] += 1
+
+
+    def _release(self, lock_key: str, token: str):
+        """Release lock only if we still own it (it may have expired)."""
+        try:
+            owner = self.redis.get(lock_key)
+            if owner is not None and (owner.decode() if isinstance(owner, bytes) else owner) == token:
+                self.redis.delete(lock_key)
+        except Exception:
+            self._stats["redis_errors"] += 1
+
+
+    def get_stats(self) -> dict:
+        """
+        Get coalescing metrics.
+
+        RETURNS:
+            {
+                "leaders": 10,       # Calls that went upstream (or to Redis)
+                "coalesced": 25,     # In-process followers served
+                "remote_hits": 3,    # Results reused from other workers
+                "inflight": 1,
+                ...
+            }
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["inflight"] = len(self._inflight)
+        return stats
+
+
+# Global instances (one per call type)
+inference_coalescer = RequestCoalescer(namespace="inference")
+embedding_coalescer = RequestCoalescer(namespace="embedding")
+retrieval_coalescer = RequestCoalescer(namespace="retrieval")
@@ -12,6 +12,7 @@ HOW:
 - Apply annotation boosting
 - Combine results from multiple sources
 - Return ranked chunks with metadata
+- Coalesce identical concurrent searches and query embeddings
 
 PSEUDOCODE follows the existing codebase patterns.
 """
@@ -23,6 +24,7 @@ from sqlalchemy.orm import Session
 
 from app.services.embedding_service import embedding_service
 from app.services.vector_store_service import vector_store_service
+from app.services.request_coalescer import embedding_coalescer, retrieval_coalescer
 
 
 class RetrievalService:
@@ -42,6 +44,8 @@ class RetrievalService:
         """
         self.embedding_service = embedding_service
         self.vector_store_service = vector_store_service
+        self.embedding_coalescer = embedding_coalescer
+        self.retrieval_coalescer = retrieval_coalescer
 
 
     async def search(
@@ -59,6 +63,7 @@ class RetrievalService:
 
         WHY: RAG - find relevant context for AI response
         HOW: Embed query, search vector store, boost annotations
+             (identical concurrent searches share one execution)
 
         ARGS:
             db: Database session
@@ -84,6 +89,38 @@ class RetrievalService:
             ]
         """
 
+        coalesce_key = self.retrieval_coalescer.build_key(
+            kb_id, query, top_k, search_method, threshold, apply_annotation_boost
+        )
+
+        return await self.retrieval_coalescer.run(
+            coalesce_key,
+            lambda: self._search(
+                db=db,
+                kb_id=kb_id,
+                query=query,
+                top_k=top_k,
+                search_method=search_method,
+                threshold=threshold,
+                apply_annotation_boost=apply_annotation_boost
+            )
+        )
+
+
+    async def _search(
+        self,
+        db: Session,
+        kb_id: UUID,
+        query: str,
+        top_k: int,
+        search_method: str,
+        threshold: float,
+        apply_annotation_boost: bool
+    ) -> List[dict]:
+        """
+        Uncoalesced search (see search()).
+        """
+
         from app.models.knowledge_base import KnowledgeBase
 
         # Get KB
@@ -92,8 +129,8 @@ class RetrievalService:
             raise ValueError("Knowledge base not found")
 
         # Generate query embedding
-        query_embedding = await self.embedding_service.generate_embedding(
-            text=query,
+        query_embedding = await self._embed_query(
+            query=query,
             model=kb.config.get("embedding_model", "text-embedding-ada-002")
         )
 
@@ -138,6 +175,23 @@ class RetrievalService:
         return results
 
 
+    async def _embed_query(self, query: str, model: str) -> List[float]:
+        """
+        Embed search query, coalescing identical concurrent requests.
+
+        WHY: A burst of the same question embeds the same text N times
+        HOW: Single-flight per (model, query) - also shared by searches
+             against different KBs using the same embedding model
+        """
+
+        coalesce_key = self.embedding_coalescer.build_key(model, query)
+
+        return await self.embedding_coalescer.run(
+            coalesce_key,
+            lambda: self.embedding_service.generate_embedding(text=query, model=model)
+        )
+
+
     async def _vector_search(
         self,
         db: Session,
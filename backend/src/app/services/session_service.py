@@ -12,6 +12,7 @@ HOW:
 - Save messages
 - Retrieve conversation history
 - Handle session expiration
+- Keep analytics rollups current on every message write
 
 PSEUDOCODE follows the existing codebase patterns.
 """
@@ -24,6 +25,8 @@ from sqlalchemy.orm import Session
 
 from app.models.chat_session import ChatSession, SessionStatus, BotType
 from app.models.chat_message import ChatMessage, MessageRole
+from app.services.bot_analytics_service import bot_analytics_service
+from app.services.usage_metering_service import usage_metering_service
 
 
 class SessionService:
@@ -137,11 +140,20 @@ class SessionService:
             completion_tokens=completion_tokens,
             total_tokens=(prompt_tokens or 0) + (completion_tokens or 0) if prompt_tokens or completion_tokens else None,
             error=error,
-            error_code=error_code
+            error_code=error_code,
+            created_at=datetime.utcnow()
         )
 
         db.add(message)
 
+        # Analytics rollups (same transaction as the message)
+        bot_analytics_service.record_message(
+            db=db,
+            session=session,
+            message=message,
+            new_conversation=not session.message_count
+        )
+
         # Update session message count
         session.message_count += 1
         session.last_message_at = datetime.utcnow()
@@ -149,6 +161,19 @@ class SessionService:
         db.commit()
         db.refresh(message)
 
+        # Usage metering (Redis counters, flushed to workspace_usage)
+        if message.role == MessageRole.ASSISTANT:
+            usage_metering_service.record(
+                workspace_id=session.workspace_id,
+                bot_id=session.bot_id,
+                deltas={
+                    "messages": 1,
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens
+                },
+                db=db
+            )
+
         return message
 
 
@@ -202,26 +227,33 @@ class SessionService:
         Background job to delete expired sessions.
 
         WHY: Free up database space
-        HOW: Delete sessions past expiration + 7 days grace period
+        HOW: Drop expired chat_messages partitions, then delete sessions
+             past expiration + 7 days grace period in one statement
 
         SCHEDULE: Run daily
 
+        NOTE: Message retention is partition-based (whole months, see
+              chat_partition_service). Remaining messages of deleted
+              sessions are removed by ON DELETE CASCADE, not row by row
+              through the ORM.
+
         RETURNS:
             Number of sessions deleted
         """
 
+        from app.services.chat_partition_service import chat_partition_service
+
+        chat_partition_service.drop_expired_partitions(db)
+
         cutoff = datetime.utcnow() - timedelta(days=7)
 
-        expired_sessions = db.query(ChatSession).filter(
+        deleted = db.query(ChatSession).filter(
             ChatSession.expires_at < cutoff
-        ).all()
-
-        for session in expired_sessions:
-            db.delete(session)  # Cascades to messages
+        ).delete(synchronize_session=False)
 
         db.commit()
 
-        return len(expired_sessions)
+        return deleted
 
 
     def get_session_stats(
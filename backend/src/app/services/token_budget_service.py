@@ -0,0 +1,310 @@
+"""
+Token Budget Service - Shared tokenizer and prompt budget planning.
+
+WHY:
+- Prompts were assembled without measuring length (context overflow errors)
+- Token counts were approximated as len(text) / 4
+- Sending every retrieved chunk and the whole history wastes prompt tokens
+- One tokenizer shared by chatbots, chatflows and embeddings
+
+HOW:
+- BPE tokenizer (tiktoken cl100k_base) loaded once and cached
+- Falls back to a deterministic word/punctuation estimator if tiktoken is missing
+- Token counts memoized per text (system prompts and chunks repeat constantly)
+- Planner allocates the model context window:
+    1. Reserve completion tokens (max_tokens)
+    2. System prompt + current user message (always kept, trimmed if huge)
+    3. Retrieved context, best-first by score
+    4. History, newest-first
+    5. Older history collapsed into a one-line omission note
+
+PSEUDOCODE follows the existing codebase patterns.
+"""
+
+import math
+import re
+from functools import lru_cache
+from typing import Optional
+
+from app.core.config import settings
+
+
+# Known context windows (tokens). Unknown models use DEFAULT_CONTEXT_WINDOW.
+MODEL_CONTEXT_WINDOWS = {
+    "secret-ai-v1": 8192,
+    "gpt-3.5-turbo": 16385,
+    "gpt-4": 8192,
+    "gpt-4o": 128000,
+    "gpt-4o-mini": 128000,
+    "llama3.1:70b": 131072,
+    "llama3.3:70b": 131072,
+}
+
+DEFAULT_CONTEXT_WINDOW = 4096
+
+# Fallback estimator: words, numbers and single punctuation marks
+_FALLBACK_PATTERN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+# Longer texts bypass the count cache (it would pin whole documents)
+TOKEN_COUNT_CACHE_MAX_CHARS = getattr(settings, "TOKEN_COUNT_CACHE_MAX_CHARS", 2048)
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    """
+    Load the BPE encoding once per process.
+
+    WHY: Building the BPE ranks table is expensive (~100ms)
+    HOW: lru_cache on a zero-arg loader
+
+    RETURNS:
+        tiktoken Encoding or None if tiktoken is not installed
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+
+    encoding_name = getattr(settings, "TOKENIZER_ENCODING", "cl100k_base")
+    try:
+        return tiktoken.get_encoding(encoding_name)
+    except Exception:
+        return None
+
+
+def _fallback_pieces(text: str) -> list[str]:
+    """
+    Split text into approximate BPE pieces.
+
+    WHY: Deterministic estimate when no BPE tokenizer is available
+    HOW: Long words cost one token per 4 characters (BPE merges ~4 chars)
+    """
+    pieces = []
+    for match in _FALLBACK_PATTERN.finditer(text):
+        word = match.group(0)
+        for start in range(0, len(word), 4):
+            pieces.append(word[start:start + 4])
+    return pieces
+
+
+class TokenBudgetService:
+    """
+    Tokenizer access and context-window budget planning.
+
+    WHY: Keep prompts inside the model window with the most useful content
+    HOW: Exact token counts + greedy best-first allocation
+    """
+
+    def __init__(self):
+        """
+        Initialize token budget service.
+
+        WHY: Tunable allocation without code changes
+        HOW: Read optional settings with defaults
+        """
+        self.context_ratio = getattr(settings, "PROMPT_CONTEXT_RATIO", 0.6)
+        self.min_chunk_tokens = getattr(settings, "PROMPT_MIN_CHUNK_TOKENS", 64)
+        self.safety_margin = getattr(settings, "PROMPT_SAFETY_MARGIN_TOKENS", 32)
+
+
+    @property
+    def uses_bpe(self) -> bool:
+        """True when the real BPE tokenizer is available."""
+        return _get_encoding() is not None
+
+
+    def count_tokens(self, text: str) -> int:
+        """
+        Count tokens in text.
+
+        WHY: Exact budget accounting
+        HOW: BPE encode (or fallback estimate), memoized for short texts
+        """
+        if not text:
+            return 0
+        if len(text) > TOKEN_COUNT_CACHE_MAX_CHARS:
+            return _count_tokens(text)
+        return _count_tokens_cached(text)
+
+
+    def truncate_to_tokens(self, text: str, max_tokens: int) -> str:
+        """
+        Truncate text to at most max_tokens tokens.
+
+        WHY: Cut at token boundaries instead of guessing characters
+        HOW: Encode, slice, decode (deterministic)
+        """
+        if max_tokens <= 0 or not text:
+            return ""
+
+        if self.count_tokens(text) <= max_tokens:
+            return text
+
+        encoding = _get_encoding()
+        if encoding is not None:
+            return encoding.decode(encoding.encode(text)[:max_tokens])
+
+        # Fallback: cut after the max_tokens-th estimated piece
+        end = 0
+        pieces = 0
+        for match in _FALLBACK_PATTERN.finditer(text):
+            word_pieces = math.ceil(len(match.group(0)) / 4)
+            if pieces + word_pieces > max_tokens:
+                remaining = max_tokens - pieces
+                end = match.start() + remaining * 4
+                break
+            pieces += word_pieces
+            end = match.end()
+
+        return text[:end]
+
+
+    def get_context_window(self, model: str, override: Optional[int] = None) -> int:
+        """
+        Get context window size for a model.
+
+        ARGS:
+            model: Model name
+            override: Explicit window from bot config (wins if set)
+        """
+        if override:
+            return int(override)
+
+        default = getattr(settings, "DEFAULT_CONTEXT_WINDOW", DEFAULT_CONTEXT_WINDOW)
+        return MODEL_CONTEXT_WINDOWS.get(model, default)
+
+
+    def plan_prompt(
+        self,
+        system_prompt: str,
+        user_message: str,
+        context_chunks: list[dict],
+        history: list[dict],
+        model: str,
+        max_completion_tokens: int,
+        context_window: Optional[int] = None
+    ) -> dict:
+        """
+        Allocate the context window across prompt sections.
+
+        FLOW:
+        1. available = window - completion reserve - safety margin
+        2. System prompt and user message (trimmed only if they alone overflow)
+        3. Context budget = max(ratio share, what history does not need)
+        4. Chunks best-first (by "score"); a partial chunk is trimmed if
+           at least min_chunk_tokens fit, otherwise skipped
+        5. History newest-first with whatever remains
+        6. Dropped history replaced with "[N earlier messages omitted]"
+
+        ARGS:
+            system_prompt: Bot system prompt
+            user_message: Current user input
+            context_chunks: Retrieval results [{"content": ..., "score": ...}]
+            history: Previous turns [{"role": "user"|"assistant", "content": ...}]
+                     in chronological order (current message excluded)
+            model: Model name (selects context window)
+            max_completion_tokens: Tokens reserved for the answer
+            context_window: Optional window override
+
+        RETURNS:
+            {
+                "system_prompt": "...",
+                "user_message": "...",
+                "context_chunks": [...],   # Kept chunks, best-first
+                "history": [...],          # Kept turns, chronological
+                "history_omitted": 3,
+                "chunks_dropped": 2,
+                "prompt_tokens": 1450,     # Estimated prompt size
+                "context_window": 8192,
+                "available_tokens": 6000
+            }
+        """
+
+        window = self.get_context_window(model, context_window)
+        completion_reserve = min(max_completion_tokens, window // 2)
+        available = max(window - completion_reserve - self.safety_margin, 0)
+
+        # 1. Mandatory sections (system prompt may use at most half the budget)
+        system_budget = max(available // 2, 0)
+        system_prompt = self.truncate_to_tokens(system_prompt, system_budget)
+        used = self.count_tokens(system_prompt)
+
+        user_message = self.truncate_to_tokens(user_message, available - used)
+        used += self.count_tokens(user_message)
+
+        remaining = max(available - used, 0)
+
+        # 2. Context budget - give context whatever history does not need
+        history_costs = [self._message_tokens(msg) for msg in history]
+        history_need = sum(history_costs)
+        context_budget = max(int(remaining * self.context_ratio), remaining - history_need)
+        context_budget = min(context_budget, remaining)
+
+        ranked = sorted(
+            enumerate(context_chunks),
+            key=lambda pair: (-(pair[1].get("score") or 0.0), pair[0])
+        )
+
+        kept_chunks = []
+        context_used = 0
+        for _, chunk in ranked:
+            content = chunk.get("content") or ""
+            cost = self.count_tokens(content)
+            room = context_budget - context_used
+
+            if cost <= room:
+                kept_chunks.append(chunk)
+                context_used += cost
+            elif room >= self.min_chunk_tokens:
+                trimmed = self.truncate_to_tokens(content, room)
+                kept_chunks.append({**chunk, "content": trimmed, "truncated": True})
+                context_used += self.count_tokens(trimmed)
+
+        remaining -= context_used
+
+        # 3. History newest-first
+        kept_history = []
+        for msg, cost in zip(reversed(history), reversed(history_costs)):
+            if cost > remaining:
+                break
+            kept_history.append(msg)
+            remaining -= cost
+
+        kept_history.reverse()
+        history_omitted = len(history) - len(kept_history)
+
+        return {
+            "system_prompt": system_prompt,
+            "user_message": user_message,
+            "context_chunks": kept_chunks,
+            "history": kept_history,
+            "history_omitted": history_omitted,
+            "chunks_dropped": len(context_chunks) - len(kept_chunks),
+            "prompt_tokens": available - remaining,
+            "context_window": window,
+            "available_tokens": available
+        }
+
+
+    def _message_tokens(self, message: dict) -> int:
+        """Tokens for one history line ("User: ..."), including role prefix."""
+        return self.count_tokens(message.get("content") or "") + 4
+
+
+def _count_tokens(text: str) -> int:
+    """Token count with the BPE tokenizer, else the fallback estimate."""
+
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return len(_fallback_pieces(text))
+
+
+@lru_cache(maxsize=4096)
+def _count_tokens_cached(text: str) -> int:
+    """Memoized token count (system prompts and short turns repeat)."""
+    return _count_tokens(text)
+
+
+# Global instance
+token_budget_service = TokenBudgetService()
@@ -0,0 +1,515 @@
+"""
+Usage Metering Service - Per-workspace usage counters and quota checks.
+
+WHY:
+- Quota/billing checks summed chat_messages (full scan per check)
+- Ingestion usage (embedding tokens, crawled pages) was not metered
+- The public chat path needs a quota check costing ~1 Redis round trip
+
+HOW:
+- record(): HINCRBY counters in Redis as work happens
+    usage:pending:{YYYYMMDD}           field "{workspace}|{bot}|{metric}"
+    usage:month:{YYYYMM}:{workspace}   field "{metric}" (quota counter)
+- flush() (periodic task, under a Redis lock): RENAME each pending hash
+  (new increments start a fresh hash), upsert totals into workspace_usage
+  and record the snapshot id in usage_flush_log in the same transaction
+  (a snapshot is never applied twice), then delete the snapshot
+- check_quota(): monthly counter from Redis vs. plan limit
+  (organization tier defaults, overridable in workspace.settings["quotas"])
+- Monthly counter is seeded from workspace_usage before its first
+  increment (new month or Redis data loss); until it is seeded record()
+  writes nothing, so persisted totals never include counted increments
+- Redis failures never block work (fail open, counted in stats)
+
+METRICS:
+- messages            Assistant replies
+- prompt_tokens       LLM input tokens
+- completion_tokens   LLM output tokens
+- tokens              Derived: prompt_tokens + completion_tokens (quota only)
+- embedding_tokens    Tokens embedded during ingestion
+- crawl_pages         Pages fetched by crawlers
+
+PSEUDOCODE follows the existing codebase patterns.
+"""
+
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.workspace_usage import NIL_UUID, UsageFlushLog, WorkspaceUsage
+
+
+METRICS = ("messages", "prompt_tokens", "completion_tokens", "embedding_tokens", "crawl_pages")
+
+# Monthly limits per subscription tier (None = unlimited)
+DEFAULT_TIER_QUOTAS = {
+    "free": {"messages": 1000, "tokens": 1_000_000, "embedding_tokens": 2_000_000, "crawl_pages": 200},
+    "starter": {"messages": 10000, "tokens": 10_000_000, "embedding_tokens": 20_000_000, "crawl_pages": 2000},
+    "pro": {"messages": 100000, "tokens": 100_000_000, "embedding_tokens": 200_000_000, "crawl_pages": 20000},
+    "enterprise": {}
+}
+
+
+FLUSH_LOCK_KEY = "usage:flush:lock"
+
+# Increment the monthly counter (and pending hash) only once it is seeded.
+# KEYS: month counter, pending hash
+# ARGV: ttl, seed ("1" = seed now), base count, base metric/value pairs,
+#       then pending field/metric/value triples
+# Returns 0 (nothing written) when unseeded and not asked to seed.
+MONTH_SCRIPT = """
+if redis.call('HEXISTS', KEYS[1], '_seeded') == 0 then
+    if ARGV[2] ~= '1' then
+        return 0
+    end
+    redis.call('HSET', KEYS[1], '_seeded', 1)
+    for i = 4, 3 + 2 * tonumber(ARGV[3]), 2 do
+        redis.call('HINCRBY', KEYS[1], ARGV[i], ARGV[i + 1])
+    end
+end
+for i = 4 + 2 * tonumber(ARGV[3]), #ARGV, 3 do
+    redis.call('HINCRBY', KEYS[2], ARGV[i], ARGV[i + 2])
+    redis.call('HINCRBY', KEYS[1], ARGV[i + 1], ARGV[i + 2])
+end
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return 1
+"""
+
+# Delete the lock only if we still hold it
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class QuotaExceededError(Exception):
+    """Workspace has used up its monthly allowance for a metric."""
+
+    def __init__(self, metric: str, used: int, limit: int):
+        self.metric = metric
+        self.used = used
+        self.limit = limit
+        super().__init__(f"Monthly {metric} quota exceeded ({used}/{limit})")
+
+
+class UsageMeteringService:
+    """
+    Redis-backed usage counters with periodic Postgres flush.
+
+    WHY: Cheap metering on hot paths, durable compact history
+    HOW: Seed-aware HINCRBY script on write, RENAME + logged upsert on flush
+    """
+
+    def __init__(self, redis_client=None):
+        """
+        Initialize metering service.
+
+        ARGS:
+            redis_client: Optional Redis client (defaults to app.utils.redis)
+        """
+        self.enabled = getattr(settings, "USAGE_METERING_ENABLED", True)
+        self.limits_ttl = getattr(settings, "USAGE_LIMITS_CACHE_SECONDS", 60)
+        self.tier_quotas = getattr(settings, "USAGE_TIER_QUOTAS", None) or DEFAULT_TIER_QUOTAS
+        self.month_key_ttl = 40 * 24 * 60 * 60  # Outlive the month
+        self.flush_lock_ttl = getattr(settings, "USAGE_FLUSH_LOCK_SECONDS", 300)
+        self.flush_log_retention_days = getattr(settings, "USAGE_FLUSH_LOG_RETENTION_DAYS", 7)
+
+        self._redis = redis_client
+        self._limits_cache: dict[UUID, tuple[float, dict]] = {}
+        self._lock = threading.Lock()
+        self._stats = {"recorded": 0, "flushed_rows": 0, "redis_errors": 0, "skipped_snapshots": 0}
+
+
+    @property
+    def redis(self):
+        """
+        Lazily resolve Redis client.
+
+        WHY: Importing services must not require a live Redis
+        """
+        if self._redis is None:
+            from app.utils.redis import redis_client
+            self._redis = redis_client
+        return self._redis
+
+
+    def _month_key(self, workspace_id: UUID, at: datetime) -> str:
+        return f"usage:month:{at:%Y%m}:{workspace_id}"
+
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def record(
+        self,
+        workspace_id: UUID,
+        deltas: dict,
+        bot_id: Optional[UUID] = None,
+        at: Optional[datetime] = None,
+        db: Optional[Session] = None
+    ):
+        """
+        Add usage for a workspace (and optionally a bot).
+
+        WHY: Called as work happens (message saved, document embedded, ...)
+        HOW: One script call - pending (for flush) + monthly counter.
+             The first increment of a month seeds the counter from
+             workspace_usage (one extra query + script call)
+
+        ARGS:
+            deltas: {"messages": 1, "prompt_tokens": 120, ...}
+            db: Session used to seed the monthly counter (a short-lived
+                session is opened when omitted)
+        """
+
+        if not self.enabled:
+            return
+
+        deltas = {metric: int(value) for metric, value in deltas.items() if value and metric in METRICS}
+        if not deltas:
+            return
+
+        at = at or datetime.utcnow()
+        pending_key = f"usage:pending:{at:%Y%m%d}"
+        month_key = self._month_key(workspace_id, at)
+        subject = f"{workspace_id}|{bot_id or NIL_UUID}"
+        increments = [(f"{subject}|{metric}", metric, value) for metric, value in deltas.items()]
+
+        try:
+            if self._increment(month_key, pending_key, increments):
+                self._stats["recorded"] += 1
+                return
+
+            base = self._load_month_base(db, workspace_id, at)
+            if base is None:
+                # Database unavailable: keep billing data, leave the counter
+                # unseeded (it is seeded from workspace_usage later)
+                pipe = self.redis.pipeline(transaction=False)
+                for field, _, value in increments:
+                    pipe.hincrby(pending_key, field, value)
+                pipe.execute()
+            else:
+                self._increment(month_key, pending_key, increments, base=base)
+            self._stats["recorded"] += 1
+        except Exception as e:
+            # Metering must never break chat or ingestion
+            self._stats["redis_errors"] += 1
+            print(f"Usage metering failed for {workspace_id}: {e}")
+
+
+    def _increment(
+        self,
+        month_key: str,
+        pending_key: str,
+        increments: list,
+        base: Optional[dict] = None
+    ) -> bool:
+        """
+        Run MONTH_SCRIPT.
+
+        ARGS:
+            increments: [(pending field, metric, value), ...]
+            base: Persisted month totals; seeds the counter if still unseeded
+
+        RETURNS:
+            False if the counter is unseeded and no base was given
+        """
+
+        args = [self.month_key_ttl, "0" if base is None else "1", len(base or {})]
+        for metric, value in (base or {}).items():
+            args += [metric, value]
+        for field, metric, value in increments:
+            args += [field, metric, value]
+
+        return bool(self.redis.eval(MONTH_SCRIPT, 2, month_key, pending_key, *args))
+
+
+    def _load_month_base(self, db: Optional[Session], workspace_id: UUID, at: datetime) -> Optional[dict]:
+        """Persisted month totals for seeding, or None if the database is unavailable."""
+
+        try:
+            if db is not None:
+                return self._persisted_month_usage(db, workspace_id, at)
+
+            from app.db.session import SessionLocal
+
+            session = SessionLocal()
+            try:
+                return self._persisted_month_usage(session, workspace_id, at)
+            finally:
+                session.close()
+        except Exception as e:
+            print(f"Usage seeding failed for {workspace_id}: {e}")
+            return None
+
+
+    # ------------------------------------------------------------------
+    # Flushing
+    # ------------------------------------------------------------------
+
+    def flush(self, db: Session) -> int:
+        """
+        Move pending Redis counters into workspace_usage.
+
+        FLOW:
+        1. Take usage:flush:lock (SET NX EX) - one flusher at a time
+        2. Re-flush snapshots left by a crashed flush (usage:flushing:*)
+        3. RENAME each usage:pending:{day} to a unique snapshot key
+           (atomic - concurrent HINCRBYs go to a fresh pending hash)
+        4. Per snapshot, in one transaction: insert its id into
+           usage_flush_log (skip if already there), upsert totals
+           (value = value + excluded.value)
+        5. Commit, then delete the snapshot
+
+        WHY step 4: A crash between commit and delete (or a flusher that
+        outlived the lock) leaves an applied snapshot behind; the log makes
+        re-applying it a no-op
+
+        SCHEDULE: Every minute (maintenance_tasks.flush_usage_counters)
+
+        RETURNS:
+            Number of usage rows upserted (0 if another flush holds the lock)
+        """
+
+        token = uuid.uuid4().hex
+        if not self.redis.set(FLUSH_LOCK_KEY, token, nx=True, ex=self.flush_lock_ttl):
+            return 0
+
+        try:
+            snapshots = list(self.redis.scan_iter(match="usage:flushing:*"))
+
+            for pending_key in self.redis.scan_iter(match="usage:pending:*"):
+                day = pending_key.rsplit(":", 1)[-1]
+                snapshot_key = f"usage:flushing:{day}:{uuid.uuid4().hex}"
+                try:
+                    self.redis.rename(pending_key, snapshot_key)
+                except Exception:
+                    # Key vanished (another flusher took it)
+                    continue
+                snapshots.append(snapshot_key)
+
+            written = 0
+            for snapshot_key in snapshots:
+                day = snapshot_key.split(":")[2]
+                counters = self.redis.hgetall(snapshot_key)
+                if self._claim_snapshot(db, snapshot_key):
+                    written += self._upsert(db, datetime.strptime(day, "%Y%m%d").date(), counters)
+                else:
+                    self._stats["skipped_snapshots"] += 1
+                db.commit()
+                self.redis.delete(snapshot_key)
+
+            self._prune_flush_log(db)
+            db.commit()
+        finally:
+            self.redis.eval(RELEASE_SCRIPT, 1, FLUSH_LOCK_KEY, token)
+
+        self._stats["flushed_rows"] += written
+        return written
+
+
+    def _claim_snapshot(self, db: Session, snapshot_key: str) -> bool:
+        """
+        Record a snapshot as applied (same transaction as its upsert).
+
+        RETURNS:
+            False if the snapshot was already applied
+        """
+
+        stmt = insert(UsageFlushLog.__table__).values(
+            snapshot_id=snapshot_key
+        ).on_conflict_do_nothing(
+            index_elements=["snapshot_id"]
+        ).returning(UsageFlushLog.__table__.c.id)
+
+        return db.execute(stmt).first() is not None
+
+
+    def _prune_flush_log(self, db: Session):
+        """Drop applied snapshot ids past retention (snapshots live minutes)."""
+
+        cutoff = datetime.utcnow() - timedelta(days=self.flush_log_retention_days)
+        db.query(UsageFlushLog).filter(UsageFlushLog.created_at < cutoff).delete(synchronize_session=False)
+
+
+    def _upsert(self, db: Session, period_start: date, counters: dict) -> int:
+        """Add snapshot counters to workspace_usage rows."""
+
+        rows = []
+        for field, value in counters.items():
+            workspace_id, bot_id, metric = field.split("|")
+            if int(value):
+                rows.append({
+                    "workspace_id": UUID(workspace_id),
+                    "bot_id": UUID(bot_id),
+                    "period_start": period_start,
+                    "metric": metric,
+                    "value": int(value)
+                })
+
+        if not rows:
+            return 0
+
+        table = WorkspaceUsage.__table__
+        stmt = insert(table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_workspace_usage_period_metric",
+            set_={
+                "value": table.c.value + stmt.excluded.value,
+                "updated_at": datetime.utcnow()
+            }
+        )
+        db.execute(stmt)
+
+        return len(rows)
+
+
+    # ------------------------------------------------------------------
+    # Reading and quotas
+    # ------------------------------------------------------------------
+
+    def get_month_usage(self, db: Session, workspace_id: UUID) -> dict:
+        """
+        Current month usage for a workspace.
+
+        HOW: Redis monthly counter; seeded once from workspace_usage when
+             missing (new month or lost Redis data). record() only
+             increments a seeded counter, so the persisted totals and the
+             counter never overlap
+
+        RETURNS:
+            {"messages": 120, "prompt_tokens": ..., "tokens": ..., ...}
+        """
+
+        now = datetime.utcnow()
+        month_key = self._month_key(workspace_id, now)
+
+        counters = self.redis.hgetall(month_key)
+
+        if "_seeded" not in counters:
+            persisted = self._persisted_month_usage(db, workspace_id, now)
+            # Only the first seeder adds the persisted totals
+            self._increment(month_key, f"usage:pending:{now:%Y%m%d}", [], base=persisted)
+            counters = self.redis.hgetall(month_key)
+
+        usage = {metric: int(counters.get(metric, 0)) for metric in METRICS}
+        usage["tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        return usage
+
+
+    def _persisted_month_usage(self, db: Session, workspace_id: UUID, now: datetime) -> dict:
+        """Sum flushed workspace_usage rows for the current month."""
+
+        rows = db.query(
+            WorkspaceUsage.metric,
+            func.sum(WorkspaceUsage.value)
+        ).filter(
+            WorkspaceUsage.workspace_id == workspace_id,
+            WorkspaceUsage.period_start >= date(now.year, now.month, 1)
+        ).group_by(WorkspaceUsage.metric).all()
+
+        return {metric: int(total) for metric, total in rows if total}
+
+
+    def get_limits(self, db: Session, workspace_id: UUID) -> dict:
+        """
+        Monthly limits for a workspace.
+
+        HOW: Tier defaults + workspace.settings["quotas"] overrides,
+             cached in process for limits_ttl seconds
+        """
+
+        now = time.monotonic()
+        with self._lock:
+            cached = self._limits_cache.get(workspace_id)
+            if cached and cached[0] > now:
+                return cached[1]
+
+        from app.models.workspace import Workspace
+        from app.models.organization import Organization
+
+        row = db.query(Workspace.settings, Organization.subscription_tier).join(
+            Organization, Organization.id == Workspace.organization_id
+        ).filter(Workspace.id == workspace_id).first()
+
+        if row is None:
+            limits = {}
+        else:
+            workspace_settings, tier = row
+            limits = dict(self.tier_quotas.get(tier or "free", {}))
+            limits.update((workspace_settings or {}).get("quotas", {}))
+
+        with self._lock:
+            self._limits_cache[workspace_id] = (now + self.limits_ttl, limits)
+
+        return limits
+
+
+    def check_quota(self, db: Session, workspace_id: UUID, metric: str, amount: int = 1) -> dict:
+        """
+        Check whether `amount` more units of `metric` fit in the monthly quota.
+
+        WHY: Cheap gate for the public chat path and ingestion tasks
+        HOW: Cached limits + one Redis HGETALL; fails open on Redis errors
+
+        RETURNS:
+            {
+                "allowed": True,
+                "metric": "messages",
+                "used": 120,
+                "limit": 1000,       # None = unlimited
+                "remaining": 880     # None = unlimited
+            }
+        """
+
+        limit = self.get_limits(db, workspace_id).get(metric)
+
+        if limit is None or not self.enabled:
+            return {"allowed": True, "metric": metric, "used": None, "limit": None, "remaining": None}
+
+        try:
+            used = self.get_month_usage(db, workspace_id).get(metric, 0)
+        except Exception:
+            self._stats["redis_errors"] += 1
+            return {"allowed": True, "metric": metric, "used": None, "limit": limit, "remaining": None}
+
+        remaining = max(limit - used, 0)
+
+        return {
+            "allowed": used + amount <= limit,
+            "metric": metric,
+            "used": used,
+            "limit": limit,
+            "remaining": remaining
+        }
+
+
+    def enforce_quota(self, db: Session, workspace_id: UUID, metric: str, amount: int = 1) -> dict:
+        """
+        check_quota() that raises QuotaExceededError when not allowed.
+        """
+
+        result = self.check_quota(db, workspace_id, metric, amount)
+        if not result["allowed"]:
+            raise QuotaExceededError(metric, result["used"], result["limit"])
+        return result
+
+
+    def get_stats(self) -> dict:
+        """Metering counters for monitoring."""
+        return dict(self._stats)
+
+
+# Global instance
+usage_metering_service = UsageMeteringService()
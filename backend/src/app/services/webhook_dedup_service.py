@@ -0,0 +1,139 @@
+"""
+Webhook Dedup Service - Drop redelivered channel webhook updates.
+
+WHY:
+- Platforms redeliver webhooks when we respond slowly or error
+  (Telegram update_id, WhatsApp message id, Discord interaction id)
+- Each redelivery re-ran retrieval + inference and double-billed tokens
+
+HOW:
+- Local recent-ids LRU answers repeats seen by this process (no I/O)
+- Redis SET NX EX on "webhook:seen:{platform}:{bot_id}:{update_id}"
+  makes the first delivery win across all API workers
+- Checked at the top of the webhook routes, before DB or LLM work;
+  routes release() the id when they fail before acknowledging, so the
+  platform's redelivery is processed
+- Redis unavailable -> local cache only (fail open, never drop new traffic)
+
+PSEUDOCODE follows the existing codebase patterns.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from app.core.config import settings
+
+
+class WebhookDedupService:
+    """
+    First-delivery-wins filter for webhook updates.
+
+    WHY: Idempotent webhook handling
+    HOW: Local LRU + Redis SET NX with TTL
+    """
+
+    def __init__(self, redis_client=None):
+        """
+        Initialize dedup service.
+
+        ARGS:
+            redis_client: Optional Redis client (defaults to app.utils.redis)
+        """
+        self.ttl = getattr(settings, "WEBHOOK_DEDUP_TTL_SECONDS", 24 * 60 * 60)
+        self.max_local = getattr(settings, "WEBHOOK_DEDUP_LOCAL_SIZE", 10000)
+
+        self._redis = redis_client
+        self._recent: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"new": 0, "local_duplicates": 0, "redis_duplicates": 0, "redis_errors": 0}
+
+
+    @property
+    def redis(self):
+        """Lazily resolve Redis client."""
+        if self._redis is None:
+            from app.utils.redis import redis_client
+            self._redis = redis_client
+        return self._redis
+
+
+    def is_duplicate(self, platform: str, bot_id: Any, update_id: Any) -> bool:
+        """
+        Record an update and report whether it was already seen.
+
+        ARGS:
+            platform: "telegram" | "whatsapp" | "discord"
+            bot_id: Bot receiving the webhook
+            update_id: Platform's unique id for the update
+
+        RETURNS:
+            True if this update was delivered before (drop it)
+        """
+
+        if update_id is None:
+            return False
+
+        key = f"webhook:seen:{platform}:{bot_id}:{update_id}"
+        now = time.monotonic()
+
+        # Tier 1: this process saw it recently
+        with self._lock:
+            expires_at = self._recent.get(key)
+            if expires_at is not None and expires_at > now:
+                self._recent.move_to_end(key)
+                self._stats["local_duplicates"] += 1
+                return True
+
+        # Tier 2: atomic first-writer-wins across processes
+        try:
+            first = self.redis.set(key, "1", nx=True, ex=self.ttl)
+        except Exception:
+            self._stats["redis_errors"] += 1
+            first = True
+
+        self._remember(key, now)
+
+        if not first:
+            self._stats["redis_duplicates"] += 1
+            return True
+
+        self._stats["new"] += 1
+        return False
+
+
+    def release(self, platform: str, bot_id: Any, update_id: Any):
+        """
+        Forget an update so its redelivery is processed.
+
+        WHY: We refused the update (e.g. chat queue full) and want the
+             platform's retry to go through
+        """
+
+        key = f"webhook:seen:{platform}:{bot_id}:{update_id}"
+
+        with self._lock:
+            self._recent.pop(key, None)
+
+        try:
+            self.redis.delete(key)
+        except Exception:
+            self._stats["redis_errors"] += 1
+
+
+    def _remember(self, key: str, now: float):
+        with self._lock:
+            self._recent[key] = now + self.ttl
+            self._recent.move_to_end(key)
+            while len(self._recent) > self.max_local:
+                self._recent.popitem(last=False)
+
+
+    def get_stats(self) -> dict:
+        """Dedup counters for monitoring."""
+        return {**self._stats, "local_entries": len(self._recent)}
+
+
+# Global instance
+webhook_dedup_service = WebhookDedupService()
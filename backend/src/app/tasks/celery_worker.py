@@ -0,0 +1,56 @@
+"""
+Celery Worker - Celery application and periodic task schedule.
+
+WHY:
+- Background tasks are declared with @shared_task and need an app to run on
+- Maintenance tasks (partitions, session cleanup, usage flush) must run
+  on a schedule, not only when someone triggers them
+
+HOW:
+- Broker / result backend from settings (Redis)
+- Task modules listed in `include` so workers register them; only modules
+  that import cleanly are listed (one failing import stops the worker and
+  beat from starting) - add the ingestion/sync task modules as their
+  services are implemented
+- beat_schedule drives the periodic maintenance tasks
+
+USAGE:
+    cd backend/src
+    celery -A app.tasks.celery_worker worker --loglevel=info
+    celery -A app.tasks.celery_worker beat --loglevel=info
+
+PSEUDOCODE follows the existing codebase patterns.
+"""
+
+from celery import Celery
+from celery.schedules import crontab
+
+from app.core.config import settings
+
+
+celery_app = Celery(
+    "privexbot",
+    broker=settings.CELERY_BROKER_URL,
+    backend=settings.CELERY_RESULT_BACKEND,
+    include=[
+        "app.tasks.maintenance_tasks"
+    ]
+)
+
+celery_app.conf.timezone = "UTC"
+
+celery_app.conf.beat_schedule = {
+    # Create upcoming chat_messages partitions, drop expired ones
+    "maintain-chat-partitions": {
+        "task": "maintain_chat_partitions",
+        "schedule": crontab(hour=0, minute=15)
+    },
+    "cleanup-expired-sessions": {
+        "task": "cleanup_expired_sessions",
+        "schedule": crontab(hour=3, minute=0)
+    },
+    "flush-usage-counters": {
+        "task": "flush_usage_counters",
+        "schedule": 60.0
+    }
+}
@@ -27,6 +27,23 @@ from app.integrations.firecrawl_adapter import firecrawl_adapter
 from app.integrations.jina_adapter import jina_adapter
 from app.services.chunking_service import chunking_service
 from app.services.indexing_service import indexing_service
+from app.services.usage_metering_service import usage_metering_service
+
+
+def _crawl_page_allowance(db: Session, workspace_id: UUID, requested: int) -> int:
+    """
+    Clamp a crawl to the workspace's remaining monthly page quota.
+
+    RAISES:
+        QuotaExceededError: No pages left this month
+    """
+
+    quota = usage_metering_service.enforce_quota(db, workspace_id, "crawl_pages")
+
+    if quota["remaining"] is None:
+        return requested
+
+    return min(requested, quota["remaining"])
 
 
 @shared_task(bind=True, name="crawl_website")
@@ -84,6 +101,9 @@ def crawl_website_task(
         kb.metadata["crawl_started_at"] = str(__import__("datetime").datetime.utcnow())
         db.commit()
 
+        # Stay within monthly crawl quota
+        max_pages = _crawl_page_allowance(db, kb.workspace_id, max_pages)
+
         # Select adapter
         if adapter == "crawl4ai":
             crawler = crawl4ai_adapter
@@ -108,6 +128,8 @@ def crawl_website_task(
 
         loop.close()
 
+        usage_metering_service.record(kb.workspace_id, {"crawl_pages": len(pages)}, db=db)
+
         # Create documents for each page
         documents_created = 0
 
@@ -244,6 +266,9 @@ def crawl_sitemap_task(
             crawler.parse_sitemap(db=db, sitemap_url=sitemap_url)
         )
 
+        # Stay within monthly crawl quota
+        urls = urls[:_crawl_page_allowance(db, kb.workspace_id, len(urls))]
+
         # Crawl each URL
         documents_created = 0
 
@@ -280,6 +305,8 @@ def crawl_sitemap_task(
         db.commit()
         loop.close()
 
+        usage_metering_service.record(kb.workspace_id, {"crawl_pages": documents_created}, db=db)
+
         # Queue documents for processing
         from app.tasks.document_tasks import process_document_task
 
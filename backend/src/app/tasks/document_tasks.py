@@ -24,6 +24,8 @@ from app.db.session import SessionLocal
 from app.services.document_processing_service import document_processing_service
 from app.services.chunking_service import chunking_service
 from app.services.indexing_service import indexing_service
+from app.services.token_budget_service import token_budget_service
+from app.services.usage_metering_service import usage_metering_service
 
 
 @shared_task(bind=True, name="process_document")
@@ -35,11 +37,11 @@ def process_document_task(self, document_id: str, kb_id: str):
     HOW: Chain parsing, chunking, indexing
 
     FLOW:
-    1. Parse document (extract text)
+    1. Check embedding token quota
     2. Chunk document (split into pieces)
     3. Generate embeddings
     4. Index in vector store
-    5. Update status
+    5. Record usage, update status
 
     ARGS:
         document_id: Document UUID
@@ -69,6 +71,10 @@ def process_document_task(self, document_id: str, kb_id: str):
         if not kb:
             raise ValueError(f"KB not found: {kb_id}")
 
+        # Embedding quota (raises QuotaExceededError -> document marked error)
+        embedding_tokens = token_budget_service.count_tokens(document.content or "")
+        usage_metering_service.enforce_quota(db, kb.workspace_id, "embedding_tokens", embedding_tokens)
+
         # Update status
         document.status = "processing"
         db.commit()
@@ -107,6 +113,8 @@ def process_document_task(self, document_id: str, kb_id: str):
 
         loop.close()
 
+        usage_metering_service.record(kb.workspace_id, {"embedding_tokens": embedding_tokens}, db=db)
+
         # Update document status
         document.status = "indexed"
         db.commit()
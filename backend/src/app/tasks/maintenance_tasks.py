@@ -0,0 +1,139 @@
+"""
+Maintenance Tasks - Celery tasks for database housekeeping.
+
+WHY:
+- chat_messages partitions must exist before the month starts
+- Expired sessions and messages must be removed regularly
+- Analytics rollups need a backfill/repair path
+- Usage counters in Redis must reach Postgres regularly
+- Keep request handlers free of housekeeping work
+
+HOW:
+- Celery periodic tasks (beat_schedule in tasks/celery_worker.py)
+- Delegate to services
+
+PSEUDOCODE follows the existing codebase patterns.
+"""
+
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from celery import shared_task
+
+from app.db.session import SessionLocal
+from app.services.bot_analytics_service import bot_analytics_service
+from app.services.chat_partition_service import chat_partition_service
+from app.services.session_service import session_service
+from app.services.usage_metering_service import usage_metering_service
+
+
+@shared_task(bind=True, name="maintain_chat_partitions")
+def maintain_chat_partitions_task(self):
+    """
+    Create upcoming chat_messages partitions and drop expired ones.
+
+    WHY: O(1) retention, inserts never fall into the default partition
+    HOW: ensure_partitions() + drop_expired_partitions()
+
+    SCHEDULE: Run daily
+
+    RETURNS:
+        {
+            "created": ["chat_messages_p202503"],
+            "dropped": ["chat_messages_p202401"]
+        }
+    """
+
+    db = SessionLocal()
+
+    try:
+        created = chat_partition_service.ensure_partitions(db)
+        dropped = chat_partition_service.drop_expired_partitions(db)
+
+        return {"created": created, "dropped": dropped}
+
+    finally:
+        db.close()
+
+
+@shared_task(bind=True, name="cleanup_expired_sessions")
+def cleanup_expired_sessions_task(self):
+    """
+    Delete expired chat sessions.
+
+    WHY: Free up database space
+    HOW: session_service.cleanup_expired_sessions (bulk delete)
+
+    SCHEDULE: Run daily
+
+    RETURNS:
+        {"sessions_deleted": 120}
+    """
+
+    db = SessionLocal()
+
+    try:
+        deleted = session_service.cleanup_expired_sessions(db)
+
+        return {"sessions_deleted": deleted}
+
+    finally:
+        db.close()
+
+
+@shared_task(bind=True, name="rebuild_bot_analytics")
+def rebuild_bot_analytics_task(self, bot_type: str, bot_id: str, days: int = 30):
+    """
+    Recompute a bot's analytics rollups from raw messages.
+
+    WHY: Backfill history after rollups were introduced, or repair drift
+    HOW: bot_analytics_service.rebuild over the last `days` days
+
+    ARGS:
+        bot_type: "chatbot" | "chatflow"
+        bot_id: Bot UUID
+        days: Window to rebuild
+
+    RETURNS:
+        {"bot_id": "uuid", "rows_written": 48}
+    """
+
+    db = SessionLocal()
+
+    try:
+        rows = bot_analytics_service.rebuild(
+            db=db,
+            bot_type=bot_type,
+            bot_id=UUID(bot_id),
+            since=datetime.utcnow() - timedelta(days=days)
+        )
+
+        return {"bot_id": bot_id, "rows_written": rows}
+
+    finally:
+        db.close()
+
+
+@shared_task(bind=True, name="flush_usage_counters")
+def flush_usage_counters_task(self):
+    """
+    Move pending usage counters from Redis into workspace_usage.
+
+    WHY: Durable billing totals without a DB write per message
+    HOW: usage_metering_service.flush (RENAME + upsert)
+
+    SCHEDULE: Run every minute
+
+    RETURNS:
+        {"rows_upserted": 35}
+    """
+
+    db = SessionLocal()
+
+    try:
+        rows = usage_metering_service.flush(db)
+
+        return {"rows_upserted": rows}
+
+    finally:
+        db.close()
@@ -0,0 +1,133 @@
+"""
+BotAnalyticsService Tests
+
+WHY: Dashboard numbers are derived entirely from rollup counters
+HOW: Exercise bucketing and summary folding on in-memory rows (no database)
+
+Tests:
+1. Hour/day bucket truncation
+2. Response time histogram bucketing and percentiles
+3. Summary totals and derived ratios
+4. Feedback resubmission adjusts counters
+
+USAGE:
+    pytest app/tests/test_bot_analytics_service.py -v
+"""
+
+from datetime import datetime
+from types import SimpleNamespace
+from uuid import uuid4
+
+from app.models.bot_analytics_rollup import COUNTER_COLUMNS
+from app.services.bot_analytics_service import (
+    BotAnalyticsService,
+    histogram_percentile,
+    response_time_column,
+    truncate
+)
+
+
+def rollup(day: int, **counters) -> SimpleNamespace:
+    values = {column: 0 for column in COUNTER_COLUMNS}
+    values.update(counters)
+    return SimpleNamespace(bucket_start=datetime(2025, 1, day), **values)
+
+
+class RecordingService(BotAnalyticsService):
+    """Captures increments instead of writing to the database."""
+
+    def __init__(self):
+        self.increments = []
+
+    def increment(self, db, bot_type, bot_id, workspace_id, at, deltas):
+        self.increments.append({column: value for column, value in deltas.items() if value})
+
+
+class TestBucketing:
+    """Test bucket helpers."""
+
+    def test_truncate(self):
+        moment = datetime(2025, 1, 2, 13, 45, 12, 999)
+        assert truncate(moment, "hour") == datetime(2025, 1, 2, 13)
+        assert truncate(moment, "day") == datetime(2025, 1, 2)
+
+    def test_response_time_column(self):
+        assert response_time_column(100) == "rt_le_250"
+        assert response_time_column(250) == "rt_le_250"
+        assert response_time_column(251) == "rt_le_500"
+        assert response_time_column(60000) == "rt_gt_5000"
+
+    def test_histogram_percentile(self):
+        histogram = {"rt_le_250": 50, "rt_le_500": 40, "rt_le_1000": 5, "rt_le_2000": 5}
+        assert histogram_percentile(histogram, 0.5) == 250
+        assert histogram_percentile(histogram, 0.95) == 1000
+        assert histogram_percentile({}, 0.5) is None
+
+
+class TestSummary:
+    """Test folding rollup rows into the endpoint response."""
+
+    def test_totals_and_ratios(self):
+        rows = [
+            rollup(1, conversations=2, messages=8, errors=1, feedback_positive=3,
+                   response_time_count=4, response_time_sum_ms=2000, rt_le_500=4),
+            rollup(2, conversations=2, messages=12, feedback_negative=1,
+                   response_time_count=1, response_time_sum_ms=3000, rt_le_5000=1)
+        ]
+
+        summary = BotAnalyticsService().summarize(rows)
+
+        assert summary["total_conversations"] == 4
+        assert summary["total_messages"] == 20
+        assert summary["avg_conversation_length"] == 5.0
+        assert summary["avg_response_time_ms"] == 1000
+        assert summary["p50_response_time_ms"] == 500
+        assert summary["user_satisfaction"] == 0.75
+        assert summary["error_rate"] == 0.05
+        assert [point["date"] for point in summary["daily"]] == ["2025-01-01", "2025-01-02"]
+
+    def test_empty(self):
+        summary = BotAnalyticsService().summarize([])
+        assert summary["total_messages"] == 0
+        assert summary["user_satisfaction"] is None
+        assert summary["p95_response_time_ms"] is None
+
+
+class TestRecording:
+    """Test deltas produced for writes."""
+
+    def _session(self):
+        return SimpleNamespace(bot_type=SimpleNamespace(value="chatbot"), bot_id=uuid4(), workspace_id=uuid4())
+
+    def test_assistant_message_deltas(self):
+        service = RecordingService()
+        message = SimpleNamespace(
+            role=SimpleNamespace(value="assistant"),
+            response_metadata={"latency_ms": 820},
+            prompt_tokens=100,
+            completion_tokens=20,
+            total_tokens=120,
+            error=None,
+            created_at=datetime(2025, 1, 1, 10)
+        )
+
+        service.record_message(None, self._session(), message, new_conversation=False)
+
+        assert service.increments == [{
+            "messages": 1,
+            "assistant_messages": 1,
+            "prompt_tokens": 100,
+            "completion_tokens": 20,
+            "total_tokens": 120,
+            "response_time_count": 1,
+            "response_time_sum_ms": 820,
+            "rt_le_1000": 1
+        }]
+
+    def test_feedback_change_moves_count(self):
+        service = RecordingService()
+        message = SimpleNamespace(created_at=datetime(2025, 1, 1))
+
+        service.record_feedback(None, self._session(), message, "negative", previous_rating="positive")
+
+        assert service.increments == [{"feedback_positive": -1, "feedback_negative": 1}]
@@ -0,0 +1,104 @@
+"""
+BotRegistry Tests
+
+WHY: Webhooks and public chat resolve bots through the registry
+HOW: In-memory Redis stand-in and a counting loader (no database)
+
+Tests:
+1. Database hit once, then served locally
+2. Redis tier shared across registry instances
+3. Invalidation forces a reload
+4. Unknown bots negatively cached
+
+USAGE:
+    pytest app/tests/test_bot_registry.py -v
+"""
+
+from types import SimpleNamespace
+from uuid import uuid4
+
+from app.services.bot_registry import BotRegistry
+
+
+class MemoryRedis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+class CountingRegistry(BotRegistry):
+    """Serves bots from a dict and counts database loads."""
+
+    def __init__(self, redis, bots):
+        super().__init__(redis_client=redis)
+        self.bots = bots
+        self.loads = 0
+
+    def _load_bot(self, db, bot_id):
+        self.loads += 1
+        bot = self.bots.get(bot_id)
+        return ("chatbot", bot) if bot else (None, None)
+
+
+def make_bot(channels=("telegram",)):
+    return SimpleNamespace(
+        id=uuid4(),
+        workspace_id=uuid4(),
+        config={"deployment": {"channels": list(channels)}},
+        deployment_config=None
+    )
+
+
+class TestLookup:
+    """Test tiered lookup."""
+
+    def test_local_cache(self):
+        bot = make_bot()
+        registry = CountingRegistry(MemoryRedis(), {str(bot.id): bot})
+
+        first = registry.get(None, bot.id)
+        second = registry.get(None, bot.id)
+
+        assert registry.loads == 1
+        assert first is second
+        assert first.channel_enabled("telegram")
+        assert not first.channel_enabled("discord")
+
+    def test_redis_shared(self):
+        redis = MemoryRedis()
+        bot = make_bot()
+        CountingRegistry(redis, {str(bot.id): bot}).get(None, bot.id)
+
+        other = CountingRegistry(redis, {})
+        entry = other.get(None, bot.id)
+
+        assert other.loads == 0
+        assert entry.workspace_id == str(bot.workspace_id)
+        assert entry.deployment_config == {"channels": ["telegram"]}
+
+    def test_invalidate(self):
+        bot = make_bot()
+        registry = CountingRegistry(MemoryRedis(), {str(bot.id): bot})
+        registry.get(None, bot.id)
+
+        bot.config = {"deployment": {"channels": ["discord"]}}
+        registry.invalidate(bot.id)
+
+        assert registry.get(None, bot.id).channel_enabled("discord")
+        assert registry.loads == 2
+
+    def test_unknown_negatively_cached(self):
+        registry = CountingRegistry(MemoryRedis(), {})
+        missing = uuid4()
+
+        assert registry.get(None, missing) is None
+        assert registry.get(None, missing) is None
+        assert registry.loads == 1
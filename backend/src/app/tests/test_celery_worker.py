@@ -0,0 +1,25 @@
+"""
+Celery Worker Tests
+
+WHY: A task module that fails to import stops the worker and beat entirely
+HOW: Import the included modules the way the worker does
+
+Tests:
+1. Every beat entry names a registered task
+
+USAGE:
+    pytest app/tests/test_celery_worker.py -v
+"""
+
+from app.tasks.celery_worker import celery_app
+
+
+class TestSchedule:
+    """Test beat schedule wiring."""
+
+    def test_scheduled_tasks_registered(self):
+        celery_app.loader.import_default_modules()
+
+        scheduled = {entry["task"] for entry in celery_app.conf.beat_schedule.values()}
+        assert "maintain_chat_partitions" in scheduled
+        assert scheduled <= set(celery_app.tasks)
@@ -0,0 +1,234 @@
+"""
+ChannelDispatcher Tests
+
+WHY: Webhook replies must stay ordered per chat without serialising chats,
+     and an acknowledged update must survive the process
+HOW: Registered handlers over an in-memory Redis and a fake session factory
+
+Tests:
+1. Jobs within one chat run in submission order
+2. Different chats run concurrently
+3. Full chat queue rejects new jobs; Redis down rejects (not acknowledged)
+4. A failing job does not block later jobs; sessions always closed
+5. Jobs left queued by a dead process are recovered, in order
+6. Two dispatchers sharing Redis never run one chat concurrently
+
+USAGE:
+    pytest app/tests/test_channel_dispatcher.py -v
+"""
+
+import asyncio
+
+from app.services.channel_dispatcher import ChannelDispatcher
+
+
+class FakeRedis:
+    """In-memory stand-in for the list/set/lease commands the dispatcher uses."""
+
+    def __init__(self):
+        self.data = {}
+
+    def llen(self, key):
+        return len(self.data.get(key, []))
+
+    def rpush(self, key, value):
+        self.data.setdefault(key, []).append(value)
+
+    def lindex(self, key, index):
+        items = self.data.get(key, [])
+        return items[index] if items else None
+
+    def lpop(self, key):
+        items = self.data.get(key, [])
+        return items.pop(0) if items else None
+
+    def sadd(self, key, member):
+        self.data.setdefault(key, set()).add(member)
+
+    def srem(self, key, member):
+        self.data.get(key, set()).discard(member)
+
+    def smembers(self, key):
+        return set(self.data.get(key, set()))
+
+    def set(self, key, value, nx=False, px=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def pexpire(self, key, ms):
+        pass
+
+
+class BrokenRedis:
+    def llen(self, key):
+        raise ConnectionError("redis down")
+
+
+class FakeSession:
+    closed = 0
+
+    def close(self):
+        FakeSession.closed += 1
+
+
+def make_dispatcher(redis=None, **kwargs) -> ChannelDispatcher:
+    return ChannelDispatcher(session_factory=FakeSession, redis_client=redis or FakeRedis(), **kwargs)
+
+
+class Recorder:
+    """Handler that sleeps payload["delay"] and records payload["n"]."""
+
+    def __init__(self):
+        self.seen = []
+        self.running = 0
+        self.max_running = 0
+
+    async def __call__(self, db, payload):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(payload.get("delay", 0))
+            if payload.get("fail"):
+                raise RuntimeError("upstream down")
+            self.seen.append(payload["n"])
+        finally:
+            self.running -= 1
+
+
+class TestOrdering:
+    """Test per-chat ordering."""
+
+    def test_same_chat_in_order(self):
+        dispatcher = make_dispatcher()
+        recorder = Recorder()
+        dispatcher.register("test", recorder)
+
+        async def scenario():
+            # Earlier jobs are slower; order must still hold
+            for n, delay in enumerate([0.03, 0.02, 0.01, 0.0]):
+                assert dispatcher.submit("bot", "chat", "test", {"n": n, "delay": delay})
+            await dispatcher.drain()
+
+        asyncio.run(scenario())
+        assert recorder.seen == [0, 1, 2, 3]
+
+    def test_chats_run_concurrently(self):
+        dispatcher = make_dispatcher()
+        dispatcher.register("test", Recorder())
+
+        async def scenario():
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            for chat in range(5):
+                dispatcher.submit("bot", chat, "test", {"n": chat, "delay": 0.1})
+            await dispatcher.drain()
+            return loop.time() - started
+
+        assert asyncio.run(scenario()) < 0.3
+
+
+class TestBackpressure:
+    """Test queue limits and failures."""
+
+    def test_full_queue_rejected(self):
+        dispatcher = make_dispatcher(max_pending_per_chat=2)
+        dispatcher.register("test", Recorder())
+
+        async def scenario():
+            results = [dispatcher.submit("bot", "chat", "test", {"n": n}) for n in range(3)]
+            await dispatcher.drain()
+            return results
+
+        assert asyncio.run(scenario()) == [True, True, False]
+        assert dispatcher.get_stats()["rejected"] == 1
+
+    def test_redis_down_is_not_acknowledged(self):
+        dispatcher = make_dispatcher(redis=BrokenRedis())
+
+        async def scenario():
+            return dispatcher.submit("bot", "chat", "test", {"n": 0})
+
+        assert asyncio.run(scenario()) is False
+        assert dispatcher.get_stats()["redis_errors"] == 1
+
+    def test_failure_isolated(self):
+        dispatcher = make_dispatcher()
+        recorder = Recorder()
+        dispatcher.register("test", recorder)
+        FakeSession.closed = 0
+
+        async def scenario():
+            dispatcher.submit("bot", "chat", "test", {"n": 0, "fail": True})
+            dispatcher.submit("bot", "chat", "test", {"n": 1})
+            await dispatcher.drain()
+
+        asyncio.run(scenario())
+
+        assert recorder.seen == [1]
+        assert FakeSession.closed == 2
+        stats = dispatcher.get_stats()
+        assert stats["failed"] == 1
+        assert stats["completed"] == 1
+        assert stats["active_chats"] == 0
+
+
+class TestDurability:
+    """Test recovery and cross-process ordering."""
+
+    def test_queued_jobs_recovered_after_restart(self):
+        redis = FakeRedis()
+        crashed = make_dispatcher(redis)
+
+        async def accept_then_die():
+            # Queued (webhook acknowledged) but never run
+            crashed._start_worker = lambda partition: None
+            for n in range(3):
+                crashed.submit("bot", "chat", "test", {"n": n})
+
+        asyncio.run(accept_then_die())
+
+        restarted = make_dispatcher(redis)
+        recorder = Recorder()
+        restarted.register("test", recorder)
+
+        async def scenario():
+            started = restarted.recover()
+            await restarted.drain()
+            return started
+
+        assert asyncio.run(scenario()) == 1
+        assert recorder.seen == [0, 1, 2]
+        assert redis.llen("channel:queue:bot:chat") == 0
+
+        # Drained partitions are dropped from the index on the next pass
+        asyncio.run(scenario())
+        assert redis.smembers("channel:partitions") == set()
+
+    def test_lease_keeps_chat_serial_across_dispatchers(self):
+        redis = FakeRedis()
+        recorder = Recorder()
+        first, second = make_dispatcher(redis), make_dispatcher(redis)
+        first.register("test", recorder)
+        second.register("test", recorder)
+
+        async def scenario():
+            for n in range(4):
+                (first if n % 2 == 0 else second).submit("bot", "chat", "test", {"n": n, "delay": 0.01})
+            await first.drain()
+            await second.drain()
+
+        asyncio.run(scenario())
+
+        assert recorder.seen == [0, 1, 2, 3]
+        assert recorder.max_running == 1
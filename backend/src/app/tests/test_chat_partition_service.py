@@ -0,0 +1,124 @@
+"""
+ChatPartitionService Tests
+
+WHY: Missing partitions send inserts to the default partition; a wrong
+     retention cutoff drops messages that must be kept
+HOW: Fake session answering the catalog queries and recording DDL
+
+Tests:
+1. ensure_partitions() creates default + current + upcoming months once
+2. drop_expired_partitions() detaches and drops only whole expired months
+3. Non-partitioned tables are left alone
+
+USAGE:
+    pytest app/tests/test_chat_partition_service.py -v
+"""
+
+from datetime import date
+
+from app.services.chat_partition_service import ChatPartitionService
+
+
+class Result:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar(self):
+        return self.value
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return list(self.value)
+
+
+class FakeSession:
+    """chat_messages catalog in memory; DDL statements are recorded."""
+
+    def __init__(self, children=(), partitioned=True):
+        self.children = set(children)
+        self.partitioned = partitioned
+        self.ddl = []
+        self.commits = 0
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+
+        if "pg_partitioned_table" in sql:
+            return Result(1 if self.partitioned else None)
+        if "pg_inherits" in sql:
+            return Result(sorted(self.children))
+
+        self.ddl.append(sql)
+        words = sql.split()
+        if sql.startswith("CREATE TABLE"):
+            self.children.add(words[5])
+        elif "DETACH PARTITION" in sql:
+            self.children.discard(words[-1])
+        return Result(None)
+
+    def commit(self):
+        self.commits += 1
+
+
+class TestEnsurePartitions:
+    """Test partition creation."""
+
+    def test_creates_current_and_upcoming(self):
+        db = FakeSession()
+        service = ChatPartitionService()
+
+        created = service.ensure_partitions(db, months_ahead=2, today=date(2025, 11, 20))
+
+        assert created == [
+            "chat_messages_default",
+            "chat_messages_p202511",
+            "chat_messages_p202512",
+            "chat_messages_p202601"
+        ]
+        assert "FOR VALUES FROM ('2025-12-01') TO ('2026-01-01')" in db.ddl[2]
+
+        # Idempotent: nothing left to create
+        assert service.ensure_partitions(db, months_ahead=2, today=date(2025, 11, 30)) == []
+
+    def test_only_missing_months(self):
+        db = FakeSession(children={"chat_messages_default", "chat_messages_p202511"})
+
+        created = ChatPartitionService().ensure_partitions(db, months_ahead=1, today=date(2025, 11, 1))
+
+        assert created == ["chat_messages_p202512"]
+
+    def test_not_partitioned(self):
+        db = FakeSession(partitioned=False)
+        service = ChatPartitionService()
+
+        assert service.ensure_partitions(db, today=date(2025, 11, 1)) == []
+        assert service.drop_expired_partitions(db, today=date(2025, 11, 1)) == []
+        assert db.ddl == []
+
+
+class TestDropExpiredPartitions:
+    """Test retention."""
+
+    def test_drops_whole_expired_months_only(self):
+        months = ["202401", "202402", "202403", "202404"]
+        db = FakeSession(children={"chat_messages_default"} | {f"chat_messages_p{m}" for m in months})
+
+        # Cutoff 2024-03-01: February ends exactly at the cutoff, March does not
+        dropped = ChatPartitionService().drop_expired_partitions(db, retention_days=366, today=date(2025, 3, 2))
+
+        assert dropped == ["chat_messages_p202401", "chat_messages_p202402"]
+        assert db.ddl == [
+            "ALTER TABLE chat_messages DETACH PARTITION chat_messages_p202401",
+            "DROP TABLE chat_messages_p202401",
+            "ALTER TABLE chat_messages DETACH PARTITION chat_messages_p202402",
+            "DROP TABLE chat_messages_p202402"
+        ]
+        assert "chat_messages_p202403" in db.children and "chat_messages_default" in db.children
+
+    def test_nothing_expired(self):
+        db = FakeSession(children={"chat_messages_p202501"})
+
+        assert ChatPartitionService().drop_expired_partitions(db, retention_days=365, today=date(2025, 6, 1)) == []
+        assert db.ddl == []
@@ -0,0 +1,196 @@
+"""
+ChatbotService Tests
+
+WHY: Retrieval runs concurrently with session bookkeeping; a slow or failing
+     knowledge base must not cost the turn or the user's message
+HOW: Session, inference and retrieval services replaced with in-memory fakes
+
+Tests:
+1. Session preparation and retrieval overlap
+2. A per-KB timeout drops only that KB's results
+3. A retrieval error still saves the user message and answers
+4. Concurrent KB searches never share a DB session
+
+USAGE:
+    pytest app/tests/test_chatbot_service.py -v
+"""
+
+import asyncio
+import sys
+import time
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+import app.db.session
+import app.models.chatbot
+
+if not hasattr(app.models.chatbot, "Chatbot"):
+    # The service only uses the model name in annotations
+    app.models.chatbot.Chatbot = object
+
+try:
+    import app.services.draft_service  # noqa: F401
+except (ImportError, AttributeError):
+    # Only needed by preview_response, which these tests do not cover
+    sys.modules["app.services.draft_service"] = SimpleNamespace(DraftType=object)
+
+from app.services.chatbot_service import ChatbotService
+
+
+class FakeSessionService:
+    """Records saved messages; each bookkeeping step takes `delay` seconds."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.saved = []
+
+    def get_or_create_session(self, db, **kwargs):
+        time.sleep(self.delay)
+        return SimpleNamespace(id=uuid4())
+
+    def get_context_messages(self, db, session_id, max_messages):
+        return []
+
+    def save_message(self, db, session_id, role, content, **kwargs):
+        time.sleep(self.delay)
+        self.saved.append((role, content, kwargs))
+        return SimpleNamespace(id=uuid4())
+
+
+class FakeInference:
+    def __init__(self):
+        self.prompts = []
+
+    async def generate(self, prompt, model, temperature, max_tokens):
+        self.prompts.append(prompt)
+        return {"text": "answer", "usage": {"prompt_tokens": 10, "completion_tokens": 2}}
+
+
+class FakeRetrieval:
+    """Per-KB delay / failure, one result per search."""
+
+    def __init__(self, delays=None, failures=()):
+        self.delays = delays or {}
+        self.failures = set(failures)
+        self.sessions = []
+
+    async def search(self, db, kb_id, query, top_k, search_method, threshold):
+        self.sessions.append(db)
+        await asyncio.sleep(self.delays.get(str(kb_id), 0))
+        if str(kb_id) in self.failures:
+            raise RuntimeError("index unavailable")
+        return [{"content": f"fact from {kb_id}", "score": 0.9, "kb_id": str(kb_id)}]
+
+
+class FakeDB:
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def make_chatbot(*kb_ids):
+    return SimpleNamespace(
+        id=uuid4(),
+        workspace_id=uuid4(),
+        config={
+            "model": "secret-ai-v1",
+            "knowledge_bases": [{"kb_id": kb_id, "enabled": True} for kb_id in kb_ids]
+        }
+    )
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(app.db.session, "SessionLocal", FakeDB)
+
+    service = ChatbotService()
+    service.session_service = FakeSessionService()
+    service.inference_service = FakeInference()
+    return service
+
+
+def use_retrieval(monkeypatch, retrieval):
+    monkeypatch.setitem(
+        sys.modules,
+        "app.services.retrieval_service",
+        SimpleNamespace(retrieval_service=retrieval)
+    )
+
+
+def run(service, chatbot):
+    return asyncio.run(service.process_message(
+        db=None,
+        chatbot=chatbot,
+        user_message="What is the refund policy?",
+        session_id="s1"
+    ))
+
+
+class TestConcurrentStages:
+    """Test stage overlap and degradation."""
+
+    def test_session_and_retrieval_overlap(self, service, monkeypatch):
+        kb_id = str(uuid4())
+        use_retrieval(monkeypatch, FakeRetrieval(delays={kb_id: 0.2}))
+        # Session + user message save: 0.2s in the worker thread
+        service.session_service.delay = 0.1
+
+        start = time.perf_counter()
+        result = run(service, make_chatbot(kb_id))
+        elapsed = time.perf_counter() - start
+
+        # Sequential stages would take >= 0.4s (+ the assistant save)
+        assert elapsed < 0.38
+        assert [source["kb_id"] for source in result["sources"]] == [kb_id]
+
+        timings = service.session_service.saved[-1][2]["response_metadata"]["stage_timings_ms"]
+        assert timings["retrieval"] >= 190 and timings["session_bookkeeping"] >= 190
+
+    def test_kb_timeout_drops_only_that_kb(self, service, monkeypatch):
+        fast, slow = str(uuid4()), str(uuid4())
+        use_retrieval(monkeypatch, FakeRetrieval(delays={slow: 1.0}))
+        service.kb_search_timeout = 0.05
+
+        result = run(service, make_chatbot(fast, slow))
+
+        assert [source["kb_id"] for source in result["sources"]] == [fast]
+        assert f"fact from {fast}" in service.inference_service.prompts[0]
+
+        timings = service.session_service.saved[-1][2]["response_metadata"]["stage_timings_ms"]
+        assert f"kb:{slow}" in timings and timings["retrieval"] < 500
+
+    def test_kb_error_drops_only_that_kb(self, service, monkeypatch):
+        ok, broken = str(uuid4()), str(uuid4())
+        use_retrieval(monkeypatch, FakeRetrieval(failures={broken}))
+
+        result = run(service, make_chatbot(ok, broken))
+
+        assert [source["kb_id"] for source in result["sources"]] == [ok]
+
+    def test_retrieval_error_keeps_user_message(self, service, monkeypatch):
+        def broken_session():
+            raise RuntimeError("connection pool exhausted")
+
+        monkeypatch.setattr(app.db.session, "SessionLocal", broken_session)
+        use_retrieval(monkeypatch, FakeRetrieval())
+
+        result = run(service, make_chatbot(str(uuid4())))
+
+        saved = service.session_service.saved
+        assert [(role, content) for role, content, _ in saved] == [
+            ("user", "What is the refund policy?"),
+            ("assistant", "answer")
+        ]
+        assert result["response"] == "answer" and result["sources"] == []
+
+    def test_kb_searches_use_separate_sessions(self, service, monkeypatch):
+        retrieval = FakeRetrieval()
+        use_retrieval(monkeypatch, retrieval)
+
+        run(service, make_chatbot(str(uuid4()), str(uuid4()), str(uuid4())))
+
+        assert len({id(db) for db in retrieval.sessions}) == 3
+        assert all(db.closed for db in retrieval.sessions)
@@ -0,0 +1,198 @@
+"""
+Chatflow Trace Tests
+
+WHY: Per-node profiles must reflect real spans and never break executions
+HOW: In-memory stand-in for the Redis stream commands used
+
+Tests:
+1. Spans record duration, sizes, cache hit, upstream latency and errors
+2. Stream is bounded; profile aggregates p50 / p95 per node id
+3. Sampling (low by default) and fail-open writes
+4. Writes from an event loop run off the loop
+5. Reading with Redis down raises TraceStoreUnavailable
+
+USAGE:
+    pytest app/tests/test_chatflow_trace.py -v
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from app.services.chatflow_trace_service import (
+    ChatflowTraceService,
+    ExecutionTrace,
+    TraceStoreUnavailable,
+    percentile
+)
+
+
+class FakeStreams:
+    """XADD (MAXLEN) / XREVRANGE / EXPIRE over lists."""
+
+    def __init__(self, fail: bool = False):
+        self.streams = {}
+        self.fail = fail
+
+    def pipeline(self):
+        return self
+
+    def xadd(self, key, fields, maxlen=None, approximate=True):
+        entries = self.streams.setdefault(key, [])
+        entries.append((str(len(entries)), fields))
+        if maxlen is not None:
+            del entries[:-maxlen]
+
+    def expire(self, key, ttl):
+        pass
+
+    def execute(self):
+        if self.fail:
+            raise ConnectionError("redis down")
+
+    def xrevrange(self, key, count=None):
+        if self.fail:
+            raise ConnectionError("redis down")
+        return list(reversed(self.streams.get(key, [])))[:count]
+
+
+def context(message: str = "hello") -> dict:
+    return {"user_message": message, "variables": {}}
+
+
+def run_trace(trace: ExecutionTrace, durations: dict):
+    """Record one span per node with a fixed result."""
+
+    async def run():
+        for node_id, result in durations.items():
+            async def node_run(result=result):
+                return result
+            await trace.span({"id": node_id, "type": "llm", "config": {"prompt": "{{input}}"}}, context(), node_run)
+
+    asyncio.run(run())
+
+
+class TestSpans:
+    """Test span capture."""
+
+    def test_span_fields(self):
+        trace = ExecutionTrace("flow")
+        run_trace(trace, {
+            "llm1": {"output": "abcd", "metadata": {"cache_hit": True, "upstream_ms": 12.5}},
+            "http1": {"output": None, "success": False, "error": "timeout"}
+        })
+
+        llm, http = trace.to_dict()["nodes"]
+        assert llm["node_id"] == "llm1" and llm["input_size"] == len('{"input":"hello"}')
+        assert llm["output_size"] == 4 and llm["cache_hit"] is True and llm["upstream_ms"] == 12.5
+        assert http["error"] == "timeout" and "upstream_ms" not in http
+
+    def test_exception_recorded_and_raised(self):
+        trace = ExecutionTrace("flow")
+
+        async def boom():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(trace.span({"id": "n1", "type": "code"}, context(), boom))
+
+        assert trace.spans[0]["error"] == "boom" and "duration_ms" in trace.spans[0]
+
+
+class TestProfile:
+    """Test storage bounds and aggregation."""
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        assert percentile(values, 0.5) == 50
+        assert percentile(values, 0.95) == 95
+        assert percentile([], 0.5) is None
+
+    def test_profile_per_node(self):
+        redis = FakeStreams()
+        service = ChatflowTraceService(redis_client=redis)
+        service.stream_maxlen = 20
+
+        for i in range(30):
+            trace = ExecutionTrace("flow")
+            trace.spans = [
+                {"node_id": "kb1", "type": "kb", "start_ms": 0, "duration_ms": i, "cache_hit": i % 2 == 0},
+                {"node_id": "llm1", "type": "llm", "start_ms": 1, "duration_ms": 100 + i, "upstream_ms": 90}
+            ]
+            service.record(trace, status="error" if i == 29 else "success")
+
+        assert len(redis.streams["chatflow_traces:flow"]) == 20
+
+        profile = service.get_profile("flow", limit=20)
+        assert profile["traces"] == 20 and profile["execution"]["error_rate"] == 0.05
+
+        llm, kb = profile["nodes"]
+        assert llm["node_id"] == "llm1" and llm["count"] == 20
+        assert llm["p50_ms"] == 119 and llm["p95_ms"] == 128 and llm["max_ms"] == 129
+        assert llm["upstream_p50_ms"] == 90
+        assert kb["cache_hit_rate"] == 0.5 and kb["upstream_p50_ms"] is None
+
+
+class TestSampling:
+    """Test sampling and failure handling."""
+
+    def test_sample_rate(self):
+        service = ChatflowTraceService(redis_client=FakeStreams())
+
+        service.sample_rate = 0
+        assert service.start("flow") is None
+
+        service.sample_rate = 1
+        assert isinstance(service.start("flow"), ExecutionTrace)
+
+    def test_write_failure_is_swallowed(self):
+        service = ChatflowTraceService(redis_client=FakeStreams(fail=True))
+        service.record(ExecutionTrace("flow"))
+        assert service.get_stats()["failed"] == 1
+
+    def test_default_sample_rate_is_low(self):
+        assert ChatflowTraceService(redis_client=FakeStreams()).sample_rate <= 0.1
+
+
+class TestStorage:
+    """Test write placement and read failures."""
+
+    def test_write_runs_off_the_event_loop(self):
+        redis = FakeStreams()
+        service = ChatflowTraceService(redis_client=redis)
+        writers = []
+
+        execute = redis.execute
+
+        def recording_execute():
+            writers.append(threading.current_thread())
+            execute()
+
+        redis.execute = recording_execute
+
+        async def scenario():
+            service.record(ExecutionTrace("flow"))
+            # Give the executor a moment to run the write
+            for _ in range(100):
+                if writers:
+                    break
+                await asyncio.sleep(0.01)
+
+        asyncio.run(scenario())
+
+        assert writers and writers[0] is not threading.main_thread()
+        assert len(redis.streams["chatflow_traces:flow"]) == 1
+
+    def test_profile_read_failure(self):
+        service = ChatflowTraceService(redis_client=FakeStreams(fail=True))
+
+        with pytest.raises(TraceStoreUnavailable):
+            service.get_profile("flow")
+
+    def test_corrupt_entry_skipped(self):
+        redis = FakeStreams()
+        redis.streams["chatflow_traces:flow"] = [("0", {"trace": "{not json"})]
+        service = ChatflowTraceService(redis_client=redis)
+
+        assert service.get_profile("flow")["traces"] == 0
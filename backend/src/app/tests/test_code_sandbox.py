@@ -0,0 +1,121 @@
+"""
+Code Sandbox Tests
+
+WHY: CodeNode runs user code; it must not hang or crash the API process
+HOW: Real worker processes from a small dedicated pool
+
+Tests:
+1. Code runs with input_data / variables and returns JSON-safe results
+2. Compiled bytecode is reused per code hash
+3. Infinite loops hit the wall-clock timeout and the worker is replaced
+4. Memory limits, imports and dunder access are rejected
+5. Runs do not share module state
+6. Known escapes (module traversal, format strings, frames) fail and
+   workers hold no API secrets
+
+USAGE:
+    pytest app/tests/test_code_sandbox.py -v
+"""
+
+import asyncio
+import os
+import time
+
+import pytest
+
+from app.chatflow.utils.code_sandbox import CodeSandboxError, CodeSandboxPool
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = CodeSandboxPool(size=1, memory_mb=512, max_timeout=5)
+    pool.start()
+    yield pool
+    pool.close()
+
+
+class TestExecution:
+    """Test normal execution."""
+
+    def test_result(self, pool):
+        run = pool.execute(
+            "result = {'text': input_data.upper(), 'total': sum(variables['items']), 'tags': {1}}",
+            input_data="hi",
+            variables={"items": [1, 2, 3]}
+        )
+
+        assert run["result"] == {"text": "HI", "total": 6, "tags": "{1}"}
+
+    def test_bytecode_cached(self, pool):
+        code = "result = input_data * 2"
+
+        assert pool.execute(code, input_data=3)["compiled"] is True
+        second = pool.execute(code, input_data=4)
+
+        assert second == {"result": 8, "compiled": False, "duration_ms": second["duration_ms"]}
+
+    def test_async_run(self, pool):
+        run = asyncio.run(pool.run("result = len(variables)", variables={"a": 1}))
+        assert run["result"] == 1
+
+
+class TestIsolation:
+    """Test limits and isolation."""
+
+    def test_timeout_replaces_worker(self, pool):
+        start = time.perf_counter()
+        with pytest.raises(CodeSandboxError, match="timed out"):
+            pool.execute("while True:\n    pass", timeout=0.5)
+
+        assert time.perf_counter() - start < 3
+        assert pool.execute("result = 1")["result"] == 1
+        assert pool.get_stats()["timeouts"] == 1
+
+    @pytest.mark.parametrize("code, message", [
+        ("result = 'a' * (2 ** 31)", "Memory"),
+        ("import os", "Imports"),
+        ("result = json.__dict__", "__dict__"),
+        ("result = open('/etc/passwd').read()", "NameError")
+    ])
+    def test_rejected(self, pool, code, message):
+        with pytest.raises(CodeSandboxError, match=message):
+            pool.execute(code)
+
+    def test_no_shared_module_state(self, pool):
+        pool.execute("json.dumps = None")
+        assert pool.execute("result = json.dumps([1])")["result"] == "[1]"
+
+
+class TestEscapes:
+    """Test escape attempts seen against module-namespace sandboxes."""
+
+    @pytest.mark.parametrize("code, message", [
+        ("result = json.codecs.sys.modules['os'].environ", "AttributeError"),
+        ("result = re.enum.sys.modules['os'].popen('id').read()", "AttributeError"),
+        ("result = datetime.sys", "AttributeError"),
+        ("result = '{0.__class__}'.format(1)", "format"),
+        ("result = '{0.loads}'.format_map({'0': json})", "format_map"),
+        ("result = str.format('{0.__globals__}', json.loads)", "format"),
+        ("def f():\n    yield 1\nresult = f().gi_frame.f_back", "not allowed"),
+        ("result = f'{json.loads.__globals__}'", "__globals__")
+    ])
+    def test_escape_rejected(self, pool, code, message):
+        with pytest.raises(CodeSandboxError, match=message):
+            pool.execute(code)
+
+    def test_allowed_functions(self, pool):
+        run = pool.execute(
+            "result = [json.loads('[1]'), re.findall('a', 'aa'), math.sqrt(4), "
+            "str(datetime.timedelta(seconds=60))]"
+        )
+        assert run["result"] == [[1], ["a", "a"], 2.0, "0:01:00"]
+
+    @pytest.mark.skipif(not os.path.exists("/proc/self/environ"), reason="needs /proc")
+    def test_worker_environment_is_empty(self, pool, monkeypatch):
+        monkeypatch.setenv("SANDBOX_TEST_SECRET", "leak")
+        worker = pool._spawn()
+        try:
+            with open(f"/proc/{worker.process.pid}/environ", "rb") as environ:
+                assert b"SANDBOX_TEST_SECRET" not in environ.read()
+        finally:
+            worker.kill()
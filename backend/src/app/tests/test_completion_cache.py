@@ -0,0 +1,167 @@
+"""
+CompletionCache Tests
+
+WHY: Cached completions must only be served for identical deterministic requests
+HOW: Exercise the in-process tier with a fake Redis client (no services needed)
+
+Tests:
+1. Key construction (exact-match on every parameter)
+2. Deterministic-only caching
+3. LRU size eviction and TTL expiry
+4. Redis tier promotion and failure tolerance
+5. Hit/miss metrics
+6. Cache hits served by InferenceService report zero usage
+
+USAGE:
+    pytest app/tests/test_completion_cache.py -v
+"""
+
+import asyncio
+import time
+
+from app.services.completion_cache import CompletionCache
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the Redis commands the cache uses."""
+
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+
+
+class BrokenRedis:
+    """Redis client whose every call fails."""
+
+    def get(self, key):
+        raise ConnectionError("redis down")
+
+    def setex(self, key, ttl, value):
+        raise ConnectionError("redis down")
+
+
+RESULT = {"text": "billing", "usage": {"prompt_tokens": 10, "completion_tokens": 1, "total_tokens": 11}}
+
+
+class TestKeys:
+    """Test cache key construction."""
+
+    def test_identical_requests_share_key(self):
+        cache = CompletionCache(redis_client=FakeRedis())
+        a = cache.build_key("secret-ai-v1", "classify: hi", 0, 10, ["\n"])
+        b = cache.build_key("secret-ai-v1", "classify: hi", 0.0, 10, ["\n"])
+        assert a == b
+
+    def test_any_parameter_change_changes_key(self):
+        cache = CompletionCache(redis_client=FakeRedis())
+        base = cache.build_key("secret-ai-v1", "classify: hi", 0, 10, None)
+
+        assert base != cache.build_key("other-model", "classify: hi", 0, 10, None)
+        assert base != cache.build_key("secret-ai-v1", "classify: hello", 0, 10, None)
+        assert base != cache.build_key("secret-ai-v1", "classify: hi", 0, 11, None)
+        assert base != cache.build_key("secret-ai-v1", "classify: hi", 0, 10, ["\n"])
+
+    def test_messages_are_hashed(self):
+        cache = CompletionCache(redis_client=FakeRedis())
+        messages = [{"role": "user", "content": "hi"}]
+        key = cache.build_key("secret-ai-v1", messages, 0, 10)
+        assert key.startswith("completion_cache:")
+        assert key != cache.build_key("secret-ai-v1", [{"role": "user", "content": "ho"}], 0, 10)
+
+
+class TestCaching:
+    """Test get/set behaviour."""
+
+    def test_only_deterministic_requests_are_cacheable(self):
+        cache = CompletionCache(redis_client=FakeRedis())
+        assert cache.is_cacheable(0)
+        assert cache.is_cacheable(0.0)
+        assert not cache.is_cacheable(0.7)
+        assert not cache.is_cacheable(None)
+
+    def test_round_trip(self):
+        cache = CompletionCache(redis_client=FakeRedis())
+        key = cache.build_key("m", "p", 0, 10)
+
+        assert cache.get(key) is None
+        cache.set(key, RESULT)
+        assert cache.get(key) == RESULT
+
+    def test_lru_eviction(self):
+        cache = CompletionCache(max_entries=2, redis_client=BrokenRedis())
+        cache.set("a", RESULT)
+        cache.set("b", RESULT)
+        cache.get("a")  # "a" becomes most recently used
+        cache.set("c", RESULT)
+
+        assert cache.get("a") == RESULT
+        assert cache.get("b") is None
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_ttl_expiry(self):
+        cache = CompletionCache(ttl_seconds=1, redis_client=BrokenRedis())
+        cache.set("a", RESULT)
+        cache._entries["a"] = (time.monotonic() - 1, RESULT)
+
+        assert cache.get("a") is None
+        assert cache.get_stats()["expirations"] == 1
+
+    def test_redis_hit_is_promoted_to_memory(self):
+        redis = FakeRedis()
+        writer = CompletionCache(redis_client=redis)
+        reader = CompletionCache(redis_client=redis)
+
+        writer.set("k", RESULT)
+        assert reader.get("k") == RESULT
+        assert reader.get("k") == RESULT
+
+        stats = reader.get_stats()
+        assert stats["redis_hits"] == 1
+        assert stats["memory_hits"] == 1
+
+    def test_redis_failure_is_a_miss(self):
+        cache = CompletionCache(redis_client=BrokenRedis())
+        assert cache.get("missing") is None
+
+        stats = cache.get_stats()
+        assert stats["misses"] == 1
+        assert stats["redis_errors"] == 1
+        assert stats["hit_rate"] == 0.0
+
+
+class TestInferenceHits:
+    """Test what InferenceService reports for cache hits."""
+
+    class Router:
+        def __init__(self):
+            self.calls = 0
+
+        async def call(self, model, request, is_failure=None):
+            self.calls += 1
+            return {
+                "choices": [{"text": "answer"}],
+                "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}
+            }
+
+    def test_hit_is_not_billed(self):
+        from app.services.inference_service import InferenceService
+        from app.services.request_coalescer import RequestCoalescer
+
+        service = InferenceService()
+        service.router = self.Router()
+        service.coalescer = RequestCoalescer(namespace="test", distributed=False)
+        service.completion_cache = CompletionCache(redis_client=FakeRedis())
+
+        first = asyncio.run(service.generate("hi", model="m", temperature=0))
+        second = asyncio.run(service.generate("hi", model="m", temperature=0))
+
+        assert service.router.calls == 1
+        assert first["usage"]["total_tokens"] == 15
+        assert second["cached"] is True and second["text"] == "answer"
+        assert second["usage"] == {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        assert second["cached_usage"]["total_tokens"] == 15
@@ -0,0 +1,135 @@
+"""
+Credential Cache Tests
+
+WHY: Nodes must not hit SQL / decryption per call, and stale secrets must go
+HOW: CredentialCache with the database loader and usage writer replaced
+
+Tests:
+1. Hits skip loading; callers get independent copies
+2. TTL expiry, LRU bound and invalidation wipe the cached payload
+3. Disabled / missing credentials
+4. Usage counts are written in batch, off the caller's thread
+
+USAGE:
+    pytest app/tests/test_credential_cache.py -v
+"""
+
+import json
+import time
+from uuid import uuid4
+
+import pytest
+
+from app.services.credential_cache import CredentialCache
+
+
+class FakeCredentialCache(CredentialCache):
+    """Cache over an in-memory credential table."""
+
+    def __init__(self, credentials: dict):
+        super().__init__()
+        self.credentials = credentials
+        self.loads = 0
+        self.flushed = []
+        self.write_delay = 0.0
+
+    def _load(self, db, credential_id):
+        self.loads += 1
+        credential = self.credentials.get(credential_id)
+        if credential is None:
+            return None
+        if not credential.get("is_active", True):
+            raise ValueError(f"Credential '{credential['name']}' is disabled")
+        return (credential["name"], credential["type"], "v1", bytearray(json.dumps(credential["data"]).encode()))
+
+    def _write_usage(self, batch):
+        time.sleep(self.write_delay)
+        self.flushed.append(batch)
+
+
+@pytest.fixture
+def credential_id():
+    return uuid4()
+
+
+@pytest.fixture
+def cache(credential_id):
+    return FakeCredentialCache({
+        credential_id: {"name": "api", "type": "api_key", "data": {"api_key": "secret"}}
+    })
+
+
+class TestCaching:
+    """Test hits and copies."""
+
+    def test_hit_skips_load(self, cache, credential_id):
+        first = cache.get(None, str(credential_id))
+        second = cache.get(None, credential_id)
+
+        assert cache.loads == 1
+        assert second.data == {"api_key": "secret"} and second.credential_type == "api_key"
+
+        first.data["api_key"] = "changed"
+        assert cache.get(None, credential_id).data["api_key"] == "secret"
+
+    def test_expiry_and_invalidation_wipe(self, cache, credential_id):
+        cache.ttl = 0.01
+        cache.get(None, credential_id)
+        payload = cache._entries[str(credential_id)].payload
+
+        time.sleep(0.02)
+        cache.get(None, credential_id)
+        assert cache.loads == 2 and set(payload) == {0}
+
+        payload = cache._entries[str(credential_id)].payload
+        cache.invalidate(credential_id)
+        assert set(payload) == {0} and cache.get_stats()["entries"] == 0
+
+    def test_lru_bound(self):
+        ids = [uuid4() for _ in range(3)]
+        cache = FakeCredentialCache({
+            key: {"name": "c", "type": "api_key", "data": {"api_key": str(key)}} for key in ids
+        })
+        cache.max_entries = 2
+
+        for key in ids:
+            cache.get(None, key)
+
+        assert list(cache._entries) == [str(ids[1]), str(ids[2])]
+        assert cache.get_stats()["evicted"] == 1
+
+    def test_missing_and_disabled(self, cache, credential_id):
+        assert cache.get(None, uuid4()) is None
+
+        cache.credentials[credential_id]["is_active"] = False
+        cache.invalidate(credential_id)
+        with pytest.raises(ValueError):
+            cache.get(None, credential_id)
+
+
+class TestUsage:
+    """Test batched usage tracking."""
+
+    def test_batched_flush(self, cache, credential_id):
+        cache.flush_calls = 5
+        cache.flush_seconds = 3600
+
+        for _ in range(4):
+            cache.get(None, credential_id)
+        assert cache.flushed == []
+
+        # The due flush runs in the background; get() does not wait for it
+        cache.write_delay = 0.2
+        start = time.perf_counter()
+        cache.get(None, credential_id)
+        assert time.perf_counter() - start < 0.1
+
+        deadline = time.monotonic() + 2
+        while not cache.flushed and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(cache.flushed) == 1
+        count, _ = cache.flushed[0][str(credential_id)]
+        assert count == 5
+
+        cache.flush_usage()
+        assert len(cache.flushed) == 1  # nothing pending
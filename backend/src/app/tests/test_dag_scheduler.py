@@ -0,0 +1,134 @@
+"""
+DAGScheduler Tests
+
+WHY: Independent chatflow branches must run concurrently and merge correctly
+HOW: Compiled plans with a fake node runner that sleeps (no LLM/HTTP)
+
+Tests:
+1. Fan-out finishes in the time of the slowest branch
+2. Merge node sees exactly its upstream outputs
+3. Condition prunes the untaken branch; merge still runs
+4. max_parallelism bounds concurrent nodes
+5. A failing node cancels its running siblings
+
+USAGE:
+    pytest app/tests/test_dag_scheduler.py -v
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.chatflow.utils.dag_scheduler import DAGScheduler
+from app.chatflow.utils.execution_plan import compile_plan
+
+
+def node(node_id, node_type="llm", **config):
+    return {"id": node_id, "type": node_type, "config": config}
+
+
+def edge(source, target, handle=None):
+    result = {"source": source, "target": target}
+    if handle:
+        result["sourceHandle"] = handle
+    return result
+
+
+FAN_OUT = compile_plan("flow", 1, {
+    "nodes": [node("t", "trigger"), node("a"), node("b"), node("c"), node("merge"), node("r", "response")],
+    "edges": [
+        edge("t", "a"), edge("t", "b"), edge("t", "c"),
+        edge("a", "merge"), edge("b", "merge"), edge("c", "merge"),
+        edge("merge", "r")
+    ]
+})
+
+
+def make_runner(delays=None, seen=None, active=None):
+    delays = delays or {}
+
+    async def run(node, node_context):
+        if seen is not None:
+            seen[node["id"]] = sorted(node_context["variables"])
+        if active is not None:
+            active["now"] += 1
+            active["max"] = max(active["max"], active["now"])
+        try:
+            delay = delays.get(node["id"], 0)
+            if isinstance(delay, Exception):
+                raise delay
+            await asyncio.sleep(delay)
+        finally:
+            if active is not None:
+                active["now"] -= 1
+
+        if node["type"] == "condition":
+            return {"output": False, "condition_result": False}
+        return {"output": f"out-{node['id']}"}
+
+    return run
+
+
+class TestDAGScheduler:
+    """Test concurrent plan execution."""
+
+    def test_fan_out_runs_concurrently(self):
+        runner = make_runner({"a": 0.1, "b": 0.1, "c": 0.1})
+
+        start = time.perf_counter()
+        result = asyncio.run(DAGScheduler(max_parallelism=4).run(FAN_OUT, runner, {"variables": {}}))
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.2
+        assert result["output"] == "out-r"
+        assert result["nodes_executed"] == ["t", "a", "b", "c", "merge", "r"]
+
+    def test_merge_sees_upstream_only(self):
+        seen = {}
+        context = {"variables": {"flow_var": 1}}
+        asyncio.run(DAGScheduler().run(FAN_OUT, make_runner({"a": 0.02}, seen=seen), context))
+
+        assert seen["b"] == ["flow_var", "t"]
+        assert seen["merge"] == ["a", "b", "c", "flow_var", "t"]
+        assert list(context["variables"]) == ["flow_var", "t", "a", "b", "c", "merge", "r"]
+
+    def test_condition_prunes_branch(self):
+        plan = compile_plan("flow", 1, {
+            "nodes": [node("t", "trigger"), node("cond", "condition"), node("yes"), node("no"),
+                      node("merge"), node("r", "response")],
+            "edges": [
+                edge("t", "cond"),
+                edge("cond", "yes", "true"), edge("cond", "no", "false"),
+                edge("yes", "merge"), edge("no", "merge"),
+                edge("merge", "r")
+            ]
+        })
+
+        result = asyncio.run(DAGScheduler().run(plan, make_runner(), {"variables": {}}))
+
+        assert result["nodes_executed"] == ["t", "cond", "no", "merge", "r"]
+
+    def test_max_parallelism(self):
+        active = {"now": 0, "max": 0}
+        runner = make_runner({"a": 0.02, "b": 0.02, "c": 0.02}, active=active)
+
+        asyncio.run(DAGScheduler().run(FAN_OUT, runner, {"variables": {}}, max_parallelism=2))
+
+        assert active["max"] == 2
+
+    def test_failure_cancels_siblings(self):
+        finished = []
+
+        async def runner(node, node_context):
+            if node["id"] == "a":
+                raise RuntimeError("boom")
+            if node["id"] in ("b", "c"):
+                await asyncio.sleep(0.5)
+                finished.append(node["id"])
+            return {"output": node["id"]}
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(DAGScheduler().run(FAN_OUT, runner, {"variables": {}}))
+
+        assert finished == []
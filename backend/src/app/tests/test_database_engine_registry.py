@@ -0,0 +1,96 @@
+"""
+Database Engine Registry Tests
+
+WHY: DatabaseNode must reuse pooled engines and drop them when credentials change
+HOW: File-backed SQLite engines (no external database)
+
+Tests:
+1. Same credential version reuses one engine (and its connections)
+2. New credential version disposes the old engine
+3. Invalidation, LRU bound and idle eviction
+4. Per-pool metrics
+
+USAGE:
+    pytest app/tests/test_database_engine_registry.py -v
+"""
+
+from datetime import datetime
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.engine import URL
+
+from app.services.database_engine_registry import DatabaseEngineRegistry, credential_version
+
+
+@pytest.fixture
+def registry():
+    registry = DatabaseEngineRegistry()
+    yield registry
+    registry.dispose_all()
+
+
+@pytest.fixture
+def url(tmp_path):
+    return URL.create("sqlite", database=str(tmp_path / "customer.db"))
+
+
+class TestRegistry:
+    """Test engine reuse and disposal."""
+
+    def test_reuse(self, registry, url):
+        credential_id = uuid4()
+
+        engine = registry.get_engine(credential_id, "v1", url)
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT 1")).scalar() == 1
+
+        assert registry.get_engine(credential_id, "v1", url) is engine
+        assert engine.pool.checkedin() == 1
+        assert registry.get_stats()["created"] == 1
+        assert registry.get_stats()["reused"] == 1
+
+    def test_new_version_replaces_engine(self, registry, url):
+        credential_id = uuid4()
+        old = registry.get_engine(credential_id, "v1", url)
+        new = registry.get_engine(credential_id, "v2", url)
+
+        assert new is not old
+        stats = registry.get_stats()
+        assert stats["engines"] == 1 and stats["disposed"] == 1
+
+    def test_credential_version(self):
+        credential = SimpleNamespace(encryption_key_id="key_v1", updated_at=datetime(2026, 1, 1))
+        before = credential_version(credential)
+
+        credential.updated_at = datetime(2026, 1, 2)
+        assert credential_version(credential) != before
+
+    def test_invalidate_and_bounds(self, registry, url):
+        registry.max_engines = 2
+        first, second, third = uuid4(), uuid4(), uuid4()
+
+        for credential_id in (first, second, third):
+            registry.get_engine(credential_id, "v1", url)
+
+        stats = registry.get_stats()
+        assert stats["engines"] == 2 and stats["evicted_lru"] == 1
+        assert {pool["credential_id"] for pool in stats["pools"]} == {str(second), str(third)}
+
+        registry.invalidate(second)
+        assert [pool["credential_id"] for pool in registry.get_stats()["pools"]] == [str(third)]
+
+    def test_idle_eviction_skips_busy_pools(self, registry, url, tmp_path):
+        idle_id, busy_id = uuid4(), uuid4()
+        registry.get_engine(idle_id, "v1", url)
+        busy = registry.get_engine(busy_id, "v1", URL.create("sqlite", database=str(tmp_path / "other.db")))
+
+        registry.idle_seconds = 0
+        with busy.connect():
+            assert registry.evict_idle() == 1
+
+        pools = registry.get_stats()["pools"]
+        assert [pool["credential_id"] for pool in pools] == [str(busy_id)]
+        assert pools[0]["uses"] == 1 and pools[0]["checked_out"] == 0
@@ -0,0 +1,63 @@
+"""
+DiscordIntegration Tests
+
+WHY: Deferred interaction replies longer than one message must all stay visible
+HOW: OutboundDeliveryService over httpx.MockTransport (no network)
+
+Tests:
+1. First chunk edits @original, the rest are posted as follow-ups
+
+USAGE:
+    pytest app/tests/test_discord_integration.py -v
+"""
+
+import asyncio
+import json
+import sys
+import types
+
+import httpx
+
+try:
+    import app.models.credential  # noqa: F401
+except SyntaxError:
+    # The integration only needs the model names at import
+    sys.modules["app.models.credential"] = types.SimpleNamespace(Credential=object, CredentialType=object)
+
+import app.services.outbound_delivery_service as outbound
+from app.integrations.discord_integration import discord_integration
+from app.services.outbound_delivery_service import OutboundDeliveryService
+
+
+LIMITS = {
+    "discord": {"bot_rate": 100.0, "bot_burst": 100, "chat_rate": 100.0, "chat_burst": 100, "max_length": 20}
+}
+
+WEBHOOK = "https://discord.com/api/v10/webhooks/APP/TOKEN"
+
+
+class TestSendMessage:
+    """Test deferred reply delivery."""
+
+    def test_multi_chunk_reply(self, monkeypatch):
+        requests = []
+
+        def handler(request):
+            requests.append((request.method, str(request.url), json.loads(request.content)["content"]))
+            return httpx.Response(200, json={})
+
+        service = OutboundDeliveryService(limits=LIMITS)
+        transport = httpx.MockTransport(handler)
+        service._get_client = lambda platform: service._clients.setdefault(
+            platform, httpx.AsyncClient(transport=transport)
+        )
+        monkeypatch.setattr(outbound, "outbound_delivery_service", service)
+
+        asyncio.run(discord_integration._send_message("APP", "TOKEN", "x" * 45))
+
+        assert [(method, url) for method, url, _ in requests] == [
+            ("PATCH", f"{WEBHOOK}/messages/@original"),
+            ("POST", WEBHOOK),
+            ("POST", WEBHOOK)
+        ]
+        assert [len(content) for _, _, content in requests] == [20, 20, 5]
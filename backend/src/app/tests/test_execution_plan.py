@@ -0,0 +1,101 @@
+"""
+ExecutionPlan Tests
+
+WHY: Chatflow traversal runs from the compiled plan
+HOW: Plain config dicts and a stand-in chatflow object (no database)
+
+Tests:
+1. Linear flow compiles with topological order and O(1) successors
+2. Condition results follow sourceHandle branches
+3. Malformed nodes and missing trigger are rejected
+4. Plans are cached per (chatflow_id, version) and invalidated
+
+USAGE:
+    pytest app/tests/test_execution_plan.py -v
+"""
+
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.chatflow.utils.execution_plan import ExecutionPlanCache, compile_plan
+
+
+def node(node_id, node_type, **config):
+    return {"id": node_id, "type": node_type, "config": config}
+
+
+LINEAR = {
+    "nodes": [node("t", "trigger"), node("llm", "llm"), node("r", "response")],
+    "edges": [{"source": "t", "target": "llm"}, {"source": "llm", "target": "r"}]
+}
+
+BRANCHING = {
+    "nodes": [
+        node("t", "trigger"),
+        node("c", "condition"),
+        node("yes", "response"),
+        node("no", "response")
+    ],
+    "edges": [
+        {"source": "t", "target": "c"},
+        {"source": "c", "target": "yes", "sourceHandle": "true"},
+        {"source": "c", "target": "no", "sourceHandle": "false"}
+    ]
+}
+
+
+class TestCompile:
+    """Test plan compilation."""
+
+    def test_linear(self):
+        plan = compile_plan("flow", 1, LINEAR)
+
+        assert plan.start_node == "t"
+        assert plan.order == ("t", "llm", "r")
+        assert plan.next_node("t", {})["id"] == "llm"
+        assert plan.next_node("r", {}) is None
+        assert plan.errors == ()
+
+    def test_branches(self):
+        plan = compile_plan("flow", 1, BRANCHING)
+
+        assert plan.next_node("c", {"condition_result": True})["id"] == "yes"
+        assert plan.next_node("c", {"condition_result": False})["id"] == "no"
+        assert plan.next_node("c", {"branch": "false"})["id"] == "no"
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            compile_plan("flow", 1, {"nodes": [node("r", "response")], "edges": []})
+
+        with pytest.raises(ValueError):
+            compile_plan("flow", 1, {"nodes": [node("t", "trigger"), node("t", "response")], "edges": []})
+
+        plan = compile_plan("flow", 1, {
+            "nodes": [node("t", "trigger"), node("h", "http_request"), node("r", "response")],
+            "edges": [{"source": "t", "target": "h"}, {"source": "h", "target": "gone"}]
+        })
+        assert any("'url' is required" in error for error in plan.errors)
+        assert any("unknown node" in error for error in plan.errors)
+
+
+class TestCache:
+    """Test plan caching."""
+
+    def test_cached_per_version(self):
+        cache = ExecutionPlanCache(max_entries=10)
+        chatflow = SimpleNamespace(id=uuid4(), version=1, config=LINEAR)
+
+        first = cache.get_plan(chatflow)
+        assert cache.get_plan(chatflow) is first
+
+        chatflow.version = 2
+        assert cache.get_plan(chatflow) is not first
+
+        cache.invalidate(chatflow.id)
+        assert cache.get_stats()["entries"] == 0
+
+        # Draft previews (no version) are never cached
+        cache.get_plan(SimpleNamespace(id=uuid4(), config=LINEAR))
+        assert cache.get_stats()["entries"] == 0
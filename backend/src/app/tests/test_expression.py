@@ -0,0 +1,164 @@
+"""
+Expression Engine Tests
+
+WHY: Chatflow branching depends on condition and edge predicate correctness
+HOW: Pure evaluation against dict / layered scopes (no services)
+
+Tests:
+1. Comparisons with numeric coercion
+2. Text and collection operators
+3. Boolean logic, precedence, emptiness
+4. Dotted and {{template}} variable access
+5. Unsafe or malformed input (incl. variable regex patterns) is rejected
+   at compile time
+6. Compiled closures are cached and cheap to evaluate
+7. Edge predicates choose branches in execution plans
+
+USAGE:
+    pytest app/tests/test_expression.py -v
+"""
+
+import time
+
+import pytest
+
+from app.chatflow.utils.execution_plan import compile_plan
+from app.chatflow.utils.expression import ExpressionError, compile_expression, evaluate
+from app.chatflow.utils.template import layered_scope
+
+
+SCOPE = {
+    "input": "I need HELP with my order",
+    "count": "12",
+    "score": 7.5,
+    "tier": "gold",
+    "tags": ["vip", "beta"],
+    "order": {"total": 120, "items": [{"sku": "A1"}, {"sku": "B2"}]},
+    "empty_text": "  ",
+    "nothing": None
+}
+
+
+class TestOperators:
+    """Test comparison and text operators."""
+
+    @pytest.mark.parametrize("expression, expected", [
+        ("count > 10", True),
+        ("count == 12", True),
+        ("score >= 7.5 and score < 8", True),
+        ("order.total != 120", False),
+        ("tier == 'gold'", True),
+        ("tier == 'Gold'", False),
+        ("tier > 3", False),
+        ("-1 < 0", True)
+    ])
+    def test_comparisons(self, expression, expected):
+        assert evaluate(expression, SCOPE) is expected
+
+    @pytest.mark.parametrize("expression, expected", [
+        ("input contains 'help'", True),
+        ("input not contains 'refund'", True),
+        ("tags contains 'vip'", True),
+        ("tier in ['gold', 'platinum']", True),
+        ("'alpha' not in tags", True),
+        ("input starts_with 'i need'", True),
+        ("input ends_with 'ORDER'", True),
+        ("input matches 'ord(er)?$'", True)
+    ])
+    def test_text_and_collections(self, expression, expected):
+        assert evaluate(expression, SCOPE) is expected
+
+
+class TestLogic:
+    """Test boolean logic and variables."""
+
+    def test_precedence(self):
+        assert evaluate("tier == 'silver' or count > 10 and score > 7", SCOPE) is True
+        assert evaluate("(tier == 'silver' or count > 10) and score > 9", SCOPE) is False
+        assert evaluate("not tier == 'silver' && !(score < 1)", SCOPE) is True
+
+    def test_emptiness(self):
+        assert evaluate("empty_text is empty", SCOPE) is True
+        assert evaluate("nothing is empty and tags is not empty", SCOPE) is True
+        assert evaluate("missing.deeply.nested is empty", SCOPE) is True
+
+    def test_variables(self):
+        assert evaluate("{{order.items.1.sku}} == 'B2'", SCOPE) is True
+        assert evaluate("order.items.5.sku == null", SCOPE) is True
+
+        scope = layered_scope({"input": "urgent"}, SCOPE)
+        assert evaluate("{{input}} contains 'urgent'", scope) is True
+
+
+class TestCompilation:
+    """Test safety and caching."""
+
+    @pytest.mark.parametrize("expression", [
+        "__import__('os').system('id')",
+        "tier.__class__",
+        "count >",
+        "(tier == 'gold'",
+        "tier === 'gold'",
+        "input matches '('",
+        "input matches tier",
+        "input matches {{pattern}}",
+        ""
+    ])
+    def test_rejected(self, expression):
+        with pytest.raises(ExpressionError):
+            compile_expression(expression)
+
+    def test_match_subject_is_capped(self, monkeypatch):
+        import app.chatflow.utils.expression as expression
+
+        monkeypatch.setattr(expression, "MAX_MATCH_SUBJECT_LENGTH", 100)
+        evaluator = compile_expression("text matches 'needle'")
+
+        assert evaluator({"text": "x" * 90 + "needle"}) is True
+        assert evaluator({"text": "x" * 200 + "needle"}) is False
+
+    def test_deep_nesting_rejected(self):
+        with pytest.raises(ExpressionError):
+            compile_expression("(" * 900 + "1" + ")" * 900)
+
+    def test_cached_and_fast(self):
+        text = "order.total >= 100 and tier in ['gold', 'platinum'] and input contains 'help'"
+        assert compile_expression(text) is compile_expression(text)
+
+        runs = 10000
+        start = time.perf_counter()
+        for _ in range(runs):
+            evaluate(text, SCOPE)
+        per_eval_us = (time.perf_counter() - start) / runs * 1e6
+
+        assert per_eval_us < 50
+
+
+class TestEdgePredicates:
+    """Test predicates on plan edges."""
+
+    def test_predicate_branches(self):
+        plan = compile_plan("flow", 1, {
+            "nodes": [
+                {"id": "t", "type": "trigger"},
+                {"id": "big", "type": "response"},
+                {"id": "small", "type": "response"}
+            ],
+            "edges": [
+                {"source": "t", "target": "big", "predicate": "output > 100"},
+                {"source": "t", "target": "small"}
+            ]
+        })
+
+        assert plan.next_node("t", {}, {"output": 500})["id"] == "big"
+        assert plan.next_node("t", {}, {"output": 5})["id"] == "small"
+        assert plan.active_targets("t", {}, {"output": 5}) == {"small"}
+
+    def test_invalid_predicate_reported(self):
+        plan = compile_plan("flow", 1, {
+            "nodes": [{"id": "t", "type": "trigger"}, {"id": "r", "type": "response"}],
+            "edges": [{"source": "t", "target": "r", "predicate": "output >"}]
+        })
+
+        assert any("invalid predicate" in error for error in plan.errors)
+        assert plan.next_node("t", {}, {"output": 1}) is None
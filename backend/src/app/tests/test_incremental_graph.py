@@ -0,0 +1,234 @@
+"""
+Incremental Graph Tests
+
+WHY: Autosave validation must match a full check while only applying deltas
+HOW: Random edit sequences compared against GraphBuilder's full traversals
+
+Tests:
+1. Editor scenarios: missing nodes, dangling edges, cycles, disconnected nodes
+2. Random deltas keep cycle / reachability / order equal to a full rebuild
+   (diffed full lists and explicit editor deltas)
+3. GraphBuilder traversals are iterative (deep graphs, no recursion limit)
+4. Validation of a small delta on a large flow stays sub-millisecond
+5. Explicit deltas only apply on top of the draft version they were made against
+
+USAGE:
+    pytest app/tests/test_incremental_graph.py -v
+"""
+
+import random
+import time
+
+from app.chatflow.utils.graph_builder import graph_builder
+from app.chatflow.utils.incremental_graph import DraftGraphRegistry, IncrementalGraph
+
+
+def node(node_id: str, node_type: str = "llm", **config) -> dict:
+    return {"id": node_id, "type": node_type, "config": config}
+
+
+def edge(source: str, target: str) -> dict:
+    return {"id": f"{source}-{target}", "source": source, "target": target}
+
+
+def chain(length: int):
+    nodes = [node("n0", "trigger")] + [node(f"n{i}") for i in range(1, length - 1)] + [node(f"n{length - 1}", "response")]
+    edges = [edge(f"n{i}", f"n{i + 1}") for i in range(length - 1)]
+    return nodes, edges
+
+
+def assert_consistent(graph: IncrementalGraph):
+    """Incremental state equals full traversals of the same graph."""
+
+    adjacency = {node_id: list(targets) for node_id, targets in graph.succ.items()}
+
+    has_cycle, _ = graph_builder.detect_cycle(adjacency)
+    assert graph.has_cycle == has_cycle
+
+    expected = graph_builder.get_reachable_nodes(graph.root, adjacency) if graph.root else set()
+    assert graph.reachable == expected
+
+    for source, targets in graph.osucc.items():
+        for target in targets:
+            assert graph.order[source] < graph.order[target]
+
+
+class TestScenarios:
+    """Test editor-level validation messages."""
+
+    def test_valid_flow(self):
+        graph = IncrementalGraph()
+        graph.apply(*chain(3))
+        assert graph.validate() == ([], [])
+
+    def test_edits(self):
+        graph = IncrementalGraph()
+        nodes, edges = chain(3)
+        graph.apply(nodes, edges)
+
+        # Unconnected node + edge to a node that does not exist yet
+        graph.apply(nodes + [node("x", "http_request")], edges + [edge("n1", "y")])
+        errors, warnings = graph.validate()
+        assert "Node x: 'url' is required" in errors
+        assert "Edge n1 -> y references an unknown node" in errors
+        assert warnings == ["Disconnected nodes: x"]
+
+        # Cycle n1 -> n2 -> n1
+        graph.apply(nodes, edges + [edge("n2", "n1")])
+        errors, warnings = graph.validate()
+        assert errors == []
+        assert warnings == ["Cycle detected: n2 -> n1 -> n2 (nodes run one at a time)"]
+
+        # Removing the cycle's other edge resolves it
+        graph.apply(nodes, [edges[0], edge("n2", "n1")])
+        errors, warnings = graph.validate()
+        assert warnings == ["Disconnected nodes: n2"]
+        assert not graph.has_cycle
+
+        # Trigger removed
+        graph.apply(nodes[1:], edges)
+        errors, _ = graph.validate()
+        assert "Workflow must have a start/trigger node" in errors
+
+    def test_list_errors(self):
+        graph = IncrementalGraph()
+        graph.apply([node("a", "trigger"), node("a", "response"), {"type": "llm"}], [])
+        errors, _ = graph.validate()
+        assert "Duplicate node id: a" in errors
+        assert "Node at position 2 is missing id or type" in errors
+
+    def test_registry_keeps_state_per_draft(self):
+        registry = DraftGraphRegistry()
+        registry.max_entries = 1
+        nodes, edges = chain(3)
+
+        assert registry.validate("d1", nodes, edges) == ([], [])
+        graph = registry._graphs["d1"]
+        registry.validate("d1", nodes, edges[:1])
+        assert registry._graphs["d1"] is graph
+
+        registry.validate("d2", nodes, edges)
+        assert list(registry._graphs) == ["d2"]
+
+    def test_delta_requires_matching_version(self):
+        registry = DraftGraphRegistry()
+        nodes, edges = chain(3)
+        registry.validate("d1", nodes, edges, version="v1")
+
+        cycle = {"edges": [edge("n2", "n1")]}
+        assert registry.validate_delta("d1", cycle, base_version="v0", version="v2") is None
+        assert registry.validate_delta("d2", cycle, base_version="v1", version="v2") is None
+
+        errors, warnings = registry.validate_delta("d1", cycle, base_version="v1", version="v2")
+        assert errors == [] and warnings[0].startswith("Cycle detected")
+
+        fix = {"removed_edges": ["n2-n1"], "nodes": [{"id": "bad"}]}
+        errors, warnings = registry.validate_delta("d1", fix, base_version="v2", version="v3")
+        assert errors == ["Changed node at position 0 is missing id or type"] and warnings == []
+
+
+class TestRandomDeltas:
+    """Test incremental maintenance against full traversals."""
+
+    def test_random_edit_sequences(self):
+        rng = random.Random(7)
+
+        for _ in range(20):
+            ids = [f"n{i}" for i in range(25)]
+            nodes = {node_id: node(node_id) for node_id in ids}
+            nodes["n0"] = node("n0", "trigger")
+            edges = {}
+            graph = IncrementalGraph()
+            graph.apply(list(nodes.values()), [])
+
+            for _ in range(150):
+                action = rng.random()
+                if action < 0.55:
+                    item = edge(rng.choice(ids), rng.choice(ids))
+                    edges[item["id"]] = item
+                elif action < 0.85 and edges:
+                    del edges[rng.choice(list(edges))]
+                elif action < 0.93 and len(nodes) > 1:
+                    nodes.pop(rng.choice(list(nodes)), None)
+                else:
+                    node_id = rng.choice(ids)
+                    nodes[node_id] = node(node_id, rng.choice(["llm", "response", "trigger"]))
+
+                graph.apply(list(nodes.values()), list(edges.values()))
+                assert_consistent(graph)
+
+            fresh = IncrementalGraph()
+            fresh.apply(list(nodes.values()), list(edges.values()))
+            assert fresh.has_cycle == graph.has_cycle
+            assert fresh.reachable == graph.reachable
+            assert sorted(fresh.validate()[0]) == sorted(graph.validate()[0])
+
+    def test_random_explicit_deltas(self):
+        rng = random.Random(11)
+
+        for _ in range(20):
+            ids = [f"n{i}" for i in range(25)]
+            nodes = {node_id: node(node_id) for node_id in ids}
+            nodes["n0"] = node("n0", "trigger")
+            edges = {}
+            graph = IncrementalGraph()
+            graph.apply(list(nodes.values()), [])
+
+            for _ in range(150):
+                action = rng.random()
+                if action < 0.55:
+                    item = edge(rng.choice(ids), rng.choice(ids))
+                    edges[item["id"]] = item
+                    graph.apply_delta(edges=[item])
+                elif action < 0.85 and edges:
+                    key = rng.choice(list(edges))
+                    del edges[key]
+                    graph.apply_delta(removed_edges=[key])
+                elif action < 0.93 and len(nodes) > 1:
+                    node_id = rng.choice(list(nodes))
+                    del nodes[node_id]
+                    graph.apply_delta(removed_nodes=[node_id])
+                else:
+                    node_id = rng.choice(ids)
+                    nodes[node_id] = node(node_id, rng.choice(["llm", "response"]))
+                    graph.apply_delta(nodes=[nodes[node_id]])
+
+                assert_consistent(graph)
+
+            fresh = IncrementalGraph()
+            fresh.apply(list(nodes.values()), list(edges.values()))
+            assert fresh.has_cycle == graph.has_cycle
+            assert fresh.reachable == graph.reachable
+            assert sorted(fresh.validate()[0]) == sorted(graph.validate()[0])
+
+
+class TestGraphBuilder:
+    """Test iterative traversals."""
+
+    def test_deep_graph(self):
+        nodes, edges = chain(20000)
+        adjacency = {n["id"]: [] for n in nodes}
+        for item in edges:
+            adjacency[item["source"]].append(item["target"])
+
+        assert graph_builder.detect_cycle(adjacency) == (False, None)
+        assert len(graph_builder.get_reachable_nodes("n0", adjacency)) == 20000
+        assert graph_builder.get_execution_path("n0", "n19999", adjacency)[-2:] == ["n19998", "n19999"]
+
+        adjacency["n19999"].append("n5")
+        has_cycle, cycle = graph_builder.detect_cycle(adjacency)
+        assert has_cycle and cycle[0] == "n5" and cycle[-1] == "n19999"
+
+    def test_large_flow_delta_is_fast(self):
+        nodes, edges = chain(3000)
+        registry = DraftGraphRegistry()
+        registry.validate("d1", nodes, edges, version="0")
+
+        start = time.perf_counter()
+        for i in range(100):
+            delta = {"nodes": [node(f"n{1000 + i}", prompt="edited")], "edges": [edge("n10", f"n{2000 + i}")]}
+            registry.validate_delta("d1", delta, base_version=str(i), version=str(i + 1))
+        elapsed = (time.perf_counter() - start) / 100
+
+        assert elapsed < 0.001
+        assert_consistent(registry._graphs["d1"])
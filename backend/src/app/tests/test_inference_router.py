@@ -0,0 +1,302 @@
+"""
+InferenceRouter Tests
+
+WHY: Routing, hedging and circuit breaking decide chat tail latency
+HOW: Fake endpoint calls plus local stub HTTP servers (no external services)
+
+Tests:
+1. Fastest healthy endpoint is preferred
+2. Slow primary triggers a hedged request that wins
+3. Failures fail over; client errors do not
+4. Circuit breaker opens, then closes after a successful probe
+5. InferenceService end-to-end against stub servers (incl. streaming)
+
+USAGE:
+    pytest app/tests/test_inference_router.py -v
+"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.services.inference_router import InferenceRouter, NoHealthyEndpointError
+from app.services.inference_service import InferenceService, UpstreamError
+from app.services.request_coalescer import RequestCoalescer
+
+
+def make_router(**overrides) -> InferenceRouter:
+    router = InferenceRouter(endpoints={
+        "m": [
+            {"name": "a", "base_url": "http://a"},
+            {"name": "b", "base_url": "http://b"}
+        ]
+    })
+    router.hedge_min_samples = 5
+    for key, value in overrides.items():
+        setattr(router, key, value)
+    return router
+
+
+def warm(router: InferenceRouter, name: str, latency: float, samples: int = 10):
+    """Seed an endpoint's latency statistics."""
+    endpoint = next(e for e in router.get_endpoints("m") if e.name == name)
+    for _ in range(samples):
+        router._acquire(endpoint)
+        router._record(endpoint, latency, ok=True)
+
+
+class TestRouting:
+    """Test endpoint selection and failover."""
+
+    def test_prefers_fastest_endpoint(self):
+        router = make_router(hedge_enabled=False)
+        warm(router, "a", 0.5)
+        warm(router, "b", 0.05)
+
+        result = asyncio.run(router.call("m", lambda endpoint: endpoint.name))
+        assert result == "b"
+
+    def test_failover_on_endpoint_failure(self):
+        router = make_router(hedge_enabled=False)
+        warm(router, "a", 0.01)
+        warm(router, "b", 0.5)
+
+        def call(endpoint):
+            if endpoint.name == "a":
+                raise ConnectionError("refused")
+            return endpoint.name
+
+        assert asyncio.run(router.call("m", call)) == "b"
+        assert router.get_stats()["failovers"] == 1
+
+    def test_client_error_is_not_retried(self):
+        router = make_router(hedge_enabled=False)
+        calls = []
+
+        def call(endpoint):
+            calls.append(endpoint.name)
+            raise ValueError("bad request")
+
+        with pytest.raises(ValueError):
+            asyncio.run(router.call("m", call, is_failure=lambda e: not isinstance(e, ValueError)))
+        assert len(calls) == 1
+
+    def test_all_endpoints_failing(self):
+        router = make_router(hedge_enabled=False)
+
+        def call(endpoint):
+            raise ConnectionError("refused")
+
+        with pytest.raises(ConnectionError):
+            router.call_sync("m", call)
+
+    def test_unconfigured_model_uses_default_endpoint(self):
+        router = InferenceRouter(endpoints={})
+        assert len(router.get_endpoints("other")) == 1
+
+
+class TestHedging:
+    """Test hedged requests."""
+
+    def test_slow_primary_is_hedged(self):
+        router = make_router()
+        warm(router, "a", 0.01)
+        warm(router, "b", 0.02)
+
+        def call(endpoint):
+            # Primary "a" stalls far beyond its p95
+            time.sleep(0.5 if endpoint.name == "a" else 0.01)
+            return endpoint.name
+
+        async def timed():
+            # Measured inside the loop - asyncio.run() also waits for the
+            # abandoned primary's worker thread on shutdown
+            start = time.perf_counter()
+            result = await router.call("m", call)
+            return result, time.perf_counter() - start
+
+        result, elapsed = asyncio.run(timed())
+
+        assert result == "b"
+        assert elapsed < 0.4
+        stats = router.get_stats()
+        assert stats["hedged"] == 1
+        assert stats["hedge_wins"] == 1
+
+    def test_no_hedge_without_latency_data(self):
+        router = make_router()
+
+        def call(endpoint):
+            time.sleep(0.05)
+            return endpoint.name
+
+        asyncio.run(router.call("m", call))
+        assert router.get_stats()["hedged"] == 0
+
+
+class TestCircuitBreaker:
+    """Test circuit breaker transitions."""
+
+    def test_opens_and_recovers(self):
+        router = make_router(hedge_enabled=False, breaker_threshold=2, breaker_cooldown=0.05)
+        endpoint_a = router.get_endpoints("m")[0]
+        healthy = {"a": False}
+
+        def call(endpoint):
+            if endpoint.name == "a" and not healthy["a"]:
+                raise ConnectionError("down")
+            return endpoint.name
+
+        for _ in range(2):
+            router._acquire(endpoint_a)
+            router._record(endpoint_a, 0.01, ok=False)
+
+        assert router.get_stats()["endpoints"]["a"]["circuit"] == "open"
+        # Open circuit - traffic goes to "b"
+        assert router.call_sync("m", call) == "b"
+
+        time.sleep(0.06)
+        assert router.get_stats()["endpoints"]["a"]["circuit"] == "half_open"
+
+        # Probe succeeds -> closed
+        healthy["a"] = True
+        router._acquire(endpoint_a)
+        router._record(endpoint_a, 0.01, ok=True)
+        assert router.get_stats()["endpoints"]["a"]["circuit"] == "closed"
+
+    def test_failed_probe_reopens(self):
+        router = make_router(breaker_threshold=1, breaker_cooldown=0.01)
+        endpoint_a = router.get_endpoints("m")[0]
+
+        router._acquire(endpoint_a)
+        router._record(endpoint_a, 0.01, ok=False)
+        time.sleep(0.02)
+
+        router._acquire(endpoint_a)
+        router._record(endpoint_a, 0.01, ok=False)
+        assert router.get_stats()["endpoints"]["a"]["circuit"] == "open"
+
+
+class StubServer:
+    """Local OpenAI-compatible completions server with configurable delay/status."""
+
+    def __init__(self, delay: float = 0.0, status: int = 200):
+        self.delay = delay
+        self.status = status
+        self.hits = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                stub.hits += 1
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length))
+                time.sleep(stub.delay)
+
+                body = json.dumps({
+                    "choices": [{"text": f"{payload['model']}@{stub.port}"}],
+                    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+                }).encode()
+
+                if payload.get("stream") and stub.status == 200:
+                    # SSE: one event per word, then [DONE]
+                    events = [{"choices": [{"text": word}]} for word in ("hello ", "world")]
+                    events.append({"choices": [], "usage": {"total_tokens": 3}})
+                    body = "".join(f"data: {json.dumps(e)}\n\n" for e in events).encode()
+                    body += b"data: [DONE]\n\n"
+
+                self.send_response(stub.status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.port = self.server.server_address[1]
+        self.url = f"http://127.0.0.1:{self.port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub_servers():
+    servers = []
+
+    def start(**kwargs):
+        server = StubServer(**kwargs)
+        servers.append(server)
+        return server
+
+    yield start
+
+    for server in servers:
+        server.close()
+
+
+class TestInferenceServiceWithStubs:
+    """End-to-end routing through InferenceService."""
+
+    def _service(self, router: InferenceRouter) -> InferenceService:
+        service = InferenceService()
+        service.router = router
+        service.coalescer = RequestCoalescer(namespace="test", distributed=False)
+        return service
+
+    def test_fails_over_from_5xx_endpoint(self, stub_servers):
+        broken = stub_servers(status=503)
+        healthy = stub_servers()
+        router = InferenceRouter(endpoints={"m": [
+            {"name": "broken", "base_url": broken.url, "model": "upstream-m"},
+            {"name": "healthy", "base_url": healthy.url, "model": "upstream-m"}
+        ]})
+        router.hedge_enabled = False
+        service = self._service(router)
+
+        result = asyncio.run(service.generate("hi", model="m", use_cache=False))
+        assert result["text"].startswith("upstream-m@")
+        assert broken.hits + healthy.hits >= 1
+
+        # Broken endpoint accumulates errors and ends up ranked last
+        for _ in range(3):
+            asyncio.run(service.generate("hi", model="m", use_cache=False))
+        assert router.get_stats()["endpoints"]["broken"]["error_rate"] > 0
+
+    def test_upstream_error_when_all_fail(self, stub_servers):
+        broken = stub_servers(status=500)
+        router = InferenceRouter(endpoints={"m": [{"name": "only", "base_url": broken.url}]})
+        service = self._service(router)
+
+        with pytest.raises((UpstreamError, NoHealthyEndpointError)):
+            service.generate_sync("hi", model="m", use_cache=False)
+
+    def test_stream_fails_over_before_first_token(self, stub_servers):
+        broken = stub_servers(status=503)
+        healthy = stub_servers()
+        router = InferenceRouter(endpoints={"m": [
+            {"name": "broken", "base_url": broken.url},
+            {"name": "healthy", "base_url": healthy.url}
+        ]})
+        service = self._service(router)
+
+        async def collect():
+            usage = {}
+            chunks = [chunk async for chunk in service.generate_stream("hi", model="m", usage=usage)]
+            return chunks, usage
+
+        for _ in range(2):
+            chunks, usage = asyncio.run(collect())
+            assert chunks == ["hello ", "world"]
+            assert usage == {"total_tokens": 3}
+
+        assert healthy.hits == 2
+        assert router.get_stats()["endpoints"]["healthy"]["requests"] == 2
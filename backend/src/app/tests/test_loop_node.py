@@ -0,0 +1,97 @@
+"""
+LoopNode Tests
+
+WHY: Loop items must reach the body with their original types
+HOW: Body node runner replaced with a fake that echoes the bound item
+
+Tests:
+1. A lone {{path}} array keeps strings and dicts as-is
+2. Dotted paths resolve nested arrays
+3. output_node selects the per-item result
+
+USAGE:
+    pytest app/tests/test_loop_node.py -v
+"""
+
+import asyncio
+import importlib
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+import app.chatflow
+import app.chatflow.utils.subgraph as subgraph
+
+
+def import_loop_node():
+    """Import LoopNode without the nodes package __init__ (it imports every node)."""
+
+    try:
+        return importlib.import_module("app.chatflow.nodes.loop_node").LoopNode
+    except ImportError:
+        package = types.ModuleType("app.chatflow.nodes")
+        package.__path__ = [str(Path(app.chatflow.__file__).parent / "nodes")]
+        sys.modules["app.chatflow.nodes"] = package
+        return importlib.import_module("app.chatflow.nodes.loop_node").LoopNode
+
+
+LoopNode = import_loop_node()
+
+
+class EchoNode:
+    """Returns the iteration item (and its type) as the node output."""
+
+    def __init__(self, node_id, config):
+        self.node_id = node_id
+
+    async def run(self, db, context, inputs):
+        item = context["variables"]["item"]
+        return {"output": {"node": self.node_id, "item": item, "type": type(item).__name__}, "success": True}
+
+
+@pytest.fixture(autouse=True)
+def echo_nodes(monkeypatch):
+    monkeypatch.setattr(subgraph, "create_node", lambda node: EchoNode(node["id"], node.get("config", {})))
+
+
+def run_loop(config, variables):
+    node = LoopNode(node_id="loop", config=config)
+    return asyncio.run(node.execute(None, {"variables": variables}, {}))
+
+
+BODY = {
+    "nodes": [{"id": "first", "type": "variable"}, {"id": "second", "type": "variable"}],
+    "edges": [{"source": "first", "target": "second"}]
+}
+
+
+class TestArrayResolution:
+    """Test raw array resolution."""
+
+    def test_placeholder_keeps_item_types(self):
+        items = ["plain", {"x": 1}]
+
+        result = run_loop({"array": "{{items}}", "body": BODY, "max_concurrency": 2}, {"items": items})
+
+        assert result["success"] is True
+        assert result["metadata"]["iterations"] == 2
+        assert [r["item"] for r in result["output"]] == items
+        assert [r["result"]["type"] for r in result["output"]] == ["str", "dict"]
+
+    def test_dotted_path(self):
+        result = run_loop(
+            {"array": "{{ payload.rows }}", "body": BODY},
+            {"payload": {"rows": [{"id": 1}, {"id": 2}]}}
+        )
+
+        assert [r["item"] for r in result["output"]] == [{"id": 1}, {"id": 2}]
+
+    def test_output_node(self):
+        result = run_loop(
+            {"array": "{{items}}", "body": BODY, "output_node": "first"},
+            {"items": ["a"]}
+        )
+
+        assert result["output"][0]["result"]["node"] == "first"
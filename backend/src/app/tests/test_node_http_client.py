@@ -0,0 +1,135 @@
+"""
+Node HTTP Client Tests
+
+WHY: HTTP nodes share one pooled client and an opt-in GET cache
+HOW: httpx.MockTransport counting upstream calls (no network)
+
+Tests:
+1. Uncached and non-GET requests always reach the upstream
+2. max-age / node TTL freshness and no-store
+3. ETag revalidation (304 refreshes the entry)
+4. Cache key includes headers and credential
+5. Per-host concurrency limit
+
+USAGE:
+    pytest app/tests/test_node_http_client.py -v
+"""
+
+import asyncio
+
+import httpx
+
+from app.services.node_http_client import NodeHTTPClient, cache_ttl_from_config, parse_cache_control
+
+
+class Upstream:
+    """Mock API: records requests, replies with configured headers."""
+
+    def __init__(self, headers=None, delay=0.0):
+        self.headers = headers or {}
+        self.delay = delay
+        self.requests = []
+        self.active = 0
+        self.peak = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            if request.headers.get("if-none-match") == '"v1"':
+                return httpx.Response(304, headers={"etag": '"v1"'})
+            return httpx.Response(200, json={"count": len(self.requests)}, headers=self.headers)
+        finally:
+            self.active -= 1
+
+
+def make_client(upstream: Upstream) -> NodeHTTPClient:
+    return NodeHTTPClient(transport=httpx.MockTransport(upstream))
+
+
+async def fetch(client, url="https://api.example.com/items", **kwargs):
+    response, status = await client.request("GET", url, **kwargs)
+    return response.json()["count"], status
+
+
+class TestCache:
+    """Test GET caching."""
+
+    def test_bypass(self):
+        upstream = Upstream(headers={"cache-control": "max-age=60"})
+        client = make_client(upstream)
+
+        async def run():
+            assert await fetch(client) == (1, "bypass")
+            assert await fetch(client) == (2, "bypass")
+            response, status = await client.request("POST", "https://api.example.com/items", json_body={}, cache_ttl=60)
+            assert status == "bypass"
+
+        asyncio.run(run())
+        assert upstream.requests[-1].method == "POST"
+
+    def test_freshness(self):
+        upstream = Upstream(headers={"cache-control": "max-age=60"})
+        client = make_client(upstream)
+
+        async def run():
+            assert await fetch(client, cache_ttl=0) == (1, "miss")
+            assert await fetch(client, cache_ttl=0) == (1, "hit")
+
+            upstream.headers = {"cache-control": "no-store"}
+            assert await fetch(client, "https://api.example.com/other", cache_ttl=60) == (2, "miss")
+            assert await fetch(client, "https://api.example.com/other", cache_ttl=60) == (3, "miss")
+
+            upstream.headers = {}
+            assert await fetch(client, "https://api.example.com/ttl", cache_ttl=60) == (4, "miss")
+            assert await fetch(client, "https://api.example.com/ttl", cache_ttl=60) == (4, "hit")
+
+        asyncio.run(run())
+
+    def test_etag_revalidation(self):
+        upstream = Upstream(headers={"etag": '"v1"', "cache-control": "no-cache"})
+        client = make_client(upstream)
+
+        async def run():
+            assert await fetch(client, cache_ttl=60) == (1, "miss")
+            assert await fetch(client, cache_ttl=60) == (1, "revalidated")
+
+        asyncio.run(run())
+        assert len(upstream.requests) == 2
+        assert upstream.requests[1].headers["if-none-match"] == '"v1"'
+
+    def test_key_includes_headers_and_credential(self):
+        upstream = Upstream(headers={"cache-control": "max-age=60"})
+        client = make_client(upstream)
+
+        async def run():
+            await fetch(client, headers={"Authorization": "Bearer a"}, cache_ttl=60, credential_id="c1")
+            assert await fetch(client, headers={"Authorization": "Bearer b"}, cache_ttl=60, credential_id="c1") == (2, "miss")
+            assert await fetch(client, headers={"Authorization": "Bearer a"}, cache_ttl=60, credential_id="c2") == (3, "miss")
+            assert await fetch(client, headers={"Authorization": "Bearer a"}, cache_ttl=60, credential_id="c1") == (1, "hit")
+
+        asyncio.run(run())
+
+    def test_config_helpers(self):
+        assert cache_ttl_from_config({}) is None
+        assert cache_ttl_from_config({"cache": True}) == 0.0
+        assert cache_ttl_from_config({"cache_ttl": 30}) == 30.0
+        assert parse_cache_control('max-age=60, No-Cache') == {"max-age": "60", "no-cache": True}
+
+
+class TestPooling:
+    """Test per-host limits."""
+
+    def test_per_host_limit(self):
+        upstream = Upstream(delay=0.02)
+        client = make_client(upstream)
+        client.max_per_host = 3
+
+        async def run():
+            await asyncio.gather(*(fetch(client) for _ in range(10)))
+
+        asyncio.run(run())
+        assert upstream.peak == 3
+        assert client.get_stats()["requests"] == 10
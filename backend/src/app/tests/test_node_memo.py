@@ -0,0 +1,193 @@
+"""
+Node Memo Tests
+
+WHY: Memoized nodes must only reuse results for identical config + inputs
+HOW: Counting executors registered on a ChatflowExecutor (no services)
+
+Tests:
+1. Opt-in + cacheable type: second identical run is a hit
+2. Key covers referenced variables and config version only
+3. Failures and expired results are not served; entry bound evicts LRU
+4. Cacheability declarations (temperature 0 LLM, GET requests)
+5. Scheduler reports hits in nodes_cached
+
+USAGE:
+    pytest app/tests/test_node_memo.py -v
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.chatflow.utils.dag_scheduler import DAGScheduler
+from app.chatflow.utils.execution_plan import compile_plan
+from app.chatflow.utils.node_memo import NodeMemo, memo_ttl, node_memo, template_inputs
+from app.services.chatflow_executor import BaseNodeExecutor, ChatflowExecutor
+
+
+@pytest.fixture(autouse=True)
+def clear_memo():
+    node_memo.clear()
+    yield
+    node_memo.clear()
+
+
+class CountingExecutor(BaseNodeExecutor):
+    """Deterministic executor that counts real executions."""
+
+    memo_defaults = {"query": "{{input}}"}
+
+    def __init__(self, fail: bool = False):
+        self.calls = 0
+        self.fail = fail
+
+    def is_cacheable(self, node_config: dict) -> bool:
+        return True
+
+    async def execute(self, db, node_config, context):
+        self.calls += 1
+        if self.fail:
+            return {"output": None, "success": False, "error": "boom"}
+        return {"output": f"result {self.calls}", "success": True, "error": None, "metadata": {}}
+
+
+def make_executor(fail: bool = False):
+    executor = ChatflowExecutor()
+    counting = CountingExecutor(fail)
+    executor.register_executor("lookup", counting)
+    return executor, counting
+
+
+def lookup_node(config: dict) -> dict:
+    return {"id": "kb1", "type": "lookup", "config": config}
+
+
+def context(message: str, **variables) -> dict:
+    return {"user_message": message, "variables": variables}
+
+
+class TestMemoization:
+    """Test memoized execution through ChatflowExecutor."""
+
+    def test_hit_on_identical_inputs(self):
+        executor, counting = make_executor()
+        node = lookup_node({"memoize": True})
+
+        async def run():
+            first = await executor.execute_node(None, node, context("hello"))
+            second = await executor.execute_node(None, node, context("hello", unrelated="x"))
+            third = await executor.execute_node(None, node, context("other"))
+            return first, second, third
+
+        first, second, third = asyncio.run(run())
+
+        assert first["metadata"]["cache_hit"] is False
+        assert second["output"] == "result 1" and second["metadata"]["cache_hit"] is True
+        assert third["output"] == "result 2"
+        assert counting.calls == 2
+
+    def test_not_opted_in(self):
+        executor, counting = make_executor()
+
+        async def run():
+            for _ in range(2):
+                await executor.execute_node(None, lookup_node({}), context("hello"))
+
+        asyncio.run(run())
+        assert counting.calls == 2
+
+    def test_failures_not_stored(self):
+        executor, counting = make_executor(fail=True)
+        node = lookup_node({"memoize_ttl": 60})
+
+        async def run():
+            for _ in range(2):
+                await executor.execute_node(None, node, context("hello"))
+
+        asyncio.run(run())
+        assert counting.calls == 2
+
+
+class TestMemoStore:
+    """Test keys and bounds."""
+
+    def test_template_inputs(self):
+        scope = {"input": "hi", "kb": {"docs": ["a", "b"]}, "other": 1}
+        config = {"url": "https://x/{{kb.docs.1}}", "body": {"q": "{{input}}"}}
+
+        assert template_inputs(config, scope) == {"kb.docs.1": "b", "input": "hi"}
+        assert template_inputs({}, scope, {"query": "{{input}}"}) == {"input": "hi"}
+
+    def test_config_version_in_key(self):
+        memo = NodeMemo()
+        assert memo.key("llm", {"prompt": "a"}, {}) != memo.key("llm", {"prompt": "b"}, {})
+        assert memo.key("llm", {"a": 1, "b": 2}, {"x": 1}) == memo.key("llm", {"b": 2, "a": 1}, {"x": 1})
+
+    def test_ttl_and_size_bounds(self):
+        memo = NodeMemo()
+        memo.max_entries = 2
+
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            return {"output": "x" * 10, "success": True}
+
+        async def run(config, scope):
+            return await memo.run("lookup", config, scope, compute)
+
+        config = {"memoize_ttl": 60, "q": "{{input}}"}
+        for value in ("a", "b", "c", "a"):
+            asyncio.run(run(config, {"input": value}))
+
+        assert len(calls) == 4
+        assert memo.get_stats()["evicted"] == 2 and memo.get_stats()["entries"] == 2
+
+        short = {"memoize_ttl": 0.01, "q": "{{input}}"}
+        asyncio.run(run(short, {"input": "z"}))
+        time.sleep(0.02)
+        asyncio.run(run(short, {"input": "z"}))
+        assert len(calls) == 6 and memo.get_stats()["expired"] == 1
+
+    def test_cacheable_declarations(self):
+        executor = ChatflowExecutor()
+
+        assert memo_ttl({}) is None and memo_ttl({"memoize_ttl": 5}) == 5.0
+        assert executor.is_memoized({"type": "llm", "config": {"memoize": True, "temperature": 0}})
+        assert not executor.is_memoized({"type": "llm", "config": {"memoize": True}})
+        assert executor.is_memoized({"type": "http_request", "config": {"memoize": True}})
+        assert not executor.is_memoized({"type": "http_request", "config": {"memoize": True, "method": "POST"}})
+        assert not executor.is_memoized({"type": "response", "config": {"memoize": True}})
+
+
+class TestScheduler:
+    """Test hit reporting."""
+
+    def test_nodes_cached(self):
+        executor, counting = make_executor()
+        plan = compile_plan("flow", 1, {
+            "nodes": [
+                {"id": "t", "type": "trigger"},
+                {"id": "kb1", "type": "lookup", "config": {"memoize": True}},
+                {"id": "r", "type": "response"}
+            ],
+            "edges": [{"source": "t", "target": "kb1"}, {"source": "kb1", "target": "r"}]
+        })
+
+        async def execute_node(node, node_context):
+            if node["type"] == "lookup":
+                return await executor.execute_node(None, node, node_context)
+            return {"output": node_context["user_message"]}
+
+        async def run():
+            scheduler = DAGScheduler(max_parallelism=2)
+            first = await scheduler.run(plan, execute_node, context("hello"))
+            second = await scheduler.run(plan, execute_node, context("hello"))
+            return first, second
+
+        first, second = asyncio.run(run())
+
+        assert first["nodes_cached"] == []
+        assert second["nodes_cached"] == ["kb1"]
+        assert counting.calls == 1
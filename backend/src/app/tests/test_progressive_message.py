@@ -0,0 +1,97 @@
+"""
+ProgressiveMessage Tests
+
+WHY: Streamed channel replies must stay under platform edit limits
+HOW: Recording edit/overflow callbacks (no platform API)
+
+Tests:
+1. Many updates coalesce into few edits
+2. Final edit carries the full text without the cursor
+3. Final text over the length limit overflows into extra messages
+4. finish() cancels a flusher waiting out the interval
+
+USAGE:
+    pytest app/tests/test_progressive_message.py -v
+"""
+
+import asyncio
+
+from app.services.progressive_message import ProgressiveMessage
+
+
+class Recorder:
+    def __init__(self, delay: float = 0.0):
+        self.edits = []
+        self.overflow = []
+        self.delay = delay
+
+    async def edit(self, text, final):
+        await asyncio.sleep(self.delay)
+        self.edits.append((text, final))
+
+    async def send(self, text):
+        self.overflow.append(text)
+
+
+class TestProgressiveMessage:
+    """Test coalescing and final delivery."""
+
+    def test_updates_coalesce(self):
+        recorder = Recorder()
+
+        async def scenario():
+            message = ProgressiveMessage(recorder.edit, max_length=100, min_interval=0.05)
+            text = ""
+            for i in range(50):
+                text += "w "
+                await message.update(text)
+                await asyncio.sleep(0.002)
+            await message.finish(text)
+
+        asyncio.run(scenario())
+
+        # ~0.1s of updates at a 0.05s interval: a handful of edits, not 50
+        assert 2 <= len(recorder.edits) <= 5
+        assert all(not final for _, final in recorder.edits[:-1])
+
+    def test_final_edit(self):
+        recorder = Recorder()
+
+        async def scenario():
+            message = ProgressiveMessage(recorder.edit, max_length=100, min_interval=0.01)
+            await message.update("Hel")
+            await asyncio.sleep(0.02)
+            await message.finish("Hello world")
+
+        asyncio.run(scenario())
+
+        assert recorder.edits[0] == ("Hel" + ProgressiveMessage.CURSOR, False)
+        assert recorder.edits[-1] == ("Hello world", True)
+
+    def test_overflow(self):
+        recorder = Recorder()
+
+        async def scenario():
+            message = ProgressiveMessage(recorder.edit, max_length=10, overflow=recorder.send, min_interval=0.01)
+            await message.finish("aaaaaaaa\nbbbbbbbb\ncc")
+
+        asyncio.run(scenario())
+
+        assert recorder.edits == [("aaaaaaaa", True)]
+        assert recorder.overflow == ["bbbbbbbb", "cc"]
+
+    def test_finish_cancels_waiting_flusher(self):
+        recorder = Recorder()
+
+        async def scenario():
+            message = ProgressiveMessage(recorder.edit, max_length=100, min_interval=10.0)
+            await message.update("one")
+            await asyncio.sleep(0.01)
+            # Second update must wait 10s for its edit; finish() should not
+            await message.update("one two")
+            await asyncio.sleep(0.01)
+            await asyncio.wait_for(message.finish("one two three"), timeout=1.0)
+
+        asyncio.run(scenario())
+
+        assert [text for text, _ in recorder.edits] == ["one" + ProgressiveMessage.CURSOR, "one two three"]
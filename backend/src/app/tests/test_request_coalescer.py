@@ -0,0 +1,304 @@
+"""
+RequestCoalescer Tests
+
+WHY: Identical concurrent calls must collapse to one upstream call
+HOW: Drive the coalescer with counting coroutines and a fake Redis client
+
+Tests:
+1. Concurrent identical calls share one execution
+2. Different keys run independently
+3. Leader errors propagate to followers; a cancelled (timed out) caller
+   never cancels the others, the call stops once nobody waits
+4. Sampled (temperature > 0) inference calls are never coalesced
+5. Distributed tier reuses results published by another worker; non-JSON
+   results are published as strings or counted as skipped
+6. Redis failures fall back to a local call
+
+USAGE:
+    pytest app/tests/test_request_coalescer.py -v
+"""
+
+import asyncio
+import json
+from uuid import uuid4
+
+import pytest
+
+from app.services.request_coalescer import RequestCoalescer
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the Redis commands the coalescer uses."""
+
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, nx=False, ex=None, px=None):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        return True
+
+    def exists(self, key):
+        return int(key in self.store)
+
+    def delete(self, key):
+        self.store.pop(key, None)
+
+
+class BrokenRedis:
+    """Redis client whose every call fails."""
+
+    def get(self, key):
+        raise ConnectionError("redis down")
+
+    def set(self, *args, **kwargs):
+        raise ConnectionError("redis down")
+
+
+class Upstream:
+    """Counts calls; each call takes a moment so callers overlap."""
+
+    def __init__(self, result=None, error=None):
+        self.calls = 0
+        self.result = result if result is not None else {"text": "answer"}
+        self.error = error
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if self.error:
+            raise self.error
+        return self.result
+
+
+class TestInProcess:
+    """Test in-process single-flight."""
+
+    def test_identical_calls_share_one_execution(self):
+        coalescer = RequestCoalescer(namespace="test", distributed=False)
+        upstream = Upstream()
+        key = coalescer.build_key("model", "same question")
+
+        async def burst():
+            return await asyncio.gather(*[coalescer.run(key, upstream) for _ in range(10)])
+
+        results = asyncio.run(burst())
+
+        assert upstream.calls == 1
+        assert all(result == {"text": "answer"} for result in results)
+        # Followers get copies - mutating one never leaks into another
+        results[1]["text"] = "changed"
+        assert results[0]["text"] == "answer"
+
+        stats = coalescer.get_stats()
+        assert stats["leaders"] == 1
+        assert stats["coalesced"] == 9
+        assert stats["inflight"] == 0
+
+    def test_different_keys_run_independently(self):
+        coalescer = RequestCoalescer(namespace="test", distributed=False)
+        upstream = Upstream()
+
+        async def burst():
+            await asyncio.gather(
+                coalescer.run(coalescer.build_key("a"), upstream),
+                coalescer.run(coalescer.build_key("b"), upstream)
+            )
+
+        asyncio.run(burst())
+        assert upstream.calls == 2
+
+    def test_sequential_calls_are_not_cached(self):
+        coalescer = RequestCoalescer(namespace="test", distributed=False)
+        upstream = Upstream()
+        key = coalescer.build_key("a")
+
+        async def twice():
+            await coalescer.run(key, upstream)
+            await coalescer.run(key, upstream)
+
+        asyncio.run(twice())
+        assert upstream.calls == 2
+
+    def test_leader_error_propagates(self):
+        coalescer = RequestCoalescer(namespace="test", distributed=False)
+        upstream = Upstream(error=RuntimeError("provider down"))
+        key = coalescer.build_key("a")
+
+        async def burst():
+            return await asyncio.gather(
+                *[coalescer.run(key, upstream) for _ in range(3)],
+                return_exceptions=True
+            )
+
+        results = asyncio.run(burst())
+        assert upstream.calls == 1
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+
+class TestCancellation:
+    """Test that one caller's timeout stays with that caller."""
+
+    def test_leader_timeout_does_not_cancel_followers(self):
+        coalescer = RequestCoalescer(namespace="test", distributed=False)
+        calls = []
+
+        async def slow():
+            calls.append(1)
+            await asyncio.sleep(0.2)
+            return {"text": "answer"}
+
+        key = coalescer.build_key("a")
+
+        async def burst():
+            return await asyncio.gather(
+                asyncio.wait_for(coalescer.run(key, slow), 0.05),
+                asyncio.wait_for(coalescer.run(key, slow), 2),
+                return_exceptions=True
+            )
+
+        leader, follower = asyncio.run(burst())
+
+        assert isinstance(leader, asyncio.TimeoutError)
+        assert follower == {"text": "answer"}
+        assert len(calls) == 1
+        assert coalescer.get_stats()["inflight"] == 0
+
+    def test_call_cancelled_when_nobody_waits(self):
+        coalescer = RequestCoalescer(namespace="test", distributed=False)
+        finished = []
+
+        async def slow():
+            await asyncio.sleep(0.2)
+            finished.append(1)
+
+        async def run():
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(coalescer.run(coalescer.build_key("a"), slow), 0.05)
+            await asyncio.sleep(0.3)
+
+        asyncio.run(run())
+        assert finished == []
+        assert coalescer.get_stats()["inflight"] == 0
+
+
+class TestInferenceSampling:
+    """Test which inference calls are coalesced."""
+
+    class CountingRouter:
+        def __init__(self):
+            self.calls = 0
+
+        async def call(self, model, request, is_failure=None):
+            self.calls += 1
+            await asyncio.sleep(0.01)
+            return {"choices": [{"text": f"sample {self.calls}"}], "usage": {}}
+
+    def _service(self):
+        from app.services.inference_service import InferenceService
+
+        service = InferenceService()
+        service.router = self.CountingRouter()
+        service.coalescer = RequestCoalescer(namespace="test", distributed=False)
+        return service
+
+    @pytest.mark.parametrize("temperature, expected_calls", [(0.7, 3), (0, 1)])
+    def test_only_deterministic_calls_coalesce(self, temperature, expected_calls):
+        service = self._service()
+
+        async def burst():
+            return await asyncio.gather(*[
+                service.generate("hi", model="m", temperature=temperature, use_cache=False)
+                for _ in range(3)
+            ])
+
+        asyncio.run(burst())
+        assert service.router.calls == expected_calls
+
+
+class TestDistributed:
+    """Test the Redis tier."""
+
+    def test_published_result_is_reused(self):
+        redis = FakeRedis()
+        coalescer = RequestCoalescer(namespace="test", distributed=True, redis_client=redis)
+        key = coalescer.build_key("a")
+        redis.store[f"coalesce:test:result:{key}"] = json.dumps({"text": "remote"})
+        upstream = Upstream()
+
+        assert asyncio.run(coalescer.run(key, upstream)) == {"text": "remote"}
+        assert upstream.calls == 0
+        assert coalescer.get_stats()["remote_hits"] == 1
+
+    def test_leader_publishes_and_releases_lock(self):
+        redis = FakeRedis()
+        coalescer = RequestCoalescer(namespace="test", distributed=True, redis_client=redis)
+        key = coalescer.build_key("a")
+
+        asyncio.run(coalescer.run(key, Upstream()))
+
+        assert json.loads(redis.store[f"coalesce:test:result:{key}"]) == {"text": "answer"}
+        assert f"coalesce:test:lock:{key}" not in redis.store
+
+    def test_non_json_result_is_published_as_strings(self):
+        redis = FakeRedis()
+        coalescer = RequestCoalescer(namespace="test", distributed=True, redis_client=redis)
+        key = coalescer.build_key("a")
+        chunk_id = uuid4()
+
+        asyncio.run(coalescer.run(key, Upstream(result={"ids": [chunk_id]})))
+
+        assert json.loads(redis.store[f"coalesce:test:result:{key}"]) == {"ids": [str(chunk_id)]}
+
+    def test_unencodable_result_is_counted(self):
+        redis = FakeRedis()
+        coalescer = RequestCoalescer(namespace="test", distributed=True, redis_client=redis)
+        key = coalescer.build_key("a")
+        result = {}
+        result["self"] = result
+
+        assert asyncio.run(coalescer.run(key, Upstream(result=result))) is result
+        assert f"coalesce:test:result:{key}" not in redis.store
+        assert coalescer.get_stats()["publish_skipped"] == 1
+
+    def test_follower_runs_locally_when_leader_vanishes(self):
+        redis = FakeRedis()
+        coalescer = RequestCoalescer(
+            namespace="test",
+            distributed=True,
+            redis_client=redis,
+            poll_interval_seconds=0.001
+        )
+        key = coalescer.build_key("a")
+        lock_key = f"coalesce:test:lock:{key}"
+        redis.store[lock_key] = "other-worker"
+        upstream = Upstream()
+
+        async def leader_dies():
+            await asyncio.sleep(0.005)
+            redis.delete(lock_key)
+
+        async def scenario():
+            result, _ = await asyncio.gather(coalescer.run(key, upstream), leader_dies())
+            return result
+
+        assert asyncio.run(scenario()) == {"text": "answer"}
+        assert upstream.calls == 1
+        assert coalescer.get_stats()["remote_fallbacks"] == 1
+
+    def test_redis_failure_runs_locally(self):
+        coalescer = RequestCoalescer(namespace="test", distributed=True, redis_client=BrokenRedis())
+        upstream = Upstream()
+
+        assert asyncio.run(coalescer.run(coalescer.build_key("a"), upstream)) == {"text": "answer"}
+        assert upstream.calls == 1
+        assert coalescer.get_stats()["redis_errors"] == 1
+
+
+@pytest.mark.parametrize("parts", [("m", "q"), ("m", {"b": 1, "a": 2})])
+def test_build_key_is_stable(parts):
+    assert RequestCoalescer.build_key(*parts) == RequestCoalescer.build_key(*parts)
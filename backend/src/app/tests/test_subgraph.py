@@ -0,0 +1,98 @@
+"""
+Loop Subgraph Tests
+
+WHY: Loop bodies run as isolated, concurrently mapped sub-graphs
+HOW: Compiled body plans with a fake node runner (no node services)
+
+Tests:
+1. Concurrent mapping keeps results in item order and finishes early
+2. Iterations see item/index in a child scope; parent scope untouched
+3. First failure cancels outstanding iterations
+4. Iteration timeout is reported as a failure
+
+USAGE:
+    pytest app/tests/test_subgraph.py -v
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.chatflow.utils.subgraph import IterationError, compile_body, map_items
+
+
+BODY = compile_body({
+    "nodes": [
+        {"id": "fetch", "type": "http_request", "config": {"url": "https://example.com"}},
+        {"id": "shape", "type": "variable", "config": {}}
+    ],
+    "edges": [{"source": "fetch", "target": "shape"}]
+})
+
+
+class TestMapItems:
+    """Test concurrent loop mapping."""
+
+    def test_ordered_concurrent_results(self):
+        async def run_node(node, node_context, inputs):
+            if node["id"] == "fetch":
+                # Later items finish first
+                await asyncio.sleep(0.05 * (3 - node_context["variables"]["index"]))
+                return {"output": inputs["input"] * 10, "success": True}
+            return {"output": inputs["input"] + 1, "success": True}
+
+        async def scenario():
+            return await map_items(BODY, [1, 2, 3], run_node, scope={}, max_concurrency=3)
+
+        start = time.perf_counter()
+        results = asyncio.run(scenario())
+        elapsed = time.perf_counter() - start
+
+        assert [r["result"] for r in results] == [11, 21, 31]
+        assert [r["index"] for r in results] == [0, 1, 2]
+        assert all(r["duration_ms"] > 0 for r in results)
+        assert elapsed < 0.25  # slowest iteration, not the sum (0.3s)
+
+    def test_child_scope(self):
+        seen = []
+        scope = {"customer": "acme"}
+
+        async def run_node(node, node_context, inputs):
+            variables = node_context["variables"]
+            seen.append((variables["customer"], variables["row"], variables["i"]))
+            variables["scratch"] = True
+            return {"output": "ok", "success": True}
+
+        asyncio.run(map_items(
+            BODY, ["a", "b"], run_node, scope=scope,
+            item_variable="row", index_variable="i", output_node="fetch"
+        ))
+
+        assert ("acme", "a", 0) in seen and ("acme", "b", 1) in seen
+        assert scope == {"customer": "acme"}
+
+    def test_failure_cancels_rest(self):
+        finished = []
+
+        async def run_node(node, node_context, inputs):
+            index = node_context["variables"]["index"]
+            if index == 0:
+                return {"output": None, "success": False, "error": "HTTP 500"}
+            await asyncio.sleep(0.5)
+            finished.append(index)
+            return {"output": "ok", "success": True}
+
+        with pytest.raises(IterationError) as exc:
+            asyncio.run(map_items(BODY, [1, 2, 3], run_node, scope={}, max_concurrency=3))
+
+        assert exc.value.index == 0
+        assert finished == []
+
+    def test_timeout(self):
+        async def run_node(node, node_context, inputs):
+            await asyncio.sleep(1)
+            return {"output": "late", "success": True}
+
+        with pytest.raises(IterationError, match="timed out"):
+            asyncio.run(map_items(BODY, [1], run_node, scope={}, iteration_timeout=0.05))
@@ -0,0 +1,93 @@
+"""
+TelegramIntegration Tests
+
+WHY: A refused streaming placeholder must not cost the reply
+HOW: OutboundDeliveryService over httpx.MockTransport (no network)
+
+Tests:
+1. Placeholder accepted: the final reply edits it
+2. Placeholder refused (non-OK reply): the final reply is sent as a message
+
+USAGE:
+    pytest app/tests/test_telegram_integration.py -v
+"""
+
+import asyncio
+import json
+import sys
+import types
+
+import httpx
+import pytest
+
+try:
+    import app.models.credential  # noqa: F401
+except SyntaxError:
+    # The integration only needs the model names at import
+    sys.modules["app.models.credential"] = types.SimpleNamespace(Credential=object, CredentialType=object)
+
+import app.services.outbound_delivery_service as outbound
+from app.integrations.telegram_integration import telegram_integration
+from app.services.outbound_delivery_service import OutboundDeliveryService
+
+
+LIMITS = {
+    "telegram": {"bot_rate": 100.0, "bot_burst": 100, "chat_rate": 100.0, "chat_burst": 100, "max_length": 4096}
+}
+
+
+@pytest.fixture
+def telegram_api(monkeypatch):
+    """Records (method, text) per call; sendMessage answers with `placeholder`."""
+
+    calls = []
+    state = {"placeholder": httpx.Response(200, json={"ok": True, "result": {"message_id": 5}})}
+
+    def handler(request):
+        method = str(request.url).rsplit("/", 1)[-1]
+        calls.append((method, json.loads(request.content)["text"]))
+        if method == "sendMessage" and len(calls) == 1:
+            return state["placeholder"]
+        return httpx.Response(200, json={"ok": True, "result": {"message_id": 6}})
+
+    service = OutboundDeliveryService(limits=LIMITS)
+    transport = httpx.MockTransport(handler)
+    service._get_client = lambda platform: service._clients.setdefault(
+        platform, httpx.AsyncClient(transport=transport)
+    )
+    monkeypatch.setattr(outbound, "outbound_delivery_service", service)
+
+    return calls, state
+
+
+def stream_reply(text: str):
+    async def scenario():
+        stream = await telegram_integration.open_stream(7, "TOKEN")
+        await stream.update(text[:3])
+        await stream.finish(text)
+
+    asyncio.run(scenario())
+
+
+class TestOpenStream:
+    """Test streamed reply delivery."""
+
+    def test_placeholder_edited(self, telegram_api):
+        calls, _ = telegram_api
+
+        stream_reply("hello there")
+
+        assert calls[0] == ("sendMessage", "…")
+        assert calls[-1] == ("editMessageText", "hello there")
+
+    @pytest.mark.parametrize("placeholder", [
+        httpx.Response(403, json={"ok": False, "description": "Forbidden: bot was blocked"}),
+        httpx.Response(200, json={"ok": False, "description": "Bad Request: chat not found"})
+    ])
+    def test_refused_placeholder_falls_back_to_send(self, telegram_api, placeholder):
+        calls, state = telegram_api
+        state["placeholder"] = placeholder
+
+        stream_reply("hello there")
+
+        assert calls == [("sendMessage", "…"), ("sendMessage", "hello there")]
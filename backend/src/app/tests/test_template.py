@@ -0,0 +1,61 @@
+"""
+Template Tests
+
+WHY: Chatflow prompts and responses render through compiled templates
+HOW: Pure functions over plain dicts (no services)
+
+Tests:
+1. Dotted paths, list indexes and missing variables
+2. Compiled templates are cached by text
+3. Layered scope reads through layers and writes copy-on-write
+4. VariableResolver and executors render through the compiler
+
+USAGE:
+    pytest app/tests/test_template.py -v
+"""
+
+from app.chatflow.utils.template import compile_template, layered_scope
+from app.chatflow.utils.variable_resolver import variable_resolver
+from app.services.chatflow_executor import render_node_template
+
+
+class TestCompiledTemplate:
+    """Test template compilation and rendering."""
+
+    def test_render_paths(self):
+        template = compile_template("Hi {{ user.name }}, order {{orders.1.id}} {{missing}} {{orders.9.id}}")
+        scope = {"user": {"name": "Ada"}, "orders": [{"id": 1}, {"id": 2}]}
+
+        assert template.render(scope) == "Hi Ada, order 2 {{missing}} {{orders.9.id}}"
+        assert template.variables == ("user.name", "orders.1.id", "missing", "orders.9.id")
+
+    def test_cached(self):
+        assert compile_template("{{a}} and {{b}}") is compile_template("{{a}} and {{b}}")
+        assert compile_template("static text").is_static
+
+    def test_layered_scope(self):
+        variables = {"a": 1, "b": 2}
+        scope = layered_scope({"b": "input"}, variables)
+
+        assert scope["a"] == 1 and scope["b"] == "input"
+        assert sorted(scope) == ["a", "b"]
+
+        scope["a"] = "changed"
+        assert scope["a"] == "changed"
+        assert variables == {"a": 1, "b": 2}
+
+        child = scope.child({"c": 3})
+        assert child["c"] == 3 and "c" not in scope
+
+
+class TestIntegration:
+    """Test callers of the compiler."""
+
+    def test_variable_resolver(self):
+        scope = layered_scope({"input": "hello"}, {"llm1": {"text": "world"}})
+        assert variable_resolver.resolve("{{input}} {{llm1.text}}", scope) == "hello world"
+        assert variable_resolver._get_value("llm1.text", scope) == "world"
+
+    def test_node_template(self):
+        context = {"user_message": "help", "variables": {"input": "shadowed", "kb1": "docs"}}
+        assert render_node_template("{{input}}/{{user_message}}/{{kb1}}", context) == "help/help/docs"
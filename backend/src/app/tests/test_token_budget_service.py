@@ -0,0 +1,147 @@
+"""
+TokenBudgetService Tests
+
+WHY: Prompts must fit the model window and keep the most useful content
+HOW: Word texts whose token counts match under BPE and the fallback estimator
+
+Tests:
+1. Chunks admitted best-first; partial chunk trimmed or skipped
+2. History kept newest-first, omitted count reported
+3. Truncation stops exactly at the token budget
+4. A system prompt that alone exceeds the budget is trimmed
+5. Long texts are counted without entering the count cache
+
+USAGE:
+    pytest app/tests/test_token_budget_service.py -v
+"""
+
+import pytest
+
+from app.services import token_budget_service as module
+from app.services.token_budget_service import TokenBudgetService
+
+
+def words(count: int, word: str = "word") -> str:
+    return " ".join([word] * count)
+
+
+@pytest.fixture
+def service():
+    service = TokenBudgetService()
+    service.context_ratio = 0.6
+    service.min_chunk_tokens = 64
+    service.safety_margin = 0
+    return service
+
+
+def plan(service, window, chunks=(), history=(), system_prompt="sys", user_message="hi", completion=50):
+    return service.plan_prompt(
+        system_prompt=system_prompt,
+        user_message=user_message,
+        context_chunks=list(chunks),
+        history=list(history),
+        model="test-model",
+        max_completion_tokens=completion,
+        context_window=window
+    )
+
+
+class TestChunks:
+    """Test retrieved context admission."""
+
+    def test_best_first(self, service):
+        chunks = [
+            {"id": "low", "content": words(60), "score": 0.2},
+            {"id": "high", "content": words(60), "score": 0.9},
+            {"id": "mid", "content": words(60), "score": 0.5}
+        ]
+
+        # 150 available: two 60-token chunks fit, the third's 28 tokens of
+        # room are below min_chunk_tokens
+        result = plan(service, 200, chunks=chunks)
+
+        assert [chunk["id"] for chunk in result["context_chunks"]] == ["high", "mid"]
+        assert result["chunks_dropped"] == 1
+
+    def test_partial_chunk_trimmed_to_budget_edge(self, service):
+        service.min_chunk_tokens = 10
+        chunks = [
+            {"id": "a", "content": words(60), "score": 0.9},
+            {"id": "b", "content": words(60), "score": 0.8},
+            {"id": "c", "content": words(60), "score": 0.1}
+        ]
+
+        used = service.count_tokens("sys") + service.count_tokens("hi")
+
+        result = plan(service, 200, chunks=chunks)
+        last = result["context_chunks"][-1]
+
+        assert last["id"] == "c" and last["truncated"] is True
+        assert service.count_tokens(last["content"]) == result["available_tokens"] - used - 120
+        assert result["prompt_tokens"] == result["available_tokens"]
+
+
+class TestHistory:
+    """Test history allocation."""
+
+    def test_newest_first_with_omitted_count(self, service):
+        history = [{"role": "user", "content": f"{i} {words(19)}"} for i in range(6)]
+        cost = service._message_tokens(history[0])
+        used = service.count_tokens("sys") + service.count_tokens("hi")
+
+        # Room for three and a half messages
+        result = plan(service, 50 + used + 3 * cost + cost // 2, history=history)
+
+        assert result["history"] == history[3:]
+        assert result["history_omitted"] == 3
+
+    def test_stops_at_first_turn_that_does_not_fit(self, service):
+        history = [
+            {"role": "user", "content": "old"},
+            {"role": "assistant", "content": words(200)},
+            {"role": "user", "content": "new"}
+        ]
+
+        result = plan(service, 100, history=history)
+
+        # The small oldest turn would fit, but history stays contiguous
+        assert result["history"] == history[2:]
+        assert result["history_omitted"] == 2
+
+
+class TestTruncation:
+    """Test token-boundary truncation."""
+
+    def test_truncate_at_budget(self, service):
+        text = words(50)
+
+        assert service.count_tokens(service.truncate_to_tokens(text, 20)) == 20
+        assert service.truncate_to_tokens(text, 50) == text
+        assert service.truncate_to_tokens(text, 0) == ""
+
+    def test_oversized_system_prompt(self, service):
+        result = plan(
+            service,
+            200,
+            system_prompt=words(500),
+            chunks=[{"content": words(10), "score": 1.0}],
+            history=[{"role": "user", "content": "earlier"}]
+        )
+
+        # System prompt capped at half the available budget, user message kept
+        assert service.count_tokens(result["system_prompt"]) == result["available_tokens"] // 2
+        assert result["user_message"] == "hi"
+        assert result["prompt_tokens"] <= result["available_tokens"]
+        assert result["context_chunks"] and result["history_omitted"] == 0
+
+
+class TestCountCache:
+    """Test which texts are memoized."""
+
+    def test_long_text_not_cached(self, service, monkeypatch):
+        monkeypatch.setattr(module, "TOKEN_COUNT_CACHE_MAX_CHARS", 100)
+        module._count_tokens_cached.cache_clear()
+
+        assert service.count_tokens(words(10)) == 10
+        assert service.count_tokens(words(500)) == 500
+        assert module._count_tokens_cached.cache_info().currsize == 1
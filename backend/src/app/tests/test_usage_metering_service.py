@@ -0,0 +1,289 @@
+"""
+UsageMeteringService Tests
+
+WHY: Quota decisions and billing totals come from the Redis counters
+HOW: In-memory Redis stand-in, limits and upserts captured (no database)
+
+Tests:
+1. record() updates pending and monthly counters
+2. flush() snapshots pending counters and clears them
+3. flush() holds a lock and never applies a snapshot twice
+4. check_quota() against cached limits (tier defaults + overrides)
+5. Monthly counter seeded once from persisted usage, without counting
+   flushed increments twice
+
+USAGE:
+    pytest app/tests/test_usage_metering_service.py -v
+"""
+
+import fnmatch
+from uuid import uuid4
+
+from app.models.workspace_usage import NIL_UUID
+from app.services.usage_metering_service import (
+    FLUSH_LOCK_KEY,
+    MONTH_SCRIPT,
+    RELEASE_SCRIPT,
+    UsageMeteringService,
+)
+
+
+class MemoryRedis:
+    """Minimal hash-only Redis stand-in (decode_responses=True semantics)."""
+
+    def __init__(self):
+        self.data = {}
+
+    def pipeline(self, transaction=False):
+        return self
+
+    def execute(self):
+        return []
+
+    def hincrby(self, key, field, amount=1):
+        bucket = self.data.setdefault(key, {})
+        bucket[field] = str(int(bucket.get(field, 0)) + int(amount))
+
+    def hsetnx(self, key, field, value):
+        bucket = self.data.setdefault(key, {})
+        if field in bucket:
+            return 0
+        bucket[field] = str(value)
+        return 1
+
+    def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    def expire(self, key, seconds):
+        return True
+
+    def scan_iter(self, match):
+        return [key for key in list(self.data) if fnmatch.fnmatch(key, match)]
+
+    def rename(self, source, destination):
+        self.data[destination] = self.data.pop(source)
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def eval(self, script, numkeys, *keys_and_args):
+        """Python versions of the service's Lua scripts."""
+
+        keys, args = keys_and_args[:numkeys], keys_and_args[numkeys:]
+
+        if script == RELEASE_SCRIPT:
+            if self.data.get(keys[0]) == args[0]:
+                del self.data[keys[0]]
+                return 1
+            return 0
+
+        assert script == MONTH_SCRIPT
+        month_key, pending_key = keys
+        _, seed, base_count = args[:3]
+        if "_seeded" not in self.data.get(month_key, {}):
+            if seed != "1":
+                return 0
+            self.hsetnx(month_key, "_seeded", 1)
+            base = args[3:3 + 2 * base_count]
+            for metric, value in zip(base[::2], base[1::2]):
+                self.hincrby(month_key, metric, value)
+        rest = args[3 + 2 * base_count:]
+        for field, metric, value in zip(rest[::3], rest[1::3], rest[2::3]):
+            self.hincrby(pending_key, field, value)
+            self.hincrby(month_key, metric, value)
+        return 1
+
+
+class CapturingService(UsageMeteringService):
+    """Captures upserts; persisted totals grow as snapshots are flushed."""
+
+    def __init__(self, limits=None, persisted=None):
+        super().__init__(redis_client=MemoryRedis())
+        self.enabled = True
+        self.limits = limits or {}
+        self.persisted = persisted or {}
+        self.upserts = []
+        self.applied = set()
+        self.database_down = False
+
+    def _upsert(self, db, period_start, counters):
+        self.upserts.append((period_start, counters))
+        for field, value in counters.items():
+            metric = field.split("|")[2]
+            self.persisted[metric] = self.persisted.get(metric, 0) + int(value)
+        return len(counters)
+
+    def _claim_snapshot(self, db, snapshot_key):
+        if snapshot_key in self.applied:
+            return False
+        self.applied.add(snapshot_key)
+        return True
+
+    def _prune_flush_log(self, db):
+        pass
+
+    def _load_month_base(self, db, workspace_id, at):
+        return None if self.database_down else self._persisted_month_usage(db, workspace_id, at)
+
+    def _persisted_month_usage(self, db, workspace_id, now):
+        return dict(self.persisted)
+
+    def get_limits(self, db, workspace_id):
+        return self.limits
+
+
+class FakeDB:
+    def commit(self):
+        pass
+
+
+class TestRecord:
+    """Test counter writes."""
+
+    def test_record_increments_pending_and_month(self):
+        service = CapturingService()
+        workspace_id, bot_id = uuid4(), uuid4()
+
+        service.record(workspace_id, {"messages": 1, "prompt_tokens": 10}, bot_id=bot_id)
+        service.record(workspace_id, {"messages": 1, "completion_tokens": None})
+
+        pending = [key for key in service.redis.data if key.startswith("usage:pending:")]
+        assert len(pending) == 1
+        counters = service.redis.data[pending[0]]
+        assert counters[f"{workspace_id}|{bot_id}|messages"] == "1"
+        assert counters[f"{workspace_id}|{NIL_UUID}|messages"] == "1"
+        assert f"{workspace_id}|{NIL_UUID}|completion_tokens" not in counters
+
+        usage = service.get_month_usage(FakeDB(), workspace_id)
+        assert usage["messages"] == 2
+        assert usage["tokens"] == 10
+
+    def test_unknown_metrics_ignored(self):
+        service = CapturingService()
+        service.record(uuid4(), {"bogus": 5})
+        assert service.redis.data == {}
+
+
+class TestFlush:
+    """Test pending counter flush."""
+
+    def test_flush_moves_and_clears(self):
+        service = CapturingService()
+        workspace_id = uuid4()
+        service.record(workspace_id, {"crawl_pages": 3})
+
+        written = service.flush(FakeDB())
+
+        assert written == 1
+        assert len(service.upserts) == 1
+        assert not service.redis.scan_iter("usage:pending:*")
+        assert not service.redis.scan_iter("usage:flushing:*")
+
+    def test_flush_recovers_orphaned_snapshot(self):
+        service = CapturingService()
+        service.redis.data["usage:flushing:20250101:abc"] = {f"{uuid4()}|{NIL_UUID}|messages": "4"}
+
+        service.flush(FakeDB())
+
+        assert service.upserts[0][0].isoformat() == "2025-01-01"
+        assert not service.redis.scan_iter("usage:flushing:*")
+
+    def test_applied_snapshot_not_reapplied(self):
+        # Crash after commit, before the snapshot was deleted
+        service = CapturingService()
+        service.redis.data["usage:flushing:20250101:abc"] = {f"{uuid4()}|{NIL_UUID}|messages": "4"}
+        service.applied.add("usage:flushing:20250101:abc")
+
+        assert service.flush(FakeDB()) == 0
+
+        assert service.upserts == []
+        assert service.get_stats()["skipped_snapshots"] == 1
+        assert not service.redis.scan_iter("usage:flushing:*")
+
+    def test_flush_skipped_while_locked(self):
+        service = CapturingService()
+        service.record(uuid4(), {"messages": 1})
+        service.redis.set(FLUSH_LOCK_KEY, "other-flusher")
+
+        assert service.flush(FakeDB()) == 0
+        assert service.upserts == []
+        assert service.redis.scan_iter("usage:pending:*")
+        assert service.redis.get(FLUSH_LOCK_KEY) == "other-flusher"
+
+        # Lock expired: next flush runs and releases its own lock
+        service.redis.delete(FLUSH_LOCK_KEY)
+        assert service.flush(FakeDB()) == 1
+        assert FLUSH_LOCK_KEY not in service.redis.data
+
+
+class TestQuota:
+    """Test quota checks."""
+
+    def test_unlimited_metric(self):
+        service = CapturingService(limits={})
+        assert service.check_quota(FakeDB(), uuid4(), "messages")["allowed"] is True
+
+    def test_limit_reached(self):
+        service = CapturingService(limits={"messages": 2})
+        workspace_id = uuid4()
+        service.record(workspace_id, {"messages": 2})
+
+        result = service.check_quota(FakeDB(), workspace_id, "messages")
+        assert result["allowed"] is False
+        assert result["remaining"] == 0
+
+    def test_seeded_from_persisted_once(self):
+        service = CapturingService(limits={"crawl_pages": 10}, persisted={"crawl_pages": 6})
+        workspace_id = uuid4()
+
+        assert service.check_quota(FakeDB(), workspace_id, "crawl_pages")["remaining"] == 4
+        # Second read must not add persisted totals again
+        assert service.check_quota(FakeDB(), workspace_id, "crawl_pages", amount=5)["allowed"] is False
+        assert service.get_month_usage(FakeDB(), workspace_id)["crawl_pages"] == 6
+
+    def test_flushed_messages_not_counted_twice(self):
+        service = CapturingService()
+        workspace_id = uuid4()
+
+        for _ in range(5):
+            service.record(workspace_id, {"messages": 1})
+        service.flush(FakeDB())
+
+        assert service.persisted == {"messages": 5}
+        assert service.get_month_usage(FakeDB(), workspace_id)["messages"] == 5
+
+        service.record(workspace_id, {"messages": 2})
+        assert service.get_month_usage(FakeDB(), workspace_id)["messages"] == 7
+
+    def test_reseeded_after_counter_loss(self):
+        service = CapturingService(persisted={"messages": 5})
+        workspace_id = uuid4()
+
+        service.record(workspace_id, {"messages": 1})
+        service.flush(FakeDB())
+        for key in service.redis.scan_iter("usage:month:*"):
+            service.redis.delete(key)
+
+        service.record(workspace_id, {"messages": 1})
+        assert service.get_month_usage(FakeDB(), workspace_id)["messages"] == 7
+
+    def test_database_down_keeps_pending_only(self):
+        service = CapturingService()
+        service.database_down = True
+        workspace_id = uuid4()
+
+        service.record(workspace_id, {"messages": 3})
+
+        assert not service.redis.scan_iter("usage:month:*")
+        service.database_down = False
+        service.flush(FakeDB())
+        assert service.get_month_usage(FakeDB(), workspace_id)["messages"] == 3
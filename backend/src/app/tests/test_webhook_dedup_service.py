@@ -0,0 +1,71 @@
+"""
+WebhookDedupService Tests
+
+WHY: Redelivered webhooks must not re-run inference
+HOW: In-memory Redis stand-in with SET NX semantics (no server)
+
+Tests:
+1. First delivery passes, repeat is dropped locally
+2. Repeat seen by another process is dropped via Redis
+3. Release lets a redelivery through
+4. Redis outage fails open
+
+USAGE:
+    pytest app/tests/test_webhook_dedup_service.py -v
+"""
+
+from app.services.webhook_dedup_service import WebhookDedupService
+
+
+class MemoryRedis:
+    def __init__(self):
+        self.data = {}
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+class BrokenRedis:
+    def set(self, *args, **kwargs):
+        raise ConnectionError("redis down")
+
+
+class TestDedup:
+    """Test duplicate detection."""
+
+    def test_local_repeat(self):
+        service = WebhookDedupService(redis_client=MemoryRedis())
+
+        assert service.is_duplicate("telegram", "bot", 1) is False
+        assert service.is_duplicate("telegram", "bot", 1) is True
+        assert service.is_duplicate("telegram", "other-bot", 1) is False
+        assert service.get_stats()["local_duplicates"] == 1
+
+    def test_cross_process_repeat(self):
+        redis = MemoryRedis()
+        WebhookDedupService(redis_client=redis).is_duplicate("whatsapp", "bot", "wamid.1")
+
+        other = WebhookDedupService(redis_client=redis)
+        assert other.is_duplicate("whatsapp", "bot", "wamid.1") is True
+        assert other.get_stats()["redis_duplicates"] == 1
+
+    def test_release(self):
+        service = WebhookDedupService(redis_client=MemoryRedis())
+        service.is_duplicate("telegram", "bot", 7)
+        service.release("telegram", "bot", 7)
+
+        assert service.is_duplicate("telegram", "bot", 7) is False
+
+    def test_missing_id_and_outage(self):
+        service = WebhookDedupService(redis_client=BrokenRedis())
+
+        assert service.is_duplicate("discord", "bot", None) is False
+        assert service.is_duplicate("discord", "bot", "123") is False
+        # Still caught by the local cache
+        assert service.is_duplicate("discord", "bot", "123") is True
@@ -0,0 +1,125 @@
+"""
+Webhook Route Tests
+
+WHY: An update marked as seen must not be lost when handling it fails
+HOW: Telegram route with registry, dispatcher and dedup Redis replaced
+
+Tests:
+1. A failed first delivery is processed when the platform retries
+2. An acknowledged update is still dropped on redelivery
+
+USAGE:
+    pytest app/tests/test_webhook_routes.py -v
+"""
+
+import sys
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import app.models.chatbot
+import app.models.chatflow
+
+try:
+    import app.models.credential  # noqa: F401
+except SyntaxError:
+    # The route's imports only need the model names
+    sys.modules["app.models.credential"] = SimpleNamespace(Credential=object, CredentialType=object)
+
+for model, name in [(app.models.chatbot, "Chatbot"), (app.models.chatflow, "Chatflow")]:
+    if not hasattr(model, name):
+        setattr(model, name, object)
+
+try:
+    import app.services.draft_service  # noqa: F401
+except (ImportError, AttributeError):
+    sys.modules["app.services.draft_service"] = SimpleNamespace(DraftType=object)
+
+from app.api.v1.routes.webhooks import telegram
+from app.db.session import get_db
+from app.services.webhook_dedup_service import WebhookDedupService
+
+
+class MemoryRedis:
+    def __init__(self):
+        self.data = {}
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+class BotEntry:
+    deployment_config = {"telegram": {"bot_token": "TOKEN"}}
+
+    def channel_enabled(self, channel):
+        return channel == "telegram"
+
+
+class FlakyRegistry:
+    """Fails the first lookup (e.g. database blip), then resolves."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, db, bot_id):
+        self.calls += 1
+        if self.calls == 1:
+            raise RuntimeError("database unavailable")
+        return BotEntry()
+
+
+class RecordingDispatcher:
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, bot_id, chat_key, kind, payload):
+        self.jobs.append((bot_id, chat_key))
+        return True
+
+
+UPDATE = {
+    "update_id": 42,
+    "message": {"message_id": 1, "from": {"id": 7}, "chat": {"id": 7}, "text": "hi"}
+}
+
+
+@pytest.fixture
+def route(monkeypatch):
+    dispatcher = RecordingDispatcher()
+    monkeypatch.setattr(telegram, "webhook_dedup_service", WebhookDedupService(redis_client=MemoryRedis()))
+    monkeypatch.setattr(telegram, "bot_registry", FlakyRegistry())
+    monkeypatch.setattr(telegram, "channel_dispatcher", dispatcher)
+
+    app = FastAPI()
+    app.include_router(telegram.router)
+    app.dependency_overrides[get_db] = lambda: None
+
+    return TestClient(app, raise_server_exceptions=False), dispatcher
+
+
+class TestTelegramRetry:
+    """Test dedup release on failure."""
+
+    def test_failed_delivery_processed_on_retry(self, route):
+        client, dispatcher = route
+        url = f"/webhooks/telegram/{uuid4()}"
+
+        assert client.post(url, json=UPDATE).status_code == 500
+        assert dispatcher.jobs == []
+
+        response = client.post(url, json=UPDATE)
+        assert response.json() == {"status": "ok"}
+        assert len(dispatcher.jobs) == 1
+
+        # Acknowledged now: further redeliveries are dropped
+        assert client.post(url, json=UPDATE).json() == {"status": "duplicate"}
+        assert len(dispatcher.jobs) == 1